@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Evaluate the Rule Fast Path on the Validation Sample
+
+Runs the rule-based classifier over the stratified validation sample from
+generate_validation_sample.py and compares it with the reference labels:
+the LLM-extracted values, overridden by expert corrections where a
+`<field>_valid` column is `N` and a `<field>_correction` is given.
+
+Reports, per confidence threshold, the share of skills that would skip the
+LLM (skip rate) and how often the rule fields agree with the reference on
+those skipped skills. Optionally calibrates rule confidences from the
+observed agreement and saves them for enhanced_metadata_extractor.py
+(--fast-path-calibration).
+
+Usage:
+    python3 evaluate_rule_fast_path.py \
+        --input ../outputs/production_extraction/validation/validation_sample.csv \
+        --output ../outputs/production_extraction/validation/rule_fast_path_report.md \
+        --calibrate-output ../outputs/production_extraction/validation/rule_calibration.json
+"""
+
+import pandas as pd
+import argparse
+import sys
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'extractors'))
+from rule_classifier import RuleBasedClassifier, CLASSIFIED_FIELDS
+
+THRESHOLDS = [0.60, 0.70, 0.75, 0.80, 0.85, 0.90]
+
+
+def reference_labels(row: pd.Series) -> Dict[str, str]:
+    """LLM values, replaced by expert corrections where validators marked them wrong."""
+    labels = {}
+    for field in CLASSIFIED_FIELDS:
+        value = row.get(field, '')
+        correction = row.get(f'{field}_correction', '')
+        if str(row.get(f'{field}_valid', '')).strip().upper() == 'N' and str(correction).strip():
+            value = correction
+        labels[field] = str(value).strip()
+    return labels
+
+
+def evaluate(df: pd.DataFrame, classifier: RuleBasedClassifier) -> List[Dict]:
+    """Classify every sample row and record per-field agreement."""
+    rows = []
+    for _, row in df.iterrows():
+        fields, confidence, rules = classifier.classify(row.to_dict())
+        reference = reference_labels(row)
+        rows.append({
+            'SKILL_ID': row.get('SKILL_ID'),
+            'CONTENT_AREA': row.get('CONTENT_AREA', ''),
+            'confidence': confidence,
+            'rules': rules,
+            'agree': {field: fields[field] == reference[field] for field in CLASSIFIED_FIELDS}
+        })
+    return rows
+
+
+def threshold_table(results: List[Dict]) -> pd.DataFrame:
+    """Skip rate and agreement on skipped skills for each threshold."""
+    table = []
+    for threshold in THRESHOLDS:
+        skipped = [r for r in results if r['confidence'] >= threshold]
+        entry = {
+            'threshold': threshold,
+            'skipped': len(skipped),
+            'skip_rate': len(skipped) / len(results) if results else 0.0,
+            'all_fields_agree': (sum(all(r['agree'].values()) for r in skipped) / len(skipped)
+                                 if skipped else float('nan'))
+        }
+        for field in CLASSIFIED_FIELDS:
+            entry[field] = (sum(r['agree'][field] for r in skipped) / len(skipped)
+                            if skipped else float('nan'))
+        table.append(entry)
+    return pd.DataFrame(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Evaluate the rule-based LLM fast path')
+    parser.add_argument('--input', required=True, help='Validation sample CSV')
+    parser.add_argument('--output', help='Markdown report path')
+    parser.add_argument('--calibration', help='Existing calibration JSON to evaluate')
+    parser.add_argument('--calibrate-output',
+                        help='Fit rule confidences on this sample and save them here')
+
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("RULE FAST PATH EVALUATION")
+    print("=" * 70)
+
+    df = pd.read_csv(args.input, dtype=str, keep_default_na=False)
+    print(f"Loaded {len(df)} validation skills")
+
+    # Rows filled by an earlier fast-path run would be compared with themselves
+    if 'extraction_method' in df.columns:
+        llm_rows = ~df['extraction_method'].str.contains('rules')
+        if (~llm_rows).any():
+            print(f"Excluding {(~llm_rows).sum()} rows labelled by the rule fast path")
+        df = df[llm_rows]
+
+    classifier = RuleBasedClassifier(calibration_path=args.calibration)
+    results = evaluate(df, classifier)
+
+    calibrated_table = None
+    if args.calibrate_output:
+        classifier.calibrate(
+            (field, r['rules'][field], r['agree'][field])
+            for r in results for field in CLASSIFIED_FIELDS
+        )
+        classifier.save_calibration(Path(args.calibrate_output))
+        print(f"✓ Calibration saved: {args.calibrate_output}")
+        calibrated_table = threshold_table(evaluate(df, classifier))
+
+    table = threshold_table(results)
+    overall = {field: sum(r['agree'][field] for r in results) / len(results)
+               for field in CLASSIFIED_FIELDS} if results else {}
+
+    print("\nAgreement with reference (all skills, no threshold):")
+    for field, rate in overall.items():
+        print(f"  {field}: {rate:.1%}")
+
+    print("\nSkip rate vs agreement on skipped skills:")
+    print(table[['threshold', 'skipped', 'skip_rate', 'all_fields_agree']].to_string(
+        index=False, float_format=lambda v: f"{v:.2f}"))
+    if calibrated_table is not None:
+        print("\nAfter calibration (in-sample):")
+        print(calibrated_table[['threshold', 'skipped', 'skip_rate', 'all_fields_agree']].to_string(
+            index=False, float_format=lambda v: f"{v:.2f}"))
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w') as f:
+            f.write("# Rule Fast Path Evaluation\n\n")
+            f.write(f"**Date**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}  \n")
+            f.write(f"**Sample**: {args.input} ({len(results)} skills)  \n")
+            f.write(f"**Calibration**: {args.calibration or 'priors'}\n\n")
+
+            f.write("## Field Agreement (all skills)\n\n")
+            f.write("| Field | Agreement |\n|-------|-----------|\n")
+            for field, rate in overall.items():
+                f.write(f"| {field} | {rate:.1%} |\n")
+
+            f.write("\n## Skip Rate vs Agreement on Skipped Skills\n\n")
+            f.write(table.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+            f.write("\n")
+
+            if calibrated_table is not None:
+                f.write("\n## After Calibration (in-sample, optimistic)\n\n")
+                f.write(calibrated_table.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+                f.write("\n")
+
+            f.write("\n## By Content Area (threshold 0.80)\n\n")
+            for area in sorted({r['CONTENT_AREA'] for r in results}):
+                area_rows = [r for r in results if r['CONTENT_AREA'] == area]
+                skipped = [r for r in area_rows if r['confidence'] >= 0.80]
+                agree = (sum(all(r['agree'].values()) for r in skipped) / len(skipped)
+                         if skipped else 0.0)
+                f.write(f"- **{area or 'Unknown'}**: {len(skipped)}/{len(area_rows)} skipped, "
+                        f"{agree:.1%} full agreement\n")
+        print(f"\n✓ Report saved: {output_path}")
+
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -22,6 +22,13 @@ Usage:
         --output ./outputs/filtered_enhanced_metadata \\
         --checkpoint-interval 50
 
+    # Resume an interrupted run (re-run the same command; skills already in
+    # the run's shards are skipped and everything is merged at the end)
+    python3 enhanced_metadata_extractor.py \\
+        --input ../../rock_schemas/SKILLS.csv \\
+        --output-dir ./outputs/full_enhanced_metadata \\
+        --run-name full_ela
+
     # Full ELA corpus
     python3 enhanced_metadata_extractor.py \\
         --input ../../rock_schemas/SKILLS.csv \\
@@ -38,6 +45,8 @@ import sys
 import json
 import time
 import re
+import hashlib
+import threading
 from datetime import datetime
 from typing import List, Dict, Optional
 from botocore.config import Config
@@ -48,6 +57,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 try:
     import boto3
     from spacy_processor import SkillProcessor, SkillConcepts, SkillStructure
+    from shard_writer import ShardWriter
+    from extraction_pipeline import ExtractionPipeline
+    from rule_classifier import RuleBasedClassifier
     DEPENDENCIES_AVAILABLE = True
 except ImportError as e:
     print(f"Error: Missing dependencies: {e}")
@@ -56,6 +68,26 @@ except ImportError as e:
     DEPENDENCIES_AVAILABLE = False
 
 
+# Bump when rule-based specification logic changes in a way the pattern
+# tables below don't capture (it is hashed together with them)
+RULE_VERSION = '1.0'
+
+# Fields produced by the LLM stage (reused as a block in incremental runs)
+LLM_FIELDS = [
+    'text_type', 'text_mode', 'text_genre', 'skill_domain', 'task_complexity',
+    'cognitive_demand', 'scope', 'llm_confidence', 'llm_notes'
+]
+
+# Skill columns that feed extraction; changing any of them changes text_hash
+FINGERPRINT_INPUT_COLUMNS = ['SKILL_NAME', 'SKILL_AREA_NAME', 'GRADE_LEVEL_SHORT_NAME']
+
+
+def _short_hash(*parts) -> str:
+    """Stable 16-hex-digit SHA-256 digest of the given values."""
+    blob = '\x1f'.join('' if part is None else str(part) for part in parts)
+    return hashlib.sha256(blob.encode('utf-8')).hexdigest()[:16]
+
+
 class EnhancedMetadataExtractor:
     """
     Comprehensive metadata extraction combining:
@@ -64,15 +96,30 @@ class EnhancedMetadataExtractor:
     - Rule-based specification extraction (fast, patterns)
     """
     
-    def __init__(self, use_llm: bool = True, use_spacy: bool = True):
-        """Initialize the enhanced metadata extractor."""
+    def __init__(self, use_llm: bool = True, use_spacy: bool = True,
+                 domains: Optional[List[str]] = None,
+                 rule_fast_path: bool = False,
+                 fast_path_threshold: float = 0.80,
+                 calibration_path: Optional[Path] = None):
+        """
+        Initialize the enhanced metadata extractor.
+        
+        Args:
+            use_llm: Enable LLM educational classification
+            use_spacy: Enable spaCy structural analysis
+            domains: Extra vocabulary lexicons for spaCy tagging (e.g. ['math'])
+            rule_fast_path: Fill LLM fields by rule when the rule classifier is confident
+            fast_path_threshold: Minimum rule confidence to skip the LLM
+            calibration_path: Rule confidence calibration JSON (see rule_classifier.py)
+        """
         self.use_llm = use_llm
         self.use_spacy = use_spacy
+        self.domains = domains
         
         # Initialize spaCy processor
         if self.use_spacy:
             print("Initializing spaCy processor...")
-            self.spacy_processor = SkillProcessor()
+            self.spacy_processor = SkillProcessor(domains=domains)
         else:
             self.spacy_processor = None
         
@@ -85,6 +132,8 @@ class EnhancedMetadataExtractor:
                 config=Config(read_timeout=300)
             )
             self.model_id = 'us.anthropic.claude-sonnet-4-5-20250929-v1:0'
+        else:
+            self.model_id = None
         
         # Define patterns for rule-based extraction
         self.support_patterns = {
@@ -94,28 +143,41 @@ class EnhancedMetadataExtractor:
             'independent': ['independently', 'without support', 'autonomously']
         }
         
+        self.grade_band_map = {
+            'Pre-K': 'K-2', 'PK': 'K-2', 'K': 'K-2', 'Kindergarten': 'K-2',
+            '1': 'K-2', '2': 'K-2',
+            '3': '3-5', '4': '3-5', '5': '3-5',
+            '6': '6-8', '7': '6-8', '8': '6-8',
+            '9': '9-12', '10': '9-12', '11': '9-12', '12': '9-12'
+        }
+        
+        # Rule fast path: skip the LLM for confidently classified skills
+        self.rule_classifier = RuleBasedClassifier(calibration_path) if rule_fast_path else None
+        self.fast_path_threshold = fast_path_threshold
+        
+        # Incremental re-extraction: prior rows keyed by SKILL_ID
+        self.previous_metadata: Dict[str, Dict] = {}
+        self._version_stamp: Optional[Dict] = None
+        
         # Token tracking
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.api_calls = 0
         self.spacy_extraction_count = 0
         self.llm_extraction_count = 0
+        self.llm_reuse_count = 0
+        self.llm_failure_count = 0
+        self.rule_fast_path_count = 0
+        # Counters are shared by concurrent LLM workers (see extraction_pipeline)
+        self._stats_lock = threading.Lock()
     
     def extract_complexity_band(self, grade_level: str) -> str:
         """Map grade level to complexity band."""
         if pd.isna(grade_level):
             return 'Unknown'
         
-        grade_map = {
-            'Pre-K': 'K-2', 'PK': 'K-2', 'K': 'K-2', 'Kindergarten': 'K-2',
-            '1': 'K-2', '2': 'K-2',
-            '3': '3-5', '4': '3-5', '5': '3-5',
-            '6': '6-8', '7': '6-8', '8': '6-8',
-            '9': '9-12', '10': '9-12', '11': '9-12', '12': '9-12'
-        }
-        
         grade_str = str(grade_level).strip()
-        return grade_map.get(grade_str, 'Unknown')
+        return self.grade_band_map.get(grade_str, 'Unknown')
     
     def extract_support_level(self, skill_name: str) -> str:
         """Extract support level using pattern matching."""
@@ -258,11 +320,12 @@ RESPOND WITH ONLY THE JSON OBJECT (no preamble, no markdown):"""
         response_body = json.loads(response['body'].read())
         
         # Track tokens
-        if 'usage' in response_body:
-            self.total_input_tokens += response_body['usage'].get('input_tokens', 0)
-            self.total_output_tokens += response_body['usage'].get('output_tokens', 0)
-        
-        self.api_calls += 1
+        with self._stats_lock:
+            if 'usage' in response_body:
+                self.total_input_tokens += response_body['usage'].get('input_tokens', 0)
+                self.total_output_tokens += response_body['usage'].get('output_tokens', 0)
+            
+            self.api_calls += 1
         
         return response_body
     
@@ -302,21 +365,30 @@ RESPOND WITH ONLY THE JSON OBJECT (no preamble, no markdown):"""
             return None
     
     def extract_with_llm(self, skill: Dict, concepts: Optional[SkillConcepts],
-                        structure: Optional[SkillStructure]) -> Dict:
-        """Extract educational metadata using LLM with spaCy context."""
+                        structure: Optional[SkillStructure],
+                        prompt: Optional[str] = None) -> Optional[Dict]:
+        """
+        Extract educational metadata using LLM with spaCy context.
+        
+        Returns:
+            LLM-field dict (fallback values when the LLM is disabled), or
+            None when the call or response parsing failed
+        """
         
         if not self.use_llm:
             return self._fallback_educational_metadata()
         
         try:
-            prompt = self.build_llm_prompt(skill, concepts, structure)
+            if prompt is None:
+                prompt = self.build_llm_prompt(skill, concepts, structure)
             response = self.call_bedrock(prompt)
             
             # Parse LLM response
             metadata = self.parse_llm_response(response['content'][0]['text'])
             
             if metadata:
-                self.llm_extraction_count += 1
+                with self._stats_lock:
+                    self.llm_extraction_count += 1
                 return {
                     'text_type': metadata.get('text_type', 'not_applicable'),
                     'text_mode': metadata.get('text_mode', 'not_applicable'),
@@ -330,11 +402,11 @@ RESPOND WITH ONLY THE JSON OBJECT (no preamble, no markdown):"""
                 }
             else:
                 print("  ⚠ LLM parsing failed, using fallback")
-                return self._fallback_educational_metadata()
+                return None
                 
         except Exception as e:
             print(f"  ✗ LLM error: {e}")
-            return self._fallback_educational_metadata()
+            return None
     
     def _fallback_educational_metadata(self) -> Dict:
         """Provide fallback metadata when LLM is unavailable or fails."""
@@ -350,6 +422,107 @@ RESPOND WITH ONLY THE JSON OBJECT (no preamble, no markdown):"""
             'llm_notes': 'Fallback values - LLM extraction failed or disabled'
         }
     
+    # ------------------------------------------------------------------
+    # Versioning / incremental re-extraction
+    # ------------------------------------------------------------------
+    
+    def version_stamp(self) -> Dict[str, str]:
+        """
+        Versions of every extraction component, shared by all rows of a run.
+        
+        - nlp_version: spaCy model + vocabulary signature
+        - prompt_hash: LLM prompt template (rendered for a placeholder skill)
+        - llm_model_id: Bedrock model, or 'none' when the LLM is disabled
+        - rule_version: RULE_VERSION plus the rule pattern tables
+        """
+        if self._version_stamp is None:
+            placeholder = {'SKILL_NAME': '{SKILL_NAME}', 'SKILL_AREA_NAME': '{SKILL_AREA_NAME}',
+                           'GRADE_LEVEL_SHORT_NAME': '{GRADE_LEVEL_SHORT_NAME}'}
+            rule_tables = [self.support_patterns, self.grade_band_map]
+            if self.rule_classifier:
+                rule_tables += [self.rule_classifier.signature(), self.fast_path_threshold]
+            rules = json.dumps(rule_tables, sort_keys=True)
+            self._version_stamp = {
+                'nlp_version': (self.spacy_processor.version_signature()
+                                if self.use_spacy and self.spacy_processor else 'none'),
+                'prompt_hash': _short_hash(self.build_llm_prompt(placeholder, None, None)),
+                'llm_model_id': self.model_id or 'none',
+                'rule_version': f"{RULE_VERSION}-{_short_hash(rules)[:8]}"
+            }
+        return self._version_stamp
+    
+    def compute_fingerprint(self, skill: Dict) -> Dict[str, str]:
+        """
+        Fingerprint a skill against the current extraction configuration.
+        
+        Returns:
+            Dict with text_hash, the version_stamp() components and the
+            combined metadata_fingerprint
+        """
+        stamp = self.version_stamp()
+        text_hash = _short_hash(*(skill.get(col, '') for col in FINGERPRINT_INPUT_COLUMNS))
+        return {
+            'text_hash': text_hash,
+            **stamp,
+            'metadata_fingerprint': _short_hash(
+                text_hash, stamp['nlp_version'], stamp['prompt_hash'],
+                stamp['llm_model_id'], stamp['rule_version']
+            )
+        }
+    
+    def load_previous_metadata(self, metadata_path: Path) -> int:
+        """
+        Load a prior metadata CSV for incremental re-extraction.
+        
+        Returns:
+            Number of prior rows loaded
+        """
+        previous_df = pd.read_csv(metadata_path, dtype=str, keep_default_na=False)
+        self.previous_metadata = {
+            row['SKILL_ID']: row for row in previous_df.to_dict('records')
+        }
+        return len(self.previous_metadata)
+    
+    def reusable_metadata(self, skill: Dict) -> Optional[Dict]:
+        """Return the prior row for a skill if its fingerprint is unchanged."""
+        previous = self.previous_metadata.get(str(skill['SKILL_ID']))
+        if previous and previous.get('metadata_fingerprint') == \
+                self.compute_fingerprint(skill)['metadata_fingerprint']:
+            return previous
+        return None
+    
+    def classify_with_rules(self, skill: Dict, concepts: Optional[SkillConcepts],
+                            structure: Optional[SkillStructure],
+                            complexity_band: str) -> Optional[Dict]:
+        """
+        Rule fast path: educational metadata without an LLM call.
+        
+        Returns:
+            LLM-field dict when the rule classifier's confidence meets
+            fast_path_threshold, otherwise None (the LLM should be asked)
+        """
+        if self.rule_classifier is None:
+            return None
+        
+        fields, confidence, rules = self.rule_classifier.classify({
+            **skill,
+            'complexity_band': complexity_band,
+            'actions': concepts.actions if concepts else [],
+            'targets': concepts.targets if concepts else [],
+            'key_concepts': concepts.key_concepts if concepts else [],
+            'root_verb': structure.root_verb if structure else ''
+        })
+        if confidence < self.fast_path_threshold:
+            return None
+        
+        with self._stats_lock:
+            self.rule_fast_path_count += 1
+        return {
+            **fields,
+            'llm_confidence': 'high' if confidence >= 0.90 else 'medium',
+            'llm_notes': f"Rule fast path (confidence {confidence:.2f})"
+        }
+    
     def extract_comprehensive_metadata(self, skill: Dict) -> Dict:
         """
         Extract all metadata for a single skill.
@@ -368,17 +541,59 @@ RESPOND WITH ONLY THE JSON OBJECT (no preamble, no markdown):"""
         if self.use_spacy and self.spacy_processor:
             concepts = self.spacy_processor.extract_concepts(skill['SKILL_NAME'])
             structure = self.spacy_processor.extract_structure(skill['SKILL_NAME'])
-            self.spacy_extraction_count += 1
         else:
             concepts = None
             structure = None
         
+        # Stages 2-4: Rules, LLM, combine
+        return self.complete_metadata(skill, concepts, structure)
+    
+    def complete_metadata(self, skill: Dict, concepts: Optional[SkillConcepts],
+                          structure: Optional[SkillStructure]) -> Dict:
+        """
+        Run the post-spaCy stages for a skill whose structure is already parsed.
+        
+        Split out of extract_comprehensive_metadata() so the concurrent
+        pipeline can parse in worker processes and finish here in LLM threads.
+        
+        Returns:
+            Dictionary with 23 metadata fields
+        """
+        if concepts is not None:
+            with self._stats_lock:
+                self.spacy_extraction_count += 1
+        
         # Stage 2: Rule-based specifications
         support_level = self.extract_support_level(skill['SKILL_NAME'])
         complexity_band = self.extract_complexity_band(skill.get('GRADE_LEVEL_SHORT_NAME'))
         
-        # Stage 3: LLM educational metadata
-        educational_metadata = self.extract_with_llm(skill, concepts, structure)
+        # Stage 3: LLM educational metadata, reused from the previous run when
+        # the exact prompt (skill text, template, spaCy context) and model match
+        fingerprint = self.compute_fingerprint(skill)
+        prompt = self.build_llm_prompt(skill, concepts, structure)
+        llm_input_hash = _short_hash(fingerprint['llm_model_id'], prompt)
+        extraction_method = 'hybrid_spacy_llm' if (self.use_spacy and self.use_llm) else 'partial'
+        previous = self.previous_metadata.get(str(skill['SKILL_ID']))
+        if previous and previous.get('llm_input_hash') == llm_input_hash:
+            educational_metadata = {field: previous.get(field, '') for field in LLM_FIELDS}
+            with self._stats_lock:
+                self.llm_reuse_count += 1
+        else:
+            educational_metadata = self.classify_with_rules(skill, concepts, structure, complexity_band)
+            if educational_metadata is not None:
+                extraction_method = 'hybrid_spacy_rules' if self.use_spacy else 'rules'
+                llm_input_hash = ''  # No LLM output to reuse in later incremental runs
+            else:
+                educational_metadata = self.extract_with_llm(skill, concepts, structure, prompt=prompt)
+                if educational_metadata is None:
+                    # Failed call: fallback values, never reused by later
+                    # incremental runs so the LLM is retried
+                    educational_metadata = self._fallback_educational_metadata()
+                    extraction_method = 'fallback'
+                    llm_input_hash = ''
+                    fingerprint['metadata_fingerprint'] = ''
+                    with self._stats_lock:
+                        self.llm_failure_count += 1
         
         # Stage 4: Combine results
         result = {
@@ -396,8 +611,12 @@ RESPOND WITH ONLY THE JSON OBJECT (no preamble, no markdown):"""
             **educational_metadata,
             
             # Quality metrics
-            'extraction_method': 'hybrid_spacy_llm' if (self.use_spacy and self.use_llm) else 'partial',
-            'extraction_timestamp': datetime.now().isoformat()
+            'extraction_method': extraction_method,
+            'extraction_timestamp': datetime.now().isoformat(),
+            
+            # Versioning (see docs/METADATA_VERSIONING_STRATEGY.md)
+            **fingerprint,
+            'llm_input_hash': llm_input_hash
         }
         
         # Add structural components (spaCy) if available
@@ -439,7 +658,10 @@ RESPOND WITH ONLY THE JSON OBJECT (no preamble, no markdown):"""
             'output_tokens': self.total_output_tokens,
             'estimated_cost': cost,
             'spacy_extractions': self.spacy_extraction_count,
-            'llm_extractions': self.llm_extraction_count
+            'llm_extractions': self.llm_extraction_count,
+            'llm_reused': self.llm_reuse_count,
+            'llm_failures': self.llm_failure_count,
+            'rule_fast_path': self.rule_fast_path_count
         }
 
 
@@ -465,16 +687,41 @@ def main():
     # Skip existing
     parser.add_argument('--skip-existing',
                         help='Path to existing metadata CSV to skip already processed skills')
-    
-    # Checkpointing
+    parser.add_argument('--incremental',
+                        help='Path to a previous metadata CSV; copy rows whose fingerprint is '
+                             'unchanged and only recompute the stages that changed')
+    
+    # Streaming output / resume
+    parser.add_argument('--run-name', default='enhanced_metadata',
+                        help='Run name for append-only shards; re-running with the same '
+                             'name and the same input/filters resumes and skips SKILL_IDs '
+                             'already written (a different input or filter is refused)')
+    parser.add_argument('--shard-size', type=int, default=1000,
+                        help='Records per output shard')
     parser.add_argument('--checkpoint-interval', type=int, default=50,
-                        help='Save checkpoint every N skills')
+                        help='Print progress statistics every N skills')
+    
+    # Concurrency
+    parser.add_argument('--nlp-workers', type=int, default=2,
+                        help='spaCy worker processes (0 = parse in the main process)')
+    parser.add_argument('--llm-workers', type=int, default=4,
+                        help='Concurrent LLM requests')
+    parser.add_argument('--queue-size', type=int, default=64,
+                        help='Max skills buffered between pipeline stages')
+    parser.add_argument('--serial', action='store_true',
+                        help='Process one skill at a time (no concurrent pipeline)')
     
     # Control flags
     parser.add_argument('--no-llm', action='store_true',
                         help='Disable LLM extraction (faster, lower quality)')
     parser.add_argument('--no-spacy', action='store_true',
                         help='Disable spaCy extraction (not recommended)')
+    parser.add_argument('--rule-fast-path', action='store_true',
+                        help='Skip the LLM for skills the rule classifier labels confidently')
+    parser.add_argument('--fast-path-threshold', type=float, default=0.80,
+                        help='Minimum rule confidence to skip the LLM (default: 0.80)')
+    parser.add_argument('--fast-path-calibration',
+                        help='Rule confidence calibration JSON from evaluate_rule_fast_path.py')
     
     args = parser.parse_args()
     
@@ -529,53 +776,93 @@ def main():
             print(f"Skipping {len(existing_ids)} already processed skills")
             print(f"Remaining: {len(skills_df)} skills to process")
     
-    # Apply limits
+    # Apply limits (before resume filtering, so a re-run covers the same batch)
     if args.limit:
         end_index = min(args.start_index + args.limit, len(skills_df))
         skills_df = skills_df.iloc[args.start_index:end_index]
         print(f"Processing batch: skills {args.start_index} to {end_index-1} ({len(skills_df)} total)")
     
-    if len(skills_df) == 0:
-        print("No skills to process!")
-        return 0
-    
     # Initialize extractor
     print("\nInitializing Enhanced Metadata Extractor...")
+    math_areas = {'Mathematics', 'Math'}
     extractor = EnhancedMetadataExtractor(
         use_llm=not args.no_llm,
-        use_spacy=not args.no_spacy
+        use_spacy=not args.no_spacy,
+        domains=['math'] if args.content_area in math_areas else None,
+        rule_fast_path=args.rule_fast_path,
+        fast_path_threshold=args.fast_path_threshold,
+        calibration_path=args.fast_path_calibration
     )
     
+    # Resume: skip skills already written to this run's shards. The run
+    # config includes every option that changes the output, plus the
+    # resolved component versions, so a resumed run can't mix settings.
+    run_config = {
+        'input': str(input_path.resolve()),
+        'content_area': args.content_area,
+        'start_index': args.start_index,
+        'limit': args.limit,
+        'skip_existing': args.skip_existing,
+        'incremental': args.incremental,
+        'no_llm': args.no_llm,
+        'no_spacy': args.no_spacy,
+        'rule_fast_path': args.rule_fast_path,
+        'fast_path_threshold': args.fast_path_threshold,
+        'fast_path_calibration': args.fast_path_calibration,
+        'versions': extractor.version_stamp(),
+    }
+    try:
+        writer = ShardWriter(output_dir, run_name=args.run_name, shard_size=args.shard_size,
+                             run_config=run_config)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    completed_ids = writer.completed_ids()
+    if completed_ids:
+        skills_df = skills_df[~skills_df['SKILL_ID'].astype(str).isin(completed_ids)]
+        print(f"Resuming run '{args.run_name}': {len(completed_ids)} skills already written")
+        print(f"Remaining: {len(skills_df)} skills to process")
+    
+    if len(skills_df) == 0 and not completed_ids:
+        print("No skills to process!")
+        return 0
+    
+    # Incremental: carry over rows whose fingerprint is unchanged
+    reused_rows = []
+    if args.incremental:
+        loaded = extractor.load_previous_metadata(Path(args.incremental))
+        print(f"\nIncremental mode: loaded {loaded} previous rows from {args.incremental}")
+        print(f"Current versions: {extractor.version_stamp()}")
+        keep_mask = []
+        for _, skill in skills_df.iterrows():
+            previous = extractor.reusable_metadata(skill.to_dict())
+            if previous is not None:
+                reused_rows.append(previous)
+            keep_mask.append(previous is None)
+        skills_df = skills_df[keep_mask]
+        print(f"Unchanged (copied): {len(reused_rows)} | To re-extract: {len(skills_df)}")
+    
     # Process skills
     print(f"\nProcessing {len(skills_df)} skills...")
+    print(f"Streaming results to: {writer.shard_dir}")
     print("=" * 70)
     
-    results = []
+    processed = 0
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     start_time = time.time()
     
-    for idx, (_, skill) in enumerate(skills_df.iterrows(), 1):
-        skill_name_display = skill['SKILL_NAME'][:70] + "..." if len(skill['SKILL_NAME']) > 70 else skill['SKILL_NAME']
-        print(f"[{idx}/{len(skills_df)}] Processing: {skill_name_display}")
-        
-        result = extractor.extract_comprehensive_metadata(skill.to_dict())
-        
-        if result:
-            results.append(result)
-            confidence = result.get('llm_confidence', 'unknown')
-            print(f"  ✓ Extracted (confidence: {confidence})")
-        else:
-            print(f"  ✗ Extraction failed")
+    def report_progress(idx: int, result: Dict):
+        skill_name = result['SKILL_NAME']
+        skill_name_display = skill_name[:70] + "..." if len(skill_name) > 70 else skill_name
+        confidence = result.get('llm_confidence', 'unknown')
+        print(f"[{idx}/{len(skills_df)}] ✓ {skill_name_display} (confidence: {confidence})")
         
-        # Checkpoint
-        if idx % args.checkpoint_interval == 0 and results:
-            checkpoint_path = output_dir / f"checkpoint_enhanced_metadata_{timestamp}.csv"
-            results_df = pd.DataFrame(results)
-            results_df.to_csv(checkpoint_path, index=False)
+        # Progress statistics (every record is already on disk)
+        if idx % args.checkpoint_interval == 0:
             print(f"\n{'='*70}")
             print(f"CHECKPOINT at {idx} skills")
             print(f"{'='*70}")
-            print(f"✓ Checkpoint saved: {checkpoint_path}")
+            print(f"✓ {writer.records_written} records streamed to {writer.shard_dir}")
             
             # Print usage stats
             stats = extractor.get_usage_stats()
@@ -588,22 +875,54 @@ def main():
                 print(f"  Estimated Cost: ${stats['estimated_cost']:.2f}")
             print(f"{'='*70}\n")
     
-    # Save final results
+    skill_records = (skill.to_dict() for _, skill in skills_df.iterrows())
+    
+    with writer:
+        for previous in reused_rows:
+            writer.write(previous)
+        
+        if args.serial:
+            for skill in skill_records:
+                result = extractor.extract_comprehensive_metadata(skill)
+                if result:
+                    writer.write(result)
+                    processed += 1
+                    report_progress(processed, result)
+                else:
+                    print(f"  ✗ Extraction failed: {skill['SKILL_ID']}")
+        else:
+            print(f"Pipeline: {args.nlp_workers} spaCy workers → "
+                  f"{args.llm_workers} LLM workers → 1 writer")
+            pipeline = ExtractionPipeline(
+                extractor,
+                nlp_workers=args.nlp_workers,
+                llm_workers=args.llm_workers,
+                queue_size=args.queue_size
+            )
+            processed = pipeline.run(skill_records, writer, on_result=report_progress)
+    
     elapsed_time = time.time() - start_time
     
     print("\n" + "=" * 70)
     print("BATCH COMPLETE")
     print("=" * 70)
-    print(f"Processed: {len(results)} skills")
+    print(f"Processed: {processed} skills")
     print(f"Time Elapsed: {elapsed_time:.1f}s")
-    print(f"Avg Time per Skill: {elapsed_time/len(results):.1f}s" if results else "N/A")
-    
-    # Save final files
-    if results:
-        final_path = output_dir / f"skill_metadata_enhanced_{timestamp}.csv"
-        results_df = pd.DataFrame(results)
-        results_df.to_csv(final_path, index=False)
-        print(f"\n✓ Final results saved: {final_path}")
+    print(f"Avg Time per Skill: {elapsed_time/processed:.1f}s" if processed else "N/A")
+    
+    # Merge all shards (this run and any resumed ones) into the final CSV
+    final_path = output_dir / f"skill_metadata_enhanced_{timestamp}.csv"
+    total_rows = writer.merge_to_csv(final_path)
+    if total_rows:
+        print(f"\n✓ Final results saved: {final_path} ({total_rows} skills)")
+        
+        # Summary only needs the categorical and structural columns
+        summary_fields = ['llm_confidence', 'skill_domain', 'text_type', 'text_mode',
+                          'cognitive_demand', 'task_complexity', 'support_level',
+                          'complexity_band', 'actions', 'root_verb']
+        results_df = pd.read_csv(
+            final_path, usecols=lambda col: col in summary_fields, keep_default_na=False
+        )
         
         # Generate summary report
         summary_path = output_dir / f"extraction_summary_{timestamp}.txt"
@@ -611,16 +930,19 @@ def main():
             f.write("Enhanced ROCK Skills Metadata Extraction Summary\n")
             f.write("=" * 70 + "\n")
             f.write(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Skills Processed: {len(results)}\n")
+            f.write(f"Skills in Output: {total_rows}\n")
+            f.write(f"Skills Processed This Run: {processed}\n")
             f.write(f"Time Elapsed: {elapsed_time:.1f}s\n")
-            f.write(f"Avg Time per Skill: {elapsed_time/len(results):.1f}s\n\n")
+            if processed:
+                f.write(f"Avg Time per Skill: {elapsed_time/processed:.1f}s\n")
+            f.write("\n")
             
             # Confidence distribution
             if 'llm_confidence' in results_df.columns:
                 conf_dist = results_df['llm_confidence'].value_counts()
                 f.write("LLM Confidence Distribution:\n")
                 for conf, count in conf_dist.items():
-                    pct = (count / len(results)) * 100
+                    pct = (count / total_rows) * 100
                     f.write(f"  {conf}: {count} ({pct:.1f}%)\n")
                 f.write("\n")
             
@@ -633,7 +955,7 @@ def main():
                     dist = results_df[field].value_counts()
                     f.write(f"{field.replace('_', ' ').title()} Distribution:\n")
                     for value, count in dist.head(10).items():
-                        pct = (count / len(results)) * 100
+                        pct = (count / total_rows) * 100
                         f.write(f"  {value}: {count} ({pct:.1f}%)\n")
                     f.write("\n")
             
@@ -641,10 +963,10 @@ def main():
             if 'actions' in results_df.columns:
                 non_empty_actions = results_df[results_df['actions'] != ''].shape[0]
                 f.write("Structural Analysis Coverage:\n")
-                f.write(f"  Skills with actions extracted: {non_empty_actions} ({non_empty_actions/len(results)*100:.1f}%)\n")
+                f.write(f"  Skills with actions extracted: {non_empty_actions} ({non_empty_actions/total_rows*100:.1f}%)\n")
                 if 'root_verb' in results_df.columns:
                     non_empty_root = results_df[results_df['root_verb'] != ''].shape[0]
-                    f.write(f"  Skills with root verb extracted: {non_empty_root} ({non_empty_root/len(results)*100:.1f}%)\n")
+                    f.write(f"  Skills with root verb extracted: {non_empty_root} ({non_empty_root/total_rows*100:.1f}%)\n")
                 f.write("\n")
             
             # LLM usage
@@ -652,6 +974,10 @@ def main():
             f.write("Processing Statistics:\n")
             f.write(f"  spaCy extractions: {stats['spacy_extractions']}\n")
             f.write(f"  LLM extractions: {stats['llm_extractions']}\n")
+            if stats['llm_reused'] > 0:
+                f.write(f"  LLM results reused (unchanged prompt): {stats['llm_reused']}\n")
+            if stats['rule_fast_path'] > 0:
+                f.write(f"  LLM skipped (rule fast path): {stats['rule_fast_path']}\n")
             if stats['api_calls'] > 0:
                 f.write(f"  API Calls: {stats['api_calls']}\n")
                 f.write(f"  Total Tokens: {stats['total_tokens']:,}\n")
@@ -668,6 +994,10 @@ def main():
     print("=" * 70)
     print(f"spaCy extractions: {stats['spacy_extractions']}")
     print(f"LLM extractions: {stats['llm_extractions']}")
+    if stats['llm_reused'] > 0:
+        print(f"LLM results reused (unchanged prompt): {stats['llm_reused']}")
+    if stats['rule_fast_path'] > 0:
+        print(f"LLM skipped (rule fast path): {stats['rule_fast_path']}")
     if stats['api_calls'] > 0:
         print(f"API Calls: {stats['api_calls']}")
         print(f"Total Tokens: {stats['total_tokens']:,}")
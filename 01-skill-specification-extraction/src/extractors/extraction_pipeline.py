@@ -0,0 +1,208 @@
+"""
+Concurrent Extraction Pipeline for Enhanced Metadata
+
+Runs EnhancedMetadataExtractor as three overlapping stages instead of one
+skill at a time:
+
+    skills ──► [spaCy process pool] ──► [LLM thread pool] ──► [single writer]
+                      (CPU-bound)            (I/O-bound)        (ShardWriter)
+
+Stages are connected by bounded queues, so a slow stage applies
+backpressure upstream instead of letting work pile up in memory. Throughput
+approaches the slowest stage (normally the LLM) rather than the sum of all
+per-skill latencies.
+
+Ctrl+C stops feeding new skills, lets in-flight LLM calls finish and be
+written, then returns; a second Ctrl+C aborts immediately. Skills that were
+never written are picked up on the next run through ShardWriter resume.
+
+Usage:
+    from extraction_pipeline import ExtractionPipeline
+
+    pipeline = ExtractionPipeline(extractor, nlp_workers=2, llm_workers=4)
+    with ShardWriter(output_dir) as writer:
+        written = pipeline.run(skills, writer)
+"""
+
+import queue
+import signal
+import threading
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from spacy_processor import SkillProcessor
+
+
+# Marks the end of a stage's output on a queue
+_DONE = object()
+
+# Per-process SkillProcessor for spaCy workers
+_worker_processor = None
+
+
+def _init_nlp_worker(domains: Optional[List[str]]):
+    """Load spaCy once per worker process; Ctrl+C is handled by the parent."""
+    global _worker_processor
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _worker_processor = SkillProcessor(domains=domains)
+
+
+def _parse_skill(skill_name: str):
+    """Stage 1 (worker process): spaCy concepts and structure for one skill."""
+    return (_worker_processor.extract_concepts(skill_name),
+            _worker_processor.extract_structure(skill_name))
+
+
+class ExtractionPipeline:
+    """
+    Three-stage concurrent runner for EnhancedMetadataExtractor.
+    """
+
+    def __init__(self, extractor, nlp_workers: int = 2, llm_workers: int = 4,
+                 queue_size: int = 64):
+        """
+        Initialize the pipeline.
+
+        Args:
+            extractor: Configured EnhancedMetadataExtractor
+            nlp_workers: spaCy worker processes (0 parses in a parent thread)
+            llm_workers: Concurrent LLM threads
+            queue_size: Capacity of each inter-stage queue (backpressure bound)
+        """
+        self.extractor = extractor
+        self.nlp_workers = nlp_workers
+        self.llm_workers = max(1, llm_workers)
+        self.queue_size = max(1, queue_size)
+        self.stop_event = threading.Event()
+
+    def _install_sigint_handler(self):
+        """First Ctrl+C drains gracefully; the second restores default behaviour."""
+        if threading.current_thread() is not threading.main_thread():
+            return None
+
+        def handle_sigint(signum, frame):
+            if self.stop_event.is_set():
+                signal.signal(signal.SIGINT, signal.default_int_handler)
+                raise KeyboardInterrupt
+            print("\n⚠ Interrupt received: finishing in-flight skills "
+                  "(press Ctrl+C again to abort)...")
+            self.stop_event.set()
+
+        return signal.signal(signal.SIGINT, handle_sigint)
+
+    def run(self, skills: Iterable[Dict], writer,
+            on_result: Optional[Callable[[int, Dict], None]] = None) -> int:
+        """
+        Extract metadata for all skills and stream results to the writer.
+
+        Args:
+            skills: Skill dicts (SKILL_ID, SKILL_NAME, ...)
+            writer: ShardWriter (or anything with write(record))
+            on_result: Called as on_result(count, result) after each write
+
+        Returns:
+            Number of results written
+
+        Raises:
+            Exception: Whatever stopped the feeder (e.g. a broken spaCy
+                process pool), after in-flight results have been written.
+                Failures of a single skill are logged and skipped instead.
+        """
+        extractor = self.extractor
+        use_spacy = extractor.use_spacy and extractor.spacy_processor is not None
+        parsed_queue = queue.Queue(maxsize=self.queue_size)
+        result_queue = queue.Queue(maxsize=self.queue_size)
+        self.stop_event.clear()
+
+        pool = None
+        if use_spacy and self.nlp_workers > 0:
+            pool = ProcessPoolExecutor(
+                max_workers=self.nlp_workers,
+                initializer=_init_nlp_worker,
+                initargs=(extractor.domains,)
+            )
+
+        # Error that stopped the feeder, re-raised by the writer once drained
+        feed_errors = []
+
+        def feed():
+            # Stage 1: submit spaCy parsing; put() blocks when the LLM stage lags
+            try:
+                for skill in skills:
+                    if self.stop_event.is_set():
+                        break
+                    try:
+                        if pool is not None:
+                            parsed = pool.submit(_parse_skill, skill['SKILL_NAME'])
+                        elif use_spacy:
+                            processor = extractor.spacy_processor
+                            parsed = (processor.extract_concepts(skill['SKILL_NAME']),
+                                      processor.extract_structure(skill['SKILL_NAME']))
+                        else:
+                            parsed = (None, None)
+                    except BrokenExecutor:
+                        raise  # Every later skill would fail too
+                    except Exception as e:
+                        print(f"  ✗ spaCy parsing failed for {skill.get('SKILL_ID')}: {e}")
+                        continue
+                    parsed_queue.put((skill, parsed))
+            except BaseException as e:
+                feed_errors.append(e)
+            finally:
+                for _ in range(self.llm_workers):
+                    parsed_queue.put(_DONE)
+
+        def enrich():
+            # Stage 2: rules + LLM call + assembly, I/O-bound so run in threads
+            try:
+                while True:
+                    item = parsed_queue.get()
+                    if item is _DONE:
+                        break
+                    skill, parsed = item
+                    if self.stop_event.is_set():
+                        if isinstance(parsed, Future):
+                            parsed.cancel()
+                        continue  # Not yet started: left for the next (resumed) run
+                    try:
+                        concepts, structure = parsed.result() if isinstance(parsed, Future) else parsed
+                        result = extractor.complete_metadata(skill, concepts, structure)
+                    except Exception as e:
+                        print(f"  ✗ Extraction failed for {skill.get('SKILL_ID')}: {e}")
+                        continue
+                    result_queue.put(result)
+            finally:
+                result_queue.put(_DONE)
+
+        threads = [threading.Thread(target=feed, name='nlp-feeder', daemon=True)]
+        threads += [threading.Thread(target=enrich, name=f'llm-{i}', daemon=True)
+                    for i in range(self.llm_workers)]
+
+        previous_handler = self._install_sigint_handler()
+        written = 0
+        try:
+            for thread in threads:
+                thread.start()
+
+            # Stage 3: single writer in the main thread
+            remaining = self.llm_workers
+            while remaining:
+                result = result_queue.get()
+                if result is _DONE:
+                    remaining -= 1
+                    continue
+                writer.write(result)
+                written += 1
+                if on_result:
+                    on_result(written, result)
+
+            if feed_errors:
+                raise feed_errors[0]
+        finally:
+            self.stop_event.set()
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            if previous_handler is not None:
+                signal.signal(signal.SIGINT, previous_handler)
+
+        return written
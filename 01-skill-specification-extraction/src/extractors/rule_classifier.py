@@ -0,0 +1,371 @@
+"""
+Rule-Based Educational Classifier (LLM Fast Path)
+
+Fills the LLM educational fields (text_type, text_mode, text_genre,
+skill_domain, task_complexity, cognitive_demand, scope) from spaCy features,
+skill area names and small lexicons. Every field value comes from a named
+rule, and each (field, rule) pair carries a confidence; the overall
+confidence of a classification is the lowest field confidence.
+
+Confidences start from hand-set priors and can be calibrated against LLM or
+expert labels (see scripts/evaluate_rule_fast_path.py), so that "0.85" means
+the rule agreed with the reference about 85% of the time. The extractor only
+calls the LLM when the overall confidence is below its threshold.
+
+Usage:
+    from rule_classifier import RuleBasedClassifier
+
+    classifier = RuleBasedClassifier(calibration_path='rule_calibration.json')
+    fields, confidence, rules = classifier.classify({
+        'SKILL_NAME': 'Blend phonemes to form words',
+        'SKILL_AREA_NAME': 'Phonological Awareness',
+        'GRADE_LEVEL_SHORT_NAME': 'K',
+        'actions': ['blend', 'form'], 'targets': ['phonemes', 'words'],
+        'root_verb': 'blend', 'key_concepts': ['blend', 'phoneme', 'word']
+    })
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Fields the classifier produces (the LLM fields minus confidence/notes)
+CLASSIFIED_FIELDS = [
+    'text_type', 'text_mode', 'text_genre', 'skill_domain',
+    'task_complexity', 'cognitive_demand', 'scope'
+]
+
+COGNITIVE_LEVELS = ['recall', 'comprehension', 'application',
+                    'analysis', 'synthesis', 'evaluation']
+
+# Prior P(rule agrees with reference) before calibration
+DEFAULT_RULE_CONFIDENCE = {
+    'skill_domain': {'math_content': 0.90, 'area_lexicon': 0.90,
+                     'action_lexicon': 0.60, 'default': 0.20},
+    'cognitive_demand': {'root_verb': 0.80, 'action': 0.65, 'default': 0.20},
+    'text_type': {'math_content': 0.90, 'word_level': 0.85, 'fiction_cue': 0.85,
+                  'info_cue': 0.85, 'both_cues': 0.70, 'default': 0.40},
+    'text_mode': {'math_content': 0.90, 'not_applicable': 0.85, 'poetry_cue': 0.90,
+                  'drama_cue': 0.85, 'prose_default': 0.75, 'default': 0.40},
+    'text_genre': {'math_content': 0.90, 'not_applicable': 0.85, 'genre_cue': 0.80,
+                   'from_text_type': 0.60, 'default': 0.30},
+    'scope': {'math_content': 0.85, 'multi_text_cue': 0.85, 'scope_cue': 0.80,
+              'default': 0.30},
+    'task_complexity': {'band_and_demand': 0.80, 'demand_only': 0.55}
+}
+
+# Shrinkage toward the prior: calibrated = (agree + k*prior) / (n + k)
+CALIBRATION_PRIOR_WEIGHT = 5
+
+
+class RuleBasedClassifier:
+    """
+    Deterministic lexicon/rule classifier for the LLM educational fields.
+    """
+
+    def __init__(self, calibration_path: Optional[Path] = None):
+        """
+        Initialize the classifier.
+
+        Args:
+            calibration_path: JSON of {field: {rule: confidence}} produced by
+                calibrate(); missing entries fall back to the priors
+        """
+        # Bloom's taxonomy verbs (mirrors the LLM prompt's analysis hints)
+        self.cognitive_verbs = {
+            'recall': {'identify', 'recognize', 'name', 'list', 'recall', 'match',
+                       'label', 'locate', 'define', 'repeat', 'point', 'know', 'count'},
+            'comprehension': {'explain', 'describe', 'summarize', 'retell', 'paraphrase',
+                              'interpret', 'determine', 'understand', 'discuss', 'restate',
+                              'classify', 'illustrate', 'ask', 'answer'},
+            'application': {'apply', 'use', 'demonstrate', 'produce', 'decode', 'blend',
+                            'segment', 'read', 'spell', 'pronounce', 'add', 'subtract',
+                            'multiply', 'divide', 'solve', 'compute', 'calculate',
+                            'measure', 'estimate', 'round', 'graph', 'isolate'},
+            'analysis': {'analyze', 'compare', 'contrast', 'distinguish', 'examine',
+                         'infer', 'differentiate', 'categorize', 'sort', 'trace',
+                         'connect', 'relate'},
+            'synthesis': {'create', 'compose', 'write', 'combine', 'integrate',
+                          'synthesize', 'develop', 'plan', 'construct', 'design',
+                          'generate'},
+            'evaluation': {'evaluate', 'judge', 'critique', 'assess', 'argue',
+                           'justify', 'defend'}
+        }
+        self.verb_levels = {verb: level for level, verbs in self.cognitive_verbs.items()
+                            for verb in verbs}
+
+        # Skill area keywords -> skill_domain, checked in order
+        self.area_domains = [
+            ('speaking', 'speaking'), ('presentation', 'speaking'), ('oral', 'speaking'),
+            ('listening', 'listening'),
+            ('writing', 'writing'), ('composition', 'writing'), ('handwriting', 'writing'),
+            ('grammar', 'language'), ('conventions', 'language'), ('vocabulary', 'language'),
+            ('spelling', 'language'), ('punctuation', 'language'), ('capitalization', 'language'),
+            ('usage', 'language'), ('figurative', 'language'), ('word relationships', 'language'),
+            ('phonics', 'reading'), ('phonological', 'reading'), ('phonemic', 'reading'),
+            ('decoding', 'reading'), ('fluency', 'reading'), ('comprehension', 'reading'),
+            ('reading', 'reading'), ('literature', 'reading'), ('informational', 'reading'),
+            ('print concepts', 'reading'), ('word recognition', 'reading'),
+            ('character', 'reading'), ('plot', 'reading'), ('theme', 'reading'),
+            ('main idea', 'reading'), ('text structure', 'reading'), ('author', 'reading')
+        ]
+        self.action_domains = {
+            'write': 'writing', 'compose': 'writing', 'draft': 'writing', 'revise': 'writing',
+            'edit': 'writing', 'read': 'reading', 'decode': 'reading', 'retell': 'reading',
+            'speak': 'speaking', 'present': 'speaking', 'listen': 'listening'
+        }
+
+        # Text cues (surface words from the skill name, targets and key concepts)
+        self.fiction_cues = {
+            'story', 'stories', 'character', 'characters', 'plot', 'setting',
+            'narrative', 'narratives', 'fable', 'fables', 'folktale', 'folktales',
+            'myth', 'myths', 'fiction', 'fictional', 'literature', 'literary',
+            'novel', 'novels', 'legend', 'legends', 'poem', 'poems', 'poetry', 'drama'
+        }
+        self.info_cues = {
+            'informational', 'nonfiction', 'article', 'articles', 'fact', 'facts',
+            'heading', 'headings', 'caption', 'captions', 'diagram', 'diagrams',
+            'chart', 'charts', 'glossary', 'biography', 'biographies',
+            'autobiography', 'scientific', 'technical', 'historical'
+        }
+        self.poetry_cues = {'poem', 'poems', 'poetry', 'verse', 'stanza', 'stanzas'}
+        self.drama_cues = {'drama', 'dramas', 'script', 'scripts', 'scene', 'scenes',
+                           'stage', 'playwright'}
+        self.genre_cues = {
+            'narrative': {'narrative', 'narratives', 'story', 'stories', 'plot'},
+            'argumentative': {'argument', 'arguments', 'argumentative', 'claim', 'claims',
+                              'opinion', 'opinions', 'persuasive'},
+            'procedural': {'procedure', 'procedures', 'procedural', 'instructions',
+                           'directions', 'steps'},
+            'literary': {'poem', 'poems', 'poetry', 'literature', 'literary', 'drama'},
+            'expository': {'informational', 'expository', 'article', 'articles'}
+        }
+
+        # Scope cues, checked from smallest to largest unit
+        self.scope_cues = [
+            ('word', {'phoneme', 'phonemes', 'sound', 'sounds', 'letter', 'letters',
+                      'syllable', 'syllables', 'vowel', 'vowels', 'consonant', 'consonants',
+                      'digraph', 'digraphs', 'blend', 'blends', 'word', 'words', 'prefix',
+                      'prefixes', 'suffix', 'suffixes', 'affix', 'affixes', 'onset',
+                      'rime', 'rimes', 'spelling'}),
+            ('sentence', {'sentence', 'sentences', 'clause', 'clauses', 'phrase', 'phrases',
+                          'punctuation', 'capitalization', 'conjunction', 'conjunctions'}),
+            ('paragraph', {'paragraph', 'paragraphs'}),
+            ('text', {'text', 'passage', 'passages', 'story', 'poem', 'article', 'book',
+                      'theme', 'plot', 'character', 'characters', 'narrative', 'drama',
+                      'idea', 'ideas'})
+        ]
+        self.multi_text_cues = {'texts', 'sources'}
+        self.multi_text_actions = {'compare', 'contrast', 'integrate', 'synthesize'}
+
+        self.grade_bands = {'K-2': 0, '3-5': 0, '6-8': 1, '9-12': 1}
+
+        self.rule_confidence = {field: dict(rules)
+                                for field, rules in DEFAULT_RULE_CONFIDENCE.items()}
+        if calibration_path:
+            with open(calibration_path, 'r') as f:
+                for field, rules in json.load(f).items():
+                    self.rule_confidence.setdefault(field, {}).update(rules)
+
+    # ------------------------------------------------------------------
+    # Feature preparation
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _as_list(value) -> List[str]:
+        """Accept lists or pipe-separated strings (as stored in metadata CSVs)."""
+        if value is None or (isinstance(value, float) and value != value):
+            return []
+        if isinstance(value, str):
+            return [item for item in value.split('|') if item]
+        return list(value)
+
+    def _features(self, skill: Dict) -> Dict:
+        name = str(skill.get('SKILL_NAME', '') or '').lower()
+        actions = [a.lower() for a in self._as_list(skill.get('actions'))]
+        targets = [t.lower() for t in self._as_list(skill.get('targets'))]
+        key_concepts = [c.lower() for c in self._as_list(skill.get('key_concepts'))]
+        content_area = next(
+            (str(skill[col]) for col in ('CONTENT_AREA', 'CONTENT_AREA_NAME',
+                                         'CONTENT_AREA_SHORT_NAME') if skill.get(col)),
+            ''
+        )
+        root_verb = skill.get('root_verb') or ''
+        return {
+            'words': set(re.findall(r"[a-z][a-z'-]*", name)) | set(targets) | set(key_concepts),
+            'actions': actions,
+            'root_verb': str(root_verb).lower(),
+            'area': str(skill.get('SKILL_AREA_NAME', '') or '').lower(),
+            'is_math': content_area in ('Mathematics', 'Math'),
+            'band': skill.get('complexity_band', '')
+        }
+
+    def _confidence(self, field: str, rule: str) -> float:
+        return self.rule_confidence.get(field, {}).get(rule, 0.0)
+
+    # ------------------------------------------------------------------
+    # Field rules: each returns (value, rule_id)
+    # ------------------------------------------------------------------
+
+    def _skill_domain(self, f: Dict) -> Tuple[str, str]:
+        if f['is_math']:
+            return 'not_applicable', 'math_content'
+        for keyword, domain in self.area_domains:
+            if keyword in f['area']:
+                return domain, 'area_lexicon'
+        for action in [f['root_verb']] + f['actions']:
+            if action in self.action_domains:
+                return self.action_domains[action], 'action_lexicon'
+        return 'not_applicable', 'default'
+
+    def _cognitive_demand(self, f: Dict) -> Tuple[str, str]:
+        if f['root_verb'] in self.verb_levels:
+            return self.verb_levels[f['root_verb']], 'root_verb'
+        for action in f['actions']:
+            if action in self.verb_levels:
+                return self.verb_levels[action], 'action'
+        return 'comprehension', 'default'
+
+    def _scope(self, f: Dict) -> Tuple[str, str]:
+        if f['is_math']:
+            return 'not_applicable', 'math_content'
+        words = f['words']
+        if words & self.multi_text_cues or (
+                set(f['actions']) & self.multi_text_actions and
+                words & {'stories', 'poems', 'articles', 'books', 'passages'}):
+            return 'multi_text', 'multi_text_cue'
+        # The largest unit mentioned sets the scope
+        scope = None
+        for unit, cues in self.scope_cues:
+            if words & cues:
+                scope = unit
+        if scope:
+            return scope, 'scope_cue'
+        return 'not_applicable', 'default'
+
+    def _text_type(self, f: Dict, scope: str) -> Tuple[str, str]:
+        if f['is_math']:
+            return 'not_applicable', 'math_content'
+        fiction = bool(f['words'] & self.fiction_cues)
+        info = bool(f['words'] & self.info_cues)
+        if fiction and info:
+            return 'mixed', 'both_cues'
+        if fiction:
+            return 'fictional', 'fiction_cue'
+        if info:
+            return 'informational', 'info_cue'
+        if scope in ('word', 'sentence'):
+            return 'not_applicable', 'word_level'
+        return 'mixed', 'default'
+
+    def _text_mode(self, f: Dict, text_type: str) -> Tuple[str, str]:
+        if f['is_math']:
+            return 'not_applicable', 'math_content'
+        if f['words'] & self.poetry_cues:
+            return 'poetry', 'poetry_cue'
+        if f['words'] & self.drama_cues:
+            return 'drama', 'drama_cue'
+        if text_type == 'not_applicable':
+            return 'not_applicable', 'not_applicable'
+        if text_type in ('fictional', 'informational'):
+            return 'prose', 'prose_default'
+        return 'prose', 'default'
+
+    def _text_genre(self, f: Dict, text_type: str) -> Tuple[str, str]:
+        if f['is_math']:
+            return 'not_applicable', 'math_content'
+        for genre, cues in self.genre_cues.items():
+            if f['words'] & cues:
+                return genre, 'genre_cue'
+        if text_type == 'not_applicable':
+            return 'not_applicable', 'not_applicable'
+        if text_type == 'fictional':
+            return 'narrative', 'from_text_type'
+        if text_type == 'informational':
+            return 'expository', 'from_text_type'
+        return 'not_applicable', 'default'
+
+    def _task_complexity(self, f: Dict, cognitive_demand: str) -> Tuple[str, str]:
+        level = COGNITIVE_LEVELS.index(cognitive_demand)
+        score = int(level >= 3) + int(level >= 5)
+        if f['band'] in self.grade_bands:
+            score += self.grade_bands[f['band']]
+            rule = 'band_and_demand'
+        else:
+            rule = 'demand_only'
+        return ['basic', 'intermediate', 'advanced'][min(score, 2)], rule
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def classify(self, skill: Dict) -> Tuple[Dict[str, str], float, Dict[str, str]]:
+        """
+        Classify one skill.
+
+        Args:
+            skill: Skill dict with SKILL_NAME, SKILL_AREA_NAME, complexity_band,
+                optional content area, and spaCy features (actions, targets,
+                root_verb, key_concepts) as lists or pipe-separated strings
+
+        Returns:
+            Tuple of (field values, overall confidence, rule id per field)
+        """
+        f = self._features(skill)
+        results = {}
+        results['skill_domain'] = self._skill_domain(f)
+        results['cognitive_demand'] = self._cognitive_demand(f)
+        results['scope'] = self._scope(f)
+        results['text_type'] = self._text_type(f, results['scope'][0])
+        results['text_mode'] = self._text_mode(f, results['text_type'][0])
+        results['text_genre'] = self._text_genre(f, results['text_type'][0])
+        results['task_complexity'] = self._task_complexity(f, results['cognitive_demand'][0])
+
+        fields = {field: value for field, (value, _) in results.items()}
+        rules = {field: rule for field, (_, rule) in results.items()}
+        confidence = min(self._confidence(field, rule) for field, rule in rules.items())
+        return fields, confidence, rules
+
+    def calibrate(self, outcomes: Iterable[Tuple[str, str, bool]]) -> Dict[str, Dict[str, float]]:
+        """
+        Re-estimate rule confidences from observed agreement.
+
+        Args:
+            outcomes: (field, rule_id, agreed_with_reference) triples
+
+        Returns:
+            The updated {field: {rule: confidence}} table (also applied in place)
+        """
+        counts: Dict[Tuple[str, str], List[int]] = {}
+        for field, rule, agreed in outcomes:
+            tally = counts.setdefault((field, rule), [0, 0])
+            tally[0] += int(agreed)
+            tally[1] += 1
+
+        k = CALIBRATION_PRIOR_WEIGHT
+        for (field, rule), (agreed, total) in counts.items():
+            prior = self._confidence(field, rule)
+            self.rule_confidence.setdefault(field, {})[rule] = round(
+                (agreed + k * prior) / (total + k), 4
+            )
+        return self.rule_confidence
+
+    def save_calibration(self, path: Path):
+        """Write the current confidence table for later runs."""
+        with open(path, 'w') as f:
+            json.dump(self.rule_confidence, f, indent=2, sort_keys=True)
+
+    def signature(self) -> str:
+        """Stable description of lexicons and confidences (for version stamps)."""
+        return json.dumps({
+            'cognitive_verbs': {k: sorted(v) for k, v in self.cognitive_verbs.items()},
+            'area_domains': self.area_domains,
+            'action_domains': self.action_domains,
+            'cues': [sorted(self.fiction_cues), sorted(self.info_cues),
+                     sorted(self.poetry_cues), sorted(self.drama_cues),
+                     {k: sorted(v) for k, v in self.genre_cues.items()},
+                     [(unit, sorted(cues)) for unit, cues in self.scope_cues]],
+            'rule_confidence': self.rule_confidence
+        }, sort_keys=True)
@@ -0,0 +1,240 @@
+"""
+Append-Only Shard Writer for Resumable Metadata Extraction
+
+Streams one JSON record per line into numbered shard files and keeps an
+atomically-replaced manifest next to them. Every record is flushed as it is
+written, so a crash loses at most the record in flight. On restart the
+writer reports which SKILL_IDs are already stored and starts a new shard;
+at the end all shards are merged into a single CSV.
+
+Layout:
+    <output_dir>/<run_name>_shards/
+        manifest.json
+        shard_00000.jsonl
+        shard_00001.jsonl
+        ...
+
+Usage:
+    from shard_writer import ShardWriter
+
+    with ShardWriter(output_dir, run_name='enhanced_metadata') as writer:
+        done = writer.completed_ids()
+        for skill in skills:
+            if str(skill['SKILL_ID']) not in done:
+                writer.write(extract(skill))
+    writer.merge_to_csv(output_dir / 'skill_metadata_enhanced.csv')
+"""
+
+import json
+import os
+import pandas as pd
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Set
+
+
+class ShardWriter:
+    """
+    Append-only JSONL shard writer with an atomic manifest.
+
+    Shards are never rewritten: a restarted run opens a fresh shard, and a
+    partially written last line (from a crash mid-write) is ignored when
+    shards are read back.
+    """
+
+    MANIFEST_NAME = 'manifest.json'
+
+    def __init__(self, output_dir: Path, run_name: str = 'enhanced_metadata',
+                 shard_size: int = 1000, id_field: str = 'SKILL_ID',
+                 fsync: bool = False, run_config: Optional[Dict] = None):
+        """
+        Initialize the writer, picking up any shards from a previous run.
+
+        Args:
+            output_dir: Directory that holds the shard directory
+            run_name: Name of the run; reusing it resumes that run
+            shard_size: Records per shard before rotating to a new file
+            id_field: Record field used to detect already-processed items
+            fsync: Also fsync after every record (survives OS crashes, slower)
+            run_config: JSON-serializable description of the run (input
+                path, filters). Stored in the manifest; resuming with a
+                different config raises ValueError.
+
+        Raises:
+            ValueError: If run_config does not match the run being resumed
+        """
+        self.shard_dir = Path(output_dir) / f"{run_name}_shards"
+        self.shard_dir.mkdir(parents=True, exist_ok=True)
+        self.run_name = run_name
+        self.shard_size = shard_size
+        self.id_field = id_field
+        self.fsync = fsync
+
+        self.manifest = self._load_manifest()
+        if run_config is not None:
+            self._check_run_config(run_config)
+        self._file = None
+        self._shard_records = 0
+        self.records_written = 0
+
+    # ------------------------------------------------------------------
+    # Manifest
+    # ------------------------------------------------------------------
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.shard_dir / self.MANIFEST_NAME
+
+    def _load_manifest(self) -> Dict:
+        if self.manifest_path.exists():
+            with open(self.manifest_path, 'r') as f:
+                return json.load(f)
+        return {'run_name': self.run_name, 'shards': []}
+
+    def _check_run_config(self, run_config: Dict):
+        """Record run_config for a new run, or verify it matches the stored one."""
+        run_config = json.loads(json.dumps(run_config, default=str))
+        stored = self.manifest.get('run_config')
+        if stored is None and not self.manifest['shards']:
+            self.manifest['run_config'] = run_config
+            self._save_manifest()
+        elif stored != run_config:
+            raise ValueError(
+                f"Run '{self.run_name}' in {self.shard_dir} was started with different "
+                f"settings ({stored}); use another run name to start a new run"
+            )
+
+    def _save_manifest(self):
+        """Write the manifest to a temp file and atomically swap it in."""
+        self.manifest['updated'] = datetime.now().isoformat()
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _open_new_shard(self):
+        shard_name = f"shard_{len(self.manifest['shards']):05d}.jsonl"
+        self.manifest['shards'].append({'file': shard_name, 'records': 0, 'complete': False})
+        self._save_manifest()
+        self._file = open(self.shard_dir / shard_name, 'a', encoding='utf-8')
+        self._shard_records = 0
+
+    def _close_shard(self):
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        entry = self.manifest['shards'][-1]
+        entry['records'] = self._shard_records
+        entry['complete'] = True
+        self._save_manifest()
+
+    def write(self, record: Dict):
+        """Append one record to the current shard and flush it to disk."""
+        if self._file is None or self._shard_records >= self.shard_size:
+            self._close_shard()
+            self._open_new_shard()
+
+        self._file.write(json.dumps(record, default=str) + '\n')
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self._shard_records += 1
+        self.records_written += 1
+
+    def close(self):
+        """Close the active shard and record it in the manifest."""
+        self._close_shard()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def shard_paths(self) -> List[Path]:
+        """Shard files in write order (including shards a crash left open)."""
+        return [self.shard_dir / entry['file'] for entry in self.manifest['shards']
+                if (self.shard_dir / entry['file']).exists()]
+
+    def iter_records(self, paths: Optional[List[Path]] = None) -> Iterator[Dict]:
+        """Stream records from shards, skipping a truncated trailing line."""
+        for path in paths if paths is not None else self.shard_paths():
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.endswith('\n'):
+                        break  # Partial write from an interrupted run
+                    yield json.loads(line)
+
+    def completed_ids(self) -> Set:
+        """SKILL_IDs (as strings) already stored by this run, used to skip on restart."""
+        return {str(record[self.id_field]) for record in self.iter_records()
+                if self.id_field in record}
+
+    def merge_to_csv(self, csv_path: Path, chunk_size: int = 1000) -> int:
+        """
+        Merge all shards into one CSV, keeping the first record per SKILL_ID.
+
+        Records are streamed twice: once to collect the union of fields,
+        then in chunks to write them, so memory stays bounded by
+        ``chunk_size`` plus the set of seen IDs.
+
+        Returns:
+            Number of rows written
+        """
+        csv_path = Path(csv_path)
+        tmp_path = csv_path.with_suffix(csv_path.suffix + '.tmp')
+
+        # First pass: union of fields over the kept records, in first-seen
+        # order (fields such as spaCy components only appear on some records)
+        seen = set()
+        fields = {}
+        for record in self.iter_records():
+            record_id = str(record.get(self.id_field))
+            if record_id in seen:
+                continue
+            seen.add(record_id)
+            fields.update(dict.fromkeys(record))
+        columns = list(fields)
+
+        seen = set()
+        rows_written = 0
+        chunk = []
+
+        def flush_chunk():
+            nonlocal rows_written
+            if not chunk:
+                return
+            pd.DataFrame(chunk).reindex(columns=columns).to_csv(
+                tmp_path, mode='a', index=False, header=rows_written == 0
+            )
+            rows_written += len(chunk)
+            chunk.clear()
+
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+        for record in self.iter_records():
+            record_id = str(record.get(self.id_field))
+            if record_id in seen:
+                continue
+            seen.add(record_id)
+            chunk.append(record)
+            if len(chunk) >= chunk_size:
+                flush_chunk()
+        flush_chunk()
+
+        if rows_written:
+            os.replace(tmp_path, csv_path)
+        return rows_written
@@ -13,11 +13,24 @@ Usage:
 """
 
 import spacy
-from typing import Dict, List, Optional, Tuple
+import hashlib
+import json
+import numpy as np
+from spacy.matcher import PhraseMatcher
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass
 import re
 
 
+# Project config holding optional vocabulary extensions and domain lexicons
+DEFAULT_CONFIG_PATH = Path(__file__).parent.parent.parent / "config.yaml"
+
+# Vocabulary sets that can be extended from the config `vocabulary` section
+VOCABULARY_FIELDS = ('educational_verbs', 'literacy_targets',
+                     'grade_indicators', 'complexity_markers')
+
+
 @dataclass
 class SkillConcepts:
     """Structured representation of skill concepts."""
@@ -40,6 +53,60 @@ class SkillStructure:
     sentence_type: str            # declarative, imperative, etc.
 
 
+@dataclass
+class StructuralFeatures:
+    """
+    Precomputed structural features for a batch of texts.
+    
+    Each text is reduced once to integer IDs from the processor's shared
+    structure vocabulary, so pairs can be compared without re-parsing.
+    Sets are stored in CSR form: the IDs for text ``i`` are
+    ``object_ids[object_indptr[i]:object_indptr[i + 1]]`` (sorted, unique).
+    """
+    root_verb_ids: np.ndarray     # int32 per text, -1 when no root verb
+    object_indptr: np.ndarray     # int64 offsets into object_ids
+    object_ids: np.ndarray        # int32 direct-object term IDs
+    concept_indptr: np.ndarray    # int64 offsets into concept_ids
+    concept_ids: np.ndarray       # int32 key-concept term IDs
+    prep_indptr: np.ndarray       # int64 offsets into prep_ids
+    prep_ids: np.ndarray          # int32 prepositional-phrase IDs
+    
+    def __len__(self) -> int:
+        return len(self.root_verb_ids)
+
+
+def _gather_csr(indptr: np.ndarray, indices: np.ndarray,
+                rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (position-in-rows, value) for every stored entry of the given rows."""
+    starts = indptr[rows]
+    lengths = indptr[rows + 1] - starts
+    total = int(lengths.sum())
+    owners = np.repeat(np.arange(len(rows)), lengths)
+    if total == 0:
+        return owners, indices[:0]
+    offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return owners, indices[np.repeat(starts, lengths) + offsets]
+
+
+def _pairwise_intersections(indptr_a: np.ndarray, indices_a: np.ndarray, rows_a: np.ndarray,
+                            indptr_b: np.ndarray, indices_b: np.ndarray, rows_b: np.ndarray
+                            ) -> np.ndarray:
+    """Count shared IDs between set ``rows_a[p]`` and set ``rows_b[p]`` for every pair p."""
+    n_pairs = len(rows_a)
+    owners_a, values_a = _gather_csr(indptr_a, indices_a, rows_a)
+    owners_b, values_b = _gather_csr(indptr_b, indices_b, rows_b)
+    
+    # Sets hold unique IDs, so a (pair, id) key seen twice is a shared member
+    width = int(max(values_a.max(initial=-1), values_b.max(initial=-1))) + 1
+    keys = np.concatenate([
+        owners_a.astype(np.int64) * width + values_a,
+        owners_b.astype(np.int64) * width + values_b
+    ])
+    keys.sort()
+    shared = keys[1:][keys[1:] == keys[:-1]]
+    return np.bincount(shared // max(width, 1), minlength=n_pairs)[:n_pairs]
+
+
 class SkillProcessor:
     """
     spaCy-based processor for educational skill descriptions.
@@ -48,12 +115,16 @@ class SkillProcessor:
     optimized for ROCK skills and Science of Reading taxonomy.
     """
     
-    def __init__(self, model_name: str = 'en_core_web_sm'):
+    def __init__(self, model_name: str = 'en_core_web_sm',
+                 config_path: Optional[Path] = None,
+                 domains: Optional[List[str]] = None):
         """
         Initialize the processor with spaCy model.
         
         Args:
             model_name: spaCy model name (default: en_core_web_sm)
+            config_path: Config with a `vocabulary` section (default: project config.yaml)
+            domains: Domain lexicons to enable from the config (e.g. ['math'])
         """
         try:
             self.nlp = spacy.load(model_name)
@@ -85,6 +156,125 @@ class SkillProcessor:
             'simple', 'complex', 'multisyllabic', 'one-syllable', 'two-syllable',
             'cvc', 'ccvc', 'cvce', 'basic', 'advanced', 'high-frequency'
         }
+        
+        self._load_vocabulary(config_path, domains or [])
+        self._build_matchers()
+        
+        # Term -> integer ID table shared by every StructuralFeatures batch
+        # built with this processor, so batches can be compared to each other
+        self._structure_vocab: Dict[str, int] = {}
+    
+    def _load_vocabulary(self, config_path: Optional[Path], domains: List[str]):
+        """Extend the built-in vocabulary with config terms and domain lexicons."""
+        if config_path is None:
+            config_path = DEFAULT_CONFIG_PATH
+            if not config_path.exists():
+                if domains:
+                    raise ValueError(f"No config found for domain lexicons: {domains}")
+                return
+        
+        import yaml
+        with open(config_path, 'r') as f:
+            vocabulary = (yaml.safe_load(f) or {}).get('vocabulary') or {}
+        
+        lexicons = [vocabulary]
+        available = vocabulary.get('domain_lexicons') or {}
+        for domain in domains:
+            if domain not in available:
+                raise ValueError(f"Unknown domain lexicon '{domain}'. "
+                                 f"Available: {sorted(available)}")
+            lexicons.append(available[domain])
+        
+        for lexicon in lexicons:
+            for field in VOCABULARY_FIELDS:
+                terms = lexicon.get(field) or []
+                getattr(self, field).update(str(term).lower() for term in terms)
+    
+    def version_signature(self) -> str:
+        """
+        Identify everything that determines this processor's output.
+        
+        Combines the spaCy model name/version, the spaCy library version and
+        a hash of the active vocabulary, so incremental extraction can tell
+        when structural fields need recomputing.
+        """
+        meta = self.nlp.meta
+        vocabulary = {field: sorted(getattr(self, field)) for field in VOCABULARY_FIELDS}
+        vocab_hash = hashlib.sha256(
+            json.dumps(vocabulary, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:8]
+        return (f"{meta.get('lang', 'xx')}_{meta.get('name', 'unknown')}-{meta.get('version', '0')}"
+                f"/spacy-{spacy.__version__}/vocab-{vocab_hash}")
+    
+    def _build_matchers(self):
+        """
+        Compile the vocabulary sets into lookups that tag a Doc in one pass.
+        
+        Single-token verbs and targets are looked up by lemma, constrained by
+        POS (verbs only count as VERB, targets only as NOUN). Multi-token
+        concept terms are matched on lemmas, and grade/complexity markers on
+        lowercase surface forms, so hyphenated terms such as "one-syllable"
+        match as a whole.
+        """
+        vocab = self.nlp.vocab
+        # Single-token lemmas keyed by POS, both as string-store IDs so
+        # tagging compares integers instead of decoding token strings
+        self.concept_lemmas: Dict[int, Set[int]] = {}
+        self.concept_phrase_matcher = PhraseMatcher(vocab, attr='LEMMA')
+        self.marker_matcher = PhraseMatcher(vocab, attr='LOWER')
+        
+        for label, terms, pos in (('EDUCATIONAL_VERB', self.educational_verbs, 'VERB'),
+                                  ('LITERACY_TARGET', self.literacy_targets, 'NOUN')):
+            multi = sorted(t for t in terms if len(self.nlp.make_doc(t)) > 1)
+            self.concept_lemmas[vocab.strings[pos]] = {
+                vocab.strings.add(t) for t in terms if t not in multi
+            }
+            if multi:
+                self.concept_phrase_matcher.add(label, list(self.nlp.pipe(multi)))
+        
+        for label, terms in (('GRADE_INDICATOR', self.grade_indicators),
+                             ('COMPLEXITY_MARKER', self.complexity_markers)):
+            if terms:
+                self.marker_matcher.add(label, [self.nlp.make_doc(t) for t in sorted(terms)])
+    
+    @staticmethod
+    def _longest_spans(spans: List[Tuple[int, int, str]]) -> List[str]:
+        """Keep the longest of overlapping (start, end, term) spans, in text order."""
+        kept, covered = [], set()
+        for start, end, term in sorted(spans, key=lambda span: (span[0] - span[1], span[0])):
+            if covered.isdisjoint(range(start, end)):
+                kept.append((start, term))
+                covered.update(range(start, end))
+        return [term for _, term in sorted(kept)]
+    
+    def tag_vocabulary(self, doc) -> Dict[str, List[str]]:
+        """
+        Tag educational vocabulary in a parsed (lowercased) Doc.
+        
+        Overlapping matches resolve to the longest span, so "pre-k" yields
+        'pre-k' rather than both 'pre-k' and 'k'. Results are in text order.
+        
+        Returns:
+            Dict with key_concepts (lemmas), grade_indicators and
+            complexity_markers (surface forms)
+        """
+        concept_spans = [
+            (token.i, token.i + 1, token.lemma_) for token in doc
+            if token.lemma in self.concept_lemmas.get(token.pos, ())
+        ]
+        concept_spans += [(start, end, doc[start:end].lemma_)
+                          for _, start, end in self.concept_phrase_matcher(doc)]
+        
+        strings = self.nlp.vocab.strings
+        marker_spans = {'GRADE_INDICATOR': [], 'COMPLEXITY_MARKER': []}
+        for match_id, start, end in self.marker_matcher(doc):
+            marker_spans[strings[match_id]].append((start, end, doc[start:end].text.lower()))
+        
+        return {
+            'key_concepts': self._longest_spans(concept_spans),
+            'grade_indicators': self._longest_spans(marker_spans['GRADE_INDICATOR']),
+            'complexity_markers': self._longest_spans(marker_spans['COMPLEXITY_MARKER'])
+        }
     
     def preprocess_for_embeddings(self, text: str) -> str:
         """
@@ -107,8 +297,10 @@ class SkillProcessor:
         if not text or not text.strip():
             return ""
         
-        doc = self.nlp(text.lower())
-        
+        return self._clean_doc(self.nlp(text.lower()))
+    
+    def _clean_doc(self, doc) -> str:
+        """Join the lemmas of content words in an already-parsed (lowercased) Doc."""
         # Extract content words (nouns, verbs, adjectives)
         content_words = []
         for token in doc:
@@ -146,52 +338,34 @@ class SkillProcessor:
             return SkillConcepts([], [], [], [], [], "", [])
         
         doc = self.nlp(text.lower())
-        
+        return self._concepts_from_doc(doc, self._clean_doc(doc))
+    
+    def _concepts_from_doc(self, doc, cleaned_text: str) -> SkillConcepts:
+        """Build SkillConcepts from an already-parsed (lowercased) Doc."""
+        # Actions (verbs), targets (nouns), qualifiers (adjectives, numbers)
         actions = []
         targets = []
         qualifiers = []
-        grade_indicators = []
-        complexity_markers = []
-        key_concepts = []
-        
         for token in doc:
-            lemma = token.lemma_
-            text_lower = token.text.lower()
-            
-            # Actions (verbs)
-            if token.pos_ == 'VERB':
-                actions.append(lemma)
-                if lemma in self.educational_verbs:
-                    key_concepts.append(lemma)
-            
-            # Targets (nouns)
-            elif token.pos_ == 'NOUN':
-                targets.append(text_lower)
-                if lemma in self.literacy_targets:
-                    key_concepts.append(lemma)
-            
-            # Qualifiers (adjectives, numbers)
-            elif token.pos_ in ['ADJ', 'NUM']:
-                qualifiers.append(text_lower)
-            
-            # Grade indicators
-            if text_lower in self.grade_indicators:
-                grade_indicators.append(text_lower)
-            
-            # Complexity markers
-            if text_lower in self.complexity_markers:
-                complexity_markers.append(text_lower)
+            pos = token.pos_
+            if pos == 'VERB':
+                actions.append(token.lemma_)
+            elif pos == 'NOUN':
+                targets.append(token.lower_)
+            elif pos in ('ADJ', 'NUM'):
+                qualifiers.append(token.lower_)
         
-        cleaned_text = self.preprocess_for_embeddings(text)
+        # Key concepts, grade indicators and complexity markers (vocabulary matchers)
+        tags = self.tag_vocabulary(doc)
         
         return SkillConcepts(
             actions=actions,
             targets=targets,
             qualifiers=qualifiers,
-            grade_indicators=grade_indicators,
-            complexity_markers=complexity_markers,
+            grade_indicators=tags['grade_indicators'],
+            complexity_markers=tags['complexity_markers'],
             cleaned_text=cleaned_text,
-            key_concepts=key_concepts
+            key_concepts=tags['key_concepts']
         )
     
     def extract_structure(self, text: str) -> SkillStructure:
@@ -219,8 +393,10 @@ class SkillProcessor:
         if not text or not text.strip():
             return SkillStructure(None, [], [], [], 'unknown')
         
-        doc = self.nlp(text)
-        
+        return self._structure_from_doc(self.nlp(text))
+    
+    def _structure_from_doc(self, doc) -> SkillStructure:
+        """Build SkillStructure from an already-parsed Doc."""
         root_verb = None
         direct_objects = []
         modifiers = []
@@ -323,6 +499,133 @@ class SkillProcessor:
             'likely_variant': similarity_score > 0.5
         }
     
+    def build_structural_features(self, texts: List[str],
+                                  show_progress: bool = False) -> StructuralFeatures:
+        """
+        Parse texts once and encode their structure as compact integer arrays.
+        
+        The result feeds compare_structural_features(), which scores many
+        pairs at once and matches compare_skills_structurally() exactly.
+        
+        Args:
+            texts: Skill or taxonomy descriptions
+            show_progress: Show progress bar (requires tqdm)
+            
+        Returns:
+            StructuralFeatures with one entry per input text
+        """
+        texts = [text if isinstance(text, str) else '' for text in texts]
+        has_text = [bool(text.strip()) for text in texts]
+        parse_texts = [text for text, keep in zip(texts, has_text) if keep]
+        
+        # Structure is parsed on the original casing, concepts on lowercase,
+        # mirroring extract_structure() and extract_concepts()
+        struct_docs = self.nlp.pipe(parse_texts)
+        concept_docs = self.nlp.pipe(text.lower() for text in parse_texts)
+        parsed = zip(struct_docs, concept_docs)
+        if show_progress:
+            try:
+                from tqdm import tqdm
+                parsed = tqdm(parsed, total=len(parse_texts), desc="Structural features")
+            except ImportError:
+                pass
+        parsed = iter(parsed)
+        
+        vocab = self._structure_vocab
+        
+        def encode(terms) -> List[int]:
+            return sorted({vocab.setdefault(term, len(vocab)) for term in terms})
+        
+        root_verb_ids = np.full(len(texts), -1, dtype=np.int32)
+        object_sets, concept_sets, prep_sets = [], [], []
+        for i, keep in enumerate(has_text):
+            if not keep:
+                object_sets.append([])
+                concept_sets.append([])
+                prep_sets.append([])
+                continue
+            struct_doc, concept_doc = next(parsed)
+            structure = self._structure_from_doc(struct_doc)
+            concepts = self._concepts_from_doc(concept_doc, '')
+            if structure.root_verb is not None:
+                root_verb_ids[i] = vocab.setdefault(structure.root_verb, len(vocab))
+            object_sets.append(encode(structure.direct_objects))
+            concept_sets.append(encode(concepts.key_concepts))
+            prep_sets.append(encode(structure.prepositional_phrases))
+        
+        def to_csr(sets: List[List[int]]) -> Tuple[np.ndarray, np.ndarray]:
+            indptr = np.zeros(len(sets) + 1, dtype=np.int64)
+            np.cumsum([len(ids) for ids in sets], out=indptr[1:])
+            indices = np.fromiter((i for ids in sets for i in ids), dtype=np.int32,
+                                  count=int(indptr[-1]))
+            return indptr, indices
+        
+        object_indptr, object_ids = to_csr(object_sets)
+        concept_indptr, concept_ids = to_csr(concept_sets)
+        prep_indptr, prep_ids = to_csr(prep_sets)
+        
+        return StructuralFeatures(
+            root_verb_ids=root_verb_ids,
+            object_indptr=object_indptr,
+            object_ids=object_ids,
+            concept_indptr=concept_indptr,
+            concept_ids=concept_ids,
+            prep_indptr=prep_indptr,
+            prep_ids=prep_ids
+        )
+    
+    def compare_structural_features(self,
+                                    left: StructuralFeatures,
+                                    right: StructuralFeatures,
+                                    left_idx: np.ndarray,
+                                    right_idx: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Vectorized compare_skills_structurally() over many pairs.
+        
+        Pair p compares text ``left_idx[p]`` of ``left`` with text
+        ``right_idx[p]`` of ``right``. Both feature sets must come from this
+        processor so their term IDs agree.
+        
+        Args:
+            left: Features for the first texts of each pair
+            right: Features for the second texts of each pair
+            left_idx: Positions into ``left``
+            right_idx: Positions into ``right``
+            
+        Returns:
+            Dict of per-pair arrays: same_root_verb, overlapping_objects,
+            overlapping_concepts, structural_similarity, likely_variant
+        """
+        left_idx = np.asarray(left_idx, dtype=np.int64)
+        right_idx = np.asarray(right_idx, dtype=np.int64)
+        
+        same_root = left.root_verb_ids[left_idx] == right.root_verb_ids[right_idx]
+        similarity = np.where(same_root, 0.4, 0.0)
+        
+        overlaps = {}
+        for field in ('object', 'concept'):
+            indptr_l = getattr(left, f'{field}_indptr')
+            indptr_r = getattr(right, f'{field}_indptr')
+            overlap = _pairwise_intersections(
+                indptr_l, getattr(left, f'{field}_ids'), left_idx,
+                indptr_r, getattr(right, f'{field}_ids'), right_idx
+            )
+            larger = np.maximum(indptr_l[left_idx + 1] - indptr_l[left_idx],
+                                indptr_r[right_idx + 1] - indptr_r[right_idx])
+            has_overlap = overlap > 0
+            similarity = similarity + np.where(
+                has_overlap, 0.3 * (overlap / np.maximum(larger, 1)), 0.0
+            )
+            overlaps[field] = overlap
+        
+        return {
+            'same_root_verb': same_root,
+            'overlapping_objects': overlaps['object'],
+            'overlapping_concepts': overlaps['concept'],
+            'structural_similarity': similarity,
+            'likely_variant': similarity > 0.5
+        }
+    
     def batch_preprocess(self, texts: List[str], show_progress: bool = True) -> List[str]:
         """
         Preprocess multiple texts efficiently using spaCy's pipe.
@@ -378,19 +681,27 @@ class SkillProcessor:
             
             skills = group[['SKILL_ID', 'SKILL_NAME']].values.tolist()
             
+            # Parse each skill once and score all pairs within the group together
+            features = self.build_structural_features([name for _, name in skills])
+            left_idx, right_idx = np.triu_indices(len(skills), k=1)
+            likely = np.zeros((len(skills), len(skills)), dtype=bool)
+            likely[left_idx, right_idx] = self.compare_structural_features(
+                features, features, left_idx, right_idx
+            )['likely_variant']
+            
             # Compare all pairs within group
             processed = set()
-            for i, (id1, name1) in enumerate(skills):
+            for i, (id1, _) in enumerate(skills):
                 if id1 in processed:
                     continue
                 
                 variant_group = [id1]
-                for id2, name2 in skills[i+1:]:
+                for j in range(i + 1, len(skills)):
+                    id2 = skills[j][0]
                     if id2 in processed:
                         continue
                     
-                    comparison = self.compare_skills_structurally(name1, name2)
-                    if comparison['likely_variant']:
+                    if likely[i, j]:
                         variant_group.append(id2)
                         processed.add(id2)
                 
@@ -0,0 +1,158 @@
+"""
+Unit tests for the concurrent extraction pipeline.
+
+Uses a stub extractor and an in-memory writer, so no spaCy model or LLM
+is needed.
+
+Usage:
+    pytest tests/test_extraction_pipeline.py
+"""
+
+import os
+import signal
+import sys
+import threading
+import time
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'extractors'))
+
+import extraction_pipeline
+from extraction_pipeline import ExtractionPipeline
+
+
+class StubProcessor:
+    """SkillProcessor stand-in; fails on skill names starting with 'bad'."""
+
+    def extract_concepts(self, text):
+        if text.startswith('bad'):
+            raise ValueError(f"cannot parse {text!r}")
+        return text.split()
+
+    def extract_structure(self, text):
+        return text.upper()
+
+
+class StubExtractor:
+    """EnhancedMetadataExtractor stand-in recording which skills it completed."""
+
+    def __init__(self, use_spacy=True, delay=0.0, fail_ids=()):
+        self.use_spacy = use_spacy
+        self.spacy_processor = StubProcessor() if use_spacy else None
+        self.domains = None
+        self.delay = delay
+        self.fail_ids = set(fail_ids)
+        self.completed = []
+        self._lock = threading.Lock()
+
+    def complete_metadata(self, skill, concepts, structure):
+        time.sleep(self.delay)
+        if skill['SKILL_ID'] in self.fail_ids:
+            raise RuntimeError('LLM call failed')
+        with self._lock:
+            self.completed.append(skill['SKILL_ID'])
+        return {'SKILL_ID': skill['SKILL_ID'], 'concepts': concepts, 'structure': structure}
+
+
+class ListWriter:
+    """ShardWriter stand-in keeping records in a list."""
+
+    def __init__(self, delay=0.0):
+        self.records = []
+        self.delay = delay
+
+    def write(self, record):
+        time.sleep(self.delay)
+        self.records.append(record)
+
+
+def _skills(n, consumed=None):
+    for i in range(n):
+        if consumed is not None:
+            consumed.append(i)
+        yield {'SKILL_ID': f"S{i}", 'SKILL_NAME': f"skill {i}"}
+
+
+def _failing_nlp_worker(domains):
+    raise RuntimeError('spaCy model not available')
+
+
+def test_all_skills_are_written():
+    extractor = StubExtractor()
+    writer = ListWriter()
+
+    written = ExtractionPipeline(extractor, nlp_workers=0, llm_workers=3).run(_skills(50), writer)
+
+    assert written == 50
+    assert sorted(r['SKILL_ID'] for r in writer.records) == sorted(f"S{i}" for i in range(50))
+    record = next(r for r in writer.records if r['SKILL_ID'] == 'S7')
+    assert record['concepts'] == ['skill', '7'] and record['structure'] == 'SKILL 7'
+
+
+def test_failing_skills_are_logged_and_skipped(capsys):
+    skills = list(_skills(20))
+    skills[3]['SKILL_NAME'] = 'bad name'  # spaCy stage fails
+    del skills[5]['SKILL_NAME']           # Malformed input row
+    extractor = StubExtractor(fail_ids={'S8'})  # Enrichment stage fails
+    writer = ListWriter()
+
+    written = ExtractionPipeline(extractor, nlp_workers=0, llm_workers=2).run(skills, writer)
+
+    expected = {f"S{i}" for i in range(20)} - {'S3', 'S5', 'S8'}
+    assert written == len(expected)
+    assert {r['SKILL_ID'] for r in writer.records} == expected
+    output = capsys.readouterr().out
+    for skill_id in ('S3', 'S5', 'S8'):
+        assert f"failed for {skill_id}" in output
+
+
+def test_broken_pool_is_raised_after_draining(monkeypatch):
+    monkeypatch.setattr(extraction_pipeline, '_init_nlp_worker', _failing_nlp_worker)
+    extractor = StubExtractor()
+    writer = ListWriter()
+    pipeline = ExtractionPipeline(extractor, nlp_workers=1, llm_workers=2, queue_size=2)
+
+    with pytest.raises(BrokenProcessPool):
+        pipeline.run(_skills(200), writer)
+    assert writer.records == []
+
+
+def test_backpressure_bounds_skills_in_flight():
+    queue_size, llm_workers = 4, 2
+    consumed = []
+    leads = []
+
+    class TrackingWriter(ListWriter):
+        def write(self, record):
+            super().write(record)
+            leads.append(len(consumed) - len(self.records))
+
+    writer = TrackingWriter(delay=0.002)
+    pipeline = ExtractionPipeline(StubExtractor(), nlp_workers=0, llm_workers=llm_workers,
+                                  queue_size=queue_size)
+
+    assert pipeline.run(_skills(200, consumed), writer) == 200
+    # Parsed queue + result queue + one skill per enricher and in the feeder
+    assert max(leads) <= 2 * queue_size + llm_workers + 1
+    assert max(leads) >= queue_size  # The slow writer did fill the queues
+
+
+def test_sigint_drains_in_flight_skills():
+    extractor = StubExtractor(delay=0.005)
+    writer = ListWriter()
+    pipeline = ExtractionPipeline(extractor, nlp_workers=0, llm_workers=3, queue_size=4)
+    previous_handler = signal.getsignal(signal.SIGINT)
+
+    def interrupt(count, result):
+        if count == 10:
+            os.kill(os.getpid(), signal.SIGINT)
+
+    written = pipeline.run(_skills(500), writer, on_result=interrupt)
+
+    assert 10 <= written < 500
+    # Every skill that was enriched was also written; the rest are left to resume
+    assert sorted(r['SKILL_ID'] for r in writer.records) == sorted(extractor.completed)
+    assert signal.getsignal(signal.SIGINT) is previous_handler
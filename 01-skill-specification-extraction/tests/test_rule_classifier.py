@@ -0,0 +1,153 @@
+"""
+Unit tests for the rule-based educational classifier (LLM fast path).
+
+Usage:
+    pytest tests/test_rule_classifier.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'extractors'))
+
+from rule_classifier import (
+    CALIBRATION_PRIOR_WEIGHT,
+    CLASSIFIED_FIELDS,
+    DEFAULT_RULE_CONFIDENCE,
+    RuleBasedClassifier,
+)
+
+
+@pytest.fixture
+def classifier():
+    return RuleBasedClassifier()
+
+
+def test_phonics_skill_rules(classifier):
+    fields, confidence, rules = classifier.classify({
+        'SKILL_NAME': 'Blend phonemes to form words',
+        'SKILL_AREA_NAME': 'Phonological Awareness',
+        'complexity_band': 'K-2',
+        'actions': ['blend', 'form'], 'targets': ['phonemes', 'words'],
+        'root_verb': 'blend', 'key_concepts': ['blend', 'phoneme', 'word']
+    })
+
+    assert set(fields) == set(CLASSIFIED_FIELDS)
+    assert (fields['skill_domain'], rules['skill_domain']) == ('reading', 'area_lexicon')
+    assert (fields['cognitive_demand'], rules['cognitive_demand']) == ('application', 'root_verb')
+    assert (fields['scope'], rules['scope']) == ('word', 'scope_cue')
+    assert (fields['text_type'], rules['text_type']) == ('not_applicable', 'word_level')
+    assert (fields['text_mode'], rules['text_mode']) == ('not_applicable', 'not_applicable')
+    assert (fields['text_genre'], rules['text_genre']) == ('not_applicable', 'not_applicable')
+    assert (fields['task_complexity'], rules['task_complexity']) == ('basic', 'band_and_demand')
+
+
+def test_math_content_short_circuits_ela_fields(classifier):
+    fields, _, rules = classifier.classify({
+        'SKILL_NAME': 'Compare two stories about fractions',
+        'CONTENT_AREA_NAME': 'Mathematics',
+        'actions': 'compare', 'root_verb': 'compare'
+    })
+
+    for field in ('skill_domain', 'scope', 'text_type', 'text_mode', 'text_genre'):
+        assert (fields[field], rules[field]) == ('not_applicable', 'math_content')
+    assert fields['cognitive_demand'] == 'analysis'
+
+
+def test_text_cues(classifier):
+    fields, _, rules = classifier.classify({
+        'SKILL_NAME': 'Describe characters in a poem',
+        'SKILL_AREA_NAME': 'Literature',
+        'root_verb': 'describe'
+    })
+    assert (fields['text_type'], rules['text_type']) == ('fictional', 'fiction_cue')
+    assert (fields['text_mode'], rules['text_mode']) == ('poetry', 'poetry_cue')
+    assert (fields['text_genre'], rules['text_genre']) == ('literary', 'genre_cue')
+    assert fields['scope'] == 'text'
+
+    fields, _, rules = classifier.classify({
+        'SKILL_NAME': 'Use headings to locate facts in informational texts',
+        'SKILL_AREA_NAME': 'Informational Text',
+        'actions': 'use|locate', 'root_verb': 'use'
+    })
+    assert (fields['text_type'], rules['text_type']) == ('informational', 'info_cue')
+    assert (fields['text_mode'], rules['text_mode']) == ('prose', 'prose_default')
+    assert (fields['text_genre'], rules['text_genre']) == ('expository', 'genre_cue')
+    assert (fields['scope'], rules['scope']) == ('multi_text', 'multi_text_cue')
+
+
+def test_defaults_when_nothing_matches(classifier):
+    fields, confidence, rules = classifier.classify({'SKILL_NAME': 'Xyz', 'actions': float('nan')})
+
+    assert rules['skill_domain'] == 'default'
+    assert (fields['cognitive_demand'], rules['cognitive_demand']) == ('comprehension', 'default')
+    assert rules['task_complexity'] == 'demand_only'
+    assert confidence == DEFAULT_RULE_CONFIDENCE['skill_domain']['default']
+
+
+def test_task_complexity_combines_band_and_demand(classifier):
+    fields, _, _ = classifier.classify({'SKILL_NAME': 'Evaluate arguments',
+                                        'root_verb': 'evaluate', 'complexity_band': '9-12'})
+    assert fields['task_complexity'] == 'advanced'
+
+    fields, _, _ = classifier.classify({'SKILL_NAME': 'Analyze arguments',
+                                        'root_verb': 'analyze', 'complexity_band': 'K-2'})
+    assert fields['task_complexity'] == 'intermediate'
+
+
+def test_confidence_is_lowest_field_confidence(classifier):
+    _, confidence, rules = classifier.classify({
+        'SKILL_NAME': 'Blend phonemes to form words',
+        'SKILL_AREA_NAME': 'Phonological Awareness',
+        'complexity_band': 'K-2', 'root_verb': 'blend'
+    })
+
+    field_confidences = [DEFAULT_RULE_CONFIDENCE[field][rule] for field, rule in rules.items()]
+    assert confidence == min(field_confidences)
+    # One weak field pulls the whole classification down
+    classifier.rule_confidence['scope']['scope_cue'] = 0.05
+    assert classifier.classify({
+        'SKILL_NAME': 'Blend phonemes to form words',
+        'SKILL_AREA_NAME': 'Phonological Awareness',
+        'complexity_band': 'K-2', 'root_verb': 'blend'
+    })[1] == 0.05
+
+
+def test_calibrate_shrinks_toward_prior(classifier):
+    prior = DEFAULT_RULE_CONFIDENCE['cognitive_demand']['root_verb']
+    table = classifier.calibrate(
+        [('cognitive_demand', 'root_verb', True)] * 3 +
+        [('cognitive_demand', 'root_verb', False)] * 7
+    )
+
+    k = CALIBRATION_PRIOR_WEIGHT
+    assert table['cognitive_demand']['root_verb'] == round((3 + k * prior) / (10 + k), 4)
+    # Rules without outcomes keep their prior
+    assert table['cognitive_demand']['action'] == DEFAULT_RULE_CONFIDENCE['cognitive_demand']['action']
+    # The module-level priors are not modified
+    assert DEFAULT_RULE_CONFIDENCE['cognitive_demand']['root_verb'] == prior
+
+
+def test_calibration_file_round_trip(tmp_path, classifier):
+    classifier.calibrate([('text_type', 'fiction_cue', False)] * 20)
+    path = tmp_path / 'rule_calibration.json'
+    classifier.save_calibration(path)
+
+    loaded = RuleBasedClassifier(calibration_path=path)
+    assert loaded.rule_confidence == classifier.rule_confidence
+    assert loaded.signature() == classifier.signature()
+    assert loaded.signature() != RuleBasedClassifier().signature()
+
+
+def test_partial_calibration_keeps_other_priors(tmp_path):
+    path = tmp_path / 'rule_calibration.json'
+    path.write_text(json.dumps({'scope': {'scope_cue': 0.5}, 'new_field': {'rule': 0.7}}))
+
+    loaded = RuleBasedClassifier(calibration_path=path)
+    assert loaded.rule_confidence['scope']['scope_cue'] == 0.5
+    assert loaded.rule_confidence['scope']['default'] == DEFAULT_RULE_CONFIDENCE['scope']['default']
+    assert loaded.rule_confidence['text_type'] == DEFAULT_RULE_CONFIDENCE['text_type']
+    assert loaded.rule_confidence['new_field'] == {'rule': 0.7}
@@ -0,0 +1,88 @@
+"""
+Unit tests for the append-only shard writer.
+
+Usage:
+    pytest tests/test_shard_writer.py
+"""
+
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'extractors'))
+
+from shard_writer import ShardWriter
+
+
+def test_resume_reports_completed_ids(tmp_path):
+    with ShardWriter(tmp_path, run_name='run', shard_size=2) as writer:
+        for i in range(5):
+            writer.write({'SKILL_ID': i, 'value': i})
+
+    resumed = ShardWriter(tmp_path, run_name='run', shard_size=2)
+    assert resumed.completed_ids() == {'0', '1', '2', '3', '4'}
+    assert len(resumed.shard_paths()) == 3
+
+
+def test_truncated_last_line_is_ignored(tmp_path):
+    with ShardWriter(tmp_path, run_name='run') as writer:
+        writer.write({'SKILL_ID': 'a'})
+    with open(writer.shard_paths()[-1], 'a') as f:
+        f.write('{"SKILL_ID": "b"')
+
+    assert ShardWriter(tmp_path, run_name='run').completed_ids() == {'a'}
+
+
+def test_merge_keeps_union_of_fields(tmp_path):
+    with ShardWriter(tmp_path, run_name='run') as writer:
+        for i in range(5):
+            writer.write({'SKILL_ID': i, 'name': f"skill {i}"})
+        writer.write({'SKILL_ID': 5, 'name': 'skill 5', 'actions': 'identify'})
+        writer.write({'SKILL_ID': 0, 'name': 'duplicate'})
+
+    csv_path = tmp_path / 'merged.csv'
+    assert writer.merge_to_csv(csv_path, chunk_size=2) == 6
+
+    merged = pd.read_csv(csv_path)
+    assert list(merged.columns) == ['SKILL_ID', 'name', 'actions']
+    assert merged.loc[merged['SKILL_ID'] == 5, 'actions'].item() == 'identify'
+    assert merged.loc[merged['SKILL_ID'] == 0, 'name'].item() == 'skill 0'
+
+
+def test_run_config_mismatch_is_refused(tmp_path):
+    config = {'input': 'skills.csv', 'limit': 10}
+    with ShardWriter(tmp_path, run_name='run', run_config=config) as writer:
+        writer.write({'SKILL_ID': 1})
+
+    # Same settings resume
+    ShardWriter(tmp_path, run_name='run', run_config=dict(config))
+
+    with pytest.raises(ValueError):
+        ShardWriter(tmp_path, run_name='run', run_config={'input': 'other.csv', 'limit': 10})
+
+    # A new run name starts fresh
+    fresh = ShardWriter(tmp_path, run_name='other', run_config={'input': 'other.csv', 'limit': 10})
+    assert fresh.completed_ids() == set()
+
+
+def test_run_without_stored_config_is_not_resumed_blindly(tmp_path):
+    with ShardWriter(tmp_path, run_name='run') as writer:
+        writer.write({'SKILL_ID': 1})
+
+    with pytest.raises(ValueError):
+        ShardWriter(tmp_path, run_name='run', run_config={'input': 'skills.csv'})
+
+
+def test_changed_component_version_is_refused(tmp_path):
+    config = {'input': 'skills.csv', 'no_llm': False,
+              'versions': {'nlp_version': 'en_core_web_sm-3.8.0/vocab-1', 'rule_version': '1.0-abc'}}
+    with ShardWriter(tmp_path, run_name='run', run_config=config) as writer:
+        writer.write({'SKILL_ID': 1})
+
+    changed = {**config, 'versions': {**config['versions'], 'rule_version': '1.1-def'}}
+    with pytest.raises(ValueError):
+        ShardWriter(tmp_path, run_name='run', run_config=changed)
+    with pytest.raises(ValueError):
+        ShardWriter(tmp_path, run_name='run', run_config={**config, 'no_llm': True})
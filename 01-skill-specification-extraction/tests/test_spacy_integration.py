@@ -6,11 +6,16 @@ Validates that all enhanced components are working correctly.
 
 Usage:
     python3 test_spacy_integration.py
+    pytest tests/test_spacy_integration.py
 """
 
 import sys
 from pathlib import Path
 
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'extractors'))
+
 def test_imports():
     """Test that all required packages are installed."""
     print("=" * 70)
@@ -298,6 +303,54 @@ def run_simple_demo():
         return False
 
 
+# Vocabulary extensions exercising phrase and hyphenated matching
+PHRASE_VOCABULARY = """
+vocabulary:
+  literacy_targets: [main idea, sight word]
+  grade_indicators: [grade-level]
+  complexity_markers: [three-syllable, multi-step]
+"""
+
+
+@pytest.fixture(scope='module')
+def phrase_processor(tmp_path_factory):
+    """SkillProcessor with phrase terms from a temporary config (needs en_core_web_sm)."""
+    spacy = pytest.importorskip('spacy')
+    if not spacy.util.is_package('en_core_web_sm'):
+        pytest.skip('en_core_web_sm not installed')
+    from spacy_processor import SkillProcessor
+    
+    config_path = tmp_path_factory.mktemp('vocabulary') / 'config.yaml'
+    config_path.write_text(PHRASE_VOCABULARY)
+    return SkillProcessor(config_path=config_path)
+
+
+def test_multi_word_targets_match_as_phrases(phrase_processor):
+    concepts = phrase_processor.extract_concepts("Identify the main idea of a passage")
+    assert 'main idea' in concepts.key_concepts
+    assert 'passage' in concepts.key_concepts
+    
+    # Phrases match on lemmas, so plurals count too
+    concepts = phrase_processor.extract_concepts("Read common sight words")
+    assert 'sight word' in concepts.key_concepts
+
+
+def test_hyphenated_markers_match_whole_terms(phrase_processor):
+    concepts = phrase_processor.extract_concepts(
+        "Decode one-syllable and three-syllable words in multi-step tasks"
+    )
+    assert concepts.complexity_markers == ['one-syllable', 'three-syllable', 'multi-step']
+    
+    concepts = phrase_processor.extract_concepts("Read grade-level texts")
+    assert concepts.grade_indicators == ['grade-level']
+    assert 'grade' not in concepts.grade_indicators
+
+
+def test_overlapping_matches_keep_longest_span(phrase_processor):
+    concepts = phrase_processor.extract_concepts("Count syllables in pre-k rhymes")
+    assert concepts.grade_indicators == ['pre-k']
+
+
 def main():
     """Run all tests."""
     print("\n" + "=" * 70)
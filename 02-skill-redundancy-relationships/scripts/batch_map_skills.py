@@ -10,45 +10,63 @@ Usage:
         --content-area "English Language Arts" \\
         --checkpoint-interval 10 \\
         --output-dir ./outputs/priority_ela_78 \\
-        --skip-existing ./llm_skill_mappings.csv
+        --skip-existing ./llm_skill_mappings.csv \\
+        --ann-index ./outputs/ann/taxonomy_index
 """
 
 import pandas as pd
-import numpy as np
 from pathlib import Path
 import argparse
 import sys
 import json
 import time
 import re
+import hashlib
 from datetime import datetime
 from typing import List, Dict, Tuple, Optional
 
-# Add parent directory to path
+# Add parent directory and repository root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared.embeddings import ANNIndex, EmbeddingStore, embedding_backend_available, load_embedding_backend
 
 try:
     import boto3
-    from sentence_transformers import SentenceTransformer
-    from sklearn.metrics.pairwise import cosine_similarity
     DEPENDENCIES_AVAILABLE = True
 except ImportError as e:
     print(f"Error: Missing dependencies: {e}")
-    print("Install with: pip install boto3 sentence-transformers scikit-learn")
+    print("Install with: pip install boto3 sentence-transformers")
+    DEPENDENCIES_AVAILABLE = False
+
+if not embedding_backend_available():
+    print("Error: Missing dependencies: no embedding backend installed")
+    print("Install with: pip install boto3 sentence-transformers")
     DEPENDENCIES_AVAILABLE = False
 
 
 class LLMMapperAssistant:
     """LLM-assisted taxonomy mapping using AWS Bedrock."""
     
-    def __init__(self, taxonomy_df: pd.DataFrame, model='all-MiniLM-L6-v2'):
-        """Initialize the LLM mapper."""
+    def __init__(self, taxonomy_df: pd.DataFrame, model='all-MiniLM-L6-v2',
+                 ann_index_path: Optional[str] = None, ann_method: str = 'auto'):
+        """
+        Initialize the LLM mapper.
+        
+        Args:
+            taxonomy_df: Taxonomy nodes
+            model: Sentence transformer model name
+            ann_index_path: Directory of a persisted taxonomy ANN index; loaded
+                when it matches the taxonomy and model, otherwise (re)built and saved
+            ann_method: ANN backend ('auto', 'hnsw' or 'ivf')
+        """
         self.taxonomy_df = taxonomy_df
         self.model_name = model
         
         # Load sentence transformer
         print(f"Loading embedding model: {model}")
-        self.encoder = SentenceTransformer(model)
+        self.encoder = load_embedding_backend(model)
+        self.embedding_store = EmbeddingStore(model, model=self.encoder)
         
         # Pre-compute taxonomy embeddings
         self.taxonomy_texts = []
@@ -72,8 +90,7 @@ class LLMMapperAssistant:
                     text += f". {annotation}"
                 self.taxonomy_texts.append(text)
         
-        print(f"Computing embeddings for {len(self.taxonomy_texts)} taxonomy nodes...")
-        self.taxonomy_embeddings = self.encoder.encode(self.taxonomy_texts, show_progress_bar=True)
+        self.taxonomy_index = self.load_or_build_index(ann_index_path, ann_method)
         
         # Initialize Bedrock client
         self.bedrock = boto3.client('bedrock-runtime', region_name='us-west-2')
@@ -85,17 +102,43 @@ class LLMMapperAssistant:
         self.total_output_tokens = 0
         self.api_calls = 0
     
+    def load_or_build_index(self, index_path: Optional[str], method: str = 'auto') -> ANNIndex:
+        """
+        Load the persisted taxonomy index, or embed the taxonomy and build it.
+        
+        Index keys are taxonomy row positions; a saved index is reused only if
+        its fingerprint (model + taxonomy texts) matches.
+        """
+        fingerprint = hashlib.sha1(
+            '\n'.join([self.model_name] + self.taxonomy_texts).encode('utf-8')
+        ).hexdigest()
+        
+        if index_path and (Path(index_path) / 'meta.json').exists():
+            index = ANNIndex.load(index_path)
+            if index.metadata.get('fingerprint') == fingerprint:
+                print(f"✓ Loaded taxonomy ANN index ({index.method}, {len(index)} nodes): {index_path}")
+                return index
+            print("Taxonomy or model changed; rebuilding ANN index")
+        
+        print(f"Computing embeddings for {len(self.taxonomy_texts)} taxonomy nodes...")
+        self.taxonomy_embeddings = self.embedding_store.encode(self.taxonomy_texts, show_progress_bar=True)
+        
+        index = ANNIndex(self.taxonomy_embeddings.shape[1], method=method)
+        index.add([str(i) for i in range(len(self.taxonomy_texts))], self.taxonomy_embeddings)
+        index.metadata = {'fingerprint': fingerprint, 'model': self.model_name}
+        if index_path:
+            index.save(index_path)
+            print(f"✓ Saved taxonomy ANN index ({index.method}): {index_path}")
+        return index
+    
     def find_semantic_candidates(self, skill_text: str, top_k: int = 20) -> List[Tuple[str, float]]:
         """Find top-k semantically similar taxonomy nodes."""
-        skill_embedding = self.encoder.encode([skill_text])
-        similarities = cosine_similarity(skill_embedding, self.taxonomy_embeddings)[0]
-        
-        # Get top k indices
-        top_indices = np.argsort(similarities)[-top_k:][::-1]
+        skill_embedding = self.embedding_store.encode([skill_text])
+        neighbours = self.taxonomy_index.search(skill_embedding, top_k=top_k)[0]
         
         candidates = [
-            (self.taxonomy_paths[idx], similarities[idx])
-            for idx in top_indices
+            (self.taxonomy_paths[int(key)], score)
+            for key, score in neighbours
         ]
         
         return candidates
@@ -313,6 +356,12 @@ def main():
     parser.add_argument('--checkpoint-interval', type=int, default=25,
                         help='Save checkpoint every N skills')
     
+    # Candidate search
+    parser.add_argument('--ann-index',
+                        help='Directory for the persisted taxonomy ANN index (reused across runs)')
+    parser.add_argument('--ann-method', choices=['auto', 'hnsw', 'ivf'], default='auto',
+                        help='ANN backend (auto = hnsw if hnswlib is installed, else ivf)')
+    
     args = parser.parse_args()
     
     if not DEPENDENCIES_AVAILABLE:
@@ -398,7 +447,10 @@ def main():
     
     # Initialize mapper
     print("\nInitializing LLM mapper...")
-    mapper = LLMMapperAssistant(taxonomy_df)
+    ann_index = args.ann_index
+    if ann_index and not Path(ann_index).is_absolute():
+        ann_index = str(base_dir / ann_index)
+    mapper = LLMMapperAssistant(taxonomy_df, ann_index_path=ann_index, ann_method=args.ann_method)
     
     # Process skills
     print(f"\nProcessing {len(skills_df)} skills...")
@@ -0,0 +1,144 @@
+"""
+ANN Index Benchmark: Recall vs Latency
+
+Compares the persisted ANN index (shared.embeddings.ANNIndex) with exact
+brute-force cosine search. Reports build time, recall@k and per-query
+latency for a sweep of ef_search (HNSW) or nprobe (IVF) values.
+
+Embeddings come from a .npy file (e.g. saved skill or taxonomy
+embeddings); queries are a held-out sample of those rows. Without
+--embeddings, clustered synthetic vectors are used.
+
+Usage:
+    python benchmark_ann_index.py --embeddings ./outputs/skill_embeddings.npy --top-k 20
+    python benchmark_ann_index.py --synthetic 50000 --method ivf
+"""
+
+import numpy as np
+import argparse
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from shared.embeddings import ANNIndex, HNSWLIB_AVAILABLE, normalize_embeddings
+
+SWEEPS = {
+    'hnsw': ('ef_search', [16, 32, 64, 128, 256]),
+    'ivf': ('nprobe', [1, 2, 4, 8, 16, 32]),
+}
+
+
+def synthetic_embeddings(n: int, dim: int = 384, n_clusters: int = 500, seed: int = 42) -> np.ndarray:
+    """Clustered random vectors resembling sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(n_clusters, dim))
+    return centers[rng.integers(0, n_clusters, n)] + 0.8 * rng.normal(size=(n, dim))
+
+
+def brute_force(corpus: np.ndarray, queries: np.ndarray, top_k: int):
+    """Exact top-k rows and mean per-query latency (ms) of one-at-a-time search."""
+    start = time.perf_counter()
+    truth = []
+    for query in queries:
+        scores = corpus @ query
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        truth.append(set(top[np.argsort(-scores[top])].tolist()))
+    return truth, (time.perf_counter() - start) / len(queries) * 1000
+
+
+def evaluate(index: ANNIndex, queries: np.ndarray, truth, top_k: int):
+    """Recall@k and mean / p95 per-query latency (ms) of one-at-a-time search."""
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        result = index.search(query, top_k=top_k)[0]
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(expected & {int(key) for key, _ in result})
+    return hits / (len(queries) * top_k), float(np.mean(latencies)), float(np.percentile(latencies, 95))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark ANN index recall vs latency')
+    parser.add_argument('--embeddings', help='.npy file of embeddings (n, dim)')
+    parser.add_argument('--synthetic', type=int, default=20000,
+                        help='Number of synthetic vectors when --embeddings is not given')
+    parser.add_argument('--method', choices=['hnsw', 'ivf', 'all'], default='all')
+    parser.add_argument('--queries', type=int, default=500, help='Held-out query rows')
+    parser.add_argument('--top-k', type=int, default=20)
+    parser.add_argument('--output', help='Markdown report path')
+
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("ANN INDEX BENCHMARK")
+    print("=" * 70)
+
+    if args.embeddings:
+        embeddings = np.load(args.embeddings)
+        print(f"Loaded {embeddings.shape[0]:,} embeddings (dim {embeddings.shape[1]})")
+    else:
+        embeddings = synthetic_embeddings(args.synthetic)
+        print(f"Generated {embeddings.shape[0]:,} synthetic embeddings (dim {embeddings.shape[1]})")
+
+    embeddings = normalize_embeddings(embeddings)
+    rng = np.random.default_rng(0)
+    query_rows = rng.choice(len(embeddings), min(args.queries, len(embeddings) // 10), replace=False)
+    corpus_mask = np.ones(len(embeddings), dtype=bool)
+    corpus_mask[query_rows] = False
+    corpus_rows = np.flatnonzero(corpus_mask)
+    corpus, queries = embeddings[corpus_rows], embeddings[query_rows]
+
+    truth, brute_ms = brute_force(corpus, queries, args.top_k)
+    print(f"Brute force: {brute_ms:.3f} ms/query ({len(corpus):,} vectors, top-{args.top_k})")
+
+    methods = ['hnsw', 'ivf'] if args.method == 'all' else [args.method]
+    if 'hnsw' in methods and not HNSWLIB_AVAILABLE:
+        print("hnswlib not installed; skipping HNSW")
+        methods.remove('hnsw')
+
+    rows = []
+    for method in methods:
+        index = ANNIndex(corpus.shape[1], method=method)
+        start = time.perf_counter()
+        index.add([str(i) for i in range(len(corpus))], corpus)
+        build_s = time.perf_counter() - start
+
+        # Round-trip through disk so the benchmark measures the persisted index
+        with tempfile.TemporaryDirectory() as tmp:
+            start = time.perf_counter()
+            index.save(tmp)
+            index = ANNIndex.load(tmp)
+            load_s = time.perf_counter() - start
+        print(f"\n{method.upper()}: build {build_s:.2f}s, save+load {load_s:.2f}s")
+
+        param, values = SWEEPS[method]
+        for value in values:
+            index.params[param] = value
+            recall, mean_ms, p95_ms = evaluate(index, queries, truth, args.top_k)
+            rows.append((method, f"{param}={value}", recall, mean_ms, p95_ms, brute_ms / mean_ms))
+            print(f"  {param}={value:<4} recall@{args.top_k} {recall:.3f}  "
+                  f"{mean_ms:.3f} ms/query (p95 {p95_ms:.3f})  {brute_ms / mean_ms:.1f}x")
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w') as f:
+            f.write("# ANN Index Benchmark\n\n")
+            f.write(f"**Corpus**: {len(corpus):,} vectors, dim {corpus.shape[1]}  \n")
+            f.write(f"**Queries**: {len(queries)} held-out rows, top-{args.top_k}  \n")
+            f.write(f"**Brute force**: {brute_ms:.3f} ms/query\n\n")
+            f.write(f"| Method | Setting | Recall@{args.top_k} | Mean ms | p95 ms | Speedup |\n")
+            f.write("|--------|---------|--------|---------|--------|---------|\n")
+            for method, setting, recall, mean_ms, p95_ms, speedup in rows:
+                f.write(f"| {method} | {setting} | {recall:.3f} | {mean_ms:.3f} | "
+                        f"{p95_ms:.3f} | {speedup:.1f}x |\n")
+        print(f"\n✓ Report saved: {output_path}")
+
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
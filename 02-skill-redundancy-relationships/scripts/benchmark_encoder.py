@@ -0,0 +1,155 @@
+"""
+Embedding Encoder Benchmark: Texts/sec Across Batch Strategies
+
+Encodes skill names and long texts (taxonomy paths + annotations, or a
+long column such as PEDAGOGICAL_LIMITS) with:
+
+- default: SentenceTransformer.encode with fixed batch_size=32
+- fixed-128: fixed batch_size=128
+- bucketed-<budget>: BucketedEncoder (length-sorted, token-budget batches)
+- bucketed-<budget>-pool<N>: the same over N CPU worker processes
+
+Each strategy is checked against the default output (order restored, max
+absolute difference reported) and timed in texts/sec.
+
+Usage:
+    python benchmark_encoder.py --skills ../../rock_schemas/SKILLS.csv \\
+        --taxonomy ../../POC_science_of_reading_literacy_skills_taxonomy.csv --processes 4
+    python benchmark_encoder.py --limit 2000 --output ./outputs/encoder_benchmark.md
+"""
+
+import pandas as pd
+import numpy as np
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from shared.embeddings import BucketedEncoder
+
+try:
+    from sentence_transformers import SentenceTransformer
+    DEPENDENCIES_AVAILABLE = True
+except ImportError as e:
+    print(f"Error: Missing dependencies: {e}")
+    print("Install with: pip install sentence-transformers")
+    DEPENDENCIES_AVAILABLE = False
+
+REPO_ROOT = Path(__file__).parent.parent.parent
+TAXONOMY_LEVELS = ['Strand', 'Pillar', 'Domain', 'Skill Area', 'Skill Set', 'Skill Subset']
+
+
+def load_texts(args) -> list:
+    """Skill names plus long texts (taxonomy nodes and/or a long skills column)."""
+    skills_df = pd.read_csv(args.skills)
+    texts = skills_df['SKILL_NAME'].dropna().astype(str).tolist()
+    if args.long_column and args.long_column in skills_df.columns:
+        texts += skills_df[args.long_column].dropna().astype(str).tolist()
+
+    if args.taxonomy:
+        taxonomy_df = pd.read_csv(args.taxonomy)
+        for _, row in taxonomy_df.iterrows():
+            parts = [str(row[level]) for level in TAXONOMY_LEVELS
+                     if level in row and pd.notna(row[level]) and row[level]]
+            if not parts:
+                continue
+            text = ' > '.join(parts)
+            annotation = row.get('Skill Subset Annotation', '')
+            if pd.notna(annotation) and annotation:
+                text += f". {annotation}"
+            texts.append(text)
+
+    # Interleave short and long texts as they arrive from real callers
+    rng = np.random.default_rng(0)
+    texts = [texts[i] for i in rng.permutation(len(texts))]
+    return texts[:args.limit] if args.limit else texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark embedding batch strategies')
+    parser.add_argument('--skills', default=str(REPO_ROOT / 'data' / 'samples' / 'sample_data.csv'),
+                        help='Skills CSV (SKILL_NAME column)')
+    parser.add_argument('--long-column', default='PEDAGOGICAL_LIMITS',
+                        help='Skills column with long texts to mix in')
+    parser.add_argument('--taxonomy', help='Taxonomy CSV (paths + annotations)')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--budgets', default='4096,8192,16384',
+                        help='Comma-separated token budgets')
+    parser.add_argument('--processes', type=int, default=0,
+                        help='Also run bucketed encoding over N CPU processes')
+    parser.add_argument('--limit', type=int, help='Use at most N texts')
+    parser.add_argument('--output', help='Markdown report path')
+
+    args = parser.parse_args()
+
+    if not DEPENDENCIES_AVAILABLE:
+        print("Error: Required dependencies not installed")
+        return 1
+
+    print("=" * 70)
+    print("EMBEDDING ENCODER BENCHMARK")
+    print("=" * 70)
+
+    texts = load_texts(args)
+    model = SentenceTransformer(args.model, device='cpu')
+    lengths = BucketedEncoder(model).token_lengths(texts)
+    print(f"Texts: {len(texts):,} (tokens: median {int(np.median(lengths))}, "
+          f"p95 {int(np.percentile(lengths, 95))}, max {lengths.max()})")
+
+    # Warm up the model so the first strategy is not penalized
+    model.encode(texts[:64], batch_size=32)
+
+    strategies = [
+        ('default', lambda: model.encode(texts, batch_size=32, convert_to_numpy=True)),
+        ('fixed-128', lambda: model.encode(texts, batch_size=128, convert_to_numpy=True)),
+    ]
+    for budget in [int(b) for b in args.budgets.split(',')]:
+        encoder = BucketedEncoder(model, token_budget=budget)
+        strategies.append((f'bucketed-{budget}', lambda encoder=encoder: encoder.encode(texts)))
+    if args.processes > 1:
+        pool_encoder = BucketedEncoder(model, token_budget=int(args.budgets.split(',')[-1]),
+                                       processes=args.processes)
+        strategies.append((f'bucketed-{pool_encoder.token_budget}-pool{args.processes}',
+                           lambda: pool_encoder.encode(texts)))
+
+    rows = []
+    reference = None
+    for name, run in strategies:
+        start = time.perf_counter()
+        vectors = run()
+        elapsed = time.perf_counter() - start
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if reference is None:
+            reference = vectors
+        rows.append({
+            'strategy': name,
+            'seconds': elapsed,
+            'texts_per_sec': len(texts) / elapsed,
+            'speedup': rows[0]['seconds'] / elapsed if rows else 1.0,
+            'max_abs_diff': float(np.abs(vectors - reference).max())
+        })
+        print(f"  {name:<28} {len(texts) / elapsed:>9.1f} texts/sec  "
+              f"({elapsed:.1f}s, max diff {rows[-1]['max_abs_diff']:.1e})")
+
+    if args.processes > 1:
+        pool_encoder.close()
+
+    report = pd.DataFrame(rows)
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w') as f:
+            f.write("# Embedding Encoder Benchmark\n\n")
+            f.write(f"**Model**: {args.model} (CPU)  \n")
+            f.write(f"**Texts**: {len(texts):,}, median {int(np.median(lengths))} tokens, "
+                    f"max {lengths.max()}\n\n")
+            f.write(report.to_string(index=False, float_format=lambda v: f"{v:.3g}"))
+            f.write("\n")
+        print(f"\n✓ Report saved: {output_path}")
+
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,145 @@
+"""
+Quantized Embedding Report: Memory Savings and Top-k Agreement
+
+Quantizes skill embeddings to float16 and int8 (per-vector scale) and
+compares per-skill top-k neighbours with exact float32 cosine search:
+
+- resident memory per format (float64 / float32 / float16 / int8)
+- top-k agreement of the quantized kernel alone, and after re-scoring
+  top_k * rescore_factor candidates in full precision
+- pair score error and wall time
+
+Embeddings come from a .npy file, or are encoded from a skills CSV through
+the shared embedding store (cached across runs). Without either, clustered
+synthetic vectors are used.
+
+Usage:
+    python benchmark_quantized_embeddings.py --skills ../../rock_schemas/SKILLS.csv --top-k 20
+    python benchmark_quantized_embeddings.py --embeddings ./outputs/skill_embeddings.npy \\
+        --output ./outputs/quantization_report.md
+"""
+
+import pandas as pd
+import numpy as np
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from shared.embeddings import (
+    EmbeddingStore, blocked_cosine_similarity, quantize_embeddings,
+    quantized_cosine_similarity, quantized_pair_cosine, pair_cosine, normalize_embeddings
+)
+
+
+def load_embeddings(args) -> np.ndarray:
+    """Embeddings from --embeddings, --skills (via the embedding store) or synthetic."""
+    if args.embeddings:
+        return np.load(args.embeddings)
+    if args.skills:
+        skills_df = pd.read_csv(args.skills, usecols=[args.text_column])
+        texts = skills_df[args.text_column].fillna('').astype(str).tolist()
+        store = EmbeddingStore(args.model)
+        return store.encode(texts, show_progress_bar=True)
+    rng = np.random.default_rng(42)
+    centers = rng.normal(size=(500, 384))
+    return centers[rng.integers(0, 500, args.synthetic)] + 0.8 * rng.normal(size=(args.synthetic, 384))
+
+
+def top_k_agreement(reference, candidate) -> float:
+    """Mean share of each row's reference neighbours also found by candidate."""
+    found = 0
+    total = 0
+    for row in range(reference.shape[0]):
+        expected = reference.indices[reference.indptr[row]:reference.indptr[row + 1]]
+        got = candidate.indices[candidate.indptr[row]:candidate.indptr[row + 1]]
+        found += len(np.intersect1d(expected, got, assume_unique=True))
+        total += len(expected)
+    return found / total if total else 1.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report quantized embedding memory and top-k agreement')
+    parser.add_argument('--embeddings', help='.npy file of embeddings (n, dim)')
+    parser.add_argument('--skills', help='Skills CSV to encode (e.g. SKILLS.csv)')
+    parser.add_argument('--text-column', default='SKILL_NAME')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2')
+    parser.add_argument('--synthetic', type=int, default=20000,
+                        help='Number of synthetic vectors when no input is given')
+    parser.add_argument('--top-k', type=int, default=20)
+    parser.add_argument('--rescore-factor', type=int, default=4)
+    parser.add_argument('--output', help='Markdown report path')
+
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("QUANTIZED EMBEDDING REPORT")
+    print("=" * 70)
+
+    # Sentence-transformer embeddings are float32; compare against that
+    embeddings = np.asarray(load_embeddings(args), dtype=np.float32)
+    n, dim = embeddings.shape
+    print(f"Embeddings: {n:,} x {dim}")
+
+    start = time.perf_counter()
+    reference = blocked_cosine_similarity(embeddings, top_k=args.top_k)
+    exact_s = time.perf_counter() - start
+    print(f"Exact float32 top-{args.top_k}: {exact_s:.2f}s")
+
+    rng = np.random.default_rng(0)
+    left, right = rng.integers(0, n, 100000), rng.integers(0, n, 100000)
+    exact_pairs = pair_cosine(normalize_embeddings(embeddings), left, right)
+
+    rows = [
+        {'format': 'float64', 'memory_mb': n * dim * 8 / 1e6, 'vs_float32': 2.0},
+        {'format': 'float32', 'memory_mb': n * dim * 4 / 1e6, 'vs_float32': 1.0,
+         'agreement': 1.0, 'time_s': exact_s},
+    ]
+    for dtype in ['float16', 'int8']:
+        quantized = quantize_embeddings(embeddings, dtype)
+        pair_error = np.abs(quantized_pair_cosine(quantized, left, right) - exact_pairs)
+
+        start = time.perf_counter()
+        approx = quantized_cosine_similarity(quantized, top_k=args.top_k)
+        approx_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rescored = quantized_cosine_similarity(quantized, top_k=args.top_k, full_precision=embeddings,
+                                               rescore_factor=args.rescore_factor)
+        rescored_s = time.perf_counter() - start
+
+        rows.append({
+            'format': dtype,
+            'memory_mb': quantized.nbytes / 1e6,
+            'vs_float32': quantized.nbytes / (n * dim * 4),
+            'agreement': top_k_agreement(reference, approx),
+            'agreement_rescored': top_k_agreement(reference, rescored),
+            'mean_abs_error': float(pair_error.mean()),
+            'max_abs_error': float(pair_error.max()),
+            'time_s': approx_s,
+            'time_rescored_s': rescored_s,
+        })
+
+    report = pd.DataFrame(rows)
+    print()
+    print(report.to_string(index=False, float_format=lambda v: f"{v:.4f}", na_rep='-'))
+
+    if args.output:
+        output_path = Path(args.output)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(output_path, 'w') as f:
+            f.write("# Quantized Embedding Report\n\n")
+            f.write(f"**Embeddings**: {n:,} x {dim}  \n")
+            f.write(f"**Top-k**: {args.top_k} (re-score factor {args.rescore_factor})\n\n")
+            f.write(report.to_string(index=False, float_format=lambda v: f"{v:.4f}", na_rep='-'))
+            f.write("\n\n- agreement: share of exact float32 top-k neighbours found\n")
+            f.write("- *_rescored: quantized candidates re-scored in full precision\n")
+            f.write("- abs error: cosine error on 100k random pairs\n")
+        print(f"\n✓ Report saved: {output_path}")
+
+    print("=" * 70)
+
+
+if __name__ == '__main__':
+    main()
@@ -363,67 +363,112 @@ def generate_master_concepts(variants_df: pd.DataFrame,
     return concepts_df
 
 
+def concept_hierarchy(concept: pd.Series) -> str:
+    """'Strand > Pillar > Domain' string of a master concept."""
+    return f"{concept['SOR_STRAND']} > {concept['SOR_PILLAR']} > {concept['SOR_DOMAIN']}"
+
+
+def build_hierarchy_trie(concepts_df: pd.DataFrame) -> Dict:
+    """
+    Character trie of concept hierarchy strings.
+    
+    Each node maps a character to its child; the '' key holds the position
+    (in concepts_df order) of the first concept whose hierarchy ends there.
+    """
+    trie = {}
+    for position, hierarchy in enumerate(concepts_df.apply(concept_hierarchy, axis=1)
+                                         if not concepts_df.empty else []):
+        node = trie
+        for char in hierarchy:
+            node = node.setdefault(char, {})
+        node.setdefault('', position)
+    return trie
+
+
+def match_concept_hierarchy(taxonomy_path: str, trie: Dict) -> Optional[int]:
+    """
+    Position of the first concept whose hierarchy string occurs in
+    taxonomy_path, or None.
+    
+    Same rule as checking `hierarchy in taxonomy_path` for each concept in
+    order, but each start position of the path only walks the trie as far
+    as a hierarchy continues to match (at most the hierarchy length).
+    """
+    best = None
+    for start in range(len(taxonomy_path)):
+        node = trie
+        for char in taxonomy_path[start:]:
+            node = node.get(char)
+            if node is None:
+                break
+            position = node.get('')
+            if position is not None and (best is None or position < best):
+                best = position
+    return best
+
+
 def generate_skill_mapping(variants_df: pd.DataFrame,
                            mappings_df: pd.DataFrame,
                            concepts_df: pd.DataFrame,
                            skills_df: pd.DataFrame) -> pd.DataFrame:
-    """Generate skill-to-master-concept bridge table."""
-    print("\nGenerating skill-to-master-concept mappings...")
+    """
+    Generate skill-to-master-concept bridge table.
     
-    skill_mappings = []
+    Skill names, taxonomy paths and confidences are looked up by SKILL_ID
+    (first row per skill); State A skills map through their equivalence
+    group, State B skills through the first concept whose
+    'Strand > Pillar > Domain' occurs in their taxonomy path, resolved
+    once per distinct path with a character trie.
+    """
+    print("\nGenerating skill-to-master-concept mappings...")
     
     # Create lookup: equivalence_group_id -> master_concept_id
     group_to_concept = dict(zip(concepts_df['EQUIVALENCE_GROUP_ID'], concepts_df['MASTER_CONCEPT_ID']))
     concept_names = dict(zip(concepts_df['MASTER_CONCEPT_ID'], concepts_df['MASTER_CONCEPT_NAME']))
     
-    # Process all skills
-    for _, skill_row in variants_df.iterrows():
-        skill_id = skill_row['SKILL_ID']
-        equiv_type = skill_row['EQUIVALENCE_TYPE']
-        equiv_group = skill_row['EQUIVALENCE_GROUP_ID']
-        
-        # Get skill name
-        skill_info = skills_df[skills_df['SKILL_ID'] == skill_id]
-        skill_name = skill_info.iloc[0]['SKILL_NAME'] if not skill_info.empty else skill_row['SKILL_NAME']
-        
-        # Get taxonomy path and confidence from LLM mappings
-        mapping_info = mappings_df[mappings_df['SKILL_ID'] == skill_id]
-        taxonomy_path = mapping_info.iloc[0]['TAXONOMY_PATH'] if not mapping_info.empty else None
-        confidence = mapping_info.iloc[0]['CONFIDENCE'] if not mapping_info.empty else None
-        
-        # Determine master concept
-        master_concept_id = None
-        master_concept_name = None
-        
-        if equiv_type == 'state-variant' and equiv_group in group_to_concept:
-            # State A: direct mapping via equivalence group
-            master_concept_id = group_to_concept[equiv_group]
-            master_concept_name = concept_names[master_concept_id]
-        elif equiv_type == 'grade-progression' and not pd.isna(taxonomy_path):
-            # State B: try to map via taxonomy similarity
-            # Find concepts with similar taxonomy paths
-            if not concepts_df.empty:
-                for _, concept in concepts_df.iterrows():
-                    concept_hierarchy = f"{concept['SOR_STRAND']} > {concept['SOR_PILLAR']} > {concept['SOR_DOMAIN']}"
-                    if pd.notna(taxonomy_path) and concept_hierarchy in taxonomy_path:
-                        master_concept_id = concept['MASTER_CONCEPT_ID']
-                        master_concept_name = concept['MASTER_CONCEPT_NAME']
-                        break
-        # Unique skills: leave unmapped (master_concept_id = None)
-        
-        skill_mapping = {
-            'SKILL_ID': skill_id,
-            'SKILL_NAME': skill_name,
-            'MASTER_CONCEPT_ID': master_concept_id,
-            'MASTER_CONCEPT_NAME': master_concept_name,
-            'EQUIVALENCE_TYPE': equiv_type,
-            'TAXONOMY_PATH': taxonomy_path,
-            'CONFIDENCE': confidence
-        }
-        
-        skill_mappings.append(skill_mapping)
-    
-    mappings_df = pd.DataFrame(skill_mappings)
+    skill_ids = variants_df['SKILL_ID']
+    equiv_types = variants_df['EQUIVALENCE_TYPE']
+    
+    # Skill name: ROCK skills first, else the name from variant classification
+    first_skills = skills_df.drop_duplicates(subset=['SKILL_ID']).set_index('SKILL_ID')['SKILL_NAME']
+    skill_names = skill_ids.map(first_skills).where(skill_ids.isin(first_skills.index),
+                                                    variants_df['SKILL_NAME'])
+    
+    # Taxonomy path and confidence from LLM mappings
+    first_mappings = mappings_df.drop_duplicates(subset=['SKILL_ID']).set_index('SKILL_ID')
+    has_mapping = skill_ids.isin(first_mappings.index)
+    taxonomy_paths = skill_ids.map(first_mappings['TAXONOMY_PATH']).where(has_mapping, None)
+    confidences = skill_ids.map(first_mappings['CONFIDENCE']).where(has_mapping, None)
+    
+    # State A: direct mapping via equivalence group
+    master_concept_ids = pd.Series([None] * len(variants_df), index=variants_df.index, dtype=object)
+    state_a = (equiv_types == 'state-variant') & variants_df['EQUIVALENCE_GROUP_ID'].isin(group_to_concept.keys())
+    master_concept_ids[state_a] = variants_df.loc[state_a, 'EQUIVALENCE_GROUP_ID'].map(group_to_concept)
+    
+    # State B: first concept whose hierarchy appears in the taxonomy path
+    state_b = (equiv_types == 'grade-progression') & taxonomy_paths.notna()
+    if state_b.any() and not concepts_df.empty:
+        trie = build_hierarchy_trie(concepts_df)
+        concept_ids = concepts_df['MASTER_CONCEPT_ID'].tolist()
+        path_concepts = {}
+        for path in taxonomy_paths[state_b].unique():
+            position = match_concept_hierarchy(str(path), trie)
+            path_concepts[path] = concept_ids[position] if position is not None else None
+        # List, not Series.map: map turns unmatched (None) entries into NaN
+        master_concept_ids[state_b] = [path_concepts[path] for path in taxonomy_paths[state_b]]
+    # Unique skills: leave unmapped (master_concept_id = None)
+    
+    master_concept_names = master_concept_ids.map(concept_names).where(master_concept_ids.notna(), None)
+    
+    mappings_df = pd.DataFrame({
+        'SKILL_ID': skill_ids,
+        'SKILL_NAME': skill_names,
+        'MASTER_CONCEPT_ID': master_concept_ids,
+        'MASTER_CONCEPT_NAME': master_concept_names,
+        'EQUIVALENCE_TYPE': equiv_types,
+        'TAXONOMY_PATH': taxonomy_paths,
+        'CONFIDENCE': confidences
+    }).reset_index(drop=True)
     
     mapped_count = mappings_df['MASTER_CONCEPT_ID'].notna().sum()
     print(f"  ✓ Generated {len(mappings_df):,} skill mappings ({mapped_count:,} mapped to master concepts)")
@@ -12,7 +12,7 @@ For each relationship type, provides:
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import yaml
@@ -79,6 +79,36 @@ class Recommendation:
         }
 
 
+class SkillLookup:
+    """
+    Row access to a metadata frame by SKILL_ID or position, built once.
+    
+    Replaces per-relationship ``metadata_df[metadata_df['SKILL_ID'] == id]``
+    scans with a hash lookup (first row wins for duplicate IDs, as with
+    the scan).
+    """
+    
+    def __init__(self, metadata_df: pd.DataFrame):
+        self.metadata_df = metadata_df
+        self.positions: Dict[str, int] = {}
+        for position, skill_id in enumerate(metadata_df['SKILL_ID'].tolist()):
+            self.positions.setdefault(skill_id, position)
+    
+    def __len__(self) -> int:
+        return len(self.positions)
+    
+    def row(self, skill_id, position: Optional[int] = None) -> pd.Series:
+        """Skill row by position if given, else by SKILL_ID."""
+        if position is None:
+            position = self.positions[skill_id]
+        return self.metadata_df.iloc[position]
+    
+    def skills_for(self, relationship: SkillRelationship) -> Tuple[pd.Series, pd.Series]:
+        """Rows of a relationship's two skills (positional indices preferred)."""
+        return (self.row(relationship.skill_a_id, relationship.skill_a_index),
+                self.row(relationship.skill_b_id, relationship.skill_b_index))
+
+
 class RecommendationEngine:
     """
     Generates actionable recommendations for skill relationships.
@@ -107,21 +137,31 @@ class RecommendationEngine:
     
     def generate_recommendation(self,
                                relationship: SkillRelationship,
-                               skill_a: pd.Series,
-                               skill_b: pd.Series,
-                               metadata_df: Optional[pd.DataFrame] = None) -> Recommendation:
+                               skill_a: Optional[pd.Series] = None,
+                               skill_b: Optional[pd.Series] = None,
+                               metadata_df: Optional[pd.DataFrame] = None,
+                               skill_lookup: Optional[SkillLookup] = None) -> Recommendation:
         """
         Generate recommendation for a skill relationship.
         
         Args:
             relationship: Classified skill relationship
-            skill_a: First skill with full metadata
-            skill_b: Second skill with full metadata
+            skill_a: First skill with full metadata (default: from skill_lookup)
+            skill_b: Second skill with full metadata (default: from skill_lookup)
             metadata_df: Full metadata DataFrame (for impact analysis)
+            skill_lookup: Index over metadata_df; build once per frame and
+                reuse across relationships
             
         Returns:
             Recommendation with action, priority, and rationale
         """
+        if skill_a is None or skill_b is None:
+            if skill_lookup is None:
+                if metadata_df is None:
+                    raise ValueError("Pass skill_a and skill_b, or a skill_lookup/metadata_df to find them")
+                skill_lookup = SkillLookup(metadata_df)
+            skill_a, skill_b = skill_lookup.skills_for(relationship)
+        
         # Route to appropriate decision tree
         if relationship.relationship_type == RelationshipType.TRUE_DUPLICATE:
             return self._recommend_true_duplicate(relationship, skill_a, skill_b, metadata_df)
@@ -7,19 +7,31 @@ Analyzes ROCK skills to identify:
 - State B (grade progressions): Same skill progressing through grades
 - Unique skills: No detected variants
 
+Name similarity is the cosine of character n-gram TF-IDF vectors of the
+normalized names, scored one sparse matrix product per block (grade level
+for State A, authority for State B) rather than per pair. Skills whose
+names have the same words are collapsed before scoring, and variant
+groups are the connected components of the similar pairs.
+
 Generates: analysis/outputs/variant-classification-report.csv
 """
 
+import numpy as np
 import pandas as pd
 import sqlite3
 from pathlib import Path
-from difflib import SequenceMatcher
 import re
-from collections import defaultdict
 import sys
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# Repository root, for shared utilities
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+from shared.utils.grouping import GroupingResult, group_edges
 
 # Configuration
-SIMILARITY_THRESHOLD = 0.75  # For name matching
+SIMILARITY_THRESHOLD = 0.70  # Name n-gram TF-IDF cosine for variant matching
+NGRAM_RANGE = (3, 3)  # Character n-grams (within words) for name vectors
+SCORE_BLOCK_SIZE = 1024  # Names per row block of the similarity product
 MIN_GROUP_SIZE = 2  # Minimum skills per variant group
 GRADE_ORDER = ['Pre-K', 'PK', 'K', '1', '2', '3', '4', '5', '6', '7', '8', '9', '10', '11', '12']
 
@@ -45,9 +57,93 @@ def normalize_skill_name(name: str) -> str:
     return name.strip()
 
 
-def text_similarity(a: str, b: str) -> float:
-    """Calculate text similarity between two strings."""
-    return SequenceMatcher(None, a, b).ratio()
+def name_signatures(names: pd.Series) -> pd.Series:
+    """Sorted words of each normalized name (word order ignored)."""
+    return names.str.split().map(lambda words: ' '.join(sorted(words)))
+
+
+def find_variant_groups(normalized: pd.DataFrame,
+                        block_column: str,
+                        differ_column: str,
+                        threshold: float = SIMILARITY_THRESHOLD,
+                        min_group_size: int = MIN_GROUP_SIZE,
+                        id_prefix: str = 'GRP') -> GroupingResult:
+    """
+    Group skills with the same block_column value, a different
+    differ_column value and similar normalized names.
+    
+    Character n-grams do not cross word boundaries, so names with the same
+    words have identical TF-IDF vectors. Skills are therefore collapsed to
+    units of (block, word signature, differ value) before scoring: only
+    distinct signatures are compared, and every skill of a unit has the
+    same similar partners. Groups are connected components, i.e. exactly
+    the groups the pairwise rule gives when applied to every skill pair.
+    
+    Args:
+        normalized: Skills with SKILL_ID, NORMALIZED_NAME and both columns
+        block_column: Column that must match (e.g. GRADE_LEVEL_NAME)
+        differ_column: Column that must differ (e.g. AUTHORITY)
+        threshold: Minimum name cosine similarity
+        min_group_size: Smallest group to keep
+        id_prefix: Group ID prefix
+        
+    Returns:
+        GroupingResult over SKILL_IDs, groups in order of first skill
+    """
+    frame = normalized[['SKILL_ID', block_column, differ_column]].dropna().copy()
+    frame['SIGNATURE'] = name_signatures(normalized.loc[frame.index, 'NORMALIZED_NAME'])
+    
+    # Units number in order of first appearance, rows = distinct (block, signature)
+    frame['UNIT'] = frame.groupby([block_column, 'SIGNATURE', differ_column], sort=False).ngroup()
+    units = frame.drop_duplicates('UNIT').set_index('UNIT').sort_index()
+    units['ROW'] = units.groupby([block_column, 'SIGNATURE'], sort=False).ngroup()
+    rows = units.drop_duplicates('ROW').set_index('ROW').sort_index()
+    
+    left, right = [], []
+    if len(rows):
+        # IDF over distinct names, whichever blocks they occur in
+        vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=NGRAM_RANGE)
+        vectorizer.fit(rows['SIGNATURE'].unique())
+        vectors = vectorizer.transform(rows['SIGNATURE']).tocsr()
+        
+        # Each row is similar to itself; other rows only within the block
+        left.append(np.arange(len(rows)))
+        right.append(np.arange(len(rows)))
+        for positions in rows.groupby(block_column, sort=False).indices.values():
+            block_vectors = vectors[positions]
+            for start in range(0, len(positions), SCORE_BLOCK_SIZE):
+                sims = (block_vectors[start:start + SCORE_BLOCK_SIZE] @ block_vectors.T).tocoo()
+                keep = (sims.data >= threshold - 1e-9) & (sims.col > sims.row + start)
+                left.append(positions[sims.row[keep] + start])
+                right.append(positions[sims.col[keep]])
+    
+    # Similar rows -> unit pairs whose differ values differ
+    row_pairs = pd.DataFrame({'ROW_A': np.concatenate(left) if left else [],
+                              'ROW_B': np.concatenate(right) if right else []})
+    unit_table = pd.DataFrame({'ROW': units['ROW'].to_numpy(),
+                               'UNIT': units.index.to_numpy(),
+                               'DIFFER': pd.factorize(units[differ_column])[0]})
+    edges = row_pairs \
+        .merge(unit_table.add_suffix('_A'), on='ROW_A') \
+        .merge(unit_table.add_suffix('_B'), on='ROW_B')
+    edges = edges[(edges['DIFFER_A'] != edges['DIFFER_B'])
+                  & ((edges['ROW_A'] != edges['ROW_B']) | (edges['UNIT_A'] < edges['UNIT_B']))]
+    
+    # Back to skills: unit edges join first members, and the other rows of
+    # a unit with any partner join its first member (by row, as a repeated
+    # SKILL_ID may also lead another unit)
+    first_member = units['SKILL_ID'].to_numpy()
+    linked = np.zeros(len(units), dtype=bool)
+    linked[edges['UNIT_A'].to_numpy()] = True
+    linked[edges['UNIT_B'].to_numpy()] = True
+    followers = frame[linked[frame['UNIT'].to_numpy()] & frame['UNIT'].duplicated()]
+    
+    skill_left = np.concatenate([first_member[edges['UNIT_A'].to_numpy()],
+                                 first_member[followers['UNIT'].to_numpy()]])
+    skill_right = np.concatenate([first_member[edges['UNIT_B'].to_numpy()],
+                                  followers['SKILL_ID'].to_numpy()])
+    return group_edges(skill_left, skill_right, nodes=frame['SKILL_ID'].tolist(),
+                       min_group_size=min_group_size, id_prefix=id_prefix)
 
 
 def calculate_complexity_level(grade_level_name: str) -> int:
@@ -121,8 +217,18 @@ def load_skills_from_csv(base_path: Path) -> pd.DataFrame:
     return ela_skills
 
 
-def identify_state_variants(skills_df: pd.DataFrame) -> dict:
-    """Identify cross-state variants (State A)."""
+def identify_state_variants(skills_df: pd.DataFrame,
+                            threshold: float = SIMILARITY_THRESHOLD) -> dict:
+    """
+    Identify cross-state variants (State A).
+    
+    Args:
+        skills_df: ELA skills with AUTHORITY
+        threshold: Minimum name similarity
+        
+    Returns:
+        {skill_id: group_id}
+    """
     print("\n🔍 Identifying State A (Cross-State Variants)...")
     
     # Group by normalized name
@@ -132,53 +238,27 @@ def identify_state_variants(skills_df: pd.DataFrame) -> dict:
     # Filter out empty normalized names
     normalized = normalized[normalized['NORMALIZED_NAME'].str.len() > 10]
     
-    state_groups = defaultdict(list)
-    group_id = 1
-    processed = set()
+    # Must be same grade level and different authority
+    grouping = find_variant_groups(normalized, 'GRADE_LEVEL_NAME', 'AUTHORITY',
+                                   threshold=threshold, id_prefix='SA')
+    for group_number, group in enumerate(grouping.groups, 1):
+        print(f"  Found State A group {group_number}: {group.size} skills")
     
-    # Group similar skills across different authorities
-    for idx1, skill1 in normalized.iterrows():
-        if skill1['SKILL_ID'] in processed:
-            continue
-        
-        group = [skill1['SKILL_ID']]
-        processed.add(skill1['SKILL_ID'])
-        
-        # Find similar skills from different states
-        for idx2, skill2 in normalized.iterrows():
-            if skill2['SKILL_ID'] in processed:
-                continue
-            
-            # Must be same grade level and different authority
-            if (skill1['GRADE_LEVEL_NAME'] == skill2['GRADE_LEVEL_NAME'] and 
-                skill1['AUTHORITY'] != skill2['AUTHORITY']):
-                
-                similarity = text_similarity(
-                    skill1['NORMALIZED_NAME'],
-                    skill2['NORMALIZED_NAME']
-                )
-                
-                if similarity >= SIMILARITY_THRESHOLD:
-                    group.append(skill2['SKILL_ID'])
-                    processed.add(skill2['SKILL_ID'])
-        
-        # Only keep groups with multiple skills
-        if len(group) >= MIN_GROUP_SIZE:
-            for skill_id in group:
-                state_groups[skill_id] = f"SA-{group_id:04d}"
-            group_id += 1
-            print(f"  Found State A group {group_id-1}: {len(group)} skills")
-    
-    print(f"✅ Identified {group_id-1} State A groups with {len(state_groups)} skills")
-    return dict(state_groups)
+    print(f"✅ Identified {len(grouping.groups)} State A groups with {len(grouping.membership)} skills")
+    return dict(grouping.membership)
 
 
-def identify_grade_progressions(skills_df: pd.DataFrame) -> tuple:
+def identify_grade_progressions(skills_df: pd.DataFrame,
+                                threshold: float = SIMILARITY_THRESHOLD) -> tuple:
     """
     Identify grade progressions (State B).
     
+    Args:
+        skills_df: ELA skills with AUTHORITY
+        threshold: Minimum name similarity
+        
     Returns:
-        Tuple of (grade_chains dict, progression_metadata dict)
+        Tuple of (grade_chains dict, progression_metadata dict, chain_details list)
         - grade_chains: {skill_id: (chain_id, complexity_level)}
         - progression_metadata: {skill_id: {'prerequisite_skill_id': str, 'is_spiral': bool}}
     """
@@ -190,69 +270,48 @@ def identify_grade_progressions(skills_df: pd.DataFrame) -> tuple:
     
     grade_chains = {}
     progression_metadata = {}
-    chain_id = 1
-    processed = set()
     chain_details = []  # Store full chain information
     
-    # Group by authority and similar names across grades
-    for authority in normalized['AUTHORITY'].unique():
-        authority_skills = normalized[normalized['AUTHORITY'] == authority]
+    # Same authority, similar names across different grades
+    grouping = find_variant_groups(normalized, 'AUTHORITY', 'GRADE_LEVEL_NAME',
+                                   threshold=threshold, id_prefix='SB')
+    skill_info = dict(zip(normalized['SKILL_ID'],
+                          zip(normalized['GRADE_LEVEL_NAME'],
+                              normalized['GRADE_LEVEL_SHORT_NAME'],
+                              normalized['AUTHORITY'])))
+    
+    for chain_number, group in enumerate(grouping.groups, 1):
+        chain = [(skill_id,) + skill_info[skill_id][:2] for skill_id in group.skill_ids]
         
-        for idx1, skill1 in authority_skills.iterrows():
-            if skill1['SKILL_ID'] in processed:
-                continue
-            
-            chain = [(skill1['SKILL_ID'], skill1['GRADE_LEVEL_NAME'], skill1['GRADE_LEVEL_SHORT_NAME'])]
-            processed.add(skill1['SKILL_ID'])
+        # Sort by grade level (using short name for ordering)
+        chain.sort(key=lambda x: GRADE_ORDER.index(x[2]) if x[2] in GRADE_ORDER else 999)
+        
+        current_chain_id = group.group_id
+        
+        # Store chain details for progression chains summary
+        chain_details.append({
+            'chain_id': current_chain_id,
+            'skills': chain,
+            'length': len(chain),
+            'authority': skill_info[chain[0][0]][2]
+        })
+        
+        # Assign complexity levels and prerequisite relationships
+        for idx, (skill_id, grade_level_name, _) in enumerate(chain):
+            complexity = calculate_complexity_level(grade_level_name)
+            grade_chains[skill_id] = (current_chain_id, complexity)
             
-            # Find similar skills from different grades (same authority)
-            for idx2, skill2 in authority_skills.iterrows():
-                if skill2['SKILL_ID'] in processed:
-                    continue
-                
-                # Must be different grade, same authority
-                if skill1['GRADE_LEVEL_NAME'] != skill2['GRADE_LEVEL_NAME']:
-                    similarity = text_similarity(
-                        skill1['NORMALIZED_NAME'],
-                        skill2['NORMALIZED_NAME']
-                    )
-                    
-                    if similarity >= SIMILARITY_THRESHOLD:
-                        chain.append((skill2['SKILL_ID'], skill2['GRADE_LEVEL_NAME'], skill2['GRADE_LEVEL_SHORT_NAME']))
-                        processed.add(skill2['SKILL_ID'])
+            # Track prerequisite (previous skill in chain)
+            prerequisite_id = chain[idx-1][0] if idx > 0 else None
             
-            # Only keep chains with progression across grades
-            if len(chain) >= MIN_GROUP_SIZE:
-                # Sort by grade level (using short name for ordering)
-                chain.sort(key=lambda x: GRADE_ORDER.index(x[2]) if x[2] in GRADE_ORDER else 999)
-                
-                current_chain_id = f"SB-{chain_id:04d}"
-                
-                # Store chain details for progression chains summary
-                chain_details.append({
-                    'chain_id': current_chain_id,
-                    'skills': chain,
-                    'length': len(chain),
-                    'authority': authority
-                })
-                
-                # Assign complexity levels and prerequisite relationships
-                for idx, (skill_id, grade_level_name, _) in enumerate(chain):
-                    complexity = calculate_complexity_level(grade_level_name)
-                    grade_chains[skill_id] = (current_chain_id, complexity)
-                    
-                    # Track prerequisite (previous skill in chain)
-                    prerequisite_id = chain[idx-1][0] if idx > 0 else None
-                    
-                    progression_metadata[skill_id] = {
-                        'prerequisite_skill_id': prerequisite_id,
-                        'is_spiral_skill': True
-                    }
-                
-                chain_id += 1
-                print(f"  Found State B chain {chain_id-1}: {len(chain)} grades")
-    
-    print(f"✅ Identified {chain_id-1} State B chains with {len(grade_chains)} skills")
+            progression_metadata[skill_id] = {
+                'prerequisite_skill_id': prerequisite_id,
+                'is_spiral_skill': True
+            }
+        
+        print(f"  Found State B chain {chain_number}: {len(chain)} grades")
+    
+    print(f"✅ Identified {len(grouping.groups)} State B chains with {len(grade_chains)} skills")
     return grade_chains, progression_metadata, chain_details
 
 
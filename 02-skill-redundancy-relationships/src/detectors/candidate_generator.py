@@ -0,0 +1,565 @@
+"""
+Candidate Pair Generation
+
+Finds the skill pairs worth scoring before the full multi-dimensional
+similarity is calculated. Comparing every pair is O(n²) and cannot finish
+on the full catalog, so candidates are generated by blocking instead:
+
+- TermSetIndex: pipe/comma-separated fields (actions, targets, ...)
+  tokenized once into integer term sets, plus an inverted index from
+  term ID to the skills that contain it.
+- InvertedIndexBlocker: exact prefilter. A pair can only reach the
+  structural threshold if it shares an action or a target, so each skill
+  is compared only with the skills found in its terms' posting lists.
+  delta_candidate_pairs() restricts this to added/changed skills for
+  incremental runs.
+- weighted_jaccard_blocks: exact all-pairs (weighted) Jaccard from
+  sparse skill x term matrices. Intersections come from sparse matrix
+  products, unions from row sums, and results are thresholded one block
+  of rows at a time so memory stays bounded.
+- MinHashLSHGenerator: approximate prefilter for very large catalogs.
+  Common verbs ("identify") make posting lists explode; MinHash
+  signatures over action/target/key_concept sets, banded into LSH
+  buckets, propose only pairs with similar whole term sets. Proposed
+  pairs are verified with the exact quick structural score.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def parse_term_set(field_value) -> Set[str]:
+    """Parse a pipe or comma-separated field into a set of lowercase terms."""
+    if pd.isna(field_value) or not field_value:
+        return set()
+
+    field_str = str(field_value).strip()
+
+    if '|' in field_str:
+        items = field_str.split('|')
+    elif ',' in field_str:
+        items = field_str.split(',')
+    else:
+        items = [field_str]
+
+    return {item.strip().lower() for item in items if item.strip()}
+
+
+def _csr_positions(indptr: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Flat positions of the CSR entries of the given rows, and their row number in `rows`."""
+    starts = indptr[rows]
+    lengths = indptr[np.asarray(rows) + 1] - starts
+    owner = np.repeat(np.arange(len(rows), dtype=np.int64), lengths)
+    offsets = np.arange(len(owner), dtype=np.int64) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    return np.repeat(starts, lengths) + offsets, owner
+
+
+class TermSetIndex:
+    """
+    Integer term sets for one list-valued field, with an inverted index.
+
+    Term sets are stored CSR-style: the sorted term IDs of skill i are
+    term_ids[indptr[i]:indptr[i + 1]]. postings[t] holds the (ascending)
+    positions of the skills that contain term t.
+    """
+
+    def __init__(self, values: Iterable,
+                 tokenizer: Callable[[object], Set[str]] = parse_term_set):
+        """
+        Tokenize a column of field values.
+
+        Args:
+            values: One field value per skill, in row order
+            tokenizer: Turns a value into its term set (default: pipe/comma list)
+        """
+        self.vocabulary: Dict[str, int] = {}
+        indptr = [0]
+        term_ids = []
+
+        for value in values:
+            ids = sorted({self.vocabulary.setdefault(term, len(self.vocabulary))
+                          for term in tokenizer(value)})
+            term_ids.extend(ids)
+            indptr.append(len(term_ids))
+
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.term_ids = np.asarray(term_ids, dtype=np.int32)
+        self.sizes = np.diff(self.indptr)
+
+        # Inverted index: sorting skill positions by term groups each posting list
+        owners = np.repeat(np.arange(len(self.sizes), dtype=np.int32), self.sizes)
+        order = np.argsort(self.term_ids, kind='stable')
+        bounds = np.searchsorted(self.term_ids[order], np.arange(len(self.vocabulary) + 1))
+        sorted_owners = owners[order]
+        self.postings = [sorted_owners[bounds[t]:bounds[t + 1]]
+                         for t in range(len(self.vocabulary))]
+        self._matrix = None
+
+    def __len__(self) -> int:
+        return len(self.sizes)
+
+    @property
+    def matrix(self) -> sparse.csr_matrix:
+        """Binary skill x term matrix (CSR, shares indptr/term_ids)."""
+        if self._matrix is None:
+            self._matrix = sparse.csr_matrix(
+                (np.ones(len(self.term_ids), dtype=np.int32), self.term_ids, self.indptr),
+                shape=(len(self.sizes), max(len(self.vocabulary), 1))
+            )
+        return self._matrix
+
+    def jaccard_block(self, start: int, stop: int, col_start: int = 0) -> sparse.csr_matrix:
+        """
+        Jaccard of skills start..stop-1 against skills col_start.., as a sparse matrix.
+
+        Intersections are the product of the block with the transposed term
+        matrix; unions are row size sums minus intersections. Pairs that
+        share no term (Jaccard 0) are not stored. Column k is skill
+        col_start + k; indices are sorted within each row.
+        """
+        inter = self.matrix[start:stop] @ self.matrix[col_start:].T
+        inter.sort_indices()
+        rows = np.repeat(np.arange(start, stop), np.diff(inter.indptr))
+        union = self.sizes[rows] + self.sizes[inter.indices + col_start] - inter.data
+        return sparse.csr_matrix((inter.data / union, inter.indices, inter.indptr), shape=inter.shape)
+
+    def jaccard_rows(self, rows: np.ndarray) -> sparse.csr_matrix:
+        """
+        Jaccard of the given skills against all skills, as a sparse matrix.
+
+        Like jaccard_block() for an arbitrary set of rows: row k is skill
+        rows[k], column j is skill j; pairs sharing no term are not stored.
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        inter = self.matrix[rows] @ self.matrix.T
+        inter.sort_indices()
+        owners = np.repeat(rows, np.diff(inter.indptr))
+        union = self.sizes[owners] + self.sizes[inter.indices] - inter.data
+        return sparse.csr_matrix((inter.data / union, inter.indices, inter.indptr), shape=inter.shape)
+
+    def terms(self, i: int) -> np.ndarray:
+        """Sorted term IDs of skill i."""
+        return self.term_ids[self.indptr[i]:self.indptr[i + 1]]
+
+    def intersection_counts(self, left: np.ndarray, right: np.ndarray,
+                            chunk_size: int = 500_000) -> np.ndarray:
+        """
+        Number of shared terms for each pair (left[k], right[k]).
+
+        Term sets hold unique IDs, so a (pair, term) key occurring twice in
+        the combined gather is a shared term.
+        """
+        counts = np.zeros(len(left), dtype=np.int64)
+        width = max(len(self.vocabulary), 1)
+        for start in range(0, len(left), chunk_size):
+            stop = min(start + chunk_size, len(left))
+            keys = []
+            for rows in (left[start:stop], right[start:stop]):
+                positions, pair = _csr_positions(self.indptr, rows)
+                keys.append(pair * width + self.term_ids[positions])
+            keys = np.sort(np.concatenate(keys))
+            shared = keys[1:][keys[1:] == keys[:-1]] // width
+            counts[start:stop] = np.bincount(shared, minlength=stop - start)
+        return counts
+
+    def jaccard(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Jaccard similarity for each pair (0.0 when either set is empty)."""
+        inter = self.intersection_counts(left, right)
+        union = self.sizes[left] + self.sizes[right] - inter
+        return np.divide(inter, union, out=np.zeros(len(left)), where=union > 0)
+
+    def overlaps_after(self, i: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Skills after position i that share at least one term with skill i.
+
+        Returns:
+            (positions, shared term counts), positions ascending
+        """
+        hits = [posting[np.searchsorted(posting, i, side='right'):]
+                for posting in (self.postings[t] for t in self.terms(i))]
+        if not hits:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(hits), return_counts=True)
+
+
+def weighted_jaccard_blocks(indexes: List[TermSetIndex],
+                            weights: List[float],
+                            threshold: float = 0.0,
+                            block_size: int = 1024,
+                            upper: bool = True) -> Iterator[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """
+    Exact all-pairs weighted Jaccard, one block of rows at a time.
+
+    The score of a pair is sum(weight * Jaccard) over the fields, summed
+    in the given order (so it matches the scalar formulas exactly). Only
+    pairs sharing a term in at least one field are emitted.
+
+    Args:
+        indexes: TermSetIndex per field, all over the same skills
+        weights: Weight per field
+        threshold: Minimum score to emit
+        block_size: Rows per block (bounds memory to block_size x skills)
+        upper: Only emit pairs with row < column
+
+    Yields:
+        (rows, cols, scores) arrays for each block, rows ascending,
+        columns ascending within a row
+    """
+    n = len(indexes[0])
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        # The upper triangle of this block only involves columns >= start
+        col_start = start if upper else 0
+        total = None
+        for index, weight in zip(indexes, weights):
+            weighted = index.jaccard_block(start, stop, col_start) * weight
+            total = weighted if total is None else total + weighted
+        total.sort_indices()
+
+        rows = np.repeat(np.arange(start, stop, dtype=np.int64), np.diff(total.indptr))
+        cols = total.indices.astype(np.int64) + col_start
+        keep = total.data >= threshold
+        if upper:
+            keep &= cols > rows
+        yield rows[keep], cols[keep], total.data[keep]
+
+
+class InvertedIndexBlocker:
+    """
+    Exact structural prefilter using inverted-index blocking.
+
+    Produces the same pairs as comparing every pair with the quick
+    structural score (mean of action and target Jaccard), but only scores
+    pairs that share at least one action or target term: a block of skills
+    is multiplied with the sparse skill x term matrices, which joins
+    through the term postings in compiled code.
+    """
+
+    def __init__(self, metadata_df: pd.DataFrame, block_size: int = 1024):
+        """
+        Tokenize actions and targets for every skill.
+
+        Args:
+            metadata_df: DataFrame with 'actions' and 'targets' columns
+            block_size: Skills per sparse-product block
+        """
+        self.block_size = block_size
+        self.actions = TermSetIndex(self._column(metadata_df, 'actions'))
+        self.targets = TermSetIndex(self._column(metadata_df, 'targets'))
+
+        # Skills without structural data are never compared
+        self.valid = (self.actions.sizes > 0) & (self.targets.sizes > 0)
+        self.pairs_scored = 0
+
+    @staticmethod
+    def _column(metadata_df: pd.DataFrame, name: str) -> List:
+        if name in metadata_df.columns:
+            return metadata_df[name].tolist()
+        return [''] * len(metadata_df)
+
+    def scores_after(self, i: int, include_disjoint: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Quick structural scores between skill i and later skills.
+
+        Args:
+            i: Skill position
+            include_disjoint: Also score later skills sharing no term (score 0)
+
+        Returns:
+            (positions, scores), positions ascending
+        """
+        action_js, action_counts = self.actions.overlaps_after(i)
+        target_js, target_counts = self.targets.overlaps_after(i)
+        if include_disjoint:
+            js = np.flatnonzero(self.valid[i + 1:]) + i + 1
+        else:
+            js = np.union1d(action_js, target_js)
+            js = js[self.valid[js]]
+
+        action_inter = np.zeros(len(js))
+        target_inter = np.zeros(len(js))
+        keep = self.valid[action_js]
+        action_inter[np.searchsorted(js, action_js[keep])] = action_counts[keep]
+        keep = self.valid[target_js]
+        target_inter[np.searchsorted(js, target_js[keep])] = target_counts[keep]
+
+        action_sim = action_inter / (self.actions.sizes[i] + self.actions.sizes[js] - action_inter)
+        target_sim = target_inter / (self.targets.sizes[i] + self.targets.sizes[js] - target_inter)
+        self.pairs_scored += len(js)
+
+        return js, (action_sim + target_sim) / 2
+
+    def candidate_pairs(self,
+                        threshold: float,
+                        max_per_skill: int,
+                        max_pairs: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Pairs (i, j), i < j, with quick structural score >= threshold.
+
+        Each skill keeps its top max_per_skill later partners (ties in row
+        order). With max_pairs, generation stops after the skill that
+        reaches the limit and the list is truncated to it.
+
+        Args:
+            threshold: Minimum quick structural score
+            max_per_skill: Candidates kept per skill
+            max_pairs: Optional overall limit (for testing)
+
+        Returns:
+            Candidate pairs ordered by first skill, then score
+        """
+        candidate_pairs = []
+
+        # A threshold <= 0 admits pairs with no shared term, which the
+        # sparse products never produce: score those skill by skill
+        if threshold <= 0:
+            for i in np.flatnonzero(self.valid):
+                js, scores = self.scores_after(i, include_disjoint=True)
+                top = np.argsort(-scores, kind='stable')[:max_per_skill]
+                candidate_pairs.extend((int(i), int(j)) for j in js[top])
+                if max_pairs and len(candidate_pairs) >= max_pairs:
+                    break
+            return candidate_pairs[:max_pairs] if max_pairs else candidate_pairs
+
+        # Quick score = (action Jaccard + target Jaccard) / 2
+        for rows, cols, scores in weighted_jaccard_blocks(
+                [self.actions, self.targets], [0.5, 0.5], block_size=self.block_size):
+            self.pairs_scored += len(rows)
+            keep = self.valid[rows] & self.valid[cols] & (scores >= threshold)
+            candidate_pairs.extend(_top_per_skill(rows[keep], cols[keep], scores[keep], max_per_skill))
+            if max_pairs and len(candidate_pairs) >= max_pairs:
+                break
+
+        return candidate_pairs[:max_pairs] if max_pairs else candidate_pairs
+
+
+    def delta_candidate_pairs(self,
+                              delta: np.ndarray,
+                              threshold: float,
+                              max_per_skill: int,
+                              block_size: int = 1024) -> List[Tuple[int, int]]:
+        """
+        Candidate pairs involving the given skills only (delta x catalog).
+
+        Each delta skill keeps its top max_per_skill partners among all
+        other skills (earlier and later) with quick structural score >=
+        threshold. Pairs are oriented (i, j), i < j, as in
+        candidate_pairs(), and pairs between two delta skills appear once.
+
+        Args:
+            delta: Positions of added or changed skills
+            threshold: Minimum quick structural score
+            max_per_skill: Candidates kept per delta skill
+            block_size: Delta skills per sparse-product block
+
+        Returns:
+            Candidate pairs ordered by first skill, then second skill
+        """
+        delta = np.unique(np.asarray(delta, dtype=np.int64))
+        delta = delta[self.valid[delta]]
+        found = []
+        for start in range(0, len(delta), block_size):
+            rows = delta[start:start + block_size]
+            total = self.actions.jaccard_rows(rows) * 0.5
+            total = total + self.targets.jaccard_rows(rows) * 0.5
+            if threshold <= 0:
+                # Pairs sharing no term score 0 and are not stored
+                total = sparse.csr_matrix(total.toarray())
+            total.sort_indices()
+            left = np.repeat(rows, np.diff(total.indptr))
+            right = total.indices.astype(np.int64)
+            scores = total.data
+            self.pairs_scored += len(left)
+            keep = self.valid[right] & (right != left) & (scores >= threshold)
+            found.extend(_top_per_skill(left[keep], right[keep], scores[keep], max_per_skill))
+
+        pairs = {(min(a, b), max(a, b)) for a, b in found}
+        return sorted(pairs)
+
+
+def _top_per_skill(left: np.ndarray, right: np.ndarray, scores: np.ndarray,
+                   max_per_skill: int, max_pairs: Optional[int] = None) -> List[Tuple[int, int]]:
+    """
+    Keep each first skill's top max_per_skill pairs, ordered like the blocker.
+
+    Pairs are ordered by first skill, then score (descending), then second
+    skill, so the result matches InvertedIndexBlocker.candidate_pairs.
+    """
+    order = np.lexsort((right, -scores, left))
+    left, right = left[order], right[order]
+    group_start = np.flatnonzero(np.r_[True, left[1:] != left[:-1]])
+    rank = np.arange(len(left)) - np.repeat(group_start, np.diff(np.r_[group_start, len(left)]))
+    keep = rank < max_per_skill
+    pairs = list(zip(left[keep].tolist(), right[keep].tolist()))
+    return pairs[:max_pairs] if max_pairs else pairs
+
+
+class MinHashLSHGenerator:
+    """
+    Approximate structural prefilter using MinHash signatures and LSH banding.
+
+    Each skill's action, target and key concept terms form one token set.
+    Its signature has bands * rows MinHash values; two skills become a
+    candidate when all rows of at least one band agree. The probability of
+    that for sets with Jaccard s is 1 - (1 - s^rows)^bands, an S-curve
+    centred near (1 / bands)^(1 / rows): more bands raise recall, more rows
+    cut false candidates. Candidates are then verified with the same quick
+    structural score as InvertedIndexBlocker.
+    """
+
+    # Mersenne prime for the universal hash family (a * x + b) mod p
+    PRIME = (1 << 31) - 1
+
+    def __init__(self, metadata_df: pd.DataFrame, bands: int = 32, rows: int = 3,
+                 seed: int = 42):
+        """
+        Tokenize fields and compute MinHash signatures.
+
+        Args:
+            metadata_df: DataFrame with actions, targets and key_concepts
+            bands: LSH bands (raise for recall)
+            rows: MinHash rows per band (raise for precision)
+            seed: Seed for the hash functions and recall sampling
+        """
+        self.bands = bands
+        self.rows = rows
+        self.seed = seed
+        self.blocker = InvertedIndexBlocker(metadata_df)
+        self.concepts = TermSetIndex(InvertedIndexBlocker._column(metadata_df, 'key_concepts'))
+        self.skills = np.flatnonzero(self.blocker.valid)
+        self.signatures = self._signatures()
+        self.stats: Dict = {}
+
+    def _token_sets(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Combined CSR token sets (field-offset term IDs) of the valid skills."""
+        owners, tokens = [], []
+        offset = 0
+        for index in (self.blocker.actions, self.blocker.targets, self.concepts):
+            positions, owner = _csr_positions(index.indptr, self.skills)
+            owners.append(owner)
+            tokens.append(index.term_ids[positions].astype(np.int64) + offset)
+            offset += len(index.vocabulary)
+        owners = np.concatenate(owners)
+        order = np.argsort(owners, kind='stable')
+        indptr = np.r_[0, np.cumsum(np.bincount(owners, minlength=len(self.skills)))]
+        return indptr, np.concatenate(tokens)[order]
+
+    def _signatures(self, chunk_size: int = 5_000) -> np.ndarray:
+        """MinHash signature matrix, shape (valid skills, bands * rows)."""
+        rng = np.random.default_rng(self.seed)
+        num_perm = self.bands * self.rows
+        a = rng.integers(1, self.PRIME, size=num_perm, dtype=np.int64)
+        b = rng.integers(0, self.PRIME, size=num_perm, dtype=np.int64)
+
+        indptr, tokens = self._token_sets()
+        signatures = np.empty((len(self.skills), num_perm), dtype=np.int64)
+        # Chunk by skill so the (tokens x permutations) hash block stays bounded
+        for start in range(0, len(self.skills), chunk_size):
+            stop = min(start + chunk_size, len(self.skills))
+            chunk_tokens = tokens[indptr[start]:indptr[stop]]
+            hashed = (chunk_tokens[:, None] * a + b) % self.PRIME
+            signatures[start:stop] = np.minimum.reduceat(hashed, indptr[start:stop] - indptr[start])
+        return signatures
+
+    def _bucket_pairs(self) -> np.ndarray:
+        """Unique candidate pairs (as i * n + j keys over DataFrame positions) from all bands."""
+        rng = np.random.default_rng(self.seed + 1)
+        n = np.int64(len(self.blocker.valid))
+        keys = []
+        for band in range(self.bands):
+            band_sig = self.signatures[:, band * self.rows:(band + 1) * self.rows].astype(np.uint64)
+            multipliers = rng.integers(1, 1 << 62, size=self.rows, dtype=np.int64).astype(np.uint64) | np.uint64(1)
+            bucket = (band_sig * multipliers).sum(axis=1)  # wraps mod 2^64; collisions are only extra candidates
+
+            order = np.argsort(bucket, kind='stable')
+            bucket = bucket[order]
+            starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+            ends = np.r_[starts[1:], len(bucket)]
+            # Every member pairs with the later members of its bucket
+            group_end = np.repeat(ends, ends - starts)
+            counts = group_end - np.arange(len(bucket)) - 1
+            first = np.repeat(np.arange(len(bucket)), counts)
+            second = first + 1 + np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+
+            i = self.skills[order[first]].astype(np.int64)
+            j = self.skills[order[second]].astype(np.int64)
+            keys.append(np.minimum(i, j) * n + np.maximum(i, j))  # distinct within a band
+        if not keys:
+            return np.empty(0, dtype=np.int64)
+        keys = np.sort(np.concatenate(keys))
+        return keys[np.r_[True, keys[1:] != keys[:-1]]]
+
+    def _quick_scores(self, left: np.ndarray, right: np.ndarray) -> np.ndarray:
+        """Quick structural score: mean of action and target Jaccard."""
+        return (self.blocker.actions.jaccard(left, right) +
+                self.blocker.targets.jaccard(left, right)) / 2
+
+    def candidate_pairs(self,
+                        threshold: float,
+                        max_per_skill: int,
+                        max_pairs: Optional[int] = None,
+                        recall_sample: int = 200) -> List[Tuple[int, int]]:
+        """
+        Approximate counterpart of InvertedIndexBlocker.candidate_pairs.
+
+        Args:
+            threshold: Minimum quick structural score
+            max_per_skill: Candidates kept per skill
+            max_pairs: Optional overall limit (for testing)
+            recall_sample: Skills whose exact candidates are computed to
+                estimate recall (0 to skip)
+
+        Returns:
+            Candidate pairs ordered by first skill, then score
+        """
+        n = len(self.blocker.valid)
+        keys = self._bucket_pairs()
+        left, right = keys // n, keys % n
+        scores = self._quick_scores(left, right)
+        passed = scores >= threshold
+
+        self.stats = {
+            'bands': self.bands,
+            'rows': self.rows,
+            'lsh_threshold': (1 / self.bands) ** (1 / self.rows),
+            'candidates_proposed': int(len(keys)),
+            'candidates_verified': int(passed.sum())
+        }
+        if recall_sample:
+            self.stats.update(self.estimate_recall(left[passed], right[passed],
+                                                   threshold, recall_sample))
+
+        return _top_per_skill(left[passed], right[passed], scores[passed],
+                              max_per_skill, max_pairs)
+
+    def estimate_recall(self, left: np.ndarray, right: np.ndarray,
+                        threshold: float, sample_size: int) -> Dict:
+        """
+        Share of exact above-threshold pairs that LSH found, on sampled skills.
+
+        Exact pairs come from the inverted index for the sampled first skills,
+        so the estimate covers pairs before the per-skill cap.
+        """
+        rng = np.random.default_rng(self.seed)
+        sample = np.sort(rng.choice(self.skills, size=min(sample_size, len(self.skills)),
+                                    replace=False))
+        in_sample = np.isin(left, sample)
+        found = set(zip(left[in_sample].tolist(), right[in_sample].tolist()))
+
+        exact = hits = 0
+        for i in sample:
+            js, scores = self.blocker.scores_after(i, include_disjoint=threshold <= 0)
+            for j in js[scores >= threshold].tolist():
+                exact += 1
+                hits += (int(i), j) in found
+
+        return {
+            'recall_sample_skills': int(len(sample)),
+            'recall_exact_pairs': exact,
+            'estimated_recall': hits / exact if exact else 1.0
+        }
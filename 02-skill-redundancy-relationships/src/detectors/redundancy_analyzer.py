@@ -8,39 +8,42 @@ Processes skills through the complete pipeline:
 3. Relationship classification
 4. Recommendation generation
 5. Prioritization and export
+
+analyze_incremental() updates a prior run's results for a catalog delta
+(added, changed and removed skills) without re-analyzing unchanged pairs.
 """
 
 import pandas as pd
 import numpy as np
+import sys
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
-import json
-from datetime import datetime
+from typing import Iterable, Iterator, List, Dict, Optional, Tuple
+from collections import Counter
 import logging
+import multiprocessing
 from tqdm import tqdm
 
+# Repository root, for shared utilities
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+from shared.embeddings import (
+    normalize_embeddings, pair_cosine, QuantizedEmbeddings, quantize_embeddings,
+    quantized_pair_cosine
+)
+from shared.utils.export import read_records
 
-class NumpyEncoder(json.JSONEncoder):
-    """Custom JSON encoder for numpy types."""
-    def default(self, obj):
-        if isinstance(obj, (np.integer, np.int64, np.int32)):
-            return int(obj)
-        elif isinstance(obj, (np.floating, np.float64, np.float32)):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif pd.isna(obj):
-            return None
-        return super().default(obj)
 
 try:
-    from .similarity_engine import SimilarityEngine, SimilarityScore
-    from .relationship_classifier import RelationshipClassifier, SkillRelationship
+    from .similarity_engine import SimilarityEngine, SimilarityScore, SkillFeatureTable
+    from .relationship_classifier import RelationshipClassifier, SkillRelationship, RelationshipType, RuleFeatureTable
     from .recommendation_engine import RecommendationEngine, Recommendation
+    from .candidate_generator import InvertedIndexBlocker, MinHashLSHGenerator, parse_term_set
+    from .result_writer import AnalysisResultWriter, relationship_record, result_file, skill_fingerprints
 except ImportError:
-    from similarity_engine import SimilarityEngine, SimilarityScore
-    from relationship_classifier import RelationshipClassifier, SkillRelationship
+    from similarity_engine import SimilarityEngine, SimilarityScore, SkillFeatureTable
+    from relationship_classifier import RelationshipClassifier, SkillRelationship, RelationshipType, RuleFeatureTable
     from recommendation_engine import RecommendationEngine, Recommendation
+    from candidate_generator import InvertedIndexBlocker, MinHashLSHGenerator, parse_term_set
+    from result_writer import AnalysisResultWriter, relationship_record, result_file, skill_fingerprints
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -71,100 +74,432 @@ class RedundancyAnalyzer:
         with open(config_path, 'r') as f:
             self.config = yaml.safe_load(f)
         
+        # Statistics from the last candidate generation and pair analysis
+        self.candidate_stats = {}
+        self.analysis_stats = {}
+        self.incremental_stats = {}
+        
         logger.info("Redundancy analyzer initialized")
     
     def analyze_skills(self,
                       metadata_df: pd.DataFrame,
                       semantic_embeddings: Optional[np.ndarray] = None,
                       output_dir: Optional[Path] = None,
-                      max_pairs: Optional[int] = None) -> Tuple[List[SkillRelationship], List[Recommendation]]:
+                      max_pairs: Optional[int] = None,
+                      workers: Optional[int] = None,
+                      include_distinct: Optional[bool] = None) -> Tuple[List[Dict], List[Recommendation]]:
         """
         Analyze skills for redundancies and relationships.
         
         Args:
             metadata_df: DataFrame with enhanced metadata (23 fields)
-            semantic_embeddings: Optional pre-computed embeddings
+            semantic_embeddings: Optional pre-computed embeddings (float or
+                QuantizedEmbeddings)
             output_dir: Directory to save results
             max_pairs: Maximum pairs to process (for testing)
+            workers: Processes for scoring, classification and
+                recommendations (default: batch.analysis_workers in config;
+                0 or 1 = serial). Results are identical to the serial run.
+            include_distinct: Save DISTINCT relationships (default:
+                output.include_distinct in config). Otherwise they are only
+                counted in analysis_stats, keeping files small. They are
+                never held in memory or returned.
             
         Returns:
-            Tuple of (relationships, recommendations)
+            Tuple of (records of the non-DISTINCT relationships, as in
+            relationship_record() without explanations; recommendations)
         """
         logger.info(f"Starting analysis of {len(metadata_df)} skills")
         
         # Step 1: Pre-filter pairs
         logger.info("Step 1: Pre-filtering skill pairs...")
-        candidate_pairs = self._prefilter_pairs(metadata_df, max_pairs=max_pairs)
+        if self.config['prefilter'].get('method', 'inverted_index') == 'minhash_lsh':
+            candidate_pairs = self._lsh_candidate_pairs(metadata_df, max_pairs=max_pairs)
+        else:
+            candidate_pairs = self._prefilter_pairs(metadata_df, max_pairs=max_pairs)
         logger.info(f"  Found {len(candidate_pairs)} candidate pairs")
         
         # Step 2: Calculate semantic similarities if not provided
         if semantic_embeddings is not None:
             logger.info("Step 2: Using provided semantic embeddings")
-            semantic_sim_matrix = self._calculate_semantic_matrix(semantic_embeddings)
+            semantic_sims = self._calculate_pair_semantics(semantic_embeddings, candidate_pairs)
         else:
             logger.info("Step 2: Skipping semantic similarity (not provided)")
-            semantic_sim_matrix = None
-        
-        # Step 3: Calculate multi-dimensional similarities
-        logger.info("Step 3: Calculating multi-dimensional similarities...")
-        similarity_scores = []
-        for idx_a, idx_b in tqdm(candidate_pairs, desc="Calculating similarities"):
-            skill_a = metadata_df.iloc[idx_a]
-            skill_b = metadata_df.iloc[idx_b]
-            
-            # Get semantic similarity if available
-            semantic_sim = None
-            if semantic_sim_matrix is not None:
-                semantic_sim = semantic_sim_matrix[idx_a, idx_b]
-            
-            sim_score = self.similarity_engine.calculate_similarity(
-                skill_a, skill_b, semantic_similarity=semantic_sim
-            )
-            similarity_scores.append((idx_a, idx_b, sim_score))
-        
-        logger.info(f"  Calculated {len(similarity_scores)} similarity scores")
-        
-        # Step 4: Classify relationships
-        logger.info("Step 4: Classifying relationships...")
-        relationships = []
-        for idx_a, idx_b, sim_score in tqdm(similarity_scores, desc="Classifying"):
-            skill_a = metadata_df.iloc[idx_a]
-            skill_b = metadata_df.iloc[idx_b]
-            
-            relationship = self.classifier.classify(sim_score, skill_a, skill_b)
-            relationships.append(relationship)
-        
-        # Filter out DISTINCT relationships (too many, low value)
-        from .relationship_classifier import RelationshipType
-        filtered_relationships = [
-            r for r in relationships 
-            if r.relationship_type != RelationshipType.DISTINCT
-        ]
-        logger.info(f"  Classified {len(filtered_relationships)} non-DISTINCT relationships")
-        
-        # Step 5: Generate recommendations
-        logger.info("Step 5: Generating recommendations...")
+            semantic_sims = None
+        
+        # Steps 3-5: Similarities, classification and recommendations per pair
+        pairs = np.asarray(candidate_pairs, dtype=np.int64).reshape(-1, 2)
+        output_config = self.config.get('output', {})
+        if workers is None:
+            workers = self.config.get('batch', {}).get('analysis_workers', 0)
+        if include_distinct is None:
+            include_distinct = output_config.get('include_distinct', False)
+        
+        writer = self._result_writer(output_dir)
+        if writer:
+            writer.write_features(metadata_df)
+        
+        if workers > 1 and len(pairs) > 0:
+            logger.info(f"Steps 3-5: Scoring, classifying and recommending in {workers} processes...")
+        else:
+            logger.info("Steps 3-5: Scoring, classifying and recommending...")
+        self.analysis_stats = {'total_relationships': 0, 'relationship_types': Counter(),
+                               'confidence_sum': 0.0, 'composite_sum': 0.0,
+                               'scored_pairs': 0, 'skipped_by_bound': 0, 'skipped_below_threshold': 0}
+        relationship_records = []
         recommendations = []
-        for relationship in tqdm(filtered_relationships, desc="Generating recommendations"):
-            skill_a = metadata_df[metadata_df['SKILL_ID'] == relationship.skill_a_id].iloc[0]
-            skill_b = metadata_df[metadata_df['SKILL_ID'] == relationship.skill_b_id].iloc[0]
-            
-            recommendation = self.recommender.generate_recommendation(
-                relationship, skill_a, skill_b, metadata_df
-            )
-            recommendations.append(recommendation)
-        
+        with tqdm(total=len(pairs), desc="Analyzing pairs") as progress:
+            for shard_relationships, shard_recommendations, shard_stats in self._iter_pair_shards(
+                    metadata_df, pairs, semantic_sims, workers, include_distinct):
+                # Written as produced; only non-DISTINCT records stay in memory
+                if writer:
+                    writer.write_relationships(shard_relationships)
+                relationship_records.extend(
+                    relationship_record(r, include_explanations=False) for r in shard_relationships
+                    if r.relationship_type != RelationshipType.DISTINCT
+                )
+                recommendations.extend(shard_recommendations)
+                for key in ('total_relationships', 'confidence_sum', 'composite_sum',
+                            'scored_pairs', 'skipped_by_bound', 'skipped_below_threshold'):
+                    self.analysis_stats[key] += shard_stats[key]
+                self.analysis_stats['relationship_types'].update(shard_stats['relationship_types'])
+                progress.update(shard_stats['total_relationships'])
+        
+        logger.info(f"  Calculated {self.analysis_stats['scored_pairs']} of "
+                    f"{self.analysis_stats['total_relationships']} similarity scores "
+                    f"({self.analysis_stats['skipped_by_bound']} stopped by the composite bound, "
+                    f"{self.analysis_stats['skipped_below_threshold']} more below "
+                    f"{self.classifier.min_composite} not classified)")
+        logger.info(f"  Classified {len(recommendations)} non-DISTINCT relationships")
         logger.info(f"  Generated {len(recommendations)} recommendations")
         
-        # Step 6: Sort by priority
+        # Step 6: Sort by priority (stable, so ties keep candidate order)
         recommendations.sort(key=lambda r: r.priority_score, reverse=True)
         
         # Step 7: Save results if output directory specified
-        if output_dir:
-            self._save_results(relationships, recommendations, output_dir)
+        if writer:
+            recommendation_records = [r.to_dict() for r in recommendations]
+            writer.finish(relationship_records, recommendation_records,
+                          self._generate_statistics(recommendation_records))
         
         logger.info("Analysis complete!")
-        return relationships, recommendations
+        return relationship_records, recommendations
+    
+    def analyze_incremental(self,
+                            metadata_df: pd.DataFrame,
+                            prior_relationships: Path,
+                            delta_skill_ids: Optional[Iterable[str]] = None,
+                            semantic_embeddings: Optional[np.ndarray] = None,
+                            output_dir: Optional[Path] = None,
+                            workers: Optional[int] = None,
+                            include_distinct: Optional[bool] = None) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+        """
+        Update a prior run's relationships for added, changed and removed skills.
+        
+        Relationships involving a changed or removed skill are retracted.
+        Candidate pairs are generated for the delta skills only (delta x
+        catalog, inverted-index blocking with the usual threshold; each
+        delta skill keeps its top max_pairs_per_skill partners), then
+        scored, classified and recommended as in analyze_skills().
+        Relationships between unchanged skills are carried over as they
+        are, so per-skill candidate caps can differ slightly from a full
+        re-run; run analyze_skills() periodically to re-baseline.
+        
+        Args:
+            metadata_df: Current catalog (all skills, with the delta applied)
+            prior_relationships: relationships_<timestamp> file of the prior
+                run; its features (feature store) and recommendations files
+                are read from the same directory
+            delta_skill_ids: Added or changed SKILL_IDs, in addition to those
+                detected by comparing metadata fingerprints with the prior
+                features file (required if that file is missing)
+            semantic_embeddings: Optional embeddings for metadata_df rows
+            output_dir: Directory to save the updated results and change log
+            workers: Processes for pair analysis (as in analyze_skills)
+            include_distinct: Keep new DISTINCT relationships (default:
+                output.include_distinct in config)
+        
+        Returns:
+            Tuple of (relationship records, recommendation records, change
+            log), as written to the result files
+        """
+        output_config = self.config.get('output', {})
+        if workers is None:
+            workers = self.config.get('batch', {}).get('analysis_workers', 0)
+        if include_distinct is None:
+            include_distinct = output_config.get('include_distinct', False)
+        
+        # Step 1: Delta against the prior run's feature store
+        prior_relationships = Path(prior_relationships)
+        skill_ids = metadata_df['SKILL_ID'].astype(str)
+        current = set(skill_ids)
+        prior_records = list(read_records(prior_relationships))
+        features_path = result_file(prior_relationships, 'features')
+        
+        delta = set(str(skill_id) for skill_id in delta_skill_ids or ()) & current
+        if features_path is not None:
+            prior_fingerprints = {r['skill_id']: r['fingerprint'] for r in read_records(features_path)}
+            delta.update(skill_id for skill_id, fingerprint in zip(skill_ids, skill_fingerprints(metadata_df))
+                         if prior_fingerprints.get(skill_id) != fingerprint)
+            removed = set(prior_fingerprints) - current
+        elif delta_skill_ids is None:
+            raise ValueError(f"No features file next to {prior_relationships}; pass delta_skill_ids")
+        else:
+            removed = {r[key] for r in prior_records for key in ('skill_a_id', 'skill_b_id')} - current
+        logger.info(f"Incremental analysis: {len(delta)} added/changed and {len(removed)} removed "
+                    f"skills in a catalog of {len(metadata_df)}")
+        
+        # Step 2: Retract relationships touching the delta
+        touched = delta | removed
+        retracted = {}
+        kept_records = []
+        for record in prior_records:
+            if record['skill_a_id'] in touched or record['skill_b_id'] in touched:
+                retracted[record['relationship_id']] = record
+            else:
+                kept_records.append(record)
+        recommendations_path = result_file(prior_relationships, 'recommendations')
+        kept_ids = {r['relationship_id'] for r in kept_records}
+        kept_recommendations = [r for r in read_records(recommendations_path)
+                                if r['relationship_id'] in kept_ids] if recommendations_path else []
+        logger.info(f"  Retracted {len(retracted)} of {len(prior_records)} prior relationships")
+        
+        # Step 3: Delta x catalog candidates
+        blocker = InvertedIndexBlocker(metadata_df)
+        positions = np.flatnonzero(skill_ids.isin(delta).to_numpy())
+        candidate_pairs = blocker.delta_candidate_pairs(
+            positions, self.config['prefilter']['structural_threshold'],
+            self.config['prefilter']['max_pairs_per_skill']
+        )
+        pairs = np.asarray(candidate_pairs, dtype=np.int64).reshape(-1, 2)
+        logger.info(f"  Found {len(pairs)} candidate pairs ({blocker.pairs_scored} overlapping pairs scored)")
+        semantic_sims = None
+        if semantic_embeddings is not None:
+            semantic_sims = self._calculate_pair_semantics(semantic_embeddings, candidate_pairs)
+        
+        # Step 4: Score, classify and recommend; DISTINCT results are kept
+        # here so the change log can report relationships that dissolved
+        evaluated = {}
+        new_relationships = []
+        new_recommendations = []
+        for shard_relationships, shard_recommendations, _ in self._iter_pair_shards(
+                metadata_df, pairs, semantic_sims, workers, include_distinct=True):
+            for relationship in shard_relationships:
+                evaluated[relationship.relationship_id] = relationship
+                if include_distinct or relationship.relationship_type != RelationshipType.DISTINCT:
+                    new_relationships.append(relationship)
+            new_recommendations.extend(shard_recommendations)
+        
+        # Step 5: Change log and updated relationship set
+        changes = self._change_log(retracted, evaluated, {r.relationship_id for r in new_relationships})
+        include_explanations = output_config.get('include_explanations', True)
+        new_records = [relationship_record(r, include_explanations) for r in new_relationships]
+        relationship_records = kept_records + new_records
+        recommendation_records = kept_recommendations + [r.to_dict() for r in new_recommendations]
+        recommendation_records.sort(key=lambda r: r['priority_score'], reverse=True)
+        
+        self.analysis_stats = {'total_relationships': len(relationship_records),
+                               'relationship_types': Counter(r['relationship_type'] for r in relationship_records),
+                               'confidence_sum': sum(r['confidence'] for r in relationship_records),
+                               'composite_sum': sum(r['composite'] for r in relationship_records),
+                               'scored_pairs': len(relationship_records),
+                               'skipped_by_bound': 0, 'skipped_below_threshold': 0}
+        self.incremental_stats = {
+            'delta_skills': len(delta),
+            'removed_skills': len(removed),
+            'pairs_scored': blocker.pairs_scored,
+            'candidate_pairs': len(pairs),
+            'carried_over': len(kept_records),
+            **Counter(change['change'] for change in changes)
+        }
+        logger.info(f"  {self.incremental_stats}")
+        
+        writer = self._result_writer(output_dir)
+        if writer:
+            writer.write_features(metadata_df)
+            writer.write_relationship_records(kept_records)
+            writer.write_relationships(new_relationships)
+            writer.write_changes(changes)
+            statistics = self._generate_statistics(recommendation_records)
+            statistics['incremental'] = dict(self.incremental_stats, prior_run=str(prior_relationships))
+            writer.finish([r for r in relationship_records if r['relationship_type'] != RelationshipType.DISTINCT.value],
+                          recommendation_records, statistics)
+        
+        logger.info("Incremental analysis complete!")
+        return relationship_records, recommendation_records, changes
+    
+    def _change_log(self,
+                    retracted: Dict[str, Dict],
+                    evaluated: Dict[str, SkillRelationship],
+                    kept_ids: set) -> List[Dict]:
+        """
+        Changes between retracted prior relationships and re-evaluated pairs.
+        
+        A relationship present before and after is 'changed' if its type
+        or confidence differs (unchanged ones are not logged); one only
+        present before is 'retracted' (with the new type if its pair was
+        re-scored, e.g. DISTINCT); one only present after is 'added'.
+        """
+        changes = []
+        for relationship_id in sorted(set(retracted) | kept_ids):
+            old = retracted.get(relationship_id)
+            new = evaluated.get(relationship_id)
+            if relationship_id not in kept_ids:
+                change = 'retracted'
+            elif old is None:
+                change = 'added'
+            elif (old['relationship_type'] != new.relationship_type.value
+                  or round(old['confidence'], 6) != round(float(new.confidence), 6)):
+                change = 'changed'
+            else:
+                continue
+            source = old if old is not None else new.to_dict()
+            changes.append({
+                'change': change,
+                'relationship_id': relationship_id,
+                'skill_a_id': source['skill_a_id'],
+                'skill_b_id': source['skill_b_id'],
+                'old_type': old['relationship_type'] if old else None,
+                'new_type': new.relationship_type.value if new else None,
+                'old_confidence': old['confidence'] if old else None,
+                'new_confidence': float(new.confidence) if new else None
+            })
+        return changes
+    
+    def _result_writer(self, output_dir: Optional[Path]) -> Optional[AnalysisResultWriter]:
+        """Result writer configured from the output section (None without output_dir)."""
+        if not output_dir:
+            return None
+        output_config = self.config.get('output', {})
+        return AnalysisResultWriter(
+            output_dir,
+            export_format=output_config.get('export_format', 'jsonl'),
+            include_explanations=output_config.get('include_explanations', True)
+        )
+    
+    def _encode_features(self, metadata_df: pd.DataFrame) -> Tuple[SkillFeatureTable, RuleFeatureTable]:
+        """Per-skill arrays for batch scoring and classification."""
+        return (self.similarity_engine.encode_features(metadata_df),
+                self.classifier.encode_features(metadata_df))
+    
+    def _analyze_pair_range(self,
+                            metadata_df: pd.DataFrame,
+                            pairs: np.ndarray,
+                            semantic_sims: Optional[np.ndarray],
+                            start: int,
+                            stop: int,
+                            include_distinct: bool = True,
+                            features: Optional[Tuple[SkillFeatureTable, RuleFeatureTable]] = None) -> Tuple[List[SkillRelationship], List[Recommendation], Dict]:
+        """
+        Score, classify and recommend for candidate pairs [start, stop).
+        
+        Serial and sharded runs both call this per shard (in worker
+        processes for the latter), so both produce the same objects.
+        Pairs are scored and classified as arrays (batch_score and the
+        classifier's decision table); relationship objects, evidence and
+        recommendations are only built for the relationships kept, from
+        the rows already in hand rather than by SKILL_ID lookups.
+        
+        Returns:
+            Tuple of (relationships, recommendations for the non-DISTINCT
+            ones, statistics over every pair), in pair order; DISTINCT
+            relationships are only counted unless include_distinct, and
+            then pairs whose composite bound cannot reach the lowest
+            threshold are not fully scored (statistics count the skips)
+        """
+        if features is None:
+            features = self._encode_features(metadata_df)
+        similarity_features, rule_features = features
+        left = pairs[start:stop, 0]
+        right = pairs[start:stop, 1]
+        
+        # Pairs that cannot reach any rule's composite_min are DISTINCT; unless
+        # DISTINCT relationships are kept, their structural scores are skipped
+        # where the composite bound allows
+        min_composite = None if include_distinct else self.classifier.min_composite
+        scores = self.similarity_engine.batch_score(
+            similarity_features, left, right,
+            semantic_sims[start:stop] if semantic_sims is not None else None,
+            min_composite=min_composite
+        )
+        batch = self.classifier.classify_batch(scores, rule_features, left, right)
+        
+        bounded = scores['bounded']
+        types = [RelationshipType.DISTINCT.value] + [rule.relationship_type.value
+                                                     for rule in self.classifier.decision_table]
+        counts = np.bincount(batch.rule_index + 1, minlength=len(types))
+        stats = {'total_relationships': stop - start,
+                 'relationship_types': Counter({t: int(c) for t, c in zip(types, counts) if c}),
+                 'confidence_sum': float(batch.confidence.sum()),
+                 'composite_sum': float(scores['composite'][~bounded].sum()),
+                 'scored_pairs': int((~bounded).sum()),
+                 'skipped_by_bound': int(bounded.sum()),
+                 'skipped_below_threshold': 0}
+        if min_composite is not None:
+            stats['skipped_below_threshold'] = int((scores['composite'][~bounded] < min_composite).sum())
+        
+        relationships = []
+        recommendations = []
+        kept = np.arange(len(left)) if include_distinct else batch.non_distinct
+        for k in kept:
+            skill_a = metadata_df.iloc[left[k]]
+            skill_b = metadata_df.iloc[right[k]]
+            sim_score = self.similarity_engine.similarity_from_batch(scores, k, skill_a, skill_b)
+            relationship = self.classifier.relationship_from_batch(batch, k, sim_score, skill_a, skill_b)
+            relationship.skill_a_index = int(left[k])
+            relationship.skill_b_index = int(right[k])
+            relationships.append(relationship)
+            
+            # DISTINCT relationships get no recommendation (too many, low value)
+            if relationship.relationship_type != RelationshipType.DISTINCT:
+                recommendations.append(self.recommender.generate_recommendation(
+                    relationship, skill_a, skill_b, metadata_df
+                ))
+        
+        return relationships, recommendations, stats
+    
+    def _iter_pair_shards(self,
+                          metadata_df: pd.DataFrame,
+                          pairs: np.ndarray,
+                          semantic_sims: Optional[np.ndarray],
+                          workers: int,
+                          include_distinct: bool) -> Iterator[Tuple[List[SkillRelationship], List[Recommendation], Dict]]:
+        """
+        Yield _analyze_pair_range() results for contiguous shards, in order.
+        
+        Shard bounds depend only on batch.analysis_shard_size, so serial
+        and sharded runs see identical shards. Skill features are encoded
+        once. With workers > 1, shards run in a process pool: workers
+        receive the analyzer, metadata, features and read-only
+        pair/semantic arrays once, at start-up (inherited without copying
+        where fork is available), and then only shard bounds. An ordered
+        imap merges them deterministically.
+        """
+        shard_size = self.config.get('batch', {}).get('analysis_shard_size', 2000)
+        shards = [(start, min(start + shard_size, len(pairs)))
+                  for start in range(0, len(pairs), shard_size)]
+        if not shards:
+            return
+        features = self._encode_features(metadata_df)
+        
+        if workers <= 1:
+            for start, stop in shards:
+                yield self._analyze_pair_range(metadata_df, pairs, semantic_sims,
+                                               start, stop, include_distinct, features)
+            return
+        
+        pairs = np.array(pairs)
+        pairs.setflags(write=False)
+        if semantic_sims is not None:
+            semantic_sims = np.array(semantic_sims)
+            semantic_sims.setflags(write=False)
+        
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if 'fork' in methods else None)
+        with context.Pool(workers, initializer=_init_shard_worker,
+                          initargs=(self, metadata_df, pairs, semantic_sims, include_distinct,
+                                    features)) as pool:
+            yield from pool.imap(_analyze_shard, shards)
     
     def _prefilter_pairs(self,
                         metadata_df: pd.DataFrame,
@@ -172,173 +507,135 @@ class RedundancyAnalyzer:
         """
         Pre-filter skill pairs using fast structural similarity.
         
-        Only returns pairs with structural similarity above threshold.
-        This drastically reduces the number of pairs to analyze.
+        Only returns pairs whose quick structural score (mean of action and
+        target Jaccard) is above threshold, keeping the top
+        max_pairs_per_skill partners per skill. Actions and targets are
+        tokenized once and blocked through an inverted index, so only
+        skills sharing a term are compared.
         """
         threshold = self.config['prefilter']['structural_threshold']
         max_per_skill = self.config['prefilter']['max_pairs_per_skill']
         
-        candidate_pairs = []
-        
-        for i in range(len(metadata_df)):
-            skill_i = metadata_df.iloc[i]
-            
-            # Get actions and targets for quick comparison
-            actions_i = self._parse_field(skill_i.get('actions', ''))
-            targets_i = self._parse_field(skill_i.get('targets', ''))
-            
-            if not actions_i or not targets_i:
-                continue  # Skip skills without structural data
-            
-            candidates_for_i = []
-            
-            for j in range(i + 1, len(metadata_df)):
-                skill_j = metadata_df.iloc[j]
-                
-                actions_j = self._parse_field(skill_j.get('actions', ''))
-                targets_j = self._parse_field(skill_j.get('targets', ''))
-                
-                if not actions_j or not targets_j:
-                    continue
-                
-                # Quick Jaccard on actions
-                action_sim = self._jaccard(actions_i, actions_j)
-                
-                # Quick Jaccard on targets
-                target_sim = self._jaccard(targets_i, targets_j)
-                
-                # Quick structural score
-                quick_struct = (action_sim + target_sim) / 2
-                
-                if quick_struct >= threshold:
-                    candidates_for_i.append((j, quick_struct))
-            
-            # Keep top N candidates for this skill
-            candidates_for_i.sort(key=lambda x: x[1], reverse=True)
-            for j, _ in candidates_for_i[:max_per_skill]:
-                candidate_pairs.append((i, j))
-            
-            # Stop if we've hit max pairs limit
-            if max_pairs and len(candidate_pairs) >= max_pairs:
-                break
+        blocker = InvertedIndexBlocker(metadata_df)
+        candidate_pairs = blocker.candidate_pairs(threshold, max_per_skill, max_pairs=max_pairs)
+        self.candidate_stats = {'pairs_scored': blocker.pairs_scored}
+        logger.info(f"  Scored {blocker.pairs_scored} overlapping pairs "
+                    f"(of {len(metadata_df) * (len(metadata_df) - 1) // 2} possible)")
         
-        # Remove duplicates
-        candidate_pairs = list(set(candidate_pairs))
+        return candidate_pairs
+    
+    def _lsh_candidate_pairs(self,
+                             metadata_df: pd.DataFrame,
+                             max_pairs: Optional[int] = None) -> List[Tuple[int, int]]:
+        """
+        Approximate pre-filter using MinHash/LSH over action, target and
+        key concept sets (prefilter.method: minhash_lsh).
         
-        # Limit to max_pairs if specified
-        if max_pairs:
-            candidate_pairs = candidate_pairs[:max_pairs]
+        Same threshold and max_pairs_per_skill as _prefilter_pairs, but
+        candidates come from LSH buckets instead of shared terms, so common
+        verbs do not blow up the comparison count. Logs the estimated
+        recall against exact Jaccard on a sample of skills.
+        """
+        prefilter = self.config['prefilter']
+        lsh_config = prefilter.get('minhash', {})
+        
+        generator = MinHashLSHGenerator(
+            metadata_df,
+            bands=lsh_config.get('bands', 32),
+            rows=lsh_config.get('rows', 3),
+            seed=lsh_config.get('seed', 42)
+        )
+        candidate_pairs = generator.candidate_pairs(
+            prefilter['structural_threshold'],
+            prefilter['max_pairs_per_skill'],
+            max_pairs=max_pairs,
+            recall_sample=lsh_config.get('recall_sample', 200)
+        )
+        
+        stats = generator.stats
+        self.candidate_stats = stats
+        logger.info(f"  LSH {stats['bands']} bands x {stats['rows']} rows "
+                    f"(S-curve midpoint ~{stats['lsh_threshold']:.2f}): "
+                    f"{stats['candidates_proposed']} proposed, {stats['candidates_verified']} verified")
+        if 'estimated_recall' in stats:
+            logger.info(f"  Estimated recall vs exact Jaccard: {stats['estimated_recall']:.1%} "
+                        f"({stats['recall_exact_pairs']} exact pairs over "
+                        f"{stats['recall_sample_skills']} sampled skills)")
         
         return candidate_pairs
     
     def _parse_field(self, field_value) -> set:
         """Parse pipe or comma-separated field."""
-        if pd.isna(field_value) or not field_value:
-            return set()
-        
-        field_str = str(field_value).strip()
-        
-        if '|' in field_str:
-            items = field_str.split('|')
-        elif ',' in field_str:
-            items = field_str.split(',')
-        else:
-            items = [field_str]
-        
-        return {item.strip().lower() for item in items if item.strip()}
+        return parse_term_set(field_value)
     
-    def _jaccard(self, set_a: set, set_b: set) -> float:
-        """Calculate Jaccard similarity."""
-        if not set_a or not set_b:
-            return 0.0
-        intersection = len(set_a & set_b)
-        union = len(set_a | set_b)
-        return intersection / union if union > 0 else 0.0
-    
-    def _calculate_semantic_matrix(self, embeddings: np.ndarray) -> np.ndarray:
-        """Calculate semantic similarity matrix from embeddings."""
-        from sklearn.metrics.pairwise import cosine_similarity
-        return cosine_similarity(embeddings)
-    
-    def _save_results(self,
-                     relationships: List[SkillRelationship],
-                     recommendations: List[Recommendation],
-                     output_dir: Path):
-        """Save results to JSON and CSV files."""
-        output_dir = Path(output_dir)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        
-        # Save relationships
-        relationships_data = [r.to_dict() for r in relationships]
-        rel_path = output_dir / f"relationships_{timestamp}.json"
-        with open(rel_path, 'w') as f:
-            json.dump(relationships_data, f, indent=2, cls=NumpyEncoder)
-        logger.info(f"  Saved relationships to {rel_path}")
-        
-        # Save recommendations
-        recommendations_data = [r.to_dict() for r in recommendations]
-        rec_path = output_dir / f"recommendations_{timestamp}.json"
-        with open(rec_path, 'w') as f:
-            json.dump(recommendations_data, f, indent=2, cls=NumpyEncoder)
-        logger.info(f"  Saved recommendations to {rec_path}")
-        
-        # Save CSV summary
-        summary_data = []
-        for rel, rec in zip(relationships, recommendations):
-            summary_data.append({
-                'relationship_id': rel.relationship_id,
-                'skill_a_id': rel.skill_a_id,
-                'skill_b_id': rel.skill_b_id,
-                'skill_a_name': rel.skill_a_name,
-                'skill_b_name': rel.skill_b_name,
-                'relationship_type': rel.relationship_type.value,
-                'confidence': rel.confidence,
-                'composite_score': rel.similarity_scores['composite'],
-                'recommended_action': rec.action.value,
-                'priority': rec.priority,
-                'priority_score': rec.priority_score,
-                'rationale': rec.rationale
-            })
+    def _calculate_pair_semantics(self,
+                                  embeddings,
+                                  candidate_pairs: List[Tuple[int, int]]) -> np.ndarray:
+        """
+        Cosine similarity for the candidate pairs only.
         
-        summary_df = pd.DataFrame(summary_data)
-        csv_path = output_dir / f"summary_{timestamp}.csv"
-        summary_df.to_csv(csv_path, index=False)
-        logger.info(f"  Saved summary to {csv_path}")
-        
-        # Save statistics
-        stats = self._generate_statistics(relationships, recommendations)
-        stats_path = output_dir / f"statistics_{timestamp}.json"
-        with open(stats_path, 'w') as f:
-            json.dump(stats, f, indent=2, cls=NumpyEncoder)
-        logger.info(f"  Saved statistics to {stats_path}")
+        Embeddings are normalized once (float32) and compared pair by pair,
+        so memory grows with the number of candidates instead of n x n.
+        QuantizedEmbeddings are compared directly in their quantized form.
+        """
+        pairs = np.asarray(candidate_pairs, dtype=np.int64).reshape(-1, 2)
+        if isinstance(embeddings, QuantizedEmbeddings):
+            return quantized_pair_cosine(embeddings, pairs[:, 0], pairs[:, 1])
+        return pair_cosine(normalize_embeddings(embeddings), pairs[:, 0], pairs[:, 1])
     
-    def _generate_statistics(self,
-                            relationships: List[SkillRelationship],
-                            recommendations: List[Recommendation]) -> Dict:
-        """Generate summary statistics."""
-        from collections import Counter
-        
-        rel_types = Counter(r.relationship_type.value for r in relationships)
-        actions = Counter(r.action.value for r in recommendations)
-        priorities = Counter(r.priority for r in recommendations)
+    def _generate_statistics(self, recommendations: List[Dict]) -> Dict:
+        """
+        Generate summary statistics (relationship counts include DISTINCT).
         
-        avg_confidence = np.mean([r.confidence for r in relationships])
-        avg_composite = np.mean([r.similarity_scores['composite'] for r in relationships])
+        The average composite covers the scored pairs, i.e. not those
+        stopped early by the composite bound.
+        """
+        stats = self.analysis_stats
+        total = stats['total_relationships']
+        scored = stats['scored_pairs']
+        actions = Counter(r['action'] for r in recommendations)
+        priorities = Counter(r['priority'] for r in recommendations)
         
         return {
-            'total_relationships': len(relationships),
+            'total_relationships': total,
             'total_recommendations': len(recommendations),
-            'relationship_types': dict(rel_types),
+            'relationship_types': dict(stats['relationship_types']),
             'recommended_actions': dict(actions),
             'priority_distribution': dict(priorities),
-            'average_confidence': float(avg_confidence),
-            'average_composite_score': float(avg_composite),
-            'high_priority_count': len([r for r in recommendations if r.priority in ['P0', 'P1']])
+            'average_confidence': stats['confidence_sum'] / total if total else float('nan'),
+            'average_composite_score': stats['composite_sum'] / scored if scored else float('nan'),
+            'scored_pairs': scored,
+            'pairs_skipped_by_bound': stats['skipped_by_bound'],
+            'pairs_skipped_below_threshold': stats['skipped_below_threshold'],
+            'high_priority_count': len([r for r in recommendations if r['priority'] in ['P0', 'P1']])
         }
 
 
+# Per-process state for sharded analysis (set once by the pool initializer)
+_shard_state = {}
+
+
+def _init_shard_worker(analyzer: RedundancyAnalyzer,
+                       metadata_df: pd.DataFrame,
+                       pairs: np.ndarray,
+                       semantic_sims: Optional[np.ndarray],
+                       include_distinct: bool,
+                       features: Tuple[SkillFeatureTable, RuleFeatureTable]):
+    """Pool initializer: keep the read-only inputs for _analyze_shard()."""
+    _shard_state.update(analyzer=analyzer, metadata_df=metadata_df, pairs=pairs,
+                        semantic_sims=semantic_sims, include_distinct=include_distinct,
+                        features=features)
+
+
+def _analyze_shard(bounds: Tuple[int, int]) -> Tuple[List[SkillRelationship], List[Recommendation], Dict]:
+    """Analyze candidate pairs [start, stop) in a worker process."""
+    start, stop = bounds
+    return _shard_state['analyzer']._analyze_pair_range(
+        _shard_state['metadata_df'], _shard_state['pairs'], _shard_state['semantic_sims'],
+        start, stop, _shard_state['include_distinct'], _shard_state['features']
+    )
+
+
 def load_enhanced_metadata(metadata_path: Path) -> pd.DataFrame:
     """Load enhanced metadata CSV."""
     logger.info(f"Loading metadata from {metadata_path}")
@@ -366,36 +663,93 @@ if __name__ == "__main__":
                        help='Maximum pairs to process (for testing)')
     parser.add_argument('--embeddings', type=str, default=None,
                        help='Path to semantic embeddings (.npy file)')
+    parser.add_argument('--candidates', choices=['inverted_index', 'minhash_lsh'], default=None,
+                       help='Candidate generation method (default: prefilter.method in config.yaml)')
+    parser.add_argument('--quantize', choices=['none', 'float16', 'int8'], default=None,
+                       help='Keep embeddings quantized in memory (default: semantic.quantization in config.yaml)')
+    parser.add_argument('--workers', type=int, default=None,
+                       help='Processes for pair analysis (default: batch.analysis_workers in config.yaml)')
+    parser.add_argument('--format', choices=['jsonl', 'parquet'], default=None,
+                       help='Result file format (default: output.export_format in config.yaml)')
+    parser.add_argument('--include-distinct', action='store_true',
+                       help='Also keep and save DISTINCT relationships (default: counted only)')
+    parser.add_argument('--incremental', type=str, default=None,
+                       help='Prior relationships_<timestamp> file to update for catalog changes')
+    parser.add_argument('--delta', type=str, default=None,
+                       help='Added/changed SKILL_IDs (comma-separated or a file with one per line); '
+                            'default: detected from the prior features file')
     
     args = parser.parse_args()
     
     # Load metadata
     metadata_df = load_enhanced_metadata(Path(args.metadata))
     
+    analyzer = RedundancyAnalyzer()
+    
     # Load embeddings if provided
     embeddings = None
     if args.embeddings:
-        embeddings = np.load(args.embeddings)
+        embeddings = np.load(args.embeddings, mmap_mode='r')
         logger.info(f"Loaded embeddings: shape {embeddings.shape}")
+        quantization = args.quantize or analyzer.config.get('semantic', {}).get('quantization', 'none')
+        if quantization != 'none':
+            embeddings = quantize_embeddings(embeddings, quantization)
+            logger.info(f"Quantized embeddings to {quantization}: {embeddings.nbytes / 1e6:.1f} MB")
+        else:
+            embeddings = np.asarray(embeddings)
     
     # Run analysis
-    analyzer = RedundancyAnalyzer()
-    relationships, recommendations = analyzer.analyze_skills(
+    if args.candidates:
+        analyzer.config['prefilter']['method'] = args.candidates
+    if args.format:
+        analyzer.config['output']['export_format'] = args.format
+    
+    if args.incremental:
+        delta_ids = None
+        if args.delta:
+            delta_path = Path(args.delta)
+            delta_ids = (delta_path.read_text().split() if delta_path.exists()
+                         else [s.strip() for s in args.delta.split(',') if s.strip()])
+        relationship_records, recommendation_records, changes = analyzer.analyze_incremental(
+            metadata_df,
+            Path(args.incremental),
+            delta_skill_ids=delta_ids,
+            semantic_embeddings=embeddings,
+            output_dir=Path(args.output),
+            workers=args.workers,
+            include_distinct=args.include_distinct or None
+        )
+        
+        print("\n" + "=" * 70)
+        print("INCREMENTAL ANALYSIS SUMMARY")
+        print("=" * 70)
+        for key, value in analyzer.incremental_stats.items():
+            print(f"  {key}: {value}")
+        print(f"Relationships after update: {len(relationship_records)}")
+        print(f"Recommendations after update: {len(recommendation_records)}")
+        print(f"\nResults saved to: {args.output}")
+        print("=" * 70)
+        sys.exit(0)
+    
+    relationship_records, recommendations = analyzer.analyze_skills(
         metadata_df,
         semantic_embeddings=embeddings,
         output_dir=Path(args.output),
-        max_pairs=args.max_pairs
+        max_pairs=args.max_pairs,
+        workers=args.workers,
+        include_distinct=args.include_distinct or None
     )
     
     # Print summary
     print("\n" + "=" * 70)
     print("ANALYSIS SUMMARY")
     print("=" * 70)
-    print(f"Total relationships found: {len(relationships)}")
+    print(f"Total relationships found: {analyzer.analysis_stats['total_relationships']}")
+    print(f"Pairs skipped early: {analyzer.analysis_stats['skipped_by_bound']} by composite bound, "
+          f"{analyzer.analysis_stats['skipped_below_threshold']} below threshold")
     print(f"Total recommendations: {len(recommendations)}")
     
-    from collections import Counter
-    rel_types = Counter(r.relationship_type.value for r in relationships)
+    rel_types = analyzer.analysis_stats['relationship_types']
     print(f"\nRelationship types:")
     for rtype, count in rel_types.most_common():
         print(f"  {rtype}: {count}")
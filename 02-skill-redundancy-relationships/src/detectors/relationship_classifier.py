@@ -11,11 +11,16 @@ Classifies skill relationships into 7 types using rule-based logic:
 7. DISTINCT - Different skills
 
 Uses multi-dimensional similarity scores and metadata to make classifications.
+
+classify() applies the rules to one pair. classify_batch() evaluates the
+same rules as a decision table compiled from the thresholds config: one
+NumPy mask per rule over arrays of scores (SimilarityEngine.batch_score),
+in priority order, with vectorized confidence.
 """
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
 from dataclasses import dataclass, field
 from enum import Enum
 import yaml
@@ -65,6 +70,11 @@ class SkillRelationship:
     # Metadata for decision support
     metadata: Dict[str, any] = field(default_factory=dict)
     
+    # Row positions of the two skills in the analyzed metadata frame
+    # (set by the analyzer; not serialized)
+    skill_a_index: Optional[int] = None
+    skill_b_index: Optional[int] = None
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary for serialization."""
         return {
@@ -84,6 +94,54 @@ class SkillRelationship:
         }
 
 
+@dataclass
+class RuleFeatureTable:
+    """
+    Skill metadata pre-encoded for classify_batch().
+    
+    Row k describes metadata_df.iloc[k], with the scalar rules' semantics:
+    equality codes come from pd.factorize (-1 = missing, never equal);
+    'present' arrays hold the truthiness of the raw value.
+    """
+    grade_number: np.ndarray        # grade_mapping value, 0 if unmapped
+    cognitive_index: np.ndarray     # index in cognitive_levels, -1 if unknown
+    skill_domain: np.ndarray
+    skill_domain_present: np.ndarray
+    specifications: Dict[str, Tuple[np.ndarray, np.ndarray]]  # field -> (codes, present)
+    completeness: np.ndarray        # share of key metadata fields filled
+    
+    def __len__(self) -> int:
+        return len(self.grade_number)
+
+
+@dataclass
+class DecisionRule:
+    """One row of the compiled decision table."""
+    name: str
+    relationship_type: RelationshipType
+    matches: Callable[[Dict[str, np.ndarray]], np.ndarray]
+    confidence: float
+    # composite_min for the threshold margin; None = fixed margin of 0.05
+    margin_from: Optional[float] = None
+    # False = fixed confidence (no agreement/margin/completeness factors)
+    adjusted: bool = True
+
+
+@dataclass
+class BatchClassification:
+    """classify_batch() result: one entry per pair."""
+    rule_index: np.ndarray   # index into RelationshipClassifier.decision_table, -1 = DISTINCT
+    confidence: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.rule_index)
+    
+    @property
+    def non_distinct(self) -> np.ndarray:
+        """Positions of pairs with a non-DISTINCT relationship."""
+        return np.flatnonzero(self.rule_index >= 0)
+
+
 class RelationshipClassifier:
     """
     Classifies skill relationships using rule-based logic.
@@ -109,6 +167,11 @@ class RelationshipClassifier:
         self.grade_mapping = self.config['grade_mapping']
         self.cognitive_levels = self.config['cognitive_levels']
         
+        # Lowest composite any rule accepts; below it every pair is DISTINCT
+        self.min_composite = min(rule['composite_min'] for rule in self.thresholds.values()
+                                 if 'composite_min' in rule)
+        self.decision_table = self._compile_decision_table()
+        
         logger.info("Relationship classifier initialized")
     
     def classify(self,
@@ -126,6 +189,10 @@ class RelationshipClassifier:
         Returns:
             SkillRelationship with classification and confidence
         """
+        # No rule can match below the lowest composite threshold
+        if similarity_score.composite < self.min_composite:
+            return self._create_distinct(similarity_score, skill_a, skill_b)
+        
         # Try each classification rule in priority order
         classification = self._try_true_duplicate(similarity_score, skill_a, skill_b)
         if classification:
@@ -154,6 +221,231 @@ class RelationshipClassifier:
         # Default: DISTINCT
         return self._create_distinct(similarity_score, skill_a, skill_b)
     
+    # Fields read by _metadata_completeness / _identify_specification_differences
+    COMPLETENESS_FIELDS = [
+        'actions', 'targets', 'key_concepts',
+        'cognitive_demand', 'task_complexity', 'skill_domain',
+        'support_level', 'scope'
+    ]
+    SPECIFICATION_FIELDS = ['support_level', 'text_type', 'complexity_band', 'scope', 'text_mode']
+    
+    def _compile_decision_table(self) -> List[DecisionRule]:
+        """
+        Decision table equivalent to the _try_* rules, in priority order.
+        
+        Each rule's mask reads the columns built by classify_batch():
+        scores (composite, structural, ...), grade_compatibility and the
+        pair features grade_diff, cognitive_diff, same_domain and
+        specification_difference. AMBIGUOUS is last; unmatched pairs are
+        DISTINCT.
+        """
+        t = self.thresholds
+        dup, spec, prereq = t['true_duplicate'], t['specification_variant'], t['prerequisite']
+        prog, comp, amb = t['progression'], t['complementary'], t['ambiguous']
+        
+        def between(c, rule):
+            return (c['composite'] >= rule['composite_min']) & (c['composite'] <= rule['composite_max'])
+        
+        return [
+            DecisionRule(
+                'true_duplicate', RelationshipType.TRUE_DUPLICATE,
+                lambda c: ((c['composite'] >= dup['composite_min']) &
+                           (c['structural'] >= dup['structural_min']) &
+                           (c['educational'] >= dup['educational_min']) &
+                           (c['grade_compatibility'] >= 0.5)),
+                dup['confidence'], margin_from=dup['composite_min']
+            ),
+            DecisionRule(
+                'specification_variant', RelationshipType.SPECIFICATION_VARIANT,
+                lambda c: ((c['composite'] >= spec['composite_min']) &
+                           (c['structural'] >= spec['structural_min']) &
+                           (c['educational'] >= spec['educational_min']) &
+                           (c['contextual'] < spec['contextual_max']) &
+                           c['specification_difference']),
+                spec['confidence'], margin_from=spec['composite_min']
+            ),
+            DecisionRule(
+                'prerequisite', RelationshipType.PREREQUISITE,
+                lambda c: (between(c, prereq) &
+                           (c['educational'] >= prereq['educational_min']) &
+                           (np.abs(c['grade_diff']) == prereq['grade_diff']) &
+                           (np.abs(c['cognitive_diff']) <= 1)),
+                prereq['confidence']
+            ),
+            DecisionRule(
+                'progression', RelationshipType.PROGRESSION,
+                lambda c: (between(c, prog) &
+                           (c['structural'] >= prog['structural_min']) &
+                           c['same_domain'] &
+                           (np.abs(c['grade_diff']) >= prog['min_grade_diff']) &
+                           (c['cognitive_diff'] > 0)),
+                prog['confidence']
+            ),
+            DecisionRule(
+                'complementary', RelationshipType.COMPLEMENTARY,
+                lambda c: between(c, comp) & c['same_domain'],
+                comp['confidence']
+            ),
+            DecisionRule(
+                'ambiguous', RelationshipType.AMBIGUOUS,
+                lambda c: c['composite'] >= amb['composite_min'],
+                amb['confidence'], adjusted=False
+            )
+        ]
+    
+    def encode_features(self, metadata_df: pd.DataFrame) -> RuleFeatureTable:
+        """
+        Pre-encode skills once for classify_batch().
+        
+        Args:
+            metadata_df: DataFrame with enhanced metadata
+            
+        Returns:
+            RuleFeatureTable aligned with metadata_df rows
+        """
+        def column(name: str) -> pd.Series:
+            # Series.get(name, '') semantics: a missing column reads as ''
+            if name in metadata_df.columns:
+                return metadata_df[name]
+            return pd.Series([''] * len(metadata_df), index=metadata_df.index, dtype=object)
+        
+        def present(name: str) -> np.ndarray:
+            return np.array([bool(v) for v in column(name)], dtype=bool)
+        
+        def equality_codes(name: str) -> np.ndarray:
+            codes, _ = pd.factorize(column(name), use_na_sentinel=True)
+            return codes
+        
+        cognitive_index = {}
+        for k, level in enumerate(self.cognitive_levels):
+            cognitive_index.setdefault(level, k)  # list.index() keeps the first
+        grades = [short if short else name for short, name in
+                  zip(column('GRADE_LEVEL_SHORT_NAME'), column('GRADE_LEVEL_NAME'))]
+        
+        filled = np.zeros(len(metadata_df))
+        for name in self.COMPLETENESS_FIELDS:
+            if name in metadata_df.columns:
+                filled += present(name)
+        
+        return RuleFeatureTable(
+            grade_number=np.array([self.grade_mapping.get(g, 0) for g in grades], dtype=np.int64),
+            cognitive_index=np.array([cognitive_index.get(v, -1) for v in column('cognitive_demand')],
+                                     dtype=np.int64),
+            skill_domain=equality_codes('skill_domain'),
+            skill_domain_present=present('skill_domain'),
+            specifications={name: (equality_codes(name), present(name))
+                            for name in self.SPECIFICATION_FIELDS},
+            completeness=filled / len(self.COMPLETENESS_FIELDS)
+        )
+    
+    def classify_batch(self,
+                       scores: Dict[str, np.ndarray],
+                       features: RuleFeatureTable,
+                       left: np.ndarray,
+                       right: np.ndarray) -> BatchClassification:
+        """
+        Classify many pairs at once; same results as classify().
+        
+        Rules are applied as masks in priority order; the first matching
+        rule wins. No objects are built; use relationship_from_batch() for
+        the pairs whose relationships are kept.
+        
+        Args:
+            scores: Output of SimilarityEngine.batch_score() for the pairs
+            features: Output of encode_features()
+            left: Row positions of the first skill of each pair
+            right: Row positions of the second skill of each pair
+            
+        Returns:
+            BatchClassification with the matched rule and confidence per pair
+        """
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        n = len(left)
+        
+        def equal(codes: np.ndarray) -> np.ndarray:
+            return (codes[left] == codes[right]) & (codes[left] >= 0)
+        
+        cog_a, cog_b = features.cognitive_index[left], features.cognitive_index[right]
+        specification_difference = np.zeros(n, dtype=bool)
+        for codes, present in features.specifications.values():
+            specification_difference |= present[left] & present[right] & ~equal(codes)
+        
+        columns = dict(scores)
+        columns.update(
+            grade_diff=features.grade_number[right] - features.grade_number[left],
+            cognitive_diff=np.where((cog_a >= 0) & (cog_b >= 0), cog_b - cog_a, 0),
+            same_domain=equal(features.skill_domain) & features.skill_domain_present[left],
+            specification_difference=specification_difference
+        )
+        
+        # Confidence factors, as in _dimension_agreement / _metadata_completeness
+        dimensions = np.column_stack([scores['structural'], scores['educational'],
+                                      scores['semantic'], scores['contextual']])
+        agreement = np.maximum(0.0, 1.0 - (np.std(dimensions, axis=1) * 2.0))
+        completeness = (features.completeness[left] + features.completeness[right]) / 2
+        
+        rule_index = np.full(n, -1, dtype=np.int64)
+        confidence = np.full(n, float(self.thresholds['distinct']['confidence']))
+        # Nothing matches below the lowest composite threshold
+        remaining = scores['composite'] >= self.min_composite
+        for k, rule in enumerate(self.decision_table):
+            matched = remaining & rule.matches(columns)
+            if not matched.any():
+                continue
+            remaining &= ~matched
+            rule_index[matched] = k
+            if not rule.adjusted:
+                confidence[matched] = rule.confidence
+                continue
+            margin = (scores['composite'][matched] - rule.margin_from
+                      if rule.margin_from is not None else 0.05)
+            confidence[matched] = self._confidence_vector(
+                rule.confidence, agreement[matched], margin, completeness[matched]
+            )
+        
+        return BatchClassification(rule_index, confidence)
+    
+    def relationship_from_batch(self,
+                                batch: BatchClassification,
+                                k: int,
+                                sim: SimilarityScore,
+                                skill_a: pd.Series,
+                                skill_b: pd.Series) -> SkillRelationship:
+        """
+        SkillRelationship for pair k of a classify_batch() result.
+        
+        Same object classify() builds for the pair; the rule-specific
+        explanation fields are computed here, for this pair only.
+        """
+        if batch.rule_index[k] < 0:
+            return self._create_distinct(sim, skill_a, skill_b)
+        rule = self.decision_table[batch.rule_index[k]]
+        confidence = float(batch.confidence[k])
+        
+        explanation = None
+        confidence_factors = None
+        if rule.relationship_type == RelationshipType.TRUE_DUPLICATE:
+            confidence_factors = {
+                'dimension_agreement': self._dimension_agreement(sim),
+                'threshold_margin': sim.composite - rule.margin_from,
+                'metadata_completeness': self._metadata_completeness(skill_a, skill_b)
+            }
+        elif rule.relationship_type == RelationshipType.SPECIFICATION_VARIANT:
+            explanation = {'specification_differences':
+                           self._identify_specification_differences(skill_a, skill_b)}
+        elif rule.relationship_type == RelationshipType.PREREQUISITE:
+            explanation = {'grade_progression': self._grade_difference(skill_a, skill_b),
+                           'cognitive_progression': self._cognitive_difference(skill_a, skill_b)}
+        elif rule.relationship_type == RelationshipType.PROGRESSION:
+            explanation = {'grade_span': self._grade_difference(skill_a, skill_b),
+                           'cognitive_progression': self._cognitive_difference(skill_a, skill_b)}
+        elif rule.relationship_type == RelationshipType.AMBIGUOUS:
+            explanation = {'reason': 'No clear rule match despite high similarity'}
+        
+        return self._build_relationship(sim, skill_a, skill_b, rule.relationship_type,
+                                        confidence, rule.name, explanation, confidence_factors)
+    
     def _try_true_duplicate(self,
                            sim: SimilarityScore,
                            skill_a: pd.Series,
@@ -178,35 +470,20 @@ class RelationshipClassifier:
             if grade_compat >= 0.5:  # Same or adjacent
                 
                 # Calculate confidence
+                factors = {
+                    'dimension_agreement': self._dimension_agreement(sim),
+                    'threshold_margin': sim.composite - thresholds['composite_min'],
+                    'metadata_completeness': self._metadata_completeness(skill_a, skill_b)
+                }
                 confidence = self._calculate_confidence(
                     rule_match=True,
                     rule_confidence=thresholds['confidence'],
-                    dimension_agreement=self._dimension_agreement(sim),
-                    threshold_margin=sim.composite - thresholds['composite_min'],
-                    metadata_completeness=self._metadata_completeness(skill_a, skill_b)
+                    **factors
                 )
                 
-                return SkillRelationship(
-                    relationship_id=self._generate_id(skill_a['SKILL_ID'], skill_b['SKILL_ID']),
-                    skill_a_id=skill_a['SKILL_ID'],
-                    skill_b_id=skill_b['SKILL_ID'],
-                    skill_a_name=skill_a['SKILL_NAME'],
-                    skill_b_name=skill_b['SKILL_NAME'],
-                    relationship_type=RelationshipType.TRUE_DUPLICATE,
-                    confidence=confidence,
-                    similarity_scores=sim.to_dict()['scores'],
-                    similarity_explanation={
-                        'components': sim.to_dict()['components'],
-                        'evidence': sim.evidence,
-                        'weights': sim.weights
-                    },
-                    rule_matched="true_duplicate",
-                    confidence_factors={
-                        'dimension_agreement': self._dimension_agreement(sim),
-                        'threshold_margin': sim.composite - thresholds['composite_min'],
-                        'metadata_completeness': self._metadata_completeness(skill_a, skill_b)
-                    },
-                    metadata=self._extract_metadata(skill_a, skill_b)
+                return self._build_relationship(
+                    sim, skill_a, skill_b, RelationshipType.TRUE_DUPLICATE, confidence,
+                    "true_duplicate", confidence_factors=factors
                 )
         
         return None
@@ -243,23 +520,9 @@ class RelationshipClassifier:
                     metadata_completeness=self._metadata_completeness(skill_a, skill_b)
                 )
                 
-                return SkillRelationship(
-                    relationship_id=self._generate_id(skill_a['SKILL_ID'], skill_b['SKILL_ID']),
-                    skill_a_id=skill_a['SKILL_ID'],
-                    skill_b_id=skill_b['SKILL_ID'],
-                    skill_a_name=skill_a['SKILL_NAME'],
-                    skill_b_name=skill_b['SKILL_NAME'],
-                    relationship_type=RelationshipType.SPECIFICATION_VARIANT,
-                    confidence=confidence,
-                    similarity_scores=sim.to_dict()['scores'],
-                    similarity_explanation={
-                        'components': sim.to_dict()['components'],
-                        'evidence': sim.evidence,
-                        'weights': sim.weights,
-                        'specification_differences': spec_diffs
-                    },
-                    rule_matched="specification_variant",
-                    metadata=self._extract_metadata(skill_a, skill_b)
+                return self._build_relationship(
+                    sim, skill_a, skill_b, RelationshipType.SPECIFICATION_VARIANT, confidence,
+                    "specification_variant", {'specification_differences': spec_diffs}
                 )
         
         return None
@@ -298,24 +561,10 @@ class RelationshipClassifier:
                         metadata_completeness=self._metadata_completeness(skill_a, skill_b)
                     )
                     
-                    return SkillRelationship(
-                        relationship_id=self._generate_id(skill_a['SKILL_ID'], skill_b['SKILL_ID']),
-                        skill_a_id=skill_a['SKILL_ID'],
-                        skill_b_id=skill_b['SKILL_ID'],
-                        skill_a_name=skill_a['SKILL_NAME'],
-                        skill_b_name=skill_b['SKILL_NAME'],
-                        relationship_type=RelationshipType.PREREQUISITE,
-                        confidence=confidence,
-                        similarity_scores=sim.to_dict()['scores'],
-                        similarity_explanation={
-                            'components': sim.to_dict()['components'],
-                            'evidence': sim.evidence,
-                            'weights': sim.weights,
-                            'grade_progression': grade_diff,
-                            'cognitive_progression': cog_diff
-                        },
-                        rule_matched="prerequisite",
-                        metadata=self._extract_metadata(skill_a, skill_b)
+                    return self._build_relationship(
+                        sim, skill_a, skill_b, RelationshipType.PREREQUISITE, confidence,
+                        "prerequisite", {'grade_progression': grade_diff,
+                                         'cognitive_progression': cog_diff}
                     )
         
         return None
@@ -360,24 +609,10 @@ class RelationshipClassifier:
                             metadata_completeness=self._metadata_completeness(skill_a, skill_b)
                         )
                         
-                        return SkillRelationship(
-                            relationship_id=self._generate_id(skill_a['SKILL_ID'], skill_b['SKILL_ID']),
-                            skill_a_id=skill_a['SKILL_ID'],
-                            skill_b_id=skill_b['SKILL_ID'],
-                            skill_a_name=skill_a['SKILL_NAME'],
-                            skill_b_name=skill_b['SKILL_NAME'],
-                            relationship_type=RelationshipType.PROGRESSION,
-                            confidence=confidence,
-                            similarity_scores=sim.to_dict()['scores'],
-                            similarity_explanation={
-                                'components': sim.to_dict()['components'],
-                                'evidence': sim.evidence,
-                                'weights': sim.weights,
-                                'grade_span': grade_diff,
-                                'cognitive_progression': cog_diff
-                            },
-                            rule_matched="progression",
-                            metadata=self._extract_metadata(skill_a, skill_b)
+                        return self._build_relationship(
+                            sim, skill_a, skill_b, RelationshipType.PROGRESSION, confidence,
+                            "progression", {'grade_span': grade_diff,
+                                            'cognitive_progression': cog_diff}
                         )
         
         return None
@@ -410,22 +645,9 @@ class RelationshipClassifier:
                     metadata_completeness=self._metadata_completeness(skill_a, skill_b)
                 )
                 
-                return SkillRelationship(
-                    relationship_id=self._generate_id(skill_a['SKILL_ID'], skill_b['SKILL_ID']),
-                    skill_a_id=skill_a['SKILL_ID'],
-                    skill_b_id=skill_b['SKILL_ID'],
-                    skill_a_name=skill_a['SKILL_NAME'],
-                    skill_b_name=skill_b['SKILL_NAME'],
-                    relationship_type=RelationshipType.COMPLEMENTARY,
-                    confidence=confidence,
-                    similarity_scores=sim.to_dict()['scores'],
-                    similarity_explanation={
-                        'components': sim.to_dict()['components'],
-                        'evidence': sim.evidence,
-                        'weights': sim.weights
-                    },
-                    rule_matched="complementary",
-                    metadata=self._extract_metadata(skill_a, skill_b)
+                return self._build_relationship(
+                    sim, skill_a, skill_b, RelationshipType.COMPLEMENTARY, confidence,
+                    "complementary"
                 )
         
         return None
@@ -435,25 +657,10 @@ class RelationshipClassifier:
                          skill_a: pd.Series,
                          skill_b: pd.Series) -> SkillRelationship:
         """Create AMBIGUOUS relationship (needs human/LLM review)."""
-        thresholds = self.thresholds['ambiguous']
-        
-        return SkillRelationship(
-            relationship_id=self._generate_id(skill_a['SKILL_ID'], skill_b['SKILL_ID']),
-            skill_a_id=skill_a['SKILL_ID'],
-            skill_b_id=skill_b['SKILL_ID'],
-            skill_a_name=skill_a['SKILL_NAME'],
-            skill_b_name=skill_b['SKILL_NAME'],
-            relationship_type=RelationshipType.AMBIGUOUS,
-            confidence=thresholds['confidence'],
-            similarity_scores=sim.to_dict()['scores'],
-            similarity_explanation={
-                'components': sim.to_dict()['components'],
-                'evidence': sim.evidence,
-                'weights': sim.weights,
-                'reason': 'No clear rule match despite high similarity'
-            },
-            rule_matched="ambiguous",
-            metadata=self._extract_metadata(skill_a, skill_b)
+        return self._build_relationship(
+            sim, skill_a, skill_b, RelationshipType.AMBIGUOUS,
+            self.thresholds['ambiguous']['confidence'], "ambiguous",
+            {'reason': 'No clear rule match despite high similarity'}
         )
     
     def _create_distinct(self,
@@ -461,23 +668,50 @@ class RelationshipClassifier:
                         skill_a: pd.Series,
                         skill_b: pd.Series) -> SkillRelationship:
         """Create DISTINCT relationship."""
-        thresholds = self.thresholds['distinct']
+        return self._build_relationship(
+            sim, skill_a, skill_b, RelationshipType.DISTINCT,
+            self.thresholds['distinct']['confidence'], "distinct"
+        )
+    
+    def _build_relationship(self,
+                            sim: SimilarityScore,
+                            skill_a: pd.Series,
+                            skill_b: pd.Series,
+                            relationship_type: RelationshipType,
+                            confidence: float,
+                            rule_matched: str,
+                            explanation: Optional[Dict] = None,
+                            confidence_factors: Optional[Dict[str, float]] = None) -> SkillRelationship:
+        """
+        SkillRelationship for a matched rule.
         
+        Args:
+            sim: Similarity score of the pair
+            skill_a: First skill with metadata
+            skill_b: Second skill with metadata
+            relationship_type: Classified type
+            confidence: Classification confidence
+            rule_matched: Rule name
+            explanation: Rule-specific explanation fields
+            confidence_factors: Confidence inputs to record (if any)
+        """
         return SkillRelationship(
             relationship_id=self._generate_id(skill_a['SKILL_ID'], skill_b['SKILL_ID']),
             skill_a_id=skill_a['SKILL_ID'],
             skill_b_id=skill_b['SKILL_ID'],
             skill_a_name=skill_a['SKILL_NAME'],
             skill_b_name=skill_b['SKILL_NAME'],
-            relationship_type=RelationshipType.DISTINCT,
-            confidence=thresholds['confidence'],
-            similarity_scores=sim.to_dict()['scores'],
+            relationship_type=relationship_type,
+            confidence=confidence,
+            similarity_scores=sim.scores_dict(),
             similarity_explanation={
-                'components': sim.to_dict()['components'],
+                'components': sim.components_dict(),
                 'evidence': sim.evidence,
-                'weights': sim.weights
+                'weights': sim.weights,
+                **(explanation or {})
             },
-            rule_matched="distinct",
+            rule_matched=rule_matched,
+            confidence_factors=confidence_factors or {},
             metadata=self._extract_metadata(skill_a, skill_b)
         )
     
@@ -515,6 +749,21 @@ class RelationshipClassifier:
         
         return min(1.0, base_confidence)
     
+    def _confidence_vector(self,
+                           rule_confidence: float,
+                           dimension_agreement: np.ndarray,
+                           threshold_margin,
+                           metadata_completeness: np.ndarray) -> np.ndarray:
+        """_calculate_confidence() for arrays (same factors, same order)."""
+        confidence = np.full(len(dimension_agreement), float(rule_confidence))
+        confidence = np.where(dimension_agreement > 0.8, confidence * 1.1,
+                              np.where(dimension_agreement < 0.5, confidence * 0.8, confidence))
+        threshold_margin = np.broadcast_to(threshold_margin, confidence.shape)
+        confidence = np.where(threshold_margin > 0.15, confidence * 1.05,
+                              np.where(threshold_margin < 0.05, confidence * 0.9, confidence))
+        confidence = confidence * metadata_completeness
+        return np.minimum(1.0, confidence)
+    
     def _dimension_agreement(self, sim: SimilarityScore) -> float:
         """
         Calculate how well dimensions agree.
@@ -534,11 +783,7 @@ class RelationshipClassifier:
     
     def _metadata_completeness(self, skill_a: pd.Series, skill_b: pd.Series) -> float:
         """Calculate metadata completeness for both skills."""
-        key_fields = [
-            'actions', 'targets', 'key_concepts',
-            'cognitive_demand', 'task_complexity', 'skill_domain',
-            'support_level', 'scope'
-        ]
+        key_fields = self.COMPLETENESS_FIELDS
         
         def completeness(skill):
             filled = sum(1 for field in key_fields if field in skill and skill[field])
@@ -572,7 +817,7 @@ class RelationshipClassifier:
                                            skill_a: pd.Series,
                                            skill_b: pd.Series) -> Dict[str, List[str]]:
         """Identify which specifications differ between skills."""
-        spec_fields = ['support_level', 'text_type', 'complexity_band', 'scope', 'text_mode']
+        spec_fields = self.SPECIFICATION_FIELDS
         differences = {}
         
         for field in spec_fields:
@@ -0,0 +1,212 @@
+"""
+Result Writer
+
+Streams redundancy analysis results to disk as they are produced:
+- relationships_<timestamp>.jsonl|parquet  (one record per relationship)
+- recommendations_<timestamp>.jsonl|parquet
+- summary_<timestamp>.csv                 (one row per recommendation)
+- statistics_<timestamp>.json
+- features_<timestamp>.jsonl|parquet      (SKILL_ID and metadata fingerprint)
+- changes_<timestamp>.jsonl|parquet       (incremental runs only)
+
+The features file is the feature store incremental runs diff against to
+find added, changed and removed skills (see
+RedundancyAnalyzer.analyze_incremental).
+
+Skill IDs, names, relationship types and other repeated strings are
+dictionary-encoded (see shared.utils.export.StreamingRecordWriter); read
+the files back with shared.utils.export.read_records().
+"""
+
+import csv
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import logging
+
+import pandas as pd
+
+# Repository root, for shared utilities
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+from shared.utils.export import StreamingRecordWriter
+
+try:
+    from .relationship_classifier import SkillRelationship
+except ImportError:
+    from relationship_classifier import SkillRelationship
+
+logger = logging.getLogger(__name__)
+
+RELATIONSHIP_DICTIONARY_COLUMNS = (
+    'skill_a_id', 'skill_b_id', 'skill_a_name', 'skill_b_name',
+    'relationship_type', 'classification_method', 'rule_matched'
+)
+RECOMMENDATION_DICTIONARY_COLUMNS = (
+    'relationship_type', 'action', 'priority', 'rationale', 'specific_steps', 'impact'
+)
+SUMMARY_COLUMNS = [
+    'relationship_id', 'skill_a_id', 'skill_b_id', 'skill_a_name', 'skill_b_name',
+    'relationship_type', 'confidence', 'composite_score', 'recommended_action',
+    'priority', 'priority_score', 'rationale'
+]
+CHANGE_DICTIONARY_COLUMNS = ('change', 'skill_a_id', 'skill_b_id', 'old_type', 'new_type')
+
+
+def relationship_record(relationship: SkillRelationship, include_explanations: bool = True) -> Dict:
+    """
+    Flat record for one relationship.
+
+    Same fields as SkillRelationship.to_dict(), with the similarity scores
+    as top-level columns (structural, ..., composite). The explanation and
+    per-skill metadata are only included with include_explanations.
+    """
+    record = relationship.to_dict()
+    record.update(record.pop('similarity_scores'))
+    if not include_explanations:
+        record.pop('similarity_explanation')
+        record.pop('metadata')
+    return record
+
+
+def skill_fingerprints(metadata_df: pd.DataFrame) -> List[str]:
+    """
+    Hex fingerprint of each skill's metadata row (all columns, by name).
+
+    Any edit to a skill's fields changes its fingerprint; column order and
+    row order do not matter.
+    """
+    columns = sorted(metadata_df.columns)
+    hashes = pd.util.hash_pandas_object(metadata_df[columns].astype(str), index=False)
+    return [f"{h:016x}" for h in hashes.to_numpy()]
+
+
+def result_file(relationships_path: Path, kind: str) -> Optional[Path]:
+    """
+    Sibling result file of the same run, e.g. the features or
+    recommendations file next to relationships_<timestamp>.jsonl.
+    """
+    relationships_path = Path(relationships_path)
+    timestamp = relationships_path.stem[len('relationships_'):]
+    for suffix in ('.jsonl', '.parquet', '.json'):
+        path = relationships_path.with_name(f"{kind}_{timestamp}{suffix}")
+        if path.exists():
+            return path
+    return None
+
+
+class AnalysisResultWriter:
+    """Write relationships, recommendations, summary and statistics files."""
+
+    def __init__(self,
+                 output_dir: Path,
+                 export_format: str = 'jsonl',
+                 include_explanations: bool = True,
+                 batch_size: int = 10000):
+        """
+        Args:
+            output_dir: Directory for the result files
+            export_format: 'jsonl' or 'parquet'
+            include_explanations: Keep similarity explanations and skill
+                metadata in relationship records
+            batch_size: Records per Parquet row group
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.export_format = export_format
+        self.include_explanations = include_explanations
+        self.batch_size = batch_size
+
+        self.relationships = StreamingRecordWriter(
+            self.output_dir / f"relationships_{self.timestamp}", export_format,
+            RELATIONSHIP_DICTIONARY_COLUMNS, batch_size
+        )
+        self.paths: Dict[str, Path] = {'relationships': self.relationships.path}
+
+    def write_relationships(self, relationships: Iterable[SkillRelationship]):
+        """Append relationships as they are produced."""
+        for relationship in relationships:
+            self.relationships.write(relationship_record(relationship, self.include_explanations))
+
+    def write_relationship_records(self, records: Iterable[Dict]):
+        """Append relationship records as read back from an earlier run."""
+        self.relationships.write_many(records)
+
+    def write_features(self, metadata_df: pd.DataFrame):
+        """Write the SKILL_ID -> fingerprint feature store for this run."""
+        with StreamingRecordWriter(self.output_dir / f"features_{self.timestamp}",
+                                   self.export_format, (), self.batch_size) as writer:
+            writer.write_many({'skill_id': str(skill_id), 'fingerprint': fingerprint}
+                              for skill_id, fingerprint in zip(metadata_df['SKILL_ID'],
+                                                               skill_fingerprints(metadata_df)))
+        self.paths['features'] = writer.path
+
+    def write_changes(self, changes: List[Dict]):
+        """Write the change log of an incremental run."""
+        with StreamingRecordWriter(self.output_dir / f"changes_{self.timestamp}",
+                                   self.export_format, CHANGE_DICTIONARY_COLUMNS,
+                                   self.batch_size) as writer:
+            writer.write_many(changes)
+        self.paths['changes'] = writer.path
+        logger.info(f"  Saved {len(changes)} changes to {writer.path}")
+
+    def finish(self,
+               relationships: List[Dict],
+               recommendations: List[Dict],
+               statistics: Dict) -> Dict[str, Path]:
+        """
+        Close the relationship stream and write the remaining files.
+
+        Args:
+            relationships: Records of the relationships that have
+                recommendations (non-DISTINCT)
+            recommendations: Recommendation records in output order
+            statistics: Output of RedundancyAnalyzer._generate_statistics()
+
+        Returns:
+            Dictionary of file paths by kind
+        """
+        self.relationships.close()
+        logger.info(f"  Saved {self.relationships.rows_written} relationships to {self.paths['relationships']}")
+
+        with StreamingRecordWriter(self.output_dir / f"recommendations_{self.timestamp}",
+                                   self.export_format, RECOMMENDATION_DICTIONARY_COLUMNS,
+                                   self.batch_size) as writer:
+            writer.write_many(recommendations)
+        self.paths['recommendations'] = writer.path
+        logger.info(f"  Saved recommendations to {writer.path}")
+
+        # One summary row per recommendation, joined to its relationship
+        by_id = {r['relationship_id']: r for r in relationships}
+        csv_path = self.output_dir / f"summary_{self.timestamp}.csv"
+        with open(csv_path, 'w', newline='') as f:
+            summary = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+            summary.writeheader()
+            for rec in recommendations:
+                rel = by_id[rec['relationship_id']]
+                summary.writerow({
+                    'relationship_id': rel['relationship_id'],
+                    'skill_a_id': rel['skill_a_id'],
+                    'skill_b_id': rel['skill_b_id'],
+                    'skill_a_name': rel['skill_a_name'],
+                    'skill_b_name': rel['skill_b_name'],
+                    'relationship_type': rel['relationship_type'],
+                    'confidence': rel['confidence'],
+                    'composite_score': rel['composite'],
+                    'recommended_action': rec['action'],
+                    'priority': rec['priority'],
+                    'priority_score': rec['priority_score'],
+                    'rationale': rec['rationale']
+                })
+        self.paths['summary'] = csv_path
+        logger.info(f"  Saved summary to {csv_path}")
+
+        stats_path = self.output_dir / f"statistics_{self.timestamp}.json"
+        with open(stats_path, 'w') as f:
+            json.dump(statistics, f, indent=2)
+        self.paths['statistics'] = stats_path
+        logger.info(f"  Saved statistics to {stats_path}")
+
+        return self.paths
@@ -15,15 +15,18 @@ from typing import List, Tuple, Dict
 import argparse
 from dataclasses import dataclass
 import json
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 
 try:
-    from sentence_transformers import SentenceTransformer
-    import torch
     from sklearn.metrics.pairwise import cosine_similarity
-    EMBEDDINGS_AVAILABLE = True
+    from shared.embeddings import EmbeddingStore, embedding_backend_available, load_embedding_backend
+    EMBEDDINGS_AVAILABLE = embedding_backend_available()
 except ImportError:
-    print("Warning: sentence-transformers not installed. Using fallback method.")
     EMBEDDINGS_AVAILABLE = False
+if not EMBEDDINGS_AVAILABLE:
+    print("Warning: sentence-transformers not installed. Using fallback method.")
 
 
 @dataclass
@@ -50,7 +53,8 @@ class SemanticMatcher:
         self.model_name = model_name
         if EMBEDDINGS_AVAILABLE:
             print(f"Loading embedding model: {model_name}")
-            self.model = SentenceTransformer(model_name)
+            self.model = load_embedding_backend(model_name)
+            self.embedding_store = EmbeddingStore(model_name, model=self.model)
             print("Model loaded successfully!")
         else:
             self.model = None
@@ -58,7 +62,7 @@ class SemanticMatcher:
     
     def encode_texts(self, texts: List[str]) -> np.ndarray:
         """
-        Encode texts to embeddings.
+        Encode texts to embeddings (cached in the shared embedding store).
         
         Args:
             texts: List of text strings
@@ -67,7 +71,7 @@ class SemanticMatcher:
             numpy array of embeddings (shape: n_texts x embedding_dim)
         """
         if self.model:
-            return self.model.encode(texts, show_progress_bar=True, convert_to_numpy=True)
+            return self.embedding_store.encode(texts, show_progress_bar=True)
         else:
             # Fallback: return dummy embeddings
             return np.random.rand(len(texts), 384)
@@ -29,16 +29,17 @@ import sys
 
 # Import our spaCy processor
 sys.path.insert(0, str(Path(__file__).parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
 from spacy_processor import SkillProcessor
 
 try:
-    from sentence_transformers import SentenceTransformer
-    import torch
     from sklearn.metrics.pairwise import cosine_similarity
-    EMBEDDINGS_AVAILABLE = True
+    from shared.embeddings import EmbeddingStore, embedding_backend_available, load_embedding_backend
+    EMBEDDINGS_AVAILABLE = embedding_backend_available()
 except ImportError:
-    print("Warning: sentence-transformers not installed. Using fallback method.")
     EMBEDDINGS_AVAILABLE = False
+if not EMBEDDINGS_AVAILABLE:
+    print("Warning: sentence-transformers not installed. Using fallback method.")
 
 
 @dataclass
@@ -89,7 +90,8 @@ class EnhancedSemanticMatcher:
         # Initialize embedding model
         if EMBEDDINGS_AVAILABLE:
             print(f"Loading embedding model: {model_name}")
-            self.model = SentenceTransformer(model_name)
+            self.model = load_embedding_backend(model_name)
+            self.embedding_store = EmbeddingStore(model_name, model=self.model)
             print("✓ Model loaded successfully!")
         else:
             self.model = None
@@ -136,7 +138,8 @@ class EnhancedSemanticMatcher:
     
     def encode_texts(self, texts: List[str]) -> np.ndarray:
         """
-        Encode texts to embeddings (after spaCy preprocessing).
+        Encode texts to embeddings (after spaCy preprocessing), cached in
+        the shared embedding store.
         
         Args:
             texts: Preprocessed text strings
@@ -145,7 +148,7 @@ class EnhancedSemanticMatcher:
             numpy array of embeddings
         """
         if self.model:
-            return self.model.encode(texts, show_progress_bar=True, convert_to_numpy=True)
+            return self.embedding_store.encode(texts, show_progress_bar=True)
         else:
             # Fallback: random embeddings
             return np.random.rand(len(texts), 384)
@@ -242,6 +245,21 @@ class EnhancedSemanticMatcher:
         print(f"Computing semantic similarities...")
         semantic_similarities = cosine_similarity(query_embeddings, target_embeddings)
         
+        # Get top-k*2 semantic matches per query (then re-rank)
+        top_indices_all = np.argsort(semantic_similarities, axis=1)[:, -(top_k * 2):][:, ::-1]
+        
+        # Structural similarity (optional, slower): parse every text once and
+        # score all query×candidate pairs in a single vectorized pass
+        structural_all = np.zeros(top_indices_all.shape)
+        if include_structural and self.use_spacy and self.spacy_processor:
+            print("Scoring structural similarity for top candidates...")
+            query_features = self.spacy_processor.build_structural_features(query_texts)
+            target_features = self.spacy_processor.build_structural_features(target_texts)
+            left_idx = np.repeat(np.arange(len(top_indices_all)), top_indices_all.shape[1])
+            structural_all = self.spacy_processor.compare_structural_features(
+                query_features, target_features, left_idx, top_indices_all.ravel()
+            )['structural_similarity'].reshape(top_indices_all.shape)
+        
         all_matches = []
         
         print(f"Finding top-{top_k} enhanced matches for each skill...")
@@ -252,24 +270,15 @@ class EnhancedSemanticMatcher:
             iterator = enumerate(semantic_similarities)
         
         for i, query_sims in iterator:
-            # Get top-k*2 semantic matches (then re-rank)
-            top_indices = np.argsort(query_sims)[-(top_k * 2):][::-1]
-            
             candidates = []
-            for idx in top_indices:
+            for rank_idx, idx in enumerate(top_indices_all[i]):
                 # Calculate concept overlap
                 concept_overlap = self.calculate_concept_overlap(
                     query_concepts[i],
                     target_concepts[idx]
                 )
                 
-                # Calculate structural similarity (optional, slower)
-                structural_sim = 0.0
-                if include_structural:
-                    structural_sim = self.calculate_structural_similarity(
-                        query_texts[i],
-                        target_texts[idx]
-                    )
+                structural_sim = float(structural_all[i, rank_idx])
                 
                 # Combined score (weighted average)
                 semantic_score = float(query_sims[idx])
@@ -8,16 +8,31 @@ Calculates similarity across four dimensions:
 4. Contextual (specifications: grade, scope, support)
 
 Each dimension is explainable and contributes to a composite score.
+
+With min_composite, calculate_similarity() scores the cheap dimensions
+first and stops once an upper bound on the composite (remaining weights at
+full score plus the largest boost) cannot reach it. Evidence strings can be
+deferred until SimilarityScore.explain() is called.
 """
 
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple, Optional, Set
+from typing import Callable, Dict, List, Tuple, Optional, Set
 from dataclasses import dataclass, field
+import sys
 import yaml
 from pathlib import Path
 import logging
 
+try:
+    from .candidate_generator import TermSetIndex
+except ImportError:
+    from candidate_generator import TermSetIndex
+
+# Repository root, for shared utilities
+sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent))
+from shared.embeddings import blocked_cosine_similarity, QuantizedEmbeddings, quantized_cosine_similarity
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -43,27 +58,85 @@ class SimilarityScore:
     weights: Dict[str, float] = field(default_factory=dict)
     evidence: List[str] = field(default_factory=list)
     
+    # Deferred evidence (lazy_evidence=True); see explain()
+    evidence_builder: Optional[Callable[[], List[str]]] = field(default=None, repr=False, compare=False)
+    
+    def explain(self) -> List[str]:
+        """
+        Build deferred evidence and return it.
+        
+        The evidence list is filled in place, so explanations that already
+        reference it (e.g. a SkillRelationship's) see the strings too.
+        """
+        if self.evidence_builder is not None:
+            self.evidence.extend(self.evidence_builder())
+            self.evidence_builder = None
+        return self.evidence
+    
+    def scores_dict(self) -> Dict[str, float]:
+        """Dimension and composite scores as floats."""
+        return {
+            'structural': float(self.structural),
+            'educational': float(self.educational),
+            'semantic': float(self.semantic),
+            'contextual': float(self.contextual),
+            'composite': float(self.composite)
+        }
+    
+    def components_dict(self) -> Dict[str, Dict[str, float]]:
+        """Dimension components as floats."""
+        return {
+            'structural': {k: float(v) for k, v in self.structural_components.items()},
+            'educational': {k: float(v) for k, v in self.educational_components.items()},
+            'contextual': {k: float(v) for k, v in self.contextual_components.items()}
+        }
+    
     def to_dict(self) -> Dict:
         """Convert to dictionary for serialization."""
         return {
             'skill_pair': list(self.skill_pair),
-            'scores': {
-                'structural': float(self.structural),
-                'educational': float(self.educational),
-                'semantic': float(self.semantic),
-                'contextual': float(self.contextual),
-                'composite': float(self.composite)
-            },
-            'components': {
-                'structural': {k: float(v) for k, v in self.structural_components.items()},
-                'educational': {k: float(v) for k, v in self.educational_components.items()},
-                'contextual': {k: float(v) for k, v in self.contextual_components.items()}
-            },
+            'scores': self.scores_dict(),
+            'components': self.components_dict(),
             'weights': {k: float(v) for k, v in self.weights.items()},
-            'evidence': self.evidence
+            'evidence': self.explain()
         }
 
 
+@dataclass
+class SkillFeatureTable:
+    """
+    Skills pre-encoded for batch similarity scoring.
+    
+    Row k describes metadata_df.iloc[k]. Equality codes come from
+    pd.factorize (-1 = missing, never equal to anything); ordinal and grade
+    columns hold positions in the configured level lists (-1 / -999 when
+    unknown); list fields are CSR term sets.
+    """
+    skill_ids: np.ndarray
+    
+    # Structural term sets
+    actions: TermSetIndex
+    targets: TermSetIndex
+    key_concepts: TermSetIndex
+    
+    # Educational
+    cognitive_demand: np.ndarray
+    task_complexity: np.ndarray  # index in complexity_levels, -1 if unknown
+    skill_domain: np.ndarray
+    text_type: TermSetIndex
+    
+    # Contextual
+    grade_number: np.ndarray     # grade_mapping value, -999 if unmapped
+    grade_short: np.ndarray      # equality code of GRADE_LEVEL_SHORT_NAME (boost)
+    scope: np.ndarray
+    support_level: np.ndarray
+    support_empty: np.ndarray    # bool, support level missing/blank
+    support_group: np.ndarray    # compatible-terminology group, -1 if none
+    
+    def __len__(self) -> int:
+        return len(self.skill_ids)
+
+
 class SimilarityEngine:
     """
     Multi-dimensional similarity calculator for skills.
@@ -72,6 +145,9 @@ class SimilarityEngine:
     to produce explainable composite similarity scores.
     """
     
+    # Relative composite boosts (see _calculate_boost_factors)
+    BOOST_FACTORS = {'exact_structural_match': 0.05, 'same_grade_high_sim': 0.03}
+    
     def __init__(self, config_path: Optional[Path] = None):
         """
         Initialize similarity engine.
@@ -99,7 +175,9 @@ class SimilarityEngine:
                            skill_a: pd.Series,
                            skill_b: pd.Series,
                            semantic_similarity: Optional[float] = None,
-                           adaptive_mode: Optional[str] = None) -> SimilarityScore:
+                           adaptive_mode: Optional[str] = None,
+                           min_composite: Optional[float] = None,
+                           lazy_evidence: bool = False) -> Optional[SimilarityScore]:
         """
         Calculate multi-dimensional similarity between two skills.
         
@@ -108,24 +186,37 @@ class SimilarityEngine:
             skill_b: Second skill with metadata
             semantic_similarity: Pre-computed semantic similarity (optional)
             adaptive_mode: Use adaptive weights for specific use case
+            min_composite: Stop early and return None when the composite
+                cannot reach this value. Semantic, contextual and educational
+                scores come first; structural (the costliest) is only
+                computed if their upper bound still reaches min_composite
+            lazy_evidence: Defer evidence strings until score.explain()
             
         Returns:
-            SimilarityScore with all dimensions and explanations
+            SimilarityScore with all dimensions and explanations, or None
+            if stopped early by min_composite
         """
-        # Calculate each dimension
-        structural, struct_comp = self._calculate_structural_similarity(skill_a, skill_b)
-        educational, edu_comp = self._calculate_educational_similarity(skill_a, skill_b)
-        contextual, ctx_comp = self._calculate_contextual_similarity(skill_a, skill_b)
-        
-        # Use provided semantic similarity or calculate placeholder
-        semantic = semantic_similarity if semantic_similarity is not None else 0.0
-        
         # Get weights (adaptive or default)
         if adaptive_mode and adaptive_mode in self.config['adaptive_weights']:
             weights = self.config['adaptive_weights'][adaptive_mode]
         else:
             weights = self.weights
         
+        # Cheap dimensions first: precomputed semantic, then metadata matches
+        semantic = semantic_similarity if semantic_similarity is not None else 0.0
+        contextual, ctx_comp = self._calculate_contextual_similarity(skill_a, skill_b)
+        educational, edu_comp = self._calculate_educational_similarity(skill_a, skill_b)
+        
+        if min_composite is not None:
+            # Upper bound: structural at 1.0 and every boost applied
+            bound = (weights['structural'] + weights['educational'] * educational +
+                     weights['semantic'] * semantic + weights['contextual'] * contextual)
+            bound = min(1.0, bound * (1.0 + sum(self.BOOST_FACTORS.values())))
+            if bound < min_composite - 1e-9:
+                return None
+        
+        structural, struct_comp = self._calculate_structural_similarity(skill_a, skill_b)
+        
         # Calculate composite score
         composite = (
             weights['structural'] * structural +
@@ -140,12 +231,9 @@ class SimilarityEngine:
         if boost_factors:
             composite = min(1.0, composite * (1.0 + sum(boost_factors.values())))
         
-        # Generate evidence
-        evidence = self._generate_evidence(
-            skill_a, skill_b,
-            struct_comp, edu_comp, ctx_comp,
-            structural, educational, semantic, contextual
-        )
+        # Generate evidence (now, or when explain() is called)
+        evidence_args = (skill_a, skill_b, struct_comp, edu_comp, ctx_comp,
+                         structural, educational, semantic, contextual)
         
         return SimilarityScore(
             skill_pair=(skill_a['SKILL_ID'], skill_b['SKILL_ID']),
@@ -158,7 +246,8 @@ class SimilarityEngine:
             educational_components=edu_comp,
             contextual_components=ctx_comp,
             weights=weights,
-            evidence=evidence
+            evidence=[] if lazy_evidence else self._generate_evidence(*evidence_args),
+            evidence_builder=(lambda: self._generate_evidence(*evidence_args)) if lazy_evidence else None
         )
     
     def _calculate_structural_similarity(self,
@@ -373,13 +462,13 @@ class SimilarityEngine:
         
         # Exact structural match
         if structural >= 0.95:
-            boosts['exact_structural_match'] = 0.05
+            boosts['exact_structural_match'] = self.BOOST_FACTORS['exact_structural_match']
         
         # Same grade + high similarity
         grade_a = skill_a.get('GRADE_LEVEL_SHORT_NAME', '')
         grade_b = skill_b.get('GRADE_LEVEL_SHORT_NAME', '')
         if grade_a == grade_b and semantic >= 0.85:
-            boosts['same_grade_high_sim'] = 0.03
+            boosts['same_grade_high_sim'] = self.BOOST_FACTORS['same_grade_high_sim']
         
         # Cross-state variant (different states, high similarity)
         # Note: Would need state field in metadata
@@ -445,6 +534,265 @@ class SimilarityEngine:
         
         return evidence
     
+    # Support level terminology treated as compatible (see _support_compatibility)
+    COMPATIBLE_SUPPORT = [
+        {'with_support', 'with_prompting', 'with_scaffolding'},
+        {'independent', 'independently', 'without_support'}
+    ]
+    
+    def encode_features(self, metadata_df: pd.DataFrame) -> SkillFeatureTable:
+        """
+        Pre-encode skills once for batch_score().
+        
+        Args:
+            metadata_df: DataFrame with enhanced metadata
+            
+        Returns:
+            SkillFeatureTable aligned with metadata_df rows
+        """
+        def column(name: str) -> pd.Series:
+            # Series.get(name, '') semantics: a missing column reads as ''
+            if name in metadata_df.columns:
+                return metadata_df[name]
+            return pd.Series([''] * len(metadata_df), index=metadata_df.index, dtype=object)
+        
+        def equality_codes(name: str) -> np.ndarray:
+            codes, _ = pd.factorize(column(name), use_na_sentinel=True)
+            return codes
+        
+        complexity_index = {}
+        for k, level in enumerate(self.complexity_levels):
+            complexity_index.setdefault(level, k)  # list.index() keeps the first
+        grades = [short if short else name for short, name in
+                  zip(column('GRADE_LEVEL_SHORT_NAME'), column('GRADE_LEVEL_NAME'))]
+        support = column('support_level').tolist()
+        
+        def support_group(value) -> int:
+            for k, group in enumerate(self.COMPATIBLE_SUPPORT):
+                if isinstance(value, str) and value in group:
+                    return k
+            return -1
+        
+        return SkillFeatureTable(
+            skill_ids=column('SKILL_ID').to_numpy(),
+            actions=TermSetIndex(column('actions')),
+            targets=TermSetIndex(column('targets')),
+            key_concepts=TermSetIndex(column('key_concepts')),
+            cognitive_demand=equality_codes('cognitive_demand'),
+            task_complexity=np.array([complexity_index.get(v, -1) for v in column('task_complexity')],
+                                     dtype=np.int64),
+            skill_domain=equality_codes('skill_domain'),
+            text_type=TermSetIndex(column('text_type')),
+            grade_number=np.array([self.grade_mapping.get(g, -999) for g in grades], dtype=np.int64),
+            grade_short=equality_codes('GRADE_LEVEL_SHORT_NAME'),
+            scope=equality_codes('scope'),
+            support_level=equality_codes('support_level'),
+            support_empty=np.array([not v for v in support], dtype=bool),
+            support_group=np.array([support_group(v) for v in support], dtype=np.int64)
+        )
+    
+    def batch_score(self,
+                    features: SkillFeatureTable,
+                    left: np.ndarray,
+                    right: np.ndarray,
+                    semantic_similarities: Optional[np.ndarray] = None,
+                    adaptive_mode: Optional[str] = None,
+                    min_composite: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        Score many pairs at once; same numbers as calculate_similarity().
+        
+        Evidence strings are not built here; see similarity_from_batch().
+        
+        Args:
+            features: Output of encode_features()
+            left: Row positions of the first skill of each pair
+            right: Row positions of the second skill of each pair
+            semantic_similarities: Optional per-pair semantic similarity
+            adaptive_mode: Use adaptive weights for specific use case
+            min_composite: Skip structural scoring for pairs whose composite
+                upper bound (as in calculate_similarity) cannot reach it;
+                their structural scores and composite are NaN
+            
+        Returns:
+            Dict of per-pair arrays: structural, educational, semantic,
+            contextual, composite, each dimension component, and 'bounded'
+            (True where structural scoring was skipped)
+        """
+        left = np.asarray(left, dtype=np.int64)
+        right = np.asarray(right, dtype=np.int64)
+        
+        def equal(codes: np.ndarray) -> np.ndarray:
+            return ((codes[left] == codes[right]) & (codes[left] >= 0)).astype(float)
+        
+        if adaptive_mode and adaptive_mode in self.config['adaptive_weights']:
+            weights = self.config['adaptive_weights'][adaptive_mode]
+        else:
+            weights = self.weights
+        
+        # Semantic
+        if semantic_similarities is not None:
+            semantic = np.asarray(semantic_similarities, dtype=np.float64)
+        else:
+            semantic = np.zeros(len(left))
+        
+        # Educational
+        ew = self.educational_weights
+        cognitive_match = equal(features.cognitive_demand)
+        task_a, task_b = features.task_complexity[left], features.task_complexity[right]
+        max_distance = len(self.complexity_levels) - 1
+        if max_distance > 0:
+            task_match = 1.0 - (np.abs(task_a - task_b) / max_distance)
+        else:
+            task_match = np.ones(len(left))
+        task_match = np.where((task_a >= 0) & (task_b >= 0), task_match, 0.0)
+        domain_match = equal(features.skill_domain)
+        text_type_match = features.text_type.jaccard(left, right)
+        educational = (
+            ew['cognitive_demand'] * cognitive_match +
+            ew['task_complexity'] * task_match +
+            ew['skill_domain'] * domain_match +
+            ew['text_type'] * text_type_match
+        )
+        
+        # Contextual
+        cw = self.contextual_weights
+        grade_a, grade_b = features.grade_number[left], features.grade_number[right]
+        distance = np.abs(grade_a - grade_b)
+        grade_compat = np.select(
+            [distance == 0, distance == 1],
+            [1.0, 0.5],
+            np.maximum(0.0, 0.5 - (distance - 1) * 0.1)
+        )
+        grade_compat = np.where((grade_a == -999) | (grade_b == -999), 0.0, grade_compat)
+        scope_match = equal(features.scope)
+        group_a, group_b = features.support_group[left], features.support_group[right]
+        support_compat = np.select(
+            [features.support_empty[left] | features.support_empty[right],
+             equal(features.support_level) == 1.0,
+             (group_a == group_b) & (group_a >= 0)],
+            [0.5, 1.0, 0.7],
+            0.0
+        )
+        contextual = (
+            cw['grade_compatibility'] * grade_compat +
+            cw['scope_match'] * scope_match +
+            cw['support_compatibility'] * support_compat
+        )
+        
+        # Structural (the costliest), only where the composite can still
+        # reach min_composite with structural at 1.0 and every boost
+        bounded = np.zeros(len(left), dtype=bool)
+        if min_composite is not None:
+            bound = (weights['structural'] + weights['educational'] * educational +
+                     weights['semantic'] * semantic + weights['contextual'] * contextual)
+            bound = np.minimum(1.0, bound * (1.0 + sum(self.BOOST_FACTORS.values())))
+            bounded = bound < min_composite - 1e-9
+        scored = ~bounded
+        
+        def jaccard(index: TermSetIndex) -> np.ndarray:
+            values = np.full(len(left), np.nan)
+            values[scored] = index.jaccard(left[scored], right[scored])
+            return values
+        
+        sw = self.structural_weights
+        action_match = jaccard(features.actions)
+        target_overlap = jaccard(features.targets)
+        concept_similarity = jaccard(features.key_concepts)
+        structural = (
+            sw['action_match'] * action_match +
+            sw['target_overlap'] * target_overlap +
+            sw['concept_similarity'] * concept_similarity
+        )
+        
+        # Composite
+        composite = (
+            weights['structural'] * structural +
+            weights['educational'] * educational +
+            weights['semantic'] * semantic +
+            weights['contextual'] * contextual
+        )
+        
+        # Boost factors (same conditions as _calculate_boost_factors)
+        exact_structural = structural >= 0.95
+        same_grade_high_sim = (equal(features.grade_short) == 1.0) & (semantic >= 0.85)
+        boost = (np.where(exact_structural, self.BOOST_FACTORS['exact_structural_match'], 0.0) +
+                 np.where(same_grade_high_sim, self.BOOST_FACTORS['same_grade_high_sim'], 0.0))
+        boosted = exact_structural | same_grade_high_sim
+        composite = np.where(boosted, np.minimum(1.0, composite * (1.0 + boost)), composite)
+        
+        return {
+            'structural': structural,
+            'educational': educational,
+            'semantic': semantic,
+            'contextual': contextual,
+            'composite': composite,
+            'action_match': action_match,
+            'target_overlap': target_overlap,
+            'concept_similarity': concept_similarity,
+            'cognitive_demand_match': cognitive_match,
+            'task_complexity_match': task_match,
+            'skill_domain_match': domain_match,
+            'text_type_match': text_type_match,
+            'grade_compatibility': grade_compat,
+            'scope_match': scope_match,
+            'support_compatibility': support_compat,
+            'bounded': bounded
+        }
+    
+    def similarity_from_batch(self,
+                              scores: Dict[str, np.ndarray],
+                              k: int,
+                              skill_a: pd.Series,
+                              skill_b: pd.Series,
+                              adaptive_mode: Optional[str] = None,
+                              lazy_evidence: bool = False) -> SimilarityScore:
+        """
+        SimilarityScore for pair k of a batch_score() result.
+        
+        Equal to calculate_similarity() for the pair, without re-scoring;
+        only the evidence strings are built (now or on explain()).
+        
+        Args:
+            scores: Output of batch_score()
+            k: Pair position in the batch
+            skill_a: First skill of the pair (row left[k])
+            skill_b: Second skill of the pair (row right[k])
+            adaptive_mode: Mode the batch was scored with
+            lazy_evidence: Defer evidence strings until score.explain()
+        """
+        if adaptive_mode and adaptive_mode in self.config['adaptive_weights']:
+            weights = self.config['adaptive_weights'][adaptive_mode]
+        else:
+            weights = self.weights
+        
+        def components(names: List[str]) -> Dict[str, float]:
+            return {name: float(scores[name][k]) for name in names}
+        
+        struct_comp = components(['action_match', 'target_overlap', 'concept_similarity'])
+        edu_comp = components(['cognitive_demand_match', 'task_complexity_match',
+                               'skill_domain_match', 'text_type_match'])
+        ctx_comp = components(['grade_compatibility', 'scope_match', 'support_compatibility'])
+        structural, educational, semantic, contextual = (
+            float(scores[name][k]) for name in ('structural', 'educational', 'semantic', 'contextual')
+        )
+        evidence_args = (skill_a, skill_b, struct_comp, edu_comp, ctx_comp,
+                         structural, educational, semantic, contextual)
+        
+        return SimilarityScore(
+            skill_pair=(skill_a['SKILL_ID'], skill_b['SKILL_ID']),
+            structural=structural,
+            educational=educational,
+            semantic=semantic,
+            contextual=contextual,
+            composite=float(scores['composite'][k]),
+            structural_components=struct_comp,
+            educational_components=edu_comp,
+            contextual_components=ctx_comp,
+            weights=weights,
+            evidence=[] if lazy_evidence else self._generate_evidence(*evidence_args),
+            evidence_builder=(lambda: self._generate_evidence(*evidence_args)) if lazy_evidence else None
+        )
+    
     def batch_calculate_similarities(self,
                                      skill_pairs: List[Tuple[pd.Series, pd.Series]],
                                      semantic_similarities: Optional[np.ndarray] = None) -> List[SimilarityScore]:
@@ -481,6 +829,9 @@ def calculate_semantic_similarity_matrix(embeddings: np.ndarray) -> np.ndarray:
     """
     Calculate pairwise cosine similarity matrix from embeddings.
     
+    Builds the dense n x n matrix; for large catalogs use
+    calculate_sparse_semantic_similarity_matrix().
+    
     Args:
         embeddings: numpy array of shape (n_skills, embedding_dim)
         
@@ -491,6 +842,40 @@ def calculate_semantic_similarity_matrix(embeddings: np.ndarray) -> np.ndarray:
     return cosine_similarity(embeddings)
 
 
+def calculate_sparse_semantic_similarity_matrix(embeddings,
+                                                top_k: Optional[int] = 50,
+                                                threshold: Optional[float] = None,
+                                                block_size: int = 2048,
+                                                full_precision: Optional[np.ndarray] = None,
+                                                rescore_factor: int = 4):
+    """
+    Calculate sparse pairwise cosine similarity from embeddings.
+    
+    Computed in float32 tiles; only each skill's top_k neighbours and/or
+    pairs >= threshold are kept, so the n x n matrix is never built.
+    QuantizedEmbeddings are scored in quantized form; with full_precision
+    the candidates are re-scored exactly.
+    
+    Args:
+        embeddings: numpy array of shape (n_skills, embedding_dim) or QuantizedEmbeddings
+        top_k: Neighbours kept per skill (None = no limit)
+        threshold: Minimum similarity kept (None = no minimum)
+        block_size: Tile edge for the blocked computation
+        full_precision: Float embeddings for re-scoring quantized candidates
+        rescore_factor: Quantized candidates per kept neighbour
+        
+    Returns:
+        scipy CSR matrix of shape (n_skills, n_skills), diagonal excluded
+    """
+    if isinstance(embeddings, QuantizedEmbeddings):
+        return quantized_cosine_similarity(embeddings, top_k=top_k, threshold=threshold,
+                                           full_precision=full_precision,
+                                           rescore_factor=rescore_factor,
+                                           block_size=block_size)
+    return blocked_cosine_similarity(embeddings, top_k=top_k, threshold=threshold,
+                                     block_size=block_size)
+
+
 if __name__ == "__main__":
     # Simple test
     print("Similarity Engine Test")
@@ -0,0 +1,206 @@
+"""
+Tests for the persistent ANN index.
+
+IVF search is checked for recall against exact (brute-force) cosine
+search; both backends are checked for deletes, key replacement and
+save/load, including rebuilding a saved HNSW index as IVF.
+
+Usage:
+    pytest tests/test_ann_index.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared.embeddings import ann_index
+from shared.embeddings.ann_index import ANNIndex, HNSWLIB_AVAILABLE
+from shared.embeddings.similarity import normalize_embeddings
+
+
+DIM = 16
+METHODS = ['ivf', pytest.param('hnsw', marks=pytest.mark.skipif(
+    not HNSWLIB_AVAILABLE, reason='hnswlib not installed'))]
+
+
+def _clustered(rng, n, n_clusters=20, spread=0.3):
+    """Vectors around random cluster centres, like embeddings of related skills."""
+    centres = rng.normal(size=(n_clusters, DIM))
+    return centres[rng.integers(n_clusters, size=n)] + spread * rng.normal(size=(n, DIM))
+
+
+def brute_force_search(keys, vectors, queries, top_k):
+    """Exact cosine top-k over all vectors."""
+    scores = normalize_embeddings(queries) @ normalize_embeddings(vectors).T
+    order = np.argsort(-scores, axis=1, kind='stable')[:, :top_k]
+    return [[keys[j] for j in row] for row in order]
+
+
+def _keys(n, prefix='S'):
+    return [f"{prefix}{i}" for i in range(n)]
+
+
+@pytest.mark.parametrize('nprobe, min_recall', [(8, 0.8), (32, 0.98)])
+def test_ivf_recall_against_brute_force(nprobe, min_recall):
+    rng = np.random.default_rng(0)
+    vectors = _clustered(rng, 3000)
+    queries = _clustered(rng, 100)
+    keys = _keys(len(vectors))
+
+    index = ANNIndex(DIM, method='ivf', min_train_size=1000, nprobe=nprobe)
+    index.add(keys, vectors)
+    assert index._centroids is not None  # Trained, so this is not an exhaustive scan
+
+    top_k = 10
+    expected = brute_force_search(keys, vectors, queries, top_k)
+    results = index.search(queries, top_k=top_k)
+
+    hits = sum(len({key for key, _ in result} & set(truth))
+               for result, truth in zip(results, expected))
+    assert hits / (top_k * len(queries)) >= min_recall
+
+    # Reported scores are exact cosines, best first
+    normalized = normalize_embeddings(vectors)
+    rows = {key: row for row, key in enumerate(keys)}
+    for query, result in zip(normalize_embeddings(queries), results):
+        scores = [score for _, score in result]
+        assert scores == sorted(scores, reverse=True)
+        for key, score in result:
+            assert score == pytest.approx(float(normalized[rows[key]] @ query), abs=1e-5)
+
+
+def test_ivf_with_all_lists_probed_is_exact():
+    rng = np.random.default_rng(1)
+    vectors = _clustered(rng, 500)
+    queries = _clustered(rng, 20)
+    keys = _keys(len(vectors))
+
+    index = ANNIndex(DIM, method='ivf', min_train_size=100, n_lists=10, nprobe=10)
+    index.add(keys, vectors)
+
+    results = index.search(queries, top_k=5)
+    assert [[key for key, _ in result] for result in results] == \
+        brute_force_search(keys, vectors, queries, 5)
+
+
+@pytest.mark.parametrize('method', METHODS)
+@pytest.mark.parametrize('min_train_size', [100, 10_000])
+def test_removed_keys_never_return(method, min_train_size):
+    rng = np.random.default_rng(2)
+    vectors = _clustered(rng, 600)
+    keys = _keys(len(vectors))
+    index = ANNIndex(DIM, method=method, min_train_size=min_train_size)
+    index.add(keys, vectors)
+
+    removed = set(keys[::3])
+    assert index.remove(list(removed) + ['unknown']) == len(removed)
+    assert index.remove(removed) == 0
+    assert len(index) == len(keys) - len(removed)
+    assert not any(key in index for key in removed)
+    assert set(index.keys) == set(keys) - removed
+
+    # Querying with the removed vectors themselves must not find them
+    results = index.search(vectors[::3], top_k=20)
+    assert all(key not in removed for result in results for key, _ in result)
+
+    # Removing everything leaves an empty but usable index
+    index.remove(index.keys)
+    assert index.search(vectors[:2], top_k=5) == [[], []]
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_replacing_a_key_keeps_one_entry(method):
+    rng = np.random.default_rng(3)
+    vectors = _clustered(rng, 200)
+    keys = _keys(len(vectors))
+    index = ANNIndex(DIM, method=method, min_train_size=100)
+    index.add(keys, vectors)
+
+    replacement = rng.normal(size=(1, DIM))
+    index.add(['S5'], replacement)
+
+    assert len(index) == len(keys)
+    assert index.keys.count('S5') == 1
+    assert np.allclose(index.get_vector('S5'), normalize_embeddings(replacement)[0], atol=1e-6)
+
+    best_key, best_score = index.search(replacement, top_k=1)[0][0]
+    assert best_key == 'S5' and best_score == pytest.approx(1.0, abs=1e-5)
+    # The old vector no longer finds S5 as an exact match
+    old = index.search(vectors[5], top_k=len(index))[0]
+    assert dict(old)['S5'] < 0.999
+
+
+def test_add_rejects_bad_input():
+    index = ANNIndex(DIM, method='ivf')
+    with pytest.raises(ValueError):
+        index.add(['a', 'b'], np.ones((3, DIM)))
+    with pytest.raises(ValueError):
+        index.add(['a', 'a'], np.ones((2, DIM)))
+
+
+@pytest.mark.parametrize('method', METHODS)
+def test_save_load_round_trip(tmp_path, method):
+    rng = np.random.default_rng(4)
+    vectors = _clustered(rng, 800)
+    keys = _keys(len(vectors))
+    index = ANNIndex(DIM, method=method, min_train_size=300)
+    index.add(keys, vectors)
+    index.remove(keys[:50])
+    index.metadata = {'model': 'stub'}
+    queries = _clustered(rng, 30)
+    before = index.search(queries, top_k=10)
+
+    index.save(tmp_path / 'index')
+    loaded = ANNIndex.load(tmp_path / 'index')
+
+    assert loaded.method == method
+    assert loaded.metadata == {'model': 'stub'}
+    assert loaded.keys == index.keys
+    assert [[key for key, _ in result] for result in loaded.search(queries, top_k=10)] == \
+        [[key for key, _ in result] for result in before]
+
+    # The loaded index keeps accepting updates
+    loaded.add(['new'], queries[:1])
+    loaded.remove(['S60'])
+    assert loaded.search(queries[:1], top_k=1)[0][0][0] == 'new'
+    assert 'S60' not in loaded and len(loaded) == len(index)
+
+
+@pytest.mark.skipif(not HNSWLIB_AVAILABLE, reason='hnswlib not installed')
+def test_saved_hnsw_index_is_rebuilt_as_ivf_without_hnswlib(tmp_path, monkeypatch):
+    rng = np.random.default_rng(5)
+    vectors = _clustered(rng, 400)
+    keys = _keys(len(vectors))
+    index = ANNIndex(DIM, method='hnsw')
+    index.add(keys, vectors)
+    index.remove(keys[:40])
+    index.save(tmp_path / 'index')
+
+    monkeypatch.setattr(ann_index, 'HNSWLIB_AVAILABLE', False)
+    loaded = ANNIndex.load(tmp_path / 'index')
+
+    assert loaded.method == 'ivf'
+    assert set(loaded.keys) == set(keys[40:])
+    queries = _clustered(rng, 20)
+    # Below min_train_size the rebuilt IVF index searches exhaustively
+    assert [[key for key, _ in result] for result in loaded.search(queries, top_k=5)] == \
+        brute_force_search(keys[40:], vectors[40:], queries, 5)
+
+
+@pytest.mark.skipif(not HNSWLIB_AVAILABLE, reason='hnswlib not installed')
+def test_load_as_other_method_rebuilds(tmp_path):
+    rng = np.random.default_rng(6)
+    vectors = _clustered(rng, 300)
+    keys = _keys(len(vectors))
+    index = ANNIndex(DIM, method='ivf', min_train_size=100)
+    index.add(keys, vectors)
+    index.remove(keys[-10:])
+    index.save(tmp_path / 'index')
+
+    loaded = ANNIndex.load(tmp_path / 'index', method='hnsw')
+    assert loaded.method == 'hnsw'
+    assert set(loaded.keys) == set(keys[:-10])
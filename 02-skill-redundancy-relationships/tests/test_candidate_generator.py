@@ -0,0 +1,98 @@
+"""
+Parity tests for the inverted-index structural prefilter.
+
+InvertedIndexBlocker must return the same candidate pairs as comparing
+every pair with the quick structural score (mean of action and target
+Jaccard), which is what the analyzer did before blocking.
+
+Usage:
+    pytest tests/test_candidate_generator.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'detectors'))
+
+from candidate_generator import InvertedIndexBlocker, parse_term_set
+
+
+ACTIONS = ['identify', 'describe', 'compare', 'explain', 'use', 'Read', 'write']
+TARGETS = ['main idea', 'character', 'text', 'details', 'theme', 'words', 'Setting']
+
+
+def _field(rng, vocab):
+    kind = rng.integers(6)
+    if kind == 0:
+        return np.nan
+    if kind == 1:
+        return ''
+    terms = rng.choice(vocab, size=rng.integers(1, 4), replace=False)
+    separator = ', ' if kind == 2 else '|'
+    return separator.join(terms)
+
+
+def _catalog(seed: int, n: int = 120) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'SKILL_ID': [f"S{i}" for i in range(n)],
+        'actions': [_field(rng, ACTIONS) for _ in range(n)],
+        'targets': [_field(rng, TARGETS) for _ in range(n)],
+    })
+
+
+def _jaccard(set_a, set_b):
+    if not set_a or not set_b:
+        return 0.0
+    return len(set_a & set_b) / len(set_a | set_b)
+
+
+def brute_force_pairs(metadata_df, threshold, max_per_skill):
+    """The analyzer's former all-pairs prefilter loop (without max_pairs)."""
+    actions = [parse_term_set(v) for v in metadata_df['actions']]
+    targets = [parse_term_set(v) for v in metadata_df['targets']]
+
+    candidate_pairs = []
+    for i in range(len(metadata_df)):
+        if not actions[i] or not targets[i]:
+            continue
+        candidates_for_i = []
+        for j in range(i + 1, len(metadata_df)):
+            if not actions[j] or not targets[j]:
+                continue
+            quick_struct = (_jaccard(actions[i], actions[j]) + _jaccard(targets[i], targets[j])) / 2
+            if quick_struct >= threshold:
+                candidates_for_i.append((j, quick_struct))
+        candidates_for_i.sort(key=lambda x: x[1], reverse=True)
+        candidate_pairs.extend((i, j) for j, _ in candidates_for_i[:max_per_skill])
+    return candidate_pairs
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('threshold, max_per_skill', [(0.3, 10), (0.5, 3), (0.75, 100), (0.0, 5)])
+def test_blocker_matches_brute_force(seed, threshold, max_per_skill):
+    metadata_df = _catalog(seed)
+    expected = brute_force_pairs(metadata_df, threshold, max_per_skill)
+
+    blocker = InvertedIndexBlocker(metadata_df, block_size=16)
+    pairs = blocker.candidate_pairs(threshold, max_per_skill)
+
+    assert len(pairs) == len(set(pairs))
+    assert set(pairs) == set(expected)
+
+
+def test_max_pairs_is_prefix_of_full_result():
+    metadata_df = _catalog(0)
+    full = InvertedIndexBlocker(metadata_df, block_size=16).candidate_pairs(0.3, 10)
+    limited = InvertedIndexBlocker(metadata_df, block_size=16).candidate_pairs(0.3, 10, max_pairs=25)
+
+    assert limited == full[:25]
+
+
+def test_missing_columns_give_no_pairs():
+    metadata_df = pd.DataFrame({'actions': ['identify|describe', 'identify']})
+    assert InvertedIndexBlocker(metadata_df).candidate_pairs(0.0, 10) == []
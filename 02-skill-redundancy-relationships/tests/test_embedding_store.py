@@ -0,0 +1,169 @@
+"""
+Tests for the persistent embedding store.
+
+A stub model (anything with encode()) stands in for sentence-transformers,
+so the tests check the store itself: hit/miss accounting, the on-disk
+round-trip, recovery from an interrupted append and the float16/int8
+storage paths.
+
+Usage:
+    pytest tests/test_embedding_store.py
+"""
+
+import os
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared.embeddings.store import EmbeddingStore
+
+
+DIM = 12
+
+
+def stub_vector(text):
+    """Deterministic pseudo-embedding of a text."""
+    rng = np.random.default_rng(zlib.crc32(text.encode('utf-8')))
+    return rng.normal(size=DIM).astype(np.float32)
+
+
+class StubModel:
+    """Records every text it is asked to encode."""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, batch_size=32, show_progress_bar=False, convert_to_numpy=True, **kwargs):
+        self.encoded.extend(texts)
+        return np.stack([stub_vector(text) for text in texts])
+
+
+class FailingModel:
+    def encode(self, texts, **kwargs):
+        raise AssertionError(f"unexpected encode of {len(texts)} texts")
+
+
+def _store(tmp_path, model=None, **kwargs):
+    return EmbeddingStore('stub-model', model=model or StubModel(), store_dir=str(tmp_path),
+                          persist=kwargs.pop('persist', True), **kwargs)
+
+
+def _expected(texts):
+    return np.stack([stub_vector(text) for text in texts])
+
+
+def test_hits_and_misses(tmp_path):
+    model = StubModel()
+    store = _store(tmp_path, model)
+
+    # Misses count distinct new texts; a repeat within the call is neither
+    vectors = store.encode(['blend phonemes', 'segment words', 'blend phonemes'])
+    assert np.array_equal(vectors, _expected(['blend phonemes', 'segment words', 'blend phonemes']))
+    assert (store.misses, store.hits) == (2, 0)
+    assert sorted(model.encoded) == ['blend phonemes', 'segment words']
+
+    # Hits count texts already in the store
+    vectors = store.encode(['segment words', 'identify the main idea', 'blend phonemes',
+                            'segment words'])
+    assert np.array_equal(vectors, _expected(['segment words', 'identify the main idea',
+                                              'blend phonemes', 'segment words']))
+    assert (store.misses, store.hits) == (3, 3)
+    assert model.encoded[2:] == ['identify the main idea']
+    assert len(store) == 3 and 'segment words' in store and 'other' not in store
+
+    assert store.encode([]).shape == (0, DIM)
+
+
+def test_persisted_round_trip(tmp_path):
+    texts = [f"skill {i}" for i in range(40)]
+    store = _store(tmp_path)
+    first = store.encode(texts)
+    assert (store.path / 'meta.json').exists()
+
+    reopened = _store(tmp_path, FailingModel())
+    assert len(reopened) == len(texts)
+    assert np.array_equal(reopened.encode(texts[::-1]), first[::-1])
+    assert (reopened.misses, reopened.hits) == (0, len(texts))
+
+
+def test_memory_only_store_writes_nothing(tmp_path):
+    store = _store(tmp_path, persist=False)
+    store.encode(['a', 'b'])
+    store.encode(['c'])
+
+    assert np.array_equal(store.encode(['c', 'a']), _expected(['c', 'a']))
+    assert not store.path.exists()
+    assert len(_store(tmp_path, FailingModel())) == 0
+
+
+@pytest.mark.parametrize('dtype, itemsize', [('float32', 4), ('int8', 1)])
+def test_partial_tail_is_truncated(tmp_path, dtype, itemsize):
+    texts = [f"skill {i}" for i in range(10)]
+    store = _store(tmp_path, dtype=dtype)
+    store.encode(texts)
+    row_bytes = itemsize * DIM
+
+    # Interrupted append: one whole vector row (and scale) and half of the
+    # next, but no hashes (hashes are written last)
+    with open(store.path / 'vectors.bin', 'ab') as f:
+        f.write(b'\1' * row_bytes + b'\0' * (row_bytes // 2))
+    if dtype == 'int8':
+        with open(store.path / 'scales.bin', 'ab') as f:
+            f.write(np.float32(0.5).tobytes())
+
+    reopened = _store(tmp_path)
+    assert len(reopened) == len(texts)
+
+    reopened.encode(['new 1', 'new 2'])
+    n_rows = len(texts) + 2
+    assert os.path.getsize(store.path / 'vectors.bin') == n_rows * row_bytes
+    assert os.path.getsize(store.path / 'hashes.bin') == n_rows * 20
+    if dtype == 'int8':
+        assert os.path.getsize(store.path / 'scales.bin') == n_rows * 4
+
+    everything = texts + ['new 1', 'new 2']
+    vectors = _store(tmp_path, FailingModel()).encode(everything)
+    expected = _expected(everything)
+    assert np.allclose(vectors, expected, atol=0 if dtype == 'float32' else 2e-2 * np.abs(expected).max())
+
+
+@pytest.mark.parametrize('dtype, itemsize, atol', [('float16', 2, 2e-3), ('int8', 1, 2e-2)])
+def test_quantized_storage(tmp_path, dtype, itemsize, atol):
+    texts = [f"skill {i}" for i in range(25)]
+    store = _store(tmp_path, dtype=dtype)
+    vectors = store.encode(texts)
+
+    expected = _expected(texts)
+    assert vectors.dtype == np.float32
+    assert np.allclose(vectors, expected, atol=atol * np.abs(expected).max())
+    assert os.path.getsize(store.path / 'vectors.bin') == len(texts) * DIM * itemsize
+    assert (store.path / 'scales.bin').exists() == (dtype == 'int8')
+
+    # The stored dtype wins over the requested one when reopening
+    reopened = _store(tmp_path, FailingModel(), dtype='float32')
+    assert reopened.dtype == dtype
+    assert np.array_equal(reopened.encode(texts), vectors)
+
+    # Appending to a quantized store keeps rows aligned with their scales
+    more = _store(tmp_path)
+    more.encode(['extra'] + texts[:3])
+    assert np.allclose(more.encode(['extra']), _expected(['extra']),
+                       atol=atol * np.abs(stub_vector('extra')).max())
+    assert np.array_equal(more.encode(texts[:3]), vectors[:3])
+
+
+def test_invalid_dtype_and_foreign_store(tmp_path):
+    with pytest.raises(ValueError):
+        _store(tmp_path, dtype='bfloat16')
+
+    store = _store(tmp_path)
+    store.encode(['a'])
+    (store.path / 'meta.json').write_text(
+        '{"model_name": "other-model", "dim": %d, "dtype": "float32"}' % DIM)
+    with pytest.raises(ValueError):
+        _store(tmp_path)
@@ -0,0 +1,156 @@
+"""
+Tests for transitive grouping of skills (shared.utils.grouping).
+
+Pins the contract downstream steps rely on: groups are the connected
+components of the edges, group IDs do not depend on edge order, members
+follow the ``nodes`` order and filters/NaN confidences are accounted for.
+
+Usage:
+    pytest tests/test_grouping.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared.utils.grouping import group_edges, group_relationships
+
+
+def union_find_groups(left, right, nodes, min_group_size=2):
+    """Reference grouping: union-find, members in node order, groups by first member."""
+    parent = {node: node for node in nodes}
+
+    def find(node):
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for a, b in zip(left, right):
+        parent[find(a)] = find(b)
+
+    components = {}
+    for node in nodes:
+        components.setdefault(find(node), []).append(node)
+    return [members for members in components.values() if len(members) >= min_group_size]
+
+
+def _random_edges(seed, n_nodes=60, n_edges=45):
+    rng = np.random.default_rng(seed)
+    ids = [f"S{i:03d}" for i in range(n_nodes)]
+    pairs = rng.integers(n_nodes, size=(n_edges, 2))
+    return ids, [ids[a] for a, _ in pairs], [ids[b] for _, b in pairs]
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_groups_match_union_find(seed):
+    ids, left, right = _random_edges(seed)
+
+    result = group_edges(left, right)
+
+    assert [group.skill_ids for group in result.groups] == union_find_groups(left, right, sorted(ids))
+    assert result.statistics['edges'] == len(left)
+    for group in result.groups:
+        assert all(result.group_of(skill_id) == group.group_id for skill_id in group.skill_ids)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_group_ids_do_not_depend_on_edge_order(seed):
+    ids, left, right = _random_edges(seed)
+    result = group_edges(left, right)
+
+    rng = np.random.default_rng(100 + seed)
+    order = rng.permutation(len(left))
+    flip = rng.random(len(left)) < 0.5
+    shuffled_left = [right[i] if f else left[i] for i, f in zip(order, flip)]
+    shuffled_right = [left[i] if f else right[i] for i, f in zip(order, flip)]
+    shuffled = group_edges(shuffled_left, shuffled_right)
+
+    assert [g.to_dict() for g in shuffled.groups] == [g.to_dict() for g in result.groups]
+    assert shuffled.membership == result.membership
+
+
+def test_node_order_is_respected_and_unlisted_nodes_are_appended_sorted():
+    left = ['c', 'z', 'x', 'b', 'y']
+    right = ['a', 'b', 'w', 'd', 'x']
+
+    result = group_edges(left, right, nodes=['d', 'c', 'a', 'b'], id_prefix='VAR', id_width=2)
+
+    # Listed nodes first in the given order, then w, x, y, z sorted
+    assert [(g.group_id, g.skill_ids) for g in result.groups] == [
+        ('VAR-01', ['d', 'b', 'z']),
+        ('VAR-02', ['c', 'a']),
+        ('VAR-03', ['w', 'x', 'y']),
+    ]
+    assert result.statistics['nodes'] == 8
+
+
+def test_min_group_size():
+    left = ['a', 'b', 'd', 'f', 'g']
+    right = ['b', 'c', 'e', 'g', 'h']
+    nodes = ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h', 'lonely']
+
+    assert [g.size for g in group_edges(left, right, nodes=nodes).groups] == [3, 2, 3]
+    assert [g.skill_ids for g in group_edges(left, right, nodes=nodes, min_group_size=3).groups] == \
+        [['a', 'b', 'c'], ['f', 'g', 'h']]
+
+    # min_group_size=1 also gives isolated listed nodes a group of their own
+    singles = group_edges(left, right, nodes=nodes, min_group_size=1)
+    assert singles.groups[-1].skill_ids == ['lonely']
+    assert singles.groups[-1].edge_count == 0
+    assert singles.statistics['skills_in_groups'] == len(nodes)
+    assert group_edges([], [], nodes=['a', 'b'], min_group_size=1).statistics['groups'] == 2
+    assert group_edges([], []).groups == []
+
+
+def test_confidence_statistics_ignore_nan():
+    result = group_edges(['a', 'b', 'c', 'x'], ['b', 'c', 'a', 'y'],
+                         confidence=[0.9, np.nan, 0.5, np.nan],
+                         edge_types=['REDUNDANT', 'REDUNDANT', 'SUBSUMES', 'REDUNDANT'])
+
+    first, second = result.groups
+    assert first.edge_count == 3
+    assert first.relationship_types == {'REDUNDANT': 2, 'SUBSUMES': 1}
+    assert (first.mean_confidence, first.min_confidence, first.max_confidence) == \
+        pytest.approx((0.7, 0.5, 0.9))
+    # A group with no usable confidence has no statistics rather than NaN
+    assert (second.mean_confidence, second.min_confidence, second.max_confidence) == (None, None, None)
+
+
+def test_relationship_filters_are_counted():
+    relationships = [
+        {'skill_a_id': 'a', 'skill_b_id': 'b', 'relationship_type': 'REDUNDANT', 'confidence': 0.9},
+        {'skill_a_id': 'b', 'skill_b_id': 'c', 'relationship_type': 'REDUNDANT', 'confidence': 'high'},
+        {'skill_a_id': 'c', 'skill_b_id': 'd', 'relationship_type': 'REDUNDANT', 'confidence': 0.4},
+        {'skill_a_id': 'd', 'skill_b_id': 'e', 'relationship_type': 'PREREQUISITE', 'confidence': 0.95},
+        {'skill_a_id': 'e', 'skill_b_id': None, 'relationship_type': 'REDUNDANT', 'confidence': 0.9},
+        {'skill_a_id': 'x', 'skill_b_id': 'y', 'relationship_type': 'SUBSUMES', 'confidence': None},
+    ]
+
+    unfiltered = group_relationships(relationships)
+    assert [g.skill_ids for g in unfiltered.groups] == [['a', 'b', 'c', 'd', 'e'], ['x', 'y']]
+    # Non-numeric and missing confidences are left out of the statistics
+    assert unfiltered.groups[0].mean_confidence == pytest.approx((0.9 + 0.4 + 0.95) / 3)
+    assert unfiltered.groups[1].mean_confidence is None
+    assert unfiltered.statistics['relationships'] == 6
+    assert unfiltered.statistics['relationships_filtered'] == 1
+
+    by_type = group_relationships(relationships, relationship_types=['REDUNDANT', 'SUBSUMES'])
+    assert [g.skill_ids for g in by_type.groups] == [['a', 'b', 'c', 'd'], ['x', 'y']]
+    assert by_type.statistics['relationships_filtered'] == 2
+
+    # A non-numeric confidence never passes a confidence filter
+    confident = group_relationships(relationships, relationship_types=['REDUNDANT', 'PREREQUISITE'],
+                                    min_confidence=0.5)
+    assert [g.skill_ids for g in confident.groups] == [['a', 'b'], ['d', 'e']]
+    assert confident.statistics['relationships_filtered'] == 4
+    assert confident.statistics['edges'] == 2
+
+
+def test_edge_lists_must_match():
+    with pytest.raises(ValueError):
+        group_edges(['a', 'b'], ['c'])
@@ -0,0 +1,103 @@
+"""
+Parity tests for the master concept hierarchy trie.
+
+match_concept_hierarchy() must return the first concept (in concepts_df
+order) whose 'Strand > Pillar > Domain' string occurs in the taxonomy
+path, exactly like scanning every concept with a substring test.
+
+Usage:
+    pytest tests/test_master_concept_generator.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'clustering'))
+
+from master_concept_generator import (
+    build_hierarchy_trie,
+    concept_hierarchy,
+    generate_skill_mapping,
+    match_concept_hierarchy,
+)
+
+
+STRANDS = ['Reading', 'Writing', 'Language', 'Read']
+PILLARS = ['Fluency', 'Comprehension', 'Comprehension Strategies', 'Vocab']
+# Overlapping names: one domain is a prefix or suffix of another
+DOMAINS = ['Rate', 'Rate and Accuracy', 'Accuracy', 'Inference', 'Inferences', None]
+
+
+def _concepts(rng, n):
+    pick = lambda values: [values[k] for k in rng.integers(len(values), size=n)]
+    return pd.DataFrame({
+        'MASTER_CONCEPT_ID': [f"MC-{i:04d}" for i in range(n)],
+        'MASTER_CONCEPT_NAME': [f"Concept {i}" for i in range(n)],
+        'SOR_STRAND': pick(STRANDS),
+        'SOR_PILLAR': pick(PILLARS),
+        'SOR_DOMAIN': pick(DOMAINS),
+        'EQUIVALENCE_GROUP_ID': [f"SA-{i:04d}" for i in range(n)],
+    })
+
+
+def _path(rng):
+    parts = [STRANDS[rng.integers(len(STRANDS))], PILLARS[rng.integers(len(PILLARS))],
+             str(DOMAINS[rng.integers(len(DOMAINS))]), f"Area {rng.integers(3)}"]
+    if rng.random() < 0.2:
+        parts.insert(0, 'ELA')
+    if rng.random() < 0.1:
+        return ' > '.join(parts)[:rng.integers(1, 30)]
+    return ' > '.join(parts)
+
+
+def substring_scan(taxonomy_path, concepts_df):
+    """The former per-concept loop: first hierarchy contained in the path."""
+    for position, (_, concept) in enumerate(concepts_df.iterrows()):
+        if concept_hierarchy(concept) in taxonomy_path:
+            return position
+    return None
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_trie_matches_substring_scan(seed):
+    rng = np.random.default_rng(seed)
+    concepts_df = _concepts(rng, 40)
+    trie = build_hierarchy_trie(concepts_df)
+
+    paths = [_path(rng) for _ in range(300)] + ['', 'Reading', 'Reading > Fluency > Rate and Accuracy']
+    results = [match_concept_hierarchy(path, trie) for path in paths]
+
+    assert results == [substring_scan(path, concepts_df) for path in paths]
+    assert any(r is not None for r in results) and any(r is None for r in results)
+
+
+def test_empty_concepts_match_nothing():
+    trie = build_hierarchy_trie(_concepts(np.random.default_rng(0), 0))
+    assert match_concept_hierarchy('Reading > Fluency > Rate', trie) is None
+
+
+def test_skill_mapping_uses_first_matching_concept():
+    rng = np.random.default_rng(7)
+    concepts_df = _concepts(rng, 30)
+    n = 200
+    paths = [_path(rng) if rng.random() < 0.9 else None for _ in range(n)]
+    variants_df = pd.DataFrame({
+        'SKILL_ID': [f"S{i}" for i in range(n)],
+        'SKILL_NAME': [f"Skill {i}" for i in range(n)],
+        'EQUIVALENCE_TYPE': ['grade-progression'] * n,
+        'EQUIVALENCE_GROUP_ID': [None] * n,
+    })
+    mappings_df = pd.DataFrame({'SKILL_ID': variants_df['SKILL_ID'], 'TAXONOMY_PATH': paths,
+                                'CONFIDENCE': ['High'] * n})
+    skills_df = pd.DataFrame({'SKILL_ID': [], 'SKILL_NAME': []})
+
+    result = generate_skill_mapping(variants_df, mappings_df, concepts_df, skills_df)
+
+    concept_ids = concepts_df['MASTER_CONCEPT_ID'].tolist()
+    for path, concept_id in zip(paths, result['MASTER_CONCEPT_ID']):
+        position = substring_scan(path, concepts_df) if path is not None else None
+        assert concept_id == (concept_ids[position] if position is not None else None)
@@ -0,0 +1,93 @@
+"""
+Parity tests for quantized similarity search with re-scoring.
+
+With full-precision vectors, quantized_cosine_similarity() must return the
+same per-row top-k (and threshold) selection, with the same scores, as
+exact float32 blocked_top_k() over the normalized vectors.
+
+Usage:
+    pytest tests/test_quantization.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared.embeddings.quantization import quantize_embeddings, quantized_cosine_similarity
+from shared.embeddings.similarity import blocked_top_k, normalize_embeddings
+
+
+DIM = 32
+
+
+def _embeddings(seed, n):
+    """Clustered vectors with uneven norms, so normalization matters."""
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(15, DIM))
+    vectors = centres[rng.integers(15, size=n)] + 0.5 * rng.normal(size=(n, DIM))
+    return (vectors * rng.uniform(0.5, 3.0, size=(n, 1))).astype(np.float32)
+
+
+def exact_top_k(vectors, other=None, top_k=None, threshold=None, block_size=64):
+    """Exact float32 selection over normalized vectors."""
+    left = normalize_embeddings(vectors)
+    right = left if other is None else normalize_embeddings(other)
+
+    def tile(row_start, row_stop, col_start, col_stop):
+        return left[row_start:row_stop] @ right[col_start:col_stop].T
+
+    return blocked_top_k(tile, len(left), len(right), top_k=top_k, threshold=threshold,
+                         block_size=block_size, self_compare=other is None)
+
+
+def _assert_same_selection(result, expected):
+    assert result.shape == expected.shape
+    result, expected = result.tocsr(), expected.tocsr()
+    result.sort_indices()
+    expected.sort_indices()
+    assert np.array_equal(result.indptr, expected.indptr)
+    assert np.array_equal(result.indices, expected.indices)
+    assert np.allclose(result.data, expected.data, atol=1e-5)
+
+
+@pytest.mark.parametrize('dtype', ['int8', 'float16'])
+@pytest.mark.parametrize('top_k, threshold', [(10, None), (10, 0.6), (None, 0.6), (1, 0.9)])
+@pytest.mark.parametrize('seed', range(3))
+def test_rescored_selection_matches_exact(dtype, top_k, threshold, seed):
+    vectors = _embeddings(seed, 300)
+    quantized = quantize_embeddings(vectors, dtype)
+
+    result = quantized_cosine_similarity(quantized, top_k=top_k, threshold=threshold,
+                                         full_precision=vectors, block_size=64)
+
+    expected = exact_top_k(vectors, top_k=top_k, threshold=threshold)
+    assert expected.nnz > 0
+    _assert_same_selection(result, expected)
+
+
+@pytest.mark.parametrize('dtype', ['int8', 'float16'])
+@pytest.mark.parametrize('threshold', [None, 0.5])
+def test_rescored_selection_against_other_matches_exact(dtype, threshold):
+    queries = _embeddings(10, 80)
+    targets = _embeddings(11, 250)
+
+    result = quantized_cosine_similarity(
+        quantize_embeddings(queries, dtype), quantize_embeddings(targets, dtype),
+        top_k=5, threshold=threshold, full_precision=queries,
+        other_full_precision=targets, block_size=64
+    )
+
+    _assert_same_selection(result, exact_top_k(queries, targets, top_k=5, threshold=threshold))
+
+
+def test_rescoring_against_other_needs_its_vectors():
+    vectors = _embeddings(0, 20)
+    quantized = quantize_embeddings(vectors, 'int8')
+    with pytest.raises(ValueError):
+        quantized_cosine_similarity(quantized, quantized, top_k=3, full_precision=vectors)
+    with pytest.raises(ValueError):
+        quantized_cosine_similarity(quantized, top_k=None, threshold=None)
@@ -0,0 +1,162 @@
+"""
+Parity tests for incremental redundancy analysis.
+
+After a full analysis, analyze_incremental() on an edited catalog (changed,
+added and removed skills) must give the same relationships and
+recommendations as a full re-run on the edited catalog, and its change
+log must list exactly the relationships that appeared and disappeared.
+
+Usage:
+    pytest tests/test_redundancy_analyzer.py
+"""
+
+import logging
+import sys
+import zlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'detectors'))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'clustering'))
+
+from redundancy_analyzer import RedundancyAnalyzer
+
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config.yaml'
+
+VALUES = {
+    'actions': ['identify', 'describe', 'compare', 'explain'],
+    'targets': ['main idea', 'character', 'theme', 'details'],
+    'key_concepts': ['comprehension', 'main idea', 'inference'],
+    'text_type': ['fictional', 'informational'],
+    'cognitive_demand': ['recall', 'comprehension', 'analysis'],
+    'task_complexity': ['basic', 'intermediate', 'advanced'],
+    'skill_domain': ['reading', 'writing'],
+    'scope': ['sentence', 'text'],
+    'support_level': ['with_support', 'independent'],
+    'GRADE_LEVEL_SHORT_NAME': ['K', 'Grade 1', 'Grade 2', 'Grade 5'],
+}
+LIST_FIELDS = {'actions', 'targets', 'key_concepts'}
+COMPARED_FIELDS = ['relationship_id', 'skill_a_id', 'skill_b_id', 'relationship_type',
+                   'confidence', 'composite', 'structural', 'semantic']
+
+
+@pytest.fixture(autouse=True)
+def quiet_logs():
+    logging.disable(logging.INFO)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+def _value(rng, column):
+    if rng.random() < 0.1:
+        return np.nan
+    options = VALUES[column]
+    if column in LIST_FIELDS:
+        return '|'.join(rng.choice(options, size=rng.integers(1, 3), replace=False))
+    return options[rng.integers(len(options))]
+
+
+def _skills(rng, ids):
+    return pd.DataFrame([{'SKILL_ID': skill_id, 'SKILL_NAME': f"Skill {skill_id}",
+                          **{column: _value(rng, column) for column in VALUES}}
+                         for skill_id in ids])
+
+
+def _embeddings(metadata_df):
+    """One fixed pseudo-embedding per SKILL_ID, in row order."""
+    return np.stack([np.random.default_rng(zlib.crc32(str(skill_id).encode())).normal(size=8)
+                     for skill_id in metadata_df['SKILL_ID']])
+
+
+def _analyzer():
+    analyzer = RedundancyAnalyzer(config_path=CONFIG_PATH)
+    # No per-skill cap, so the incremental candidates match a full run
+    analyzer.config['prefilter']['max_pairs_per_skill'] = 10_000
+    return analyzer
+
+
+def _edit(rng, catalog, related_id):
+    """Change some skills, remove some (including related_id) and append new ones."""
+    edited = catalog.copy()
+    changed = edited['SKILL_ID'].iloc[[2, 9, 17, 30]].tolist()
+    for skill_id in changed:
+        row = edited.index[edited['SKILL_ID'] == skill_id][0]
+        for column in ('actions', 'targets', 'cognitive_demand'):
+            edited.at[row, column] = _value(rng, column)
+    removed = set(edited['SKILL_ID'].iloc[[4, 21, 35]]) | {related_id}
+    edited = edited[~edited['SKILL_ID'].isin(removed)]
+    # A copy of a kept skill is always related to it
+    copy = edited.iloc[[10]].assign(SKILL_ID='N0', SKILL_NAME='Skill N0')
+    added = pd.concat([copy, _skills(rng, [f"N{i}" for i in range(1, 6)])])
+    return pd.concat([edited, added], ignore_index=True), set(changed), removed
+
+
+def _relationships_file(output_dir):
+    return next(Path(output_dir).glob('relationships_*'))
+
+
+def _by_id(records):
+    return {r['relationship_id']: {field: r[field] for field in COMPARED_FIELDS} for r in records}
+
+
+def _assert_same_relationships(records, expected):
+    records, expected = _by_id(records), _by_id(expected)
+    assert records.keys() == expected.keys()
+    for relationship_id, record in expected.items():
+        assert records[relationship_id] == pytest.approx(record), relationship_id
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_incremental_matches_full_rerun(tmp_path, seed):
+    rng = np.random.default_rng(seed)
+    catalog = _skills(rng, [f"S{i}" for i in range(45)])
+
+    analyzer = _analyzer()
+    prior_records, _ = analyzer.analyze_skills(catalog, semantic_embeddings=_embeddings(catalog),
+                                               output_dir=tmp_path / 'prior', include_distinct=False)
+    prior_path = _relationships_file(tmp_path / 'prior')
+    assert prior_records
+
+    edited, changed, removed = _edit(rng, catalog, prior_records[0]['skill_b_id'])
+    records, recommendations, changes = _analyzer().analyze_incremental(
+        edited, prior_path, semantic_embeddings=_embeddings(edited), include_distinct=False
+    )
+    full_records, full_recommendations = _analyzer().analyze_skills(
+        edited, semantic_embeddings=_embeddings(edited), include_distinct=False
+    )
+
+    _assert_same_relationships(records, full_records)
+    assert sorted(r['relationship_id'] for r in recommendations) == \
+        sorted(r.relationship_id for r in full_recommendations)
+
+    # The change log lists exactly what appeared and disappeared
+    prior, full = _by_id(prior_records), _by_id(full_records)
+    before = set(prior)
+    logged = {kind: {c['relationship_id'] for c in changes if c['change'] == kind}
+              for kind in ('added', 'retracted', 'changed')}
+    assert logged['added'] == full.keys() - before
+    assert logged['retracted'] == before - full.keys()
+    assert logged['added'] and logged['retracted']
+    touched = changed | removed | {skill_id for skill_id in edited['SKILL_ID'] if skill_id.startswith('N')}
+    for relationship_id in logged['changed']:
+        assert relationship_id in before and relationship_id in full
+        assert {prior[relationship_id]['skill_a_id'], prior[relationship_id]['skill_b_id']} & touched
+        assert (prior[relationship_id]['relationship_type'], round(prior[relationship_id]['confidence'], 6)) != \
+            (full[relationship_id]['relationship_type'], round(full[relationship_id]['confidence'], 6))
+
+
+def test_unchanged_catalog_carries_everything_over(tmp_path):
+    catalog = _skills(np.random.default_rng(7), [f"S{i}" for i in range(30)])
+    analyzer = _analyzer()
+    prior_records, _ = analyzer.analyze_skills(catalog, output_dir=tmp_path, include_distinct=False)
+
+    records, _, changes = _analyzer().analyze_incremental(
+        catalog, _relationships_file(tmp_path), include_distinct=False
+    )
+
+    assert changes == []
+    _assert_same_relationships(records, prior_records)
@@ -0,0 +1,141 @@
+"""
+Parity tests for the vectorized relationship decision table.
+
+classify_batch() must pick the same rule and confidence as classify() for
+every pair, and relationship_from_batch() must rebuild the same
+relationship, for random similarity scores and metadata with NaN, empty
+and unknown values or missing columns.
+
+Usage:
+    pytest tests/test_relationship_classifier.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'detectors'))
+
+from relationship_classifier import RelationshipClassifier, RelationshipType
+from similarity_engine import SimilarityEngine
+
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config.yaml'
+
+# Thresholds from config.yaml, so boundaries are hit exactly
+SCORE_GRID = [0.0, 0.3, 0.5, 0.55, 0.6, 0.65, 0.7, 0.75, 0.8, 0.85, 0.9, 0.95, 1.0]
+SCORE_COMPONENTS = ['action_match', 'target_overlap', 'concept_similarity',
+                    'cognitive_demand_match', 'task_complexity_match', 'skill_domain_match',
+                    'text_type_match', 'grade_compatibility', 'scope_match', 'support_compatibility']
+
+VALUES = {
+    'actions': ['identify', 'identify|determine'],
+    'targets': ['main idea', 'detail'],
+    'key_concepts': ['main idea', 'comprehension'],
+    'cognitive_demand': ['recall', 'comprehension', 'application', 'analysis', 'other'],
+    'task_complexity': ['basic', 'intermediate', 'advanced'],
+    'skill_domain': ['reading', 'writing'],
+    'text_type': ['informational', 'literary', 'informational|literary'],
+    'text_mode': ['prose', 'poetry'],
+    'scope': ['sentence', 'paragraph'],
+    'support_level': ['with_support', 'with_prompting', 'independent'],
+    'complexity_band': ['K-2', '3-5'],
+    'GRADE_LEVEL_SHORT_NAME': ['K', 'Grade 1', 'Grade 2', 'Grade 3', 'Grade 5', 'Adult'],
+    'GRADE_LEVEL_NAME': ['Kindergarten', 'Grade 4', 'Unknown'],
+}
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return SimilarityEngine(config_path=CONFIG_PATH)
+
+
+@pytest.fixture(scope='module')
+def classifier():
+    return RelationshipClassifier(config_path=CONFIG_PATH)
+
+
+def _catalog(rng, n, drop_columns=()):
+    data = {'SKILL_ID': [f"S{i}" for i in range(n)], 'SKILL_NAME': [f"Skill {i}" for i in range(n)]}
+    for column, options in VALUES.items():
+        if column in drop_columns:
+            continue
+        values = []
+        for _ in range(n):
+            kind = rng.integers(6)
+            values.append(np.nan if kind == 0 else '' if kind == 1 else options[rng.integers(len(options))])
+        data[column] = values
+    return pd.DataFrame(data)
+
+
+def _random_scores(rng, n_pairs):
+    def draw():
+        gridded = np.asarray(SCORE_GRID)[rng.integers(len(SCORE_GRID), size=n_pairs)]
+        return np.where(rng.random(n_pairs) < 0.5, gridded, rng.random(n_pairs))
+
+    scores = {name: draw() for name in ('structural', 'educational', 'semantic', 'contextual',
+                                        'composite') + tuple(SCORE_COMPONENTS)}
+    # Most rules need a high composite
+    scores['composite'] = np.maximum(scores['composite'], rng.choice([0.0, 0.5], size=n_pairs))
+    scores['bounded'] = np.zeros(n_pairs, dtype=bool)
+    return scores
+
+
+def _assert_batch_matches(engine, classifier, metadata_df, scores, left, right):
+    batch = classifier.classify_batch(scores, classifier.encode_features(metadata_df), left, right)
+
+    rows = [row for _, row in metadata_df.iterrows()]
+    matched = set()
+    for k, (i, j) in enumerate(zip(left, right)):
+        sim = engine.similarity_from_batch(scores, k, rows[i], rows[j])
+        expected = classifier.classify(sim, rows[i], rows[j])
+        rebuilt = classifier.relationship_from_batch(batch, k, sim, rows[i], rows[j])
+
+        if batch.rule_index[k] >= 0:
+            rule = classifier.decision_table[batch.rule_index[k]]
+            assert (rule.relationship_type, rule.name) == (expected.relationship_type,
+                                                           expected.rule_matched), k
+        else:
+            assert expected.relationship_type == RelationshipType.DISTINCT, k
+        assert batch.confidence[k] == pytest.approx(expected.confidence, abs=1e-12), k
+        assert rebuilt.to_dict() == expected.to_dict(), k
+        matched.add(expected.relationship_type.value)
+    return matched
+
+
+@pytest.mark.parametrize('seed', range(4))
+def test_classify_batch_matches_classify(engine, classifier, seed):
+    rng = np.random.default_rng(seed)
+    metadata_df = _catalog(rng, 40)
+    left, right = np.triu_indices(len(metadata_df), k=1)
+    scores = _random_scores(rng, len(left))
+
+    matched = _assert_batch_matches(engine, classifier, metadata_df, scores, left, right)
+    # The random scores reach most rules, not just DISTINCT
+    assert len(matched) >= 4
+
+
+@pytest.mark.parametrize('drop_columns', [
+    ('skill_domain', 'support_level', 'GRADE_LEVEL_SHORT_NAME', 'cognitive_demand'),
+    ('complexity_band', 'text_mode', 'GRADE_LEVEL_NAME'),
+    tuple(VALUES),
+])
+def test_classify_batch_with_missing_columns(engine, classifier, drop_columns):
+    rng = np.random.default_rng(11)
+    metadata_df = _catalog(rng, 25, drop_columns=drop_columns)
+    left, right = np.triu_indices(len(metadata_df), k=1)
+
+    _assert_batch_matches(engine, classifier, metadata_df, _random_scores(rng, len(left)), left, right)
+
+
+def test_classify_batch_on_engine_scores(engine, classifier):
+    rng = np.random.default_rng(5)
+    metadata_df = _catalog(rng, 40)
+    left, right = np.triu_indices(len(metadata_df), k=1)
+    semantic = rng.choice([0.2, 0.6, 0.86, 0.95, 1.0], size=len(left))
+    scores = engine.batch_score(engine.encode_features(metadata_df), left, right, semantic)
+
+    _assert_batch_matches(engine, classifier, metadata_df, scores, left, right)
@@ -0,0 +1,161 @@
+"""
+Parity tests for vectorized similarity scoring.
+
+batch_score() must give the same numbers as calculate_similarity() for
+every pair, including missing values, missing columns, adaptive weights,
+boosts and the min_composite bound.
+
+Usage:
+    pytest tests/test_similarity_engine.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'detectors'))
+
+from similarity_engine import (
+    SimilarityEngine,
+    calculate_semantic_similarity_matrix,
+    calculate_sparse_semantic_similarity_matrix,
+)
+
+
+CONFIG_PATH = Path(__file__).parent.parent / 'config.yaml'
+
+VALUES = {
+    'actions': ['identify', 'describe', 'compare', 'Explain'],
+    'targets': ['main idea', 'character', 'theme', 'details'],
+    'key_concepts': ['comprehension', 'main idea', 'inference', 'plot'],
+    'text_type': ['fictional', 'informational', 'mixed'],
+    'cognitive_demand': ['recall', 'comprehension', 'analysis'],
+    'task_complexity': ['basic', 'intermediate', 'advanced', 'expert'],
+    'skill_domain': ['reading', 'writing', 'language'],
+    'scope': ['word', 'sentence', 'text'],
+    'support_level': ['with_support', 'with_prompting', 'independent',
+                      'independently', 'not_specified'],
+    'GRADE_LEVEL_SHORT_NAME': ['K', 'Grade 1', 'Grade 2', 'Grade 5', 'Grade 9', 'Adult'],
+    'GRADE_LEVEL_NAME': ['Kindergarten', 'Grade 3', 'Unknown'],
+}
+LIST_FIELDS = {'actions', 'targets', 'key_concepts', 'text_type'}
+
+
+@pytest.fixture(scope='module')
+def engine():
+    return SimilarityEngine(config_path=CONFIG_PATH)
+
+
+def _value(rng, column):
+    kind = rng.integers(8)
+    if kind == 0:
+        return np.nan
+    if kind == 1:
+        return ''
+    options = VALUES[column]
+    if column in LIST_FIELDS:
+        terms = rng.choice(options, size=rng.integers(1, 3), replace=False)
+        return ('|' if kind % 2 else ', ').join(terms)
+    return options[rng.integers(len(options))]
+
+
+def _catalog(seed, n=40, drop_columns=()):
+    rng = np.random.default_rng(seed)
+    data = {'SKILL_ID': [f"S{i}" for i in range(n)]}
+    for column in VALUES:
+        if column not in drop_columns:
+            data[column] = [_value(rng, column) for _ in range(n)]
+    metadata_df = pd.DataFrame(data)
+    # Near-duplicates: same structure, other context (exact-structural boost)
+    copies = metadata_df.iloc[:n // 4].copy()
+    copies['SKILL_ID'] = [f"D{i}" for i in range(len(copies))]
+    for column in ('scope', 'support_level', 'GRADE_LEVEL_NAME'):
+        if column in copies.columns:
+            copies[column] = [_value(rng, column) for _ in range(len(copies))]
+    return pd.concat([metadata_df, copies], ignore_index=True)
+
+
+def _all_pairs(n):
+    left, right = np.triu_indices(n, k=1)
+    return left, right
+
+
+def _assert_pair_matches(score, batch, k):
+    for name in ('structural', 'educational', 'semantic', 'contextual', 'composite'):
+        assert batch[name][k] == pytest.approx(getattr(score, name), abs=1e-12), name
+    components = {**score.structural_components, **score.educational_components,
+                  **score.contextual_components}
+    for name, value in components.items():
+        assert batch[name][k] == pytest.approx(value, abs=1e-12), name
+
+
+@pytest.mark.parametrize('seed', range(3))
+@pytest.mark.parametrize('adaptive_mode', [None, 'true_duplicate', 'prerequisite'])
+def test_batch_score_matches_calculate_similarity(engine, seed, adaptive_mode):
+    metadata_df = _catalog(seed)
+    left, right = _all_pairs(len(metadata_df))
+    rng = np.random.default_rng(100 + seed)
+    semantic = rng.choice([0.0, 0.5, 0.85, 0.95, 1.0], size=len(left))
+
+    batch = engine.batch_score(engine.encode_features(metadata_df), left, right,
+                               semantic_similarities=semantic, adaptive_mode=adaptive_mode)
+
+    rows = [row for _, row in metadata_df.iterrows()]
+    for k, (i, j) in enumerate(zip(left, right)):
+        score = engine.calculate_similarity(rows[i], rows[j], semantic[k], adaptive_mode=adaptive_mode)
+        _assert_pair_matches(score, batch, k)
+    assert not batch['bounded'].any()
+
+
+def test_missing_columns_and_no_semantic(engine):
+    metadata_df = _catalog(7, drop_columns=('key_concepts', 'support_level',
+                                            'GRADE_LEVEL_SHORT_NAME', 'skill_domain'))
+    left, right = _all_pairs(len(metadata_df))
+
+    batch = engine.batch_score(engine.encode_features(metadata_df), left, right)
+
+    rows = [row for _, row in metadata_df.iterrows()]
+    for k, (i, j) in enumerate(zip(left, right)):
+        _assert_pair_matches(engine.calculate_similarity(rows[i], rows[j]), batch, k)
+
+
+def test_min_composite_bound_matches(engine):
+    metadata_df = _catalog(3)
+    left, right = _all_pairs(len(metadata_df))
+    semantic = np.random.default_rng(3).random(len(left))
+    min_composite = 0.5
+
+    features = engine.encode_features(metadata_df)
+    batch = engine.batch_score(features, left, right, semantic_similarities=semantic,
+                               min_composite=min_composite)
+
+    rows = [row for _, row in metadata_df.iterrows()]
+    for k, (i, j) in enumerate(zip(left, right)):
+        score = engine.calculate_similarity(rows[i], rows[j], semantic[k], min_composite=min_composite)
+        assert batch['bounded'][k] == (score is None)
+        if score is not None:
+            _assert_pair_matches(score, batch, k)
+            rebuilt = engine.similarity_from_batch(batch, k, rows[i], rows[j])
+            assert rebuilt.to_dict() == score.to_dict()
+    assert batch['bounded'].any() and not batch['bounded'].all()
+
+
+def test_semantic_similarity_matrix_dense_and_sparse():
+    embeddings = np.random.default_rng(0).normal(size=(30, 8))
+
+    dense = calculate_semantic_similarity_matrix(embeddings)
+    assert isinstance(dense, np.ndarray) and dense.shape == (30, 30)
+    assert np.allclose(np.diag(dense), 1.0)
+
+    sparse = calculate_sparse_semantic_similarity_matrix(embeddings, top_k=5)
+    assert sparse.shape == (30, 30)
+    assert sparse.diagonal().sum() == 0
+    off_diagonal = dense - np.eye(30) * 2
+    for i in range(30):
+        row = sparse.getrow(i)
+        assert row.nnz == 5
+        assert np.allclose(row.data, dense[i, row.indices], atol=1e-5)
+        assert row.data.min() >= np.sort(off_diagonal[i])[-5] - 1e-5
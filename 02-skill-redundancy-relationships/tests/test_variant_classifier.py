@@ -0,0 +1,114 @@
+"""
+Parity tests for variant grouping.
+
+find_variant_groups() collapses skills to distinct word signatures before
+scoring. Its groups must equal the connected components of the naive
+rule: every pair of skills with the same block value, different differ
+values and a name TF-IDF cosine at or above the threshold.
+
+Usage:
+    pytest tests/test_variant_classifier.py
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'clustering'))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from shared.utils.grouping import group_edges
+from variant_classifier import NGRAM_RANGE, find_variant_groups, name_signatures
+
+
+VERBS = ['identify', 'determine', 'explain', 'describe', 'compare and contrast']
+OBJECTS = ['the main idea of a text', 'the theme of a story', 'how characters respond',
+           'text features to locate information']
+MODIFIERS = ['', ' with prompting and support', ' in grade-level text']
+GRADES = ['Kindergarten', 'Grade 1', 'Grade 2', None]
+AUTHORITIES = ['CCSS', 'TEKS', 'VA', 'FL', None]
+
+
+def _name(rng):
+    words = f"{VERBS[rng.integers(len(VERBS))]} {OBJECTS[rng.integers(len(OBJECTS))]}" \
+            f"{MODIFIERS[rng.integers(len(MODIFIERS))]}".split()
+    if rng.random() < 0.3:
+        rng.shuffle(words)  # Same signature, different name
+    if rng.random() < 0.2:
+        words.insert(rng.integers(len(words) + 1), 'accurately')
+    return ' '.join(words)
+
+
+def _skills(rng, n):
+    pick = lambda values: [values[k] for k in rng.integers(len(values), size=n)]
+    skills = pd.DataFrame({
+        'SKILL_ID': [f"S{i:04d}" for i in range(n)],
+        'NORMALIZED_NAME': [_name(rng) for _ in range(n)],
+        'GRADE_LEVEL_NAME': pick(GRADES),
+        'AUTHORITY': pick(AUTHORITIES),
+    })
+    # Exact copies of earlier skills, under the same and other authorities,
+    # and a few repeated SKILL_IDs
+    copies = skills.sample(n // 5, random_state=int(rng.integers(1 << 31)))
+    copies = copies.assign(SKILL_ID=[f"C{i:04d}" for i in range(len(copies))],
+                           AUTHORITY=np.where(rng.random(len(copies)) < 0.5,
+                                              copies['AUTHORITY'], pick(AUTHORITIES)[:len(copies)]))
+    repeated = skills.sample(n // 20, random_state=int(rng.integers(1 << 31)))
+    repeated = repeated.assign(NORMALIZED_NAME=[_name(rng) for _ in range(len(repeated))],
+                               AUTHORITY=pick(AUTHORITIES)[:len(repeated)])
+    skills = pd.concat([skills, copies, repeated], ignore_index=True)
+    return skills.sample(frac=1, random_state=int(rng.integers(1 << 31)))
+
+
+def all_pairs_groups(normalized, block_column, differ_column, threshold):
+    """Naive rule: score every skill pair, then connected components."""
+    skills = normalized.dropna(subset=['SKILL_ID', block_column, differ_column])
+    names = skills['NORMALIZED_NAME']
+    vectorizer = TfidfVectorizer(analyzer='char_wb', ngram_range=NGRAM_RANGE)
+    vectorizer.fit(name_signatures(names).unique())
+    vectors = vectorizer.transform(names)
+    similarity = (vectors @ vectors.T).toarray()
+
+    ids = skills['SKILL_ID'].to_numpy()
+    block = skills[block_column].to_numpy()
+    differ = skills[differ_column].to_numpy()
+    left, right = np.triu_indices(len(skills), 1)
+    similar = ((block[left] == block[right]) & (differ[left] != differ[right])
+               & (similarity[left, right] >= threshold - 1e-9))
+    return group_edges(ids[left[similar]], ids[right[similar]], nodes=ids)
+
+
+@pytest.mark.parametrize('threshold', [0.5, 0.7, 0.9])
+@pytest.mark.parametrize('block_column, differ_column', [('GRADE_LEVEL_NAME', 'AUTHORITY'),
+                                                         ('AUTHORITY', 'GRADE_LEVEL_NAME')])
+@pytest.mark.parametrize('seed', range(4))
+def test_variant_groups_match_all_pairs(seed, block_column, differ_column, threshold):
+    skills = _skills(np.random.default_rng(seed), 200)
+
+    result = find_variant_groups(skills, block_column, differ_column, threshold)
+
+    expected = all_pairs_groups(skills, block_column, differ_column, threshold)
+    assert expected.groups
+    assert [group.skill_ids for group in result.groups] == [group.skill_ids for group in expected.groups]
+    assert result.membership == expected.membership
+
+
+def test_same_name_needs_a_different_authority():
+    skills = pd.DataFrame({
+        'SKILL_ID': ['A', 'B', 'C', 'D', 'E'],
+        'NORMALIZED_NAME': ['identify the main idea', 'identify the main idea',
+                            'the main idea identify', 'identify the main idea', 'identify the main idea'],
+        'GRADE_LEVEL_NAME': ['Grade 1', 'Grade 1', 'Grade 1', 'Grade 2', None],
+        'AUTHORITY': ['CCSS', 'CCSS', 'TEKS', 'VA', 'FL'],
+    })
+
+    result = find_variant_groups(skills, 'GRADE_LEVEL_NAME', 'AUTHORITY')
+
+    # A and B join through C; D is alone in its grade and E has no grade
+    assert [group.skill_ids for group in result.groups] == [['A', 'B', 'C']]
+    assert find_variant_groups(skills.iloc[:2], 'GRADE_LEVEL_NAME', 'AUTHORITY').groups == []
+    assert find_variant_groups(skills.iloc[:0], 'GRADE_LEVEL_NAME', 'AUTHORITY').groups == []
@@ -7,16 +7,19 @@ to assess scientific grounding and confidence levels.
 """
 
 import json
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
 from typing import List, Dict, Set
 from collections import defaultdict
-from sentence_transformers import SentenceTransformer
 from sklearn.metrics.pairwise import cosine_similarity
 import warnings
 warnings.filterwarnings('ignore')
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from shared.embeddings import EmbeddingStore, load_embedding_backend
+
 class FrameworkTracker:
     """Track concept mentions across multiple frameworks."""
     
@@ -31,7 +34,8 @@ class FrameworkTracker:
         self.taxonomy_df = None
         self.taxonomy_concepts = []
         self.frameworks = {}
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model = load_embedding_backend('all-MiniLM-L6-v2')
+        self.embedding_store = EmbeddingStore('all-MiniLM-L6-v2', model=self.model)
         
         print("Initializing Framework Tracker...")
         print(f"  Loading taxonomy from: {self.taxonomy_path}")
@@ -158,7 +162,7 @@ class FrameworkTracker:
         # Generate embeddings for taxonomy concepts
         print("  Generating taxonomy embeddings...")
         taxonomy_texts = [c['name'] for c in self.taxonomy_concepts]
-        taxonomy_embeddings = self.model.encode(taxonomy_texts, show_progress_bar=False)
+        taxonomy_embeddings = self.embedding_store.encode(taxonomy_texts)
         
         # Process each framework
         for framework_name, framework_data in self.frameworks.items():
@@ -169,7 +173,7 @@ class FrameworkTracker:
             
             # Generate embeddings for framework concepts
             framework_texts = [c['name'] for c in framework_data['concepts']]
-            framework_embeddings = self.model.encode(framework_texts, show_progress_bar=False)
+            framework_embeddings = self.embedding_store.encode(framework_texts)
             
             # Calculate similarity matrix
             sim_matrix = cosine_similarity(taxonomy_embeddings, framework_embeddings)
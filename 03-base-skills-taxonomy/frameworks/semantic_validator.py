@@ -8,20 +8,33 @@ using semantic embeddings and cosine similarity.
 
 import pandas as pd
 import numpy as np
+import sys
 from pathlib import Path
 from typing import List, Dict, Tuple, Set
 from collections import defaultdict
 import warnings
 warnings.filterwarnings('ignore')
 
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
+from scipy import sparse
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from shared.embeddings import (normalize_embeddings, blocked_cosine_similarity, EmbeddingStore,
+                               load_embedding_backend)
 
 class SemanticValidator:
     """
     Validates taxonomy for semantic duplicates and overlaps using embeddings.
+    
+    The similarity matrix is sparse: only pairs at or above the lowest
+    threshold in use are stored (missing entries read as 0).
     """
     
+    # Thresholds of the fixed-level analyses (high_similar, cross-strand)
+    HIGH_SIMILARITY = 0.90
+    
+    # Largest taxonomy whose full matrix is written to similarity_matrix.csv
+    DENSE_MATRIX_LIMIT = 10000
+    
     def __init__(self, taxonomy_csv_path: str, similarity_threshold: float = 0.85):
         """
         Initialize the semantic validator.
@@ -35,13 +48,16 @@ class SemanticValidator:
         self.df = None
         self.concepts = []
         self.embeddings = None
+        self.normalized_embeddings = None
         self.similarity_matrix = None
+        self.matrix_floor = None
         
         print(f"Initializing Semantic Validator...")
         print(f"  Similarity threshold: {self.threshold}")
         print(f"  Loading model: all-MiniLM-L6-v2...")
         
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model = load_embedding_backend('all-MiniLM-L6-v2')
+        self.embedding_store = EmbeddingStore('all-MiniLM-L6-v2', model=self.model, batch_size=32)
         print(f"  ✓ Model loaded successfully")
         
     def load_concepts(self) -> List[Dict]:
@@ -135,25 +151,49 @@ class SemanticValidator:
         texts = [c['embed_text'] for c in self.concepts]
         
         print(f"  Encoding {len(texts)} concepts...")
-        self.embeddings = self.model.encode(texts, show_progress_bar=True, batch_size=32)
+        self.embeddings = self.embedding_store.encode(texts, show_progress_bar=True)
         
         print(f"  ✓ Generated embeddings: shape {self.embeddings.shape}")
         
-    def calculate_similarity_matrix(self):
+    def calculate_similarity_matrix(self, min_similarity: float = None):
         """
-        Calculate pairwise cosine similarity matrix.
+        Calculate the sparse pairwise cosine similarity matrix.
+        
+        Computed in float32 blocks; pairs below min_similarity (default: the
+        lowest threshold used by the analyses) and the diagonal are not stored.
+        
+        Args:
+            min_similarity: Lowest similarity to keep
         """
         print(f"\nCalculating similarity matrix...")
         
         if self.embeddings is None:
             raise ValueError("No embeddings. Call generate_embeddings() first.")
         
-        self.similarity_matrix = cosine_similarity(self.embeddings)
+        if min_similarity is None:
+            min_similarity = min(self.threshold, self.HIGH_SIMILARITY)
         
-        print(f"  ✓ Similarity matrix: {self.similarity_matrix.shape}")
+        self.normalized_embeddings = normalize_embeddings(self.embeddings)
+        self.similarity_matrix = blocked_cosine_similarity(
+            self.normalized_embeddings, threshold=min_similarity, normalized=True
+        )
+        self.matrix_floor = min_similarity
         
-        # Set diagonal to 0 (ignore self-similarity)
-        np.fill_diagonal(self.similarity_matrix, 0)
+        print(f"  ✓ Similarity matrix: {self.similarity_matrix.shape} "
+              f"({self.similarity_matrix.nnz} pairs >= {min_similarity})")
+    
+    def _ensure_matrix(self, min_similarity: float):
+        """Recompute the matrix if it does not store pairs down to min_similarity."""
+        if self.similarity_matrix is None or min_similarity < self.matrix_floor:
+            self.calculate_similarity_matrix(min(min_similarity, self.threshold, self.HIGH_SIMILARITY))
+    
+    def _upper_pairs(self, min_similarity: float):
+        """Stored pairs (i < j) with similarity >= min_similarity, ordered by (i, j)."""
+        upper = sparse.triu(self.similarity_matrix, k=1).tocsr()
+        upper.sort_indices()
+        rows = np.repeat(np.arange(upper.shape[0]), np.diff(upper.indptr))
+        keep = upper.data >= min_similarity
+        return zip(rows[keep], upper.indices[keep], upper.data[keep])
         
     def find_similar_pairs(self, min_similarity: float = None) -> List[Dict]:
         """
@@ -169,31 +209,27 @@ class SemanticValidator:
             min_similarity = self.threshold
         
         print(f"\nFinding similar pairs (threshold: {min_similarity})...")
+        self._ensure_matrix(min_similarity)
         
         similar_pairs = []
         
-        n = len(self.concepts)
-        for i in range(n):
-            for j in range(i + 1, n):
-                sim = self.similarity_matrix[i, j]
-                
-                if sim >= min_similarity:
-                    c1 = self.concepts[i]
-                    c2 = self.concepts[j]
-                    
-                    similar_pairs.append({
-                        'concept1_id': c1['id'],
-                        'concept1_name': c1['name'],
-                        'concept1_level': c1['level'],
-                        'concept1_path': c1['path'],
-                        'concept2_id': c2['id'],
-                        'concept2_name': c2['name'],
-                        'concept2_level': c2['level'],
-                        'concept2_path': c2['path'],
-                        'similarity': sim,
-                        'same_level': c1['level'] == c2['level'],
-                        'same_strand': c1['path'].split(' > ')[0] == c2['path'].split(' > ')[0] if ' > ' in c1['path'] and ' > ' in c2['path'] else False
-                    })
+        for i, j, sim in self._upper_pairs(min_similarity):
+            c1 = self.concepts[i]
+            c2 = self.concepts[j]
+            
+            similar_pairs.append({
+                'concept1_id': c1['id'],
+                'concept1_name': c1['name'],
+                'concept1_level': c1['level'],
+                'concept1_path': c1['path'],
+                'concept2_id': c2['id'],
+                'concept2_name': c2['name'],
+                'concept2_level': c2['level'],
+                'concept2_path': c2['path'],
+                'similarity': sim,
+                'same_level': c1['level'] == c2['level'],
+                'same_strand': c1['path'].split(' > ')[0] == c2['path'].split(' > ')[0] if ' > ' in c1['path'] and ' > ' in c2['path'] else False
+            })
         
         # Sort by similarity (highest first)
         similar_pairs.sort(key=lambda x: x['similarity'], reverse=True)
@@ -211,6 +247,7 @@ class SemanticValidator:
             List of similar siblings that may indicate issues
         """
         print(f"\nAnalyzing sibling similarity...")
+        self._ensure_matrix(self.threshold)
         
         # Group concepts by parent
         siblings_by_parent = defaultdict(list)
@@ -264,32 +301,29 @@ class SemanticValidator:
         """
         print(f"\nAnalyzing cross-strand similarity (threshold: {high_threshold})...")
         
+        self._ensure_matrix(high_threshold)
+        
         cross_strand = []
         
-        n = len(self.concepts)
-        for i in range(n):
-            for j in range(i + 1, n):
-                c1 = self.concepts[i]
-                c2 = self.concepts[j]
-                
-                # Check if different strands
-                strand1 = c1['path'].split(' > ')[0] if ' > ' in c1['path'] else c1['name']
-                strand2 = c2['path'].split(' > ')[0] if ' > ' in c2['path'] else c2['name']
-                
-                if strand1 != strand2:
-                    sim = self.similarity_matrix[i, j]
-                    
-                    if sim >= high_threshold:
-                        cross_strand.append({
-                            'strand1': strand1,
-                            'concept1_name': c1['name'],
-                            'concept1_path': c1['path'],
-                            'strand2': strand2,
-                            'concept2_name': c2['name'],
-                            'concept2_path': c2['path'],
-                            'similarity': sim,
-                            'issue': 'Very high similarity across different strands - potential duplication'
-                        })
+        for i, j, sim in self._upper_pairs(high_threshold):
+            c1 = self.concepts[i]
+            c2 = self.concepts[j]
+            
+            # Check if different strands
+            strand1 = c1['path'].split(' > ')[0] if ' > ' in c1['path'] else c1['name']
+            strand2 = c2['path'].split(' > ')[0] if ' > ' in c2['path'] else c2['name']
+            
+            if strand1 != strand2:
+                cross_strand.append({
+                    'strand1': strand1,
+                    'concept1_name': c1['name'],
+                    'concept1_path': c1['path'],
+                    'strand2': strand2,
+                    'concept2_name': c2['name'],
+                    'concept2_path': c2['path'],
+                    'similarity': sim,
+                    'issue': 'Very high similarity across different strands - potential duplication'
+                })
         
         cross_strand.sort(key=lambda x: x['similarity'], reverse=True)
         
@@ -309,6 +343,7 @@ class SemanticValidator:
             List of parent-child pairs with too-high similarity
         """
         print(f"\nAnalyzing parent-child relationships...")
+        self._ensure_matrix(max_acceptable)
         
         hierarchy_order = ['Strand', 'Pillar', 'Domain', 'Skill Area', 'Skill Set', 'Skill Subset']
         
@@ -369,15 +404,14 @@ class SemanticValidator:
         cross_strand = self.analyze_cross_strand()
         parent_child = self.analyze_parent_child()
         
-        # Save similarity matrix
-        matrix_path = output_path / 'similarity_matrix.csv'
-        matrix_df = pd.DataFrame(
-            self.similarity_matrix,
-            index=[f"{c['id']}:{c['name']}" for c in self.concepts],
-            columns=[f"{c['id']}:{c['name']}" for c in self.concepts]
-        )
-        matrix_df.to_csv(matrix_path)
-        print(f"\n✓ Saved similarity matrix: {matrix_path}")
+        # Save similarity matrix (dense CSV only for taxonomies small enough to view)
+        if len(self.concepts) <= self.DENSE_MATRIX_LIMIT:
+            matrix_path = output_path / 'similarity_matrix.csv'
+            self._save_dense_matrix(matrix_path)
+            print(f"\n✓ Saved similarity matrix: {matrix_path}")
+        else:
+            print(f"\n  Skipped dense similarity matrix ({len(self.concepts)} concepts > "
+                  f"{self.DENSE_MATRIX_LIMIT}); see potential_duplicates.csv")
         
         # Save potential duplicates
         if all_similar:
@@ -416,6 +450,25 @@ class SemanticValidator:
             'output_dir': str(output_path)
         }
     
+    def _save_dense_matrix(self, matrix_path: Path, block_size: int = 1024):
+        """
+        Write the full similarity matrix to CSV one row block at a time.
+        
+        Args:
+            matrix_path: Output CSV path
+            block_size: Rows computed and written per block
+        """
+        labels = [f"{c['id']}:{c['name']}" for c in self.concepts]
+        pd.DataFrame(columns=labels).to_csv(matrix_path)
+        
+        for start in range(0, len(labels), block_size):
+            stop = min(start + block_size, len(labels))
+            block = self.normalized_embeddings[start:stop] @ self.normalized_embeddings.T
+            block[np.arange(stop - start), np.arange(start, stop)] = 0
+            pd.DataFrame(block, index=labels[start:stop]).to_csv(
+                matrix_path, mode='a', header=False
+            )
+    
     def _generate_markdown_report(self, all_similar, high_similar, sibling_conflicts, 
                                    cross_strand, parent_child) -> List[str]:
         """Generate markdown report content."""
@@ -24,14 +24,17 @@ import argparse
 
 # Add parent directories to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+from shared.utils.export import read_records
+from shared.utils.grouping import group_relationships
 
 try:
-    from sentence_transformers import SentenceTransformer
     from sklearn.cluster import HDBSCAN
     import numpy as np
-    CLUSTERING_AVAILABLE = True
+    from shared.embeddings import EmbeddingStore, embedding_backend_available, load_embedding_backend
+    CLUSTERING_AVAILABLE = embedding_backend_available()
 except ImportError:
     CLUSTERING_AVAILABLE = False
+if not CLUSTERING_AVAILABLE:
     print("Warning: sentence-transformers or sklearn not available. Clustering disabled.")
 
 try:
@@ -69,7 +72,8 @@ class BaseSkillExtractor:
         
         # Load sentence transformer if available
         if self.use_clustering:
-            self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+            self.embedder = load_embedding_backend('all-MiniLM-L6-v2')
+            self.embedding_store = EmbeddingStore('all-MiniLM-L6-v2', model=self.embedder)
             print("✓ Loaded sentence transformer: all-MiniLM-L6-v2")
         
         # Initialize Bedrock client if available
@@ -183,6 +187,10 @@ class BaseSkillExtractor:
         """
         Seed clusters from redundancy SPECIFICATION_VARIANT relationships.
         
+        Each connected group of SPECIFICATION_VARIANT relationships becomes
+        one seed cluster, so chains of variants (A~B, B~C) share a cluster
+        regardless of the order relationships appear in the results file.
+        
         Args:
             skills_df: DataFrame with ROCK skills
             
@@ -196,8 +204,8 @@ class BaseSkillExtractor:
         print(f"  Loading redundancy results from {self.redundancy_results_path}...")
         
         try:
-            with open(self.redundancy_results_path, 'r') as f:
-                relationships = json.load(f)
+            # .jsonl / .parquet from the redundancy analyzer, or a JSON array
+            relationships = list(read_records(self.redundancy_results_path))
         except Exception as e:
             print(f"  ⚠ Could not load redundancy results: {e}")
             return [], set()
@@ -208,32 +216,29 @@ class BaseSkillExtractor:
         
         print(f"  Found {len(spec_variants)} SPECIFICATION_VARIANT relationships")
         
-        seed_clusters = []
-        processed_skill_ids = set()
-        
+        # Only relationships between skills in this catalog
+        first_rows = skills_df.drop_duplicates(subset=['SKILL_ID'])
+        skill_names = dict(zip(first_rows['SKILL_ID'], first_rows['SKILL_NAME']))
+        spec_variants = [r for r in spec_variants
+                         if r.get('skill_a_id') in skill_names and r.get('skill_b_id') in skill_names]
+        
+        # Variants of variants belong to one cluster: seed clusters are the
+        # connected groups of the SPECIFICATION_VARIANT graph
+        grouping = group_relationships(spec_variants, nodes=first_rows['SKILL_ID'].tolist(),
+                                       id_prefix='SEED')
+        group_relationships_by_id = defaultdict(list)
         for rel in spec_variants:
-            skill_a_id = rel.get('skill_a_id')
-            skill_b_id = rel.get('skill_b_id')
-            
-            if not skill_a_id or not skill_b_id:
-                continue
-            
-            # Skip if already processed
-            if skill_a_id in processed_skill_ids or skill_b_id in processed_skill_ids:
-                continue
-            
-            # Get skill names for base skill generation
-            skill_a_row = skills_df[skills_df['SKILL_ID'] == skill_a_id]
-            skill_b_row = skills_df[skills_df['SKILL_ID'] == skill_b_id]
-            
-            if skill_a_row.empty or skill_b_row.empty:
-                continue
+            group_relationships_by_id[grouping.group_of(rel['skill_a_id'])].append(rel)
+        
+        seed_clusters = []
+        for group in grouping.groups:
+            group_rels = group_relationships_by_id[group.group_id]
             
-            skill_a_name = skill_a_row.iloc[0]['SKILL_NAME']
-            skill_b_name = skill_b_row.iloc[0]['SKILL_NAME']
+            # The closest pair names the cluster
+            representative = max(group_rels, key=self._relationship_composite)
             
             # Extract base skill name from structural components if available
-            similarity_exp = rel.get('similarity_explanation', {})
+            similarity_exp = representative.get('similarity_explanation') or {}
             structural = similarity_exp.get('components', {}).get('structural', {})
             
             # Try to get overlapping actions and targets
@@ -247,29 +252,43 @@ class BaseSkillExtractor:
                 base_name = f"{action.capitalize()} {target.capitalize()}"
             else:
                 # Fallback: use normalized form of first skill
-                base_name = self.normalize_skill_name(skill_a_name).title()
-            
-            # Extract specification differences if available
-            spec_diffs = similarity_exp.get('specification_differences', {})
+                base_name = self.normalize_skill_name(skill_names[representative['skill_a_id']]).title()
+            
+            # Specification differences across all of the group's relationships
+            spec_diffs = {}
+            for rel in group_rels:
+                rel_diffs = (rel.get('similarity_explanation') or {}).get('specification_differences', {})
+                for spec_field, values in rel_diffs.items():
+                    merged = spec_diffs.setdefault(spec_field, [])
+                    for value in (values if isinstance(values, (list, tuple)) else [values]):
+                        if value not in merged:
+                            merged.append(value)
             
             seed_clusters.append({
                 'base_skill_name': base_name,
-                'member_skill_ids': [skill_a_id, skill_b_id],
-                'member_skill_names': [skill_a_name, skill_b_name],
-                'confidence': rel.get('confidence', 'medium'),
-                'similarity_score': rel.get('similarity_scores', {}).get('composite', 0.0),
+                'member_skill_ids': group.skill_ids,
+                'member_skill_names': [skill_names[skill_id] for skill_id in group.skill_ids],
+                'confidence': (group.mean_confidence if group.mean_confidence is not None
+                               else representative.get('confidence', 'medium')),
+                'similarity_score': self._relationship_composite(representative),
                 'specifications': spec_diffs,
                 'source': 'redundancy_seeded',
-                'cluster_id': f"SEED-{len(seed_clusters)}"
+                'cluster_id': group.group_id
             })
-            
-            processed_skill_ids.add(skill_a_id)
-            processed_skill_ids.add(skill_b_id)
+        
+        processed_skill_ids = set(grouping.membership)
         
         print(f"  ✓ Created {len(seed_clusters)} seed clusters covering {len(processed_skill_ids)} skills")
         
         return seed_clusters, processed_skill_ids
     
+    @staticmethod
+    def _relationship_composite(rel: Dict) -> float:
+        """Composite score of a relationship record (flat or nested scores)."""
+        if 'composite' in rel:
+            return rel['composite']
+        return rel.get('similarity_scores', {}).get('composite', 0.0)
+    
     def cluster_similar_skills(self, skills_df: pd.DataFrame, threshold: float = 0.75) -> Dict[int, List]:
         """
         Cluster similar skills using semantic embeddings.
@@ -287,7 +306,7 @@ class BaseSkillExtractor:
         
         print(f"Generating embeddings for {len(skills_df)} skills...")
         skill_names = skills_df['normalized_name'].tolist()
-        embeddings = self.embedder.encode(skill_names, show_progress_bar=True)
+        embeddings = self.embedding_store.encode(skill_names, show_progress_bar=True)
         
         print("Clustering similar skills...")
         clusterer = HDBSCAN(
@@ -537,7 +556,7 @@ def main():
     parser.add_argument('--output', default='../../taxonomy/base_skills',
                        help='Output directory for base skills JSON files')
     parser.add_argument('--redundancy-results', type=str, default=None,
-                       help='Path to redundancy analysis results JSON (enables seed clustering)')
+                       help='Path to redundancy relationships (.jsonl, .parquet or .json; enables seed clustering)')
     parser.add_argument('--limit', type=int, default=None,
                        help='Limit number of skills to process (for testing)')
     parser.add_argument('--no-llm', action='store_true',
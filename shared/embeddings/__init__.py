@@ -0,0 +1,46 @@
+"""Shared embedding utilities for all projects.
+
+This module provides a persistent embedding store and similarity search
+over sentence-transformer embeddings that scales past an in-memory n x n
+matrix.
+"""
+
+from .similarity import normalize_embeddings, pair_cosine, blocked_cosine_similarity
+from .ann_index import ANNIndex, HNSWLIB_AVAILABLE
+from .store import EmbeddingStore, load_store_config
+from .encoder import BucketedEncoder
+from .backends import (
+    OnnxEmbeddingBackend,
+    embedding_backend_available,
+    load_embedding_backend,
+    export_onnx,
+    check_agreement,
+)
+from .quantization import (
+    QuantizedEmbeddings,
+    quantize_embeddings,
+    quantized_pair_cosine,
+    quantized_cosine_similarity,
+    rescore_pairs,
+)
+
+__all__ = [
+    'normalize_embeddings',
+    'pair_cosine',
+    'blocked_cosine_similarity',
+    'ANNIndex',
+    'HNSWLIB_AVAILABLE',
+    'EmbeddingStore',
+    'load_store_config',
+    'BucketedEncoder',
+    'OnnxEmbeddingBackend',
+    'embedding_backend_available',
+    'load_embedding_backend',
+    'export_onnx',
+    'check_agreement',
+    'QuantizedEmbeddings',
+    'quantize_embeddings',
+    'quantized_pair_cosine',
+    'quantized_cosine_similarity',
+    'rescore_pairs',
+]
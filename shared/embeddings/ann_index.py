@@ -0,0 +1,386 @@
+"""Persistent approximate-nearest-neighbour index over embeddings.
+
+Vectors are stored L2-normalized and searched by cosine similarity under
+string keys (SKILL_IDs, taxonomy paths, ...). Two backends are available:
+
+- ``hnsw``: hnswlib graph index (used by default when hnswlib is installed)
+- ``ivf``: NumPy inverted-file index. Vectors are assigned to the nearest
+  of ``n_lists`` k-means centroids and a query scans only the ``nprobe``
+  closest lists. Below ``min_train_size`` vectors it searches exhaustively.
+
+Both support incremental inserts, deletion by key and save/load to a
+directory (``meta.json``, ``vectors.npy`` plus the backend's own files).
+"""
+
+import json
+import numpy as np
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import logging
+
+from .similarity import normalize_embeddings
+
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    HNSWLIB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class ANNIndex:
+    """Cosine-similarity ANN index with string keys, deletes and persistence."""
+
+    def __init__(self,
+                 dim: int,
+                 method: str = 'auto',
+                 M: int = 16,
+                 ef_construction: int = 200,
+                 ef_search: int = 64,
+                 n_lists: Optional[int] = None,
+                 nprobe: int = 8,
+                 min_train_size: int = 4096,
+                 seed: int = 42):
+        """
+        Args:
+            dim: Embedding dimension
+            method: 'hnsw', 'ivf', or 'auto' (hnsw if hnswlib is installed)
+            M: HNSW graph degree
+            ef_construction: HNSW build-time candidate list size
+            ef_search: HNSW query-time candidate list size
+            n_lists: IVF list count (default ~4 * sqrt(n) at training time)
+            nprobe: IVF lists scanned per query
+            min_train_size: IVF searches exhaustively below this many vectors
+            seed: Random seed for IVF k-means
+        """
+        if method == 'auto':
+            method = 'hnsw' if HNSWLIB_AVAILABLE else 'ivf'
+        if method == 'hnsw' and not HNSWLIB_AVAILABLE:
+            raise ImportError("hnswlib is not installed (pip install hnswlib); use method='ivf'")
+        if method not in ('hnsw', 'ivf'):
+            raise ValueError(f"Unknown ANN method: {method}")
+
+        self.dim = dim
+        self.method = method
+        self.params = {
+            'M': M, 'ef_construction': ef_construction, 'ef_search': ef_search,
+            'n_lists': n_lists, 'nprobe': nprobe, 'min_train_size': min_train_size,
+            'seed': seed
+        }
+        self.metadata: Dict = {}
+
+        # Row storage: row -> key (None once deleted), key -> row
+        self._keys: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._vectors = np.empty((0, dim), dtype=np.float32)
+        self._alive = np.empty(0, dtype=bool)
+
+        # HNSW state
+        self._hnsw = None
+
+        # IVF state
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.empty(0, dtype=np.int64)
+        self._list_cache: Optional[List[np.ndarray]] = None
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._rows
+
+    @property
+    def keys(self) -> List[str]:
+        """Live keys in insertion order."""
+        return [key for key in self._keys if key is not None]
+
+    def get_vector(self, key: str) -> np.ndarray:
+        """Stored (normalized) vector for a key."""
+        return self._vectors[self._rows[key]]
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def add(self, keys: Sequence[str], vectors: np.ndarray):
+        """
+        Insert vectors under keys; an existing key is replaced.
+
+        Args:
+            keys: One key per vector
+            vectors: Array of shape (len(keys), dim)
+        """
+        keys = [str(key) for key in keys]
+        vectors = normalize_embeddings(np.atleast_2d(vectors))
+        if len(keys) != len(vectors):
+            raise ValueError(f"{len(keys)} keys for {len(vectors)} vectors")
+        if len(set(keys)) != len(keys):
+            raise ValueError("Duplicate keys in one add() call")
+        if len(keys) == 0:
+            return
+
+        self.remove([key for key in keys if key in self._rows])
+
+        start = len(self._keys)
+        rows = np.arange(start, start + len(keys))
+        self._reserve(start + len(keys))
+        self._vectors[rows] = vectors
+        self._alive[rows] = True
+        self._keys.extend(keys)
+        self._rows.update(zip(keys, rows.tolist()))
+
+        if self.method == 'hnsw':
+            self._hnsw_add(vectors, rows)
+        elif self._centroids is not None:
+            self._assignments[rows] = self._nearest_centroids(vectors)
+            self._list_cache = None
+            if len(self) > 4 * self._trained_size:
+                self.train()
+        elif len(self) >= self.params['min_train_size']:
+            self.train()
+
+    def remove(self, keys: Iterable[str]) -> int:
+        """
+        Delete keys from the index (unknown keys are ignored).
+
+        Args:
+            keys: Keys to delete
+
+        Returns:
+            Number of keys removed
+        """
+        removed = 0
+        for key in keys:
+            row = self._rows.pop(str(key), None)
+            if row is None:
+                continue
+            self._keys[row] = None
+            self._alive[row] = False
+            if self._hnsw is not None:
+                self._hnsw.mark_deleted(row)
+            removed += 1
+        return removed
+
+    def _reserve(self, size: int):
+        """Grow row storage geometrically."""
+        capacity = len(self._vectors)
+        if size <= capacity:
+            return
+        capacity = max(size, 2 * capacity, 1024)
+        vectors = np.empty((capacity, self.dim), dtype=np.float32)
+        vectors[:len(self._keys)] = self._vectors[:len(self._keys)]
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self._keys)] = self._alive[:len(self._keys)]
+        assignments = np.full(capacity, -1, dtype=np.int64)
+        assignments[:len(self._keys)] = self._assignments[:len(self._keys)]
+        self._vectors, self._alive, self._assignments = vectors, alive, assignments
+
+    def _hnsw_add(self, vectors: np.ndarray, rows: np.ndarray):
+        if self._hnsw is None:
+            self._hnsw = hnswlib.Index(space='cosine', dim=self.dim)
+            self._hnsw.init_index(max_elements=len(self._vectors),
+                                  ef_construction=self.params['ef_construction'],
+                                  M=self.params['M'],
+                                  random_seed=self.params['seed'])
+        elif self._hnsw.get_max_elements() < len(self._vectors):
+            self._hnsw.resize_index(len(self._vectors))
+        self._hnsw.add_items(vectors, rows)
+
+    # ------------------------------------------------------------------
+    # IVF training
+    # ------------------------------------------------------------------
+
+    def train(self, iterations: int = 10):
+        """
+        (Re)train IVF centroids with spherical k-means on the live vectors.
+
+        Args:
+            iterations: k-means iterations
+        """
+        if self.method != 'ivf':
+            return
+        rows = np.flatnonzero(self._alive[:len(self._keys)])
+        if len(rows) == 0:
+            return
+
+        n_lists = self.params['n_lists'] or int(round(4 * np.sqrt(len(rows))))
+        n_lists = max(1, min(n_lists, len(rows)))
+        rng = np.random.default_rng(self.params['seed'])
+        sample = rows if len(rows) <= 256 * n_lists else rng.choice(rows, 256 * n_lists, replace=False)
+        data = self._vectors[sample]
+
+        centroids = data[rng.choice(len(data), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            labels = np.argmax(data @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, data)
+            counts = np.bincount(labels, minlength=n_lists)
+            # Empty lists keep their previous centroid
+            filled = counts > 0
+            centroids[filled] = normalize_embeddings(sums[filled])
+
+        self._centroids = centroids
+        self._assignments[:] = -1
+        self._assignments[rows] = self._nearest_centroids(self._vectors[rows])
+        self._list_cache = None
+        self._trained_size = len(rows)
+        logger.debug(f"Trained IVF with {n_lists} lists on {len(sample)} vectors")
+
+    def _nearest_centroids(self, vectors: np.ndarray, block_size: int = 8192) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), block_size):
+            stop = min(start + block_size, len(vectors))
+            labels[start:stop] = np.argmax(vectors[start:stop] @ self._centroids.T, axis=1)
+        return labels
+
+    def _lists(self) -> List[np.ndarray]:
+        """Live rows per IVF list (rebuilt lazily after updates)."""
+        if self._list_cache is None:
+            n = len(self._keys)
+            rows = np.flatnonzero(self._alive[:n])
+            labels = self._assignments[rows]
+            order = np.argsort(labels, kind='stable')
+            bounds = np.searchsorted(labels[order], np.arange(len(self._centroids) + 1))
+            self._list_cache = [rows[order[bounds[i]:bounds[i + 1]]]
+                                for i in range(len(self._centroids))]
+        return self._list_cache
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, queries: np.ndarray, top_k: int = 10) -> List[List[Tuple[str, float]]]:
+        """
+        Find the top_k most similar keys for each query.
+
+        Args:
+            queries: Array of shape (n_queries, dim) or a single vector
+            top_k: Neighbours per query
+
+        Returns:
+            For each query, a list of (key, cosine similarity), best first
+        """
+        queries = normalize_embeddings(np.atleast_2d(queries))
+        k = min(top_k, len(self))
+        if k == 0:
+            return [[] for _ in range(len(queries))]
+
+        if self.method == 'hnsw':
+            self._hnsw.set_ef(max(self.params['ef_search'], k))
+            labels, distances = self._hnsw.knn_query(queries, k=k)
+            return [[(self._keys[row], float(1.0 - dist)) for row, dist in zip(row_labels, row_dists)]
+                    for row_labels, row_dists in zip(labels, distances)]
+
+        if self._centroids is None:
+            return self._search_flat(queries, k)
+        return self._search_ivf(queries, k)
+
+    def _search_flat(self, queries: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        n = len(self._keys)
+        scores = queries @ self._vectors[:n].T
+        scores[:, ~self._alive[:n]] = -np.inf
+        return [self._top(np.arange(n), row_scores, k) for row_scores in scores]
+
+    def _search_ivf(self, queries: np.ndarray, k: int) -> List[List[Tuple[str, float]]]:
+        lists = self._lists()
+        nprobe = min(self.params['nprobe'], len(lists))
+        centroid_scores = queries @ self._centroids.T
+        probes = np.argpartition(-centroid_scores, nprobe - 1, axis=1)[:, :nprobe]
+
+        results = []
+        for query, probe in zip(queries, probes):
+            rows = np.concatenate([lists[p] for p in probe])
+            results.append(self._top(rows, self._vectors[rows] @ query, k))
+        return results
+
+    def _top(self, rows: np.ndarray, scores: np.ndarray, k: int) -> List[Tuple[str, float]]:
+        if len(scores) > k:
+            keep = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[keep], scores[keep]
+        order = np.argsort(-scores, kind='stable')
+        return [(self._keys[rows[i]], float(scores[i])) for i in order if np.isfinite(scores[i])]
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path):
+        """
+        Save the index to a directory.
+
+        Args:
+            path: Output directory (created if needed)
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        n = len(self._keys)
+
+        np.save(path / 'vectors.npy', self._vectors[:n])
+        if self.method == 'hnsw' and self._hnsw is not None:
+            self._hnsw.save_index(str(path / 'hnsw.bin'))
+        if self._centroids is not None:
+            np.save(path / 'centroids.npy', self._centroids)
+            np.save(path / 'assignments.npy', self._assignments[:n])
+
+        with open(path / 'meta.json', 'w') as f:
+            json.dump({
+                'dim': self.dim,
+                'method': self.method,
+                'params': self.params,
+                'keys': self._keys,
+                'trained_size': self._trained_size,
+                'metadata': self.metadata
+            }, f)
+        logger.info(f"Saved {self.method} index ({len(self)} vectors) to {path}")
+
+    @classmethod
+    def load(cls, path, method: Optional[str] = None) -> 'ANNIndex':
+        """
+        Load an index saved with save().
+
+        A saved HNSW index is rebuilt as IVF when hnswlib is unavailable.
+
+        Args:
+            path: Directory written by save()
+            method: Override the saved backend (index is rebuilt if it differs)
+
+        Returns:
+            Loaded ANNIndex
+        """
+        path = Path(path)
+        with open(path / 'meta.json') as f:
+            meta = json.load(f)
+
+        saved_method = meta['method']
+        method = method or saved_method
+        if method == 'hnsw' and not HNSWLIB_AVAILABLE:
+            logger.warning("hnswlib not installed; rebuilding saved index as IVF")
+            method = 'ivf'
+
+        index = cls(meta['dim'], method=method, **meta['params'])
+        index.metadata = meta.get('metadata', {})
+        keys = meta['keys']
+        vectors = np.load(path / 'vectors.npy')
+
+        if method != saved_method:
+            live = [row for row, key in enumerate(keys) if key is not None]
+            index.add([keys[row] for row in live], vectors[live])
+            return index
+
+        n = len(keys)
+        index._reserve(n)
+        index._vectors[:n] = vectors
+        index._alive[:n] = [key is not None for key in keys]
+        index._keys = keys
+        index._rows = {key: row for row, key in enumerate(keys) if key is not None}
+
+        if method == 'hnsw' and n:
+            index._hnsw = hnswlib.Index(space='cosine', dim=index.dim)
+            index._hnsw.load_index(str(path / 'hnsw.bin'), max_elements=len(index._vectors))
+        if (path / 'centroids.npy').exists():
+            index._centroids = np.load(path / 'centroids.npy')
+            index._assignments[:n] = np.load(path / 'assignments.npy')
+            index._trained_size = meta.get('trained_size', 0)
+        return index
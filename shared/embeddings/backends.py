@@ -0,0 +1,377 @@
+"""Pluggable sentence-embedding backends.
+
+Every backend exposes the subset of the SentenceTransformer interface the
+projects use: ``encode(texts, batch_size=..., show_progress_bar=...,
+convert_to_numpy=...)``, ``tokenizer`` and ``max_seq_length``.
+
+- ``sentence_transformers``: the PyTorch SentenceTransformer itself
+- ``onnx``: ONNX Runtime session over an exported transformer plus
+  NumPy pooling/normalization. It needs only onnxruntime and tokenizers
+  at run time (no torch import), and can use an int8 dynamically
+  quantized export.
+
+The backend is chosen by the ``embeddings.backend`` setting in
+config/models.yaml; see export_onnx() for producing the ONNX files.
+"""
+
+import importlib.util
+import json
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import logging
+
+from .store import load_store_config, REPO_ROOT
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('sentence_transformers', 'onnx')
+
+# Packages each backend needs at run time
+BACKEND_PACKAGES = {
+    'sentence_transformers': ('sentence_transformers',),
+    'onnx': ('onnxruntime', 'tokenizers'),
+}
+
+
+def backend_key(model_name: str, config: Optional[Dict] = None) -> str:
+    """
+    Name under which a backend's embeddings are cached.
+
+    ONNX (and especially int8) outputs differ slightly from PyTorch, so they
+    are cached separately from the PyTorch vectors.
+    """
+    config = config or load_store_config()
+    if resolve_backend(model_name, config) != 'onnx':
+        return model_name
+    return f"{model_name}@onnx-int8" if config.get('onnx', {}).get('quantized') else f"{model_name}@onnx"
+
+
+def resolve_backend(model_name: str, config: Optional[Dict] = None, backend: Optional[str] = None) -> str:
+    """
+    Backend load_embedding_backend() will actually use for a model.
+
+    ``onnx`` falls back to ``sentence_transformers`` when the model has no
+    ONNX export, so callers keying caches by backend agree with the model
+    that gets loaded.
+
+    Args:
+        model_name: Sentence-transformers model name or local path
+        config: Embeddings config (default: config/models.yaml)
+        backend: Override embeddings.backend from the config
+    """
+    config = config or load_store_config()
+    backend = backend or config.get('backend', 'sentence_transformers')
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend} (use one of {BACKENDS})")
+    if backend == 'onnx' and not (onnx_model_dir(model_name, config) / 'backend.json').exists():
+        return 'sentence_transformers'
+    return backend
+
+
+def onnx_model_dir(model_name: str, config: Optional[Dict] = None) -> Path:
+    """Directory holding the ONNX export of a model."""
+    config = config or load_store_config()
+    root = Path(config.get('onnx', {}).get('model_dir', '.cache/onnx'))
+    if not root.is_absolute():
+        root = REPO_ROOT / root
+    return root / Path(model_name).name
+
+
+def embedding_backend_available(model_name: str = 'all-MiniLM-L6-v2', backend: Optional[str] = None) -> bool:
+    """
+    Whether the packages of the backend that would be loaded are installed.
+
+    Checked with importlib.util.find_spec, so nothing (in particular torch)
+    is imported; callers import only load_embedding_backend.
+
+    Args:
+        model_name: Sentence-transformers model name or local path
+        backend: Override embeddings.backend from config/models.yaml
+    """
+    backend = resolve_backend(model_name, backend=backend)
+    return all(importlib.util.find_spec(package) is not None for package in BACKEND_PACKAGES[backend])
+
+
+def load_embedding_backend(model_name: str = 'all-MiniLM-L6-v2', backend: Optional[str] = None):
+    """
+    Load the configured embedding backend for a model.
+
+    Args:
+        model_name: Sentence-transformers model name or local path
+        backend: Override embeddings.backend from config/models.yaml
+
+    Returns:
+        A SentenceTransformer or OnnxEmbeddingBackend
+    """
+    config = load_store_config()
+    requested = backend or config.get('backend', 'sentence_transformers')
+    backend = resolve_backend(model_name, config, requested)
+
+    if backend == 'onnx':
+        onnx_config = config.get('onnx', {})
+        return OnnxEmbeddingBackend(onnx_model_dir(model_name, config),
+                                    quantized=onnx_config.get('quantized', False),
+                                    threads=onnx_config.get('threads', 0))
+    if requested == 'onnx':
+        logger.warning(f"No ONNX export at {onnx_model_dir(model_name, config)}; falling back to "
+                       f"sentence_transformers (run: python -m shared.embeddings.backends --model {model_name})")
+
+    from sentence_transformers import SentenceTransformer
+    # Without a configured device, SentenceTransformer picks CUDA/MPS when available
+    if config.get('device'):
+        return SentenceTransformer(model_name, device=config['device'])
+    return SentenceTransformer(model_name)
+
+
+class _LengthTokenizer:
+    """Callable returning input_ids like a Hugging Face tokenizer (for BucketedEncoder)."""
+
+    def __init__(self, tokenizer):
+        self._tokenizer = tokenizer
+
+    def __call__(self, texts: Sequence[str], **kwargs) -> Dict[str, List[List[int]]]:
+        encodings = self._tokenizer.encode_batch(list(texts))
+        return {'input_ids': [encoding.ids[:sum(encoding.attention_mask)] for encoding in encodings]}
+
+
+class OnnxEmbeddingBackend:
+    """Sentence embeddings from an ONNX Runtime export of a SentenceTransformer."""
+
+    def __init__(self, model_dir, quantized: bool = False, threads: int = 0):
+        """
+        Args:
+            model_dir: Directory written by export_onnx()
+            quantized: Use model_int8.onnx instead of model.onnx
+            threads: onnxruntime intra-op threads (0 = library default)
+        """
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        self.model_dir = Path(model_dir)
+        with open(self.model_dir / 'backend.json') as f:
+            self.meta = json.load(f)
+        self.max_seq_length = self.meta['max_seq_length']
+        self.quantized = quantized
+        self.backend_key = f"{self.meta['model_name']}@onnx{'-int8' if quantized else ''}"
+
+        model_file = self.model_dir / ('model_int8.onnx' if quantized else 'model.onnx')
+        if not model_file.exists():
+            raise FileNotFoundError(f"{model_file} not found; export with quantize=True")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(model_file), options,
+                                            providers=['CPUExecutionProvider'])
+        self.input_names = [i.name for i in self.session.get_inputs()]
+
+        self._tokenizer = Tokenizer.from_file(str(self.model_dir / 'tokenizer.json'))
+        self._tokenizer.enable_truncation(self.max_seq_length)
+        self._tokenizer.enable_padding(pad_id=self.meta['pad_token_id'], pad_token=self.meta['pad_token'])
+        self.tokenizer = _LengthTokenizer(self._tokenizer)
+
+    def encode(self, texts: Sequence[str], batch_size: int = 32, show_progress_bar: bool = False,
+               convert_to_numpy: bool = True, normalize_embeddings: bool = False,
+               **kwargs) -> np.ndarray:
+        """
+        Encode texts (SentenceTransformer.encode compatible).
+
+        Args:
+            texts: Texts to encode
+            batch_size: Texts per session run
+            show_progress_bar: Show a tqdm progress bar
+            convert_to_numpy: Accepted for compatibility (always NumPy)
+            normalize_embeddings: L2-normalize even if the model does not
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        batches = range(0, len(texts), batch_size)
+        if show_progress_bar:
+            from tqdm import tqdm
+            batches = tqdm(batches, desc="Batches")
+
+        outputs = []
+        for start in batches:
+            encodings = self._tokenizer.encode_batch(texts[start:start + batch_size])
+            feed = {
+                'input_ids': np.array([e.ids for e in encodings], dtype=np.int64),
+                'attention_mask': np.array([e.attention_mask for e in encodings], dtype=np.int64),
+                'token_type_ids': np.array([e.type_ids for e in encodings], dtype=np.int64),
+            }
+            hidden = self.session.run(None, {name: feed[name] for name in self.input_names})[0]
+            outputs.append(self._pool(hidden, feed['attention_mask']))
+
+        embeddings = np.concatenate(outputs) if outputs else np.empty((0, self.meta['dim']), np.float32)
+        if self.meta['normalize'] or normalize_embeddings:
+            norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+            embeddings = embeddings / np.maximum(norms, 1e-12)
+        embeddings = embeddings.astype(np.float32)
+        return embeddings[0] if single else embeddings
+
+    def _pool(self, hidden: np.ndarray, attention_mask: np.ndarray) -> np.ndarray:
+        """Pool token embeddings as the SentenceTransformer Pooling module does."""
+        mode = self.meta['pooling']
+        if mode == 'cls':
+            return hidden[:, 0]
+        mask = attention_mask[:, :, None].astype(hidden.dtype)
+        if mode == 'max':
+            return np.where(mask > 0, hidden, -1e9).max(axis=1)
+        return (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+
+
+def export_onnx(model_name: str, output_dir=None, quantize: bool = True, opset: int = 14) -> Path:
+    """
+    Export a (locally cached) SentenceTransformer to ONNX.
+
+    Writes model.onnx, optionally model_int8.onnx (dynamic int8 weights),
+    tokenizer.json and backend.json (pooling, normalization, max length).
+    Requires torch, sentence-transformers and onnxruntime.
+
+    Args:
+        model_name: Sentence-transformers model name or local path
+        output_dir: Export directory (default: onnx.model_dir in config)
+        quantize: Also write the int8 quantized model
+        opset: ONNX opset version
+
+    Returns:
+        Export directory
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = Path(output_dir) if output_dir else onnx_model_dir(model_name)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    model = SentenceTransformer(model_name, device='cpu')
+    transformer = model[0]
+    auto_model = transformer.auto_model.eval()
+    tokenizer = transformer.tokenizer
+    pooling = next((module for module in model if type(module).__name__ == 'Pooling'), None)
+    if pooling is None:
+        pooling_mode = 'mean'
+    elif hasattr(pooling, 'get_pooling_mode_str'):
+        pooling_mode = pooling.get_pooling_mode_str()
+    else:
+        pooling_mode = pooling.pooling_mode
+    if pooling_mode not in ('mean', 'cls', 'max'):
+        raise ValueError(f"Unsupported pooling mode for ONNX export: {pooling_mode}")
+
+    sample = tokenizer(['Identify the main idea of a text'], return_tensors='pt')
+    input_names = [name for name in ('input_ids', 'attention_mask', 'token_type_ids') if name in sample]
+    dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names + ['last_hidden_state']}
+
+    class _HiddenStates(torch.nn.Module):
+        # Keyword call: positional argument order differs across transformers versions
+        def __init__(self, encoder):
+            super().__init__()
+            self.encoder = encoder
+
+        def forward(self, *inputs):
+            return self.encoder(**dict(zip(input_names, inputs)), return_dict=True).last_hidden_state
+
+    with torch.no_grad():
+        torch.onnx.export(_HiddenStates(auto_model), tuple(sample[name] for name in input_names),
+                          str(output_dir / 'model.onnx'), input_names=input_names,
+                          output_names=['last_hidden_state'], dynamic_axes=dynamic_axes,
+                          opset_version=opset, dynamo=False)
+    tokenizer.save_pretrained(str(output_dir))
+
+    if quantize:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        quantize_dynamic(str(output_dir / 'model.onnx'), str(output_dir / 'model_int8.onnx'),
+                         weight_type=QuantType.QInt8)
+
+    with open(output_dir / 'backend.json', 'w') as f:
+        json.dump({
+            'model_name': model_name,
+            'dim': getattr(model, 'get_embedding_dimension', model.get_sentence_embedding_dimension)(),
+            'max_seq_length': model.max_seq_length,
+            'pooling': pooling_mode,
+            'normalize': any(type(module).__name__ == 'Normalize' for module in model),
+            'pad_token': tokenizer.pad_token,
+            'pad_token_id': tokenizer.pad_token_id,
+        }, f, indent=2)
+    logger.info(f"Exported {model_name} to {output_dir}")
+    return output_dir
+
+
+def check_agreement(reference, candidate, texts: Sequence[str], batch_size: int = 32) -> Dict:
+    """
+    Cosine agreement between two backends' embeddings of the same texts.
+
+    Args:
+        reference: Backend treated as ground truth (e.g. SentenceTransformer)
+        candidate: Backend under test (e.g. OnnxEmbeddingBackend)
+        texts: Texts to encode with both
+        batch_size: Encode batch size
+
+    Returns:
+        Dictionary with mean, min and p01 cosine and the text count
+    """
+    a = np.asarray(reference.encode(list(texts), batch_size=batch_size), dtype=np.float32)
+    b = np.asarray(candidate.encode(list(texts), batch_size=batch_size), dtype=np.float32)
+    cosines = np.einsum('ij,ij->i', a, b) / np.maximum(
+        np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1), 1e-12)
+    return {
+        'texts': len(texts),
+        'mean_cosine': float(cosines.mean()),
+        'min_cosine': float(cosines.min()),
+        'p01_cosine': float(np.percentile(cosines, 1)),
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+    import sys
+    import time
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='Export a sentence-transformer to ONNX and check agreement')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2', help='Model name or local path')
+    parser.add_argument('--output-dir', help='Export directory (default: onnx.model_dir in config)')
+    parser.add_argument('--no-quantize', action='store_true', help='Skip the int8 export')
+    parser.add_argument('--texts', default=str(REPO_ROOT / 'data' / 'samples' / 'sample_data.csv'),
+                        help='CSV with a SKILL_NAME column for the agreement check')
+    parser.add_argument('--min-cosine', type=float, default=0.99,
+                        help='Fail if any text falls below this cosine to PyTorch')
+    args = parser.parse_args()
+
+    print("=" * 70)
+    print("ONNX EMBEDDING BACKEND EXPORT")
+    print("=" * 70)
+
+    export_dir = export_onnx(args.model, args.output_dir, quantize=not args.no_quantize)
+    print(f"✓ Exported: {export_dir}")
+
+    from sentence_transformers import SentenceTransformer
+    reference = SentenceTransformer(args.model, device='cpu')
+    texts = pd.read_csv(args.texts)['SKILL_NAME'].dropna().astype(str).tolist()
+
+    ok = True
+    results = {}
+    for quantized in ([False] if args.no_quantize else [False, True]):
+        candidate = OnnxEmbeddingBackend(export_dir, quantized=quantized)
+        label = 'onnx-int8' if quantized else 'onnx'
+        agreement = check_agreement(reference, candidate, texts)
+        for name, backend in [('torch', reference), (label, candidate)]:
+            start = time.perf_counter()
+            backend.encode(texts, batch_size=32)
+            agreement[f'{name}_texts_per_sec'] = len(texts) / (time.perf_counter() - start)
+        results[label] = agreement
+        passed = agreement['min_cosine'] >= args.min_cosine
+        ok &= passed
+        print(f"  {label}: mean cosine {agreement['mean_cosine']:.5f}, "
+              f"min {agreement['min_cosine']:.5f} {'✓' if passed else '✗'}  "
+              f"({agreement[f'{label}_texts_per_sec']:.0f} vs "
+              f"{agreement['torch_texts_per_sec']:.0f} texts/sec torch)")
+
+    with open(export_dir / 'agreement.json', 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"✓ Agreement saved: {export_dir / 'agreement.json'}")
+    print("=" * 70)
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,144 @@
+"""Length-bucketed sentence-transformer encoding with token-budget batches.
+
+Texts are sorted by token length and grouped into batches whose padded
+size (batch size x longest text) stays within ``token_budget``. Short
+skill names get large batches and long taxonomy annotations small ones,
+so little compute goes to padding. Batch sizes are rounded down to powers
+of two so each size becomes a single ``encode`` call. Optionally the work
+is spread over a CPU process pool (``start_multi_process_pool``). Results
+are always returned in the input order.
+"""
+
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class BucketedEncoder:
+    """Wrap a SentenceTransformer with length-sorted, token-budget batching."""
+
+    def __init__(self,
+                 model,
+                 token_budget: int = 8192,
+                 max_batch_size: int = 256,
+                 processes: int = 0):
+        """
+        Args:
+            model: Loaded SentenceTransformer (or any object with encode())
+            token_budget: Max padded tokens per batch (batch size x longest text)
+            max_batch_size: Upper bound on batch size
+            processes: CPU worker processes (0 = encode in this process;
+                ignored for backends without a process pool, e.g. ONNX)
+        """
+        self.model = model
+        self.token_budget = token_budget
+        self.max_batch_size = max_batch_size
+        self.processes = processes
+        self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop the worker pool, if one was started."""
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def token_lengths(self, texts: Sequence[str]) -> np.ndarray:
+        """Token count per text (capped at the model's max sequence length)."""
+        max_length = getattr(self.model, 'max_seq_length', None) or 512
+        tokenizer = getattr(self.model, 'tokenizer', None)
+        if tokenizer is not None:
+            encoded = tokenizer(list(texts), add_special_tokens=True, truncation=True,
+                                max_length=max_length)
+            lengths = np.fromiter((len(ids) for ids in encoded['input_ids']),
+                                  dtype=np.int64, count=len(texts))
+        else:
+            # Word-piece estimate when no tokenizer is exposed
+            lengths = np.fromiter((int(len(text.split()) * 1.3) + 2 for text in texts),
+                                  dtype=np.int64, count=len(texts))
+        return np.minimum(lengths, max_length)
+
+    def plan(self, texts: Sequence[str],
+             max_batch_size: Optional[int] = None) -> Tuple[np.ndarray, List[Tuple[int, int, int]]]:
+        """
+        Length order and batch groups for texts.
+
+        Args:
+            texts: Texts to encode
+            max_batch_size: Overrides the instance max_batch_size
+
+        Returns:
+            Tuple of (order, groups): order sorts texts by token length;
+            each group (start, stop, batch_size) covers order[start:stop]
+        """
+        lengths = self.token_lengths(texts)
+        order = np.argsort(lengths, kind='stable')
+        sorted_lengths = lengths[order]
+
+        sizes = np.clip(self.token_budget // np.maximum(sorted_lengths, 1), 1,
+                        max_batch_size or self.max_batch_size)
+        sizes = 2 ** np.floor(np.log2(sizes)).astype(np.int64)
+
+        groups = []
+        start = 0
+        while start < len(order):
+            size = int(sizes[start])
+            # Sizes never increase along sorted lengths; extend while unchanged
+            stop = int(np.searchsorted(-sizes, -size, side='right'))
+            groups.append((start, stop, size))
+            start = stop
+        return order, groups
+
+    def encode(self, texts: Sequence[str], batch_size: Optional[int] = None,
+               show_progress_bar: bool = False, convert_to_numpy: bool = True,
+               **kwargs) -> np.ndarray:
+        """
+        Encode texts in length-sorted, token-budget batches.
+
+        Args:
+            texts: Texts to encode
+            batch_size: Overrides max_batch_size for this call
+            show_progress_bar: Passed to the model per group
+            convert_to_numpy: Accepted for SentenceTransformer compatibility
+            **kwargs: Passed to model.encode (e.g. normalize_embeddings)
+
+        Returns:
+            float32 array of shape (len(texts), dim), in input order
+        """
+        texts = list(texts)
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+
+        order, groups = self.plan(texts, max_batch_size=batch_size)
+
+        result = None
+        for start, stop, size in groups:
+            group_texts = [texts[i] for i in order[start:stop]]
+            if self.processes > 1 and hasattr(self.model, 'start_multi_process_pool'):
+                vectors = self._encode_pool(group_texts, size, **kwargs)
+            else:
+                vectors = self.model.encode(group_texts, batch_size=size,
+                                            show_progress_bar=show_progress_bar,
+                                            convert_to_numpy=True, **kwargs)
+            vectors = np.asarray(vectors, dtype=np.float32)
+            if result is None:
+                result = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+            result[order[start:stop]] = vectors
+
+        logger.debug(f"Encoded {len(texts)} texts in {len(groups)} batch-size groups")
+        return result
+
+    def _encode_pool(self, texts: List[str], batch_size: int, **kwargs) -> np.ndarray:
+        if self._pool is None:
+            self._pool = self.model.start_multi_process_pool(['cpu'] * self.processes)
+        # A few chunks per worker keeps every process busy
+        chunk_size = max(batch_size, -(-len(texts) // (4 * self.processes)))
+        return self.model.encode_multi_process(texts, self._pool, batch_size=batch_size,
+                                               chunk_size=chunk_size, **kwargs)
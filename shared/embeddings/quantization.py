@@ -0,0 +1,217 @@
+"""Scalar-quantized embeddings and similarity kernels.
+
+Embeddings are L2-normalized and stored either as float16 or as int8 codes
+with one float32 scale per vector (``x ~= codes * scale``), cutting resident
+memory by 2x or 4x versus float32. Similarities are computed directly on the
+quantized form, tile by tile; optionally the per-row candidates are then
+re-scored against full-precision vectors (which may be a memory-mapped
+file, e.g. an EmbeddingStore) so the returned top-k scores are exact.
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from scipy import sparse
+from typing import Optional
+
+from .similarity import normalize_embeddings, blocked_top_k
+
+QUANTIZED_DTYPES = ('float16', 'int8')
+
+
+@dataclass
+class QuantizedEmbeddings:
+    """L2-normalized embeddings in float16 or per-vector-scaled int8."""
+    codes: np.ndarray
+    scales: Optional[np.ndarray] = None
+
+    @property
+    def dtype(self) -> str:
+        return str(self.codes.dtype)
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    @property
+    def nbytes(self) -> int:
+        """Resident memory of codes and scales."""
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def dequantize(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """float32 vectors for rows [start, stop)."""
+        vectors = self.codes[start:stop].astype(np.float32)
+        if self.scales is not None:
+            vectors *= self.scales[start:stop, None]
+        return vectors
+
+    def take(self, rows: np.ndarray) -> np.ndarray:
+        """float32 vectors for the given rows."""
+        vectors = self.codes[rows].astype(np.float32)
+        if self.scales is not None:
+            vectors *= self.scales[rows, None]
+        return vectors
+
+
+def quantize_embeddings(embeddings: np.ndarray, dtype: str = 'int8',
+                        normalize: bool = True, block_size: int = 65536) -> QuantizedEmbeddings:
+    """
+    Quantize embeddings to float16 or int8 with a per-vector scale.
+
+    Args:
+        embeddings: Array of shape (n, dim)
+        dtype: 'float16' or 'int8'
+        normalize: L2-normalize first (so dot products are cosines)
+        block_size: Rows converted at a time (bounds float32 temporaries)
+
+    Returns:
+        QuantizedEmbeddings
+    """
+    if dtype not in QUANTIZED_DTYPES:
+        raise ValueError(f"Unsupported quantization dtype: {dtype} (use one of {QUANTIZED_DTYPES})")
+
+    n = len(embeddings)
+    codes = np.empty(np.shape(embeddings), dtype=dtype)
+    scales = np.empty(n, dtype=np.float32) if dtype == 'int8' else None
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        block = np.asarray(embeddings[start:stop], dtype=np.float32)
+        if normalize:
+            block = normalize_embeddings(block)
+        if dtype == 'float16':
+            codes[start:stop] = block
+            continue
+        block_scales = np.abs(block).max(axis=1) / 127.0
+        block_scales[block_scales == 0] = 1.0
+        codes[start:stop] = np.clip(np.rint(block / block_scales[:, None]), -127, 127)
+        scales[start:stop] = block_scales
+
+    return QuantizedEmbeddings(codes, scales)
+
+
+def quantized_pair_cosine(quantized: QuantizedEmbeddings, left: np.ndarray, right: np.ndarray,
+                          block_size: int = 65536) -> np.ndarray:
+    """
+    Approximate cosine for each pair (left[k], right[k]) of quantized rows.
+
+    Args:
+        quantized: Output of quantize_embeddings()
+        left: Row indices of the first item of each pair
+        right: Row indices of the second item of each pair
+        block_size: Pairs per block
+
+    Returns:
+        float32 array of similarities, one per pair
+    """
+    left = np.asarray(left, dtype=np.int64)
+    right = np.asarray(right, dtype=np.int64)
+    scores = np.empty(len(left), dtype=np.float32)
+    for start in range(0, len(left), block_size):
+        stop = min(start + block_size, len(left))
+        scores[start:stop] = np.einsum('ij,ij->i', quantized.take(left[start:stop]),
+                                       quantized.take(right[start:stop]))
+    return scores
+
+
+def rescore_pairs(full_precision: np.ndarray, left: np.ndarray, right: np.ndarray,
+                  other_full_precision: Optional[np.ndarray] = None,
+                  block_size: int = 65536) -> np.ndarray:
+    """
+    Exact cosine for each pair, gathering only the rows involved.
+
+    Args:
+        full_precision: Unnormalized float vectors (array or memmap)
+        left: Row indices into full_precision
+        right: Row indices into other_full_precision (default full_precision)
+        other_full_precision: Vectors for the right-hand items
+        block_size: Pairs per block
+
+    Returns:
+        float32 array of similarities, one per pair
+    """
+    other = full_precision if other_full_precision is None else other_full_precision
+    scores = np.zeros(len(left), dtype=np.float32)
+    for start in range(0, len(left), block_size):
+        stop = min(start + block_size, len(left))
+        a = np.asarray(full_precision[left[start:stop]], dtype=np.float32)
+        b = np.asarray(other[right[start:stop]], dtype=np.float32)
+        dots = np.einsum('ij,ij->i', a, b)
+        norms = np.sqrt(np.einsum('ij,ij->i', a, a) * np.einsum('ij,ij->i', b, b))
+        np.divide(dots, norms, out=scores[start:stop], where=norms > 0)
+    return scores
+
+
+def quantized_cosine_similarity(quantized: QuantizedEmbeddings,
+                                other: Optional[QuantizedEmbeddings] = None,
+                                top_k: Optional[int] = 50,
+                                full_precision: Optional[np.ndarray] = None,
+                                other_full_precision: Optional[np.ndarray] = None,
+                                rescore_factor: int = 4,
+                                threshold: Optional[float] = None,
+                                threshold_margin: float = 0.02,
+                                block_size: int = 2048,
+                                include_self: bool = False) -> sparse.csr_matrix:
+    """
+    Per-row top-k and/or threshold cosine similarity on quantized embeddings.
+
+    Tiles are dequantized on the fly, so only block_size x dim float32
+    values exist at once. With full_precision, each row keeps
+    top_k * rescore_factor quantized candidates (or, without top_k, those
+    within threshold_margin of the threshold), which are re-scored
+    exactly; the final selection and its scores are then full precision.
+
+    Args:
+        quantized: Query embeddings
+        other: Embeddings to compare against (default: quantized)
+        top_k: Entries kept per row (None = threshold only)
+        full_precision: Float vectors of the queries for re-scoring
+        other_full_precision: Float vectors of other (default: full_precision)
+        rescore_factor: Candidate multiplier for re-scoring
+        threshold: Minimum similarity kept (applied to the final scores)
+        threshold_margin: Candidate threshold slack for quantization error
+        block_size: Tile edge
+        include_self: Keep the diagonal when other is None
+
+    Returns:
+        CSR matrix of shape (n, m) with the kept similarities
+    """
+    if top_k is None and threshold is None:
+        raise ValueError("Specify top_k and/or threshold; the dense matrix is not materialized")
+
+    targets = quantized if other is None else other
+    self_compare = other is None and not include_self
+    rescore = full_precision is not None
+    candidate_k = top_k * rescore_factor if rescore and top_k is not None else top_k
+    candidate_threshold = threshold
+    if rescore and threshold is not None:
+        candidate_threshold = None if top_k is not None else threshold - threshold_margin
+
+    def tile(row_start, row_stop, col_start, col_stop):
+        return quantized.dequantize(row_start, row_stop) @ targets.dequantize(col_start, col_stop).T
+
+    candidates = blocked_top_k(tile, len(quantized), len(targets), top_k=candidate_k,
+                               threshold=candidate_threshold,
+                               block_size=block_size, self_compare=self_compare)
+    if not rescore:
+        return candidates
+
+    if other is not None and other_full_precision is None:
+        raise ValueError("other_full_precision is required to re-score against other")
+    rows = np.repeat(np.arange(candidates.shape[0]), np.diff(candidates.indptr))
+    cols = candidates.indices
+    scores = rescore_pairs(full_precision, rows, cols, other_full_precision)
+
+    # Keep the best top_k exact scores per row
+    order = np.lexsort((-scores, rows))
+    rows, cols, scores = rows[order], cols[order], scores[order]
+    starts = np.searchsorted(rows, rows, side='left')
+    keep = np.ones(len(rows), dtype=bool) if top_k is None else np.arange(len(rows)) - starts < top_k
+    if threshold is not None:
+        keep &= scores >= threshold
+
+    result = sparse.csr_matrix((scores[keep], (rows[keep], cols[keep])), shape=candidates.shape)
+    result.sort_indices()
+    return result
@@ -0,0 +1,174 @@
+"""Blocked cosine similarity without materializing the n x n matrix.
+
+Embeddings are L2-normalized once and compared in float32 tiles of
+``block_size`` rows by ``block_size`` columns. Each tile keeps only the
+per-row top-k (via ``argpartition``) and/or the entries above a threshold,
+so peak memory is bounded by the tile size and the kept entries, not by
+the catalog size. Results are returned as a scipy CSR matrix.
+"""
+
+import numpy as np
+from scipy import sparse
+from typing import Callable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_embeddings(embeddings: np.ndarray, dtype=np.float32) -> np.ndarray:
+    """L2-normalize rows (zero vectors stay zero).
+
+    Args:
+        embeddings: Array of shape (n, dim)
+        dtype: Output dtype
+
+    Returns:
+        Normalized copy of the embeddings
+    """
+    normalized = np.array(embeddings, dtype=dtype, copy=True)
+    norms = np.sqrt(np.einsum('ij,ij->i', normalized, normalized))[:, None]
+    np.divide(normalized, norms, out=normalized, where=norms > 0)
+    return normalized
+
+
+def pair_cosine(normalized: np.ndarray, left: np.ndarray, right: np.ndarray,
+                block_size: int = 65536) -> np.ndarray:
+    """Cosine similarity for each pair (left[k], right[k]) of normalized rows.
+
+    Args:
+        normalized: Output of normalize_embeddings()
+        left: Row indices of the first item of each pair
+        right: Row indices of the second item of each pair
+        block_size: Pairs per block (bounds the gathered rows)
+
+    Returns:
+        float32 array of similarities, one per pair
+    """
+    left = np.asarray(left, dtype=np.int64)
+    right = np.asarray(right, dtype=np.int64)
+    scores = np.empty(len(left), dtype=np.float32)
+    for start in range(0, len(left), block_size):
+        stop = min(start + block_size, len(left))
+        scores[start:stop] = np.einsum('ij,ij->i', normalized[left[start:stop]],
+                                       normalized[right[start:stop]])
+    return scores
+
+
+def blocked_cosine_similarity(embeddings: np.ndarray,
+                              other: Optional[np.ndarray] = None,
+                              top_k: Optional[int] = None,
+                              threshold: Optional[float] = None,
+                              block_size: int = 2048,
+                              include_self: bool = False,
+                              normalized: bool = False) -> sparse.csr_matrix:
+    """Sparse cosine similarity: per-row top-k and/or all entries >= threshold.
+
+    With both ``top_k`` and ``threshold``, a row keeps its top-k entries
+    that are also >= threshold. Kept scores are float32.
+
+    Args:
+        embeddings: Query vectors, shape (n, dim)
+        other: Vectors to compare against, shape (m, dim); defaults to embeddings
+        top_k: Entries kept per row
+        threshold: Minimum similarity kept
+        block_size: Tile edge; peak tile memory is block_size^2 float32 values
+        include_self: Keep the diagonal when other is None
+        normalized: Inputs are already L2-normalized float32
+
+    Returns:
+        CSR matrix of shape (n, m) with the kept similarities
+    """
+    if top_k is None and threshold is None:
+        raise ValueError("Specify top_k and/or threshold; the dense matrix is not materialized")
+
+    queries = embeddings if normalized else normalize_embeddings(embeddings)
+    if other is None:
+        targets = queries
+        self_compare = not include_self
+    else:
+        targets = other if normalized else normalize_embeddings(other)
+        self_compare = False
+
+    def tile(row_start, row_stop, col_start, col_stop):
+        return queries[row_start:row_stop] @ targets[col_start:col_stop].T
+
+    return blocked_top_k(tile, len(queries), len(targets), top_k=top_k, threshold=threshold,
+                         block_size=block_size, self_compare=self_compare)
+
+
+def blocked_top_k(tile_fn: Callable[[int, int, int, int], np.ndarray],
+                  n: int, m: int,
+                  top_k: Optional[int] = None,
+                  threshold: Optional[float] = None,
+                  block_size: int = 2048,
+                  self_compare: bool = False) -> sparse.csr_matrix:
+    """Sparse per-row top-k and/or threshold selection over a tiled score matrix.
+
+    Args:
+        tile_fn: Returns the float32 scores for rows [r0, r1) x columns [c0, c1)
+        n: Number of rows
+        m: Number of columns
+        top_k: Entries kept per row
+        threshold: Minimum score kept
+        block_size: Tile edge
+        self_compare: Rows and columns are the same items; skip the diagonal
+
+    Returns:
+        CSR matrix of shape (n, m) with the kept scores
+    """
+    rows, cols, vals = [], [], []
+
+    for row_start in range(0, n, block_size):
+        row_stop = min(row_start + block_size, n)
+        block_rows = row_stop - row_start
+
+        # Running per-row top-k candidates across column tiles
+        best_cols = np.empty((block_rows, 0), dtype=np.int64)
+        best_vals = np.empty((block_rows, 0), dtype=np.float32)
+
+        for col_start in range(0, m, block_size):
+            col_stop = min(col_start + block_size, m)
+            tile = tile_fn(row_start, row_stop, col_start, col_stop)
+
+            if self_compare and col_start < row_stop and row_start < col_stop:
+                diag = np.arange(max(row_start, col_start), min(row_stop, col_stop))
+                tile[diag - row_start, diag - col_start] = -np.inf
+            if threshold is not None:
+                tile[tile < threshold] = -np.inf
+
+            if top_k is None:
+                r, c = np.nonzero(np.isfinite(tile))
+                rows.append(r + row_start)
+                cols.append(c + col_start)
+                vals.append(tile[r, c])
+                continue
+
+            # Reduce the tile to its own top-k, then merge with the running best
+            tile_cols = np.broadcast_to(np.arange(col_start, col_stop), tile.shape)
+            if tile.shape[1] > top_k:
+                keep = np.argpartition(-tile, top_k - 1, axis=1)[:, :top_k]
+                tile_cols = np.take_along_axis(tile_cols, keep, axis=1)
+                tile = np.take_along_axis(tile, keep, axis=1)
+            best_cols = np.concatenate([best_cols, tile_cols], axis=1)
+            best_vals = np.concatenate([best_vals, tile], axis=1)
+            if best_vals.shape[1] > top_k:
+                keep = np.argpartition(-best_vals, top_k - 1, axis=1)[:, :top_k]
+                best_cols = np.take_along_axis(best_cols, keep, axis=1)
+                best_vals = np.take_along_axis(best_vals, keep, axis=1)
+
+        if top_k is not None:
+            r, k = np.nonzero(np.isfinite(best_vals))
+            rows.append(r + row_start)
+            cols.append(best_cols[r, k])
+            vals.append(best_vals[r, k])
+
+    if rows:
+        rows, cols, vals = np.concatenate(rows), np.concatenate(cols), np.concatenate(vals)
+    else:
+        rows = cols = np.empty(0, dtype=np.int64)
+        vals = np.empty(0, dtype=np.float32)
+
+    result = sparse.csr_matrix((vals.astype(np.float32), (rows, cols)), shape=(n, m))
+    result.sort_indices()
+    logger.debug(f"Blocked top-k: kept {result.nnz} of {n * m} entries")
+    return result
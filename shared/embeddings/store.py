@@ -0,0 +1,292 @@
+"""Persistent embedding store keyed by model and text hash.
+
+Each model gets its own directory holding an append-only, memory-mapped
+vector file plus the SHA-1 of every stored text, in row order::
+
+    <root>/<model>/
+        meta.json        # model name, dim, dtype
+        hashes.bin       # 20-byte SHA-1 per row
+        vectors.bin      # row-major vectors (float32, float16 or int8)
+        scales.bin       # float32 scale per row (int8 only)
+
+``encode()`` looks texts up by hash, encodes only the misses (deduplicated,
+in batches) and appends them, so warm runs do no model inference for
+unchanged text. Misses go through BucketedEncoder (length-sorted,
+token-budget batches, optional process pool). The model is loaded lazily
+on the first miss through the configured backend (PyTorch or ONNX); each
+backend keeps its own directory since their vectors differ slightly. The
+store assumes one writer per directory at a time.
+"""
+
+import hashlib
+import json
+import os
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import logging
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+from .quantization import quantize_embeddings
+from .encoder import BucketedEncoder
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).parent.parent.parent
+DEFAULT_STORE_DIR = REPO_ROOT / '.cache' / 'embeddings'
+STORAGE_DTYPES = ('float32', 'float16', 'int8')
+HASH_BYTES = 20
+
+
+def load_store_config(config_path: Optional[Path] = None) -> Dict:
+    """
+    Read the ``embeddings`` section of config/models.yaml.
+
+    The ROCK_EMBEDDING_STORE environment variable overrides the directory.
+
+    Args:
+        config_path: Path to models.yaml (default: <repo>/config/models.yaml)
+
+    Returns:
+        Dictionary with store_dir, dtype, batch_size, token_budget,
+        processes, enabled, backend and onnx
+    """
+    config = {'store_dir': str(DEFAULT_STORE_DIR), 'dtype': 'float32',
+              'batch_size': 64, 'token_budget': 8192, 'processes': 0, 'enabled': True,
+              'backend': 'sentence_transformers',
+              'onnx': {'model_dir': '.cache/onnx', 'quantized': False, 'threads': 0}}
+    config_path = Path(config_path) if config_path else REPO_ROOT / 'config' / 'models.yaml'
+    if yaml is not None and config_path.exists():
+        with open(config_path) as f:
+            config.update((yaml.safe_load(f) or {}).get('embeddings', {}) or {})
+
+    store_dir = Path(os.environ.get('ROCK_EMBEDDING_STORE', config['store_dir']))
+    if not store_dir.is_absolute():
+        store_dir = REPO_ROOT / store_dir
+    config['store_dir'] = str(store_dir)
+    return config
+
+
+def text_hash(model_name: str, text: str) -> bytes:
+    """SHA-1 of model name and text (the store key)."""
+    return hashlib.sha1(f"{model_name}\0{text}".encode('utf-8')).digest()
+
+
+class EmbeddingStore:
+    """Cache sentence-transformer embeddings on disk, encoding only misses."""
+
+    def __init__(self,
+                 model_name: str = 'all-MiniLM-L6-v2',
+                 model=None,
+                 store_dir: Optional[str] = None,
+                 dtype: Optional[str] = None,
+                 batch_size: Optional[int] = None,
+                 persist: Optional[bool] = None,
+                 token_budget: Optional[int] = None,
+                 processes: Optional[int] = None):
+        """
+        Args:
+            model_name: Sentence-transformers model name (part of the key)
+            model: Loaded model with an encode() method; if None, the
+                configured backend is loaded lazily
+            store_dir: Root directory (default from config/models.yaml)
+            dtype: Storage dtype for new stores: float32, float16 or int8
+            batch_size: Largest encode batch for misses
+            persist: Write to disk (default: config 'enabled'); False keeps
+                the cache in memory for this process only
+            token_budget: Max padded tokens per encode batch
+            processes: CPU encode processes for misses (0 = in-process)
+        """
+        from .backends import backend_key
+
+        config = load_store_config()
+        self.model_name = model_name
+        self._model = model
+        # Key (and directory) name: model name plus the suffix of the backend
+        # that will actually be loaded, e.g. "...@onnx-int8"
+        if model is None:
+            self.key = backend_key(model_name, config)
+        else:
+            self.key = getattr(model, 'backend_key', model_name)
+        self.batch_size = batch_size or config['batch_size']
+        self.token_budget = token_budget or config['token_budget']
+        self.processes = config['processes'] if processes is None else processes
+        self._encoder: Optional[BucketedEncoder] = None
+        self.persist = config['enabled'] if persist is None else persist
+        self.path = Path(store_dir or config['store_dir']) / self.key.replace('/', '__')
+
+        dtype = dtype or config['dtype']
+        if dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Unsupported storage dtype: {dtype} (use one of {STORAGE_DTYPES})")
+        self.dtype = dtype
+        self.dim: Optional[int] = None
+
+        self.hits = 0
+        self.misses = 0
+
+        self._rows: Dict[bytes, int] = {}
+        self._vectors: Optional[np.ndarray] = None
+        self._scales: Optional[np.ndarray] = None
+        self._open()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, text: str) -> bool:
+        return text_hash(self.key, text) in self._rows
+
+    @property
+    def model(self):
+        """The encoder, loaded on first use."""
+        if self._model is None:
+            from .backends import load_embedding_backend
+            logger.info(f"Loading embedding model: {self.key}")
+            model = load_embedding_backend(self.model_name)
+            loaded_key = getattr(model, 'backend_key', self.model_name)
+            if loaded_key != self.key:
+                # Vectors from another backend must not land in this store
+                raise RuntimeError(f"Loaded embedding backend {loaded_key} does not match "
+                                   f"store {self.key}")
+            self._model = model
+        return self._model
+
+    @property
+    def encoder(self) -> BucketedEncoder:
+        """Length-bucketed wrapper around the model."""
+        if self._encoder is None:
+            self._encoder = BucketedEncoder(self.model, token_budget=self.token_budget,
+                                            max_batch_size=self.batch_size,
+                                            processes=self.processes)
+        return self._encoder
+
+    def close(self):
+        """Stop the encoder's worker pool, if any."""
+        if self._encoder is not None:
+            self._encoder.close()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _open(self):
+        """Load the hash index and map the vector file."""
+        meta_path = self.path / 'meta.json'
+        if not self.persist or not meta_path.exists():
+            return
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta['model_name'] != self.key:
+            raise ValueError(f"Store at {self.path} belongs to {meta['model_name']}")
+        self.dim = meta['dim']
+        self.dtype = meta['dtype']
+
+        hashes = np.fromfile(self.path / 'hashes.bin', dtype=f'S{HASH_BYTES}')
+        item_size = np.dtype(self.dtype).itemsize * self.dim
+        # Rows are complete only once their hash is written (hashes go last)
+        n_rows = min(len(hashes), os.path.getsize(self.path / 'vectors.bin') // item_size)
+        if self.dtype == 'int8':
+            n_rows = min(n_rows, os.path.getsize(self.path / 'scales.bin') // 4)
+        self._rows = {h: row for row, h in enumerate(hashes[:n_rows].tolist())}
+        self._map(n_rows)
+
+    def _map(self, n_rows: int):
+        if n_rows == 0:
+            self._vectors = np.empty((0, self.dim), dtype=self.dtype)
+            self._scales = np.empty(0, dtype=np.float32)
+            return
+        self._vectors = np.memmap(self.path / 'vectors.bin', dtype=self.dtype, mode='r',
+                                  shape=(n_rows, self.dim))
+        if self.dtype == 'int8':
+            self._scales = np.memmap(self.path / 'scales.bin', dtype=np.float32, mode='r',
+                                     shape=(n_rows,))
+
+    def _quantize(self, vectors: np.ndarray):
+        """Vectors in the storage dtype (and per-row scales for int8)."""
+        if self.dtype == 'float32':
+            return vectors.astype(np.float32), None
+        quantized = quantize_embeddings(vectors, self.dtype, normalize=False)
+        return quantized.codes, quantized.scales
+
+    def _dequantize(self, rows: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(self._vectors[rows], dtype=np.float32)
+        if self.dtype == 'int8':
+            vectors *= np.asarray(self._scales[rows])[:, None]
+        return vectors
+
+    def _append(self, hashes: List[bytes], vectors: np.ndarray):
+        """Append new rows to disk (or memory) and extend the index."""
+        start = len(self._rows)
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+        codes, scales = self._quantize(vectors)
+
+        if self.persist:
+            self.path.mkdir(parents=True, exist_ok=True)
+            if not (self.path / 'meta.json').exists():
+                with open(self.path / 'meta.json', 'w') as f:
+                    json.dump({'model_name': self.key, 'dim': self.dim,
+                               'dtype': self.dtype}, f)
+            # Drop any partial tail left by an interrupted write before appending
+            for name, row_bytes in [('vectors.bin', codes.itemsize * self.dim),
+                                    ('scales.bin', 4), ('hashes.bin', HASH_BYTES)]:
+                file_path = self.path / name
+                if file_path.exists() and os.path.getsize(file_path) > start * row_bytes:
+                    os.truncate(file_path, start * row_bytes)
+            with open(self.path / 'vectors.bin', 'ab') as f:
+                f.write(np.ascontiguousarray(codes).tobytes())
+            if scales is not None:
+                with open(self.path / 'scales.bin', 'ab') as f:
+                    f.write(scales.tobytes())
+            with open(self.path / 'hashes.bin', 'ab') as f:
+                f.write(b''.join(hashes))
+            self._map(start + len(hashes))
+        else:
+            stored = self._vectors if self._vectors is not None else np.empty((0, self.dim), codes.dtype)
+            self._vectors = np.concatenate([stored, codes])
+            if scales is not None:
+                stored = self._scales if self._scales is not None else np.empty(0, np.float32)
+                self._scales = np.concatenate([stored, scales])
+
+        self._rows.update((h, start + i) for i, h in enumerate(hashes))
+
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    def encode(self, texts: Sequence[str], show_progress_bar: bool = False) -> np.ndarray:
+        """
+        Embeddings for texts, encoding and storing only those not seen before.
+
+        Args:
+            texts: Texts to embed
+            show_progress_bar: Passed to model.encode() for the misses
+
+        Returns:
+            float32 array of shape (len(texts), dim)
+        """
+        texts = [str(text) for text in texts]
+        hashes = [text_hash(self.key, text) for text in texts]
+
+        missing = {}
+        for text, h in zip(texts, hashes):
+            if h not in self._rows and h not in missing:
+                missing[h] = text
+        self.misses += len(missing)
+        self.hits += len(texts) - sum(1 for h in hashes if h in missing)
+
+        if missing:
+            logger.info(f"Embedding store: encoding {len(missing)} new texts "
+                        f"({len(texts) - len(missing)} cached)")
+            vectors = self.encoder.encode(list(missing.values()),
+                                          show_progress_bar=show_progress_bar)
+            self._append(list(missing.keys()), np.asarray(vectors, dtype=np.float32))
+
+        if not texts:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        rows = np.fromiter((self._rows[h] for h in hashes), dtype=np.int64, count=len(hashes))
+        return self._dequantize(rows)
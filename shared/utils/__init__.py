@@ -1,6 +1,7 @@
 """Shared utility functions for all projects.
 
-This module provides common utilities for logging, validation, and data export.
+This module provides common utilities for logging, validation, data export
+and grouping of pairwise relationships.
 """
 
 from .logging_config import setup_logging, get_logger
@@ -11,7 +12,19 @@ from .validation import (
     validate_data_types,
     get_validation_summary
 )
-from .export import export_to_csv, export_to_json, create_report
+from .export import (
+    export_to_csv,
+    export_to_json,
+    create_report,
+    StreamingRecordWriter,
+    read_records
+)
+from .grouping import (
+    SkillGroup,
+    GroupingResult,
+    group_edges,
+    group_relationships
+)
 
 __all__ = [
     'setup_logging',
@@ -24,5 +37,11 @@ __all__ = [
     'export_to_csv',
     'export_to_json',
     'create_report',
+    'StreamingRecordWriter',
+    'read_records',
+    'SkillGroup',
+    'GroupingResult',
+    'group_edges',
+    'group_relationships',
 ]
 
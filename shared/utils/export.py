@@ -1,17 +1,28 @@
 """Common export utilities for CSV and JSON output.
 
-This module provides consistent data export functions across all projects.
+This module provides consistent data export functions across all projects,
+plus streaming JSONL/Parquet record writers for large result sets.
 """
 
 import pandas as pd
+import numpy as np
 import json
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Sequence
 import logging
 from datetime import datetime
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+STREAM_FORMATS = ('jsonl', 'parquet')
+
 
 def export_to_csv(
     df: pd.DataFrame,
@@ -141,3 +152,227 @@ def create_report(
     logger.info(f"Created report: {output_path_obj}")
     return str(output_path_obj)
 
+
+def _json_default(obj: Any) -> Any:
+    """JSON conversion for numpy scalars and arrays."""
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dictionary_key(value: Any) -> Any:
+    """Hashable key identifying a dictionary-encoded value."""
+    if isinstance(value, (dict, list)):
+        return ('json', json.dumps(value, sort_keys=True, default=_json_default))
+    return (type(value).__name__, value)
+
+
+class StreamingRecordWriter:
+    """Append flat records to a JSONL or Parquet file as they are produced.
+    
+    Columns in ``dictionary_columns`` are dictionary-encoded. In JSONL, the
+    first occurrence of a value emits a definition line
+    ``{"$dict": column, "code": k, "value": v}`` and records carry the
+    integer code. In Parquet, columns use Arrow dictionary types. Dict and
+    list values are stored as JSON strings in Parquet. Use read_records()
+    to get the original records back.
+    
+    Parquet rows are buffered and written one row group per ``batch_size``
+    records, so memory stays bounded by the batch. A Parquet file has one
+    schema: when a later batch brings new columns or wider types (int
+    values then floats), the schema is widened and the rows written so far
+    are rewritten under it once, batch by batch. Types that cannot be
+    unified (e.g. numbers then strings) raise ValueError.
+    """
+    
+    def __init__(
+        self,
+        output_path: str,
+        format: str = 'jsonl',
+        dictionary_columns: Sequence[str] = (),
+        batch_size: int = 10000
+    ):
+        """Open the output file.
+        
+        Args:
+            output_path: Output path (suffix is set from the format)
+            format: 'jsonl' or 'parquet' (falls back to JSONL without pyarrow)
+            dictionary_columns: Columns to dictionary-encode
+            batch_size: Records per Parquet row group
+        """
+        if format not in STREAM_FORMATS:
+            raise ValueError(f"Unsupported stream format: {format} (use one of {STREAM_FORMATS})")
+        if format == 'parquet' and not PYARROW_AVAILABLE:
+            logger.warning("pyarrow not installed; writing JSONL instead of Parquet")
+            format = 'jsonl'
+        
+        self.format = format
+        self.path = Path(output_path).with_suffix(f'.{format}')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.dictionary_columns = set(dictionary_columns)
+        self.batch_size = batch_size
+        self.rows_written = 0
+        
+        self._codes: Dict[str, Dict[Any, int]] = {column: {} for column in self.dictionary_columns}
+        self._buffer: List[Dict] = []
+        self._schema = None
+        self._json_columns: List[str] = []
+        self._parquet_writer = None
+        self._file = open(self.path, 'w') if format == 'jsonl' else None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def write(self, record: Dict[str, Any]):
+        """Append one record."""
+        if self.format == 'jsonl':
+            self._write_jsonl(record)
+        else:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_parquet()
+        self.rows_written += 1
+    
+    def write_many(self, records: Iterable[Dict[str, Any]]):
+        """Append records in order."""
+        for record in records:
+            self.write(record)
+    
+    def close(self):
+        """Flush buffered rows and close the file."""
+        if self.format == 'parquet':
+            self._flush_parquet()
+            if self._parquet_writer is None:
+                # No rows: still leave a readable (empty) file
+                pq.write_table(pa.table({}), self.path)
+            else:
+                self._parquet_writer.close()
+                self._parquet_writer = None
+        elif self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def _write_jsonl(self, record: Dict[str, Any]):
+        encoded = dict(record)
+        for column, value in record.items():
+            if column not in self.dictionary_columns:
+                continue
+            codes = self._codes[column]
+            key = _dictionary_key(value)
+            if key not in codes:
+                codes[key] = len(codes)
+                self._file.write(json.dumps({'$dict': column, 'code': codes[key], 'value': value},
+                                            default=_json_default) + '\n')
+            encoded[column] = codes[key]
+        self._file.write(json.dumps(encoded, default=_json_default, separators=(',', ':')) + '\n')
+    
+    @staticmethod
+    def _needs_json(values: List[Any], dictionary: bool) -> bool:
+        if all(v is None for v in values):
+            return True
+        if dictionary:
+            return any(v is not None and not isinstance(v, str) for v in values)
+        return any(isinstance(v, (dict, list)) for v in values)
+    
+    def _flush_parquet(self):
+        if not self._buffer:
+            return
+        columns = list(self._schema.names) if self._schema is not None else []
+        known = set(columns)
+        new_columns = [column for column in dict.fromkeys(key for row in self._buffer for key in row)
+                       if column not in known]
+        # JSON-encode new columns whose type this batch cannot pin down
+        self._json_columns += [column for column in new_columns
+                               if self._needs_json([row.get(column) for row in self._buffer],
+                                                   column in self.dictionary_columns)]
+        columns += new_columns
+        
+        arrays = []
+        for column in columns:
+            values = [row.get(column) for row in self._buffer]
+            if column in self._json_columns:
+                values = [None if v is None else json.dumps(v, default=_json_default) for v in values]
+            if column in self.dictionary_columns:
+                arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+            else:
+                arrays.append(pa.array(values, type=pa.string() if column in self._json_columns else None))
+        table = pa.table(arrays, names=columns)
+        
+        metadata = {'json_columns': json.dumps(self._json_columns)}
+        if self._schema is None:
+            self._schema = table.schema.with_metadata(metadata)
+            self._parquet_writer = pq.ParquetWriter(self.path, self._schema, compression='zstd')
+        else:
+            try:
+                schema = pa.unify_schemas([self._schema, table.schema], promote_options='permissive')
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise ValueError(f"Records for {self.path} change column types: {e}") from e
+            schema = schema.with_metadata(metadata)
+            if not schema.equals(self._schema, check_metadata=True):
+                self._widen_parquet(schema)
+        self._parquet_writer.write_table(_conform(table, self._schema))
+        self._buffer = []
+    
+    def _widen_parquet(self, schema):
+        """Reopen the file under a wider schema, rewriting the rows so far."""
+        self._parquet_writer.close()
+        previous = self.path.with_name(self.path.name + '.widen')
+        self.path.replace(previous)
+        self._schema = schema
+        self._parquet_writer = pq.ParquetWriter(self.path, schema, compression='zstd')
+        for batch in pq.ParquetFile(previous).iter_batches(batch_size=self.batch_size):
+            self._parquet_writer.write_table(_conform(pa.Table.from_batches([batch]), schema))
+        previous.unlink()
+
+
+def _conform(table, schema):
+    """Cast a table to a schema, adding missing columns as nulls."""
+    arrays = [table.column(field.name).cast(field.type) if field.name in table.column_names
+              else pa.nulls(len(table), field.type) for field in schema]
+    return pa.table(arrays, schema=schema)
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Iterate records written by StreamingRecordWriter (or a JSON array file).
+    
+    Args:
+        path: .jsonl, .parquet or .json file
+        
+    Yields:
+        Records with dictionary-encoded and JSON columns decoded
+    """
+    path = Path(path)
+    if path.suffix == '.jsonl':
+        dictionaries: Dict[str, Dict[int, Any]] = {}
+        with open(path) as f:
+            for line in f:
+                record = json.loads(line)
+                if '$dict' in record:
+                    dictionaries.setdefault(record['$dict'], {})[record['code']] = record['value']
+                    continue
+                for column, values in dictionaries.items():
+                    if column in record:
+                        record[column] = values[record[column]]
+                yield record
+    elif path.suffix == '.parquet':
+        parquet_file = pq.ParquetFile(path)
+        metadata = parquet_file.schema_arrow.metadata or {}
+        json_columns = json.loads(metadata.get(b'json_columns', b'[]'))
+        for batch in parquet_file.iter_batches():
+            for record in batch.to_pylist():
+                for column in json_columns:
+                    if record.get(column) is not None:
+                        record[column] = json.loads(record[column])
+                yield record
+    else:
+        with open(path) as f:
+            yield from json.load(f)
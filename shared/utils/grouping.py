@@ -0,0 +1,248 @@
+"""Transitive grouping of skills from pairwise relationships.
+
+Pairwise detectors (redundancy relationships, similar-name pairs, state
+variants) produce edges; downstream steps want groups. Grouping greedily
+("skip a pair if either skill is already in a group") depends on the
+order pairs are visited and splits chains A~B~C whenever B was claimed
+first. Here groups are the connected components of the edge set, i.e.
+the partition a disjoint-set (union-find) structure ends up with after
+uniting every edge, computed in near-linear time with
+scipy.sparse.csgraph.
+
+Group IDs are stable: members are ordered by node order (the ``nodes``
+sequence, or sorted IDs) and groups by their first member, so the same
+edges always give the same IDs whatever order they arrive in.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+@dataclass
+class SkillGroup:
+    """One connected group of skills."""
+    group_id: str
+    skill_ids: List[Hashable]
+    edge_count: int
+    relationship_types: Dict[str, int] = field(default_factory=dict)
+    mean_confidence: Optional[float] = None
+    min_confidence: Optional[float] = None
+    max_confidence: Optional[float] = None
+
+    @property
+    def size(self) -> int:
+        return len(self.skill_ids)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'group_id': self.group_id,
+            'skill_ids': list(self.skill_ids),
+            'size': self.size,
+            'edge_count': self.edge_count,
+            'relationship_types': dict(self.relationship_types),
+            'mean_confidence': self.mean_confidence,
+            'min_confidence': self.min_confidence,
+            'max_confidence': self.max_confidence,
+        }
+
+
+@dataclass
+class GroupingResult:
+    """Groups, skill -> group membership and summary statistics."""
+    groups: List[SkillGroup]
+    membership: Dict[Hashable, str]
+    statistics: Dict[str, Any]
+
+    def group_of(self, skill_id: Hashable) -> Optional[str]:
+        return self.membership.get(skill_id)
+
+
+def group_edges(left: Sequence[Hashable],
+                right: Sequence[Hashable],
+                confidence: Optional[Sequence[float]] = None,
+                edge_types: Optional[Sequence[str]] = None,
+                nodes: Optional[Sequence[Hashable]] = None,
+                min_group_size: int = 2,
+                id_prefix: str = 'GRP',
+                id_width: int = 4) -> GroupingResult:
+    """
+    Group nodes into connected components of an undirected edge list.
+
+    Args:
+        left: First node of each edge
+        right: Second node of each edge
+        confidence: Optional confidence per edge, for group statistics
+        edge_types: Optional type label per edge, for group statistics
+        nodes: Node order for member and group ordering. Nodes not listed
+            are appended in sorted order; with min_group_size=1 every
+            listed node gets a group, including isolated ones.
+        min_group_size: Smallest group to keep
+        id_prefix: Group ID prefix
+        id_width: Zero-padding of the group number
+
+    Returns:
+        GroupingResult with groups numbered {id_prefix}-0001, ...
+    """
+    left = np.asarray(left, dtype=object)
+    right = np.asarray(right, dtype=object)
+    if len(left) != len(right):
+        raise ValueError(f"Edge lists differ in length: {len(left)} vs {len(right)}")
+
+    # Integer codes in node order: listed nodes first, then the rest sorted
+    endpoints = pd.unique(np.concatenate([left, right]))
+    listed = pd.Index(pd.unique(np.asarray(nodes, dtype=object))) if nodes is not None else pd.Index([])
+    extra = pd.Index(endpoints).difference(listed, sort=False)
+    index = listed.append(pd.Index(sorted(extra)))
+    n_nodes = len(index)
+
+    left_codes = index.get_indexer(left)
+    right_codes = index.get_indexer(right)
+    if n_nodes == 0:
+        return GroupingResult(groups=[], membership={}, statistics=_statistics([], 0, 0))
+
+    graph = coo_matrix((np.ones(len(left_codes), dtype=np.int8), (left_codes, right_codes)),
+                       shape=(n_nodes, n_nodes)).tocsr()
+    _, labels = connected_components(graph, directed=False)
+
+    # Order components by their first member in node order
+    _, first_codes, sizes = np.unique(labels, return_index=True, return_counts=True)
+    kept = np.flatnonzero(sizes >= max(min_group_size, 1))
+    kept = kept[np.argsort(first_codes[kept], kind='stable')]
+    group_number = np.full(len(sizes), -1, dtype=np.int64)
+    group_number[kept] = np.arange(len(kept))
+
+    node_group = group_number[labels]
+    edge_group = node_group[left_codes]
+
+    # Members per group, in node order
+    node_values = np.asarray(index, dtype=object)
+    grouped_codes = np.flatnonzero(node_group >= 0)
+    grouped_codes = grouped_codes[np.argsort(node_group[grouped_codes], kind='stable')]
+    boundaries = np.cumsum(np.bincount(node_group[grouped_codes], minlength=len(kept)))[:-1]
+    members = [part.tolist() for part in np.split(node_values[grouped_codes], boundaries)] if len(kept) else []
+
+    edge_mask = edge_group >= 0
+    edge_counts = np.bincount(edge_group[edge_mask], minlength=len(kept))
+    type_counts: List[Counter] = [Counter() for _ in kept]
+    if edge_types is not None:
+        for g, edge_type in zip(edge_group.tolist(), edge_types):
+            if g >= 0:
+                type_counts[g][str(edge_type)] += 1
+
+    conf_mean = conf_min = conf_max = np.full(len(kept), np.nan)
+    if confidence is not None and len(left_codes):
+        conf = np.asarray(confidence, dtype=float)[edge_mask]
+        conf_group = edge_group[edge_mask]
+        valid = ~np.isnan(conf)
+        counts = np.bincount(conf_group[valid], minlength=len(kept))
+        sums = np.bincount(conf_group[valid], weights=conf[valid], minlength=len(kept))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            conf_mean = np.where(counts > 0, sums / counts, np.nan)
+        conf_min = np.full(len(kept), np.inf)
+        conf_max = np.full(len(kept), -np.inf)
+        np.minimum.at(conf_min, conf_group[valid], conf[valid])
+        np.maximum.at(conf_max, conf_group[valid], conf[valid])
+        conf_min[counts == 0] = np.nan
+        conf_max[counts == 0] = np.nan
+
+    def _optional(value: float) -> Optional[float]:
+        return None if np.isnan(value) else float(value)
+
+    groups = []
+    membership = {}
+    for g, skill_ids in enumerate(members):
+        group_id = f"{id_prefix}-{g + 1:0{id_width}d}"
+        groups.append(SkillGroup(
+            group_id=group_id,
+            skill_ids=skill_ids,
+            edge_count=int(edge_counts[g]),
+            relationship_types=dict(type_counts[g]),
+            mean_confidence=_optional(conf_mean[g]),
+            min_confidence=_optional(conf_min[g]),
+            max_confidence=_optional(conf_max[g]),
+        ))
+        membership.update(dict.fromkeys(skill_ids, group_id))
+
+    statistics = _statistics([group.size for group in groups], len(left_codes), n_nodes)
+    return GroupingResult(groups=groups, membership=membership, statistics=statistics)
+
+
+def _statistics(group_sizes: List[int], n_edges: int, n_nodes: int) -> Dict[str, Any]:
+    return {
+        'edges': int(n_edges),
+        'nodes': int(n_nodes),
+        'groups': len(group_sizes),
+        'skills_in_groups': int(sum(group_sizes)),
+        'largest_group': int(max(group_sizes)) if group_sizes else 0,
+        'mean_group_size': float(np.mean(group_sizes)) if group_sizes else 0.0,
+        'size_distribution': {int(size): int(count)
+                              for size, count in sorted(Counter(group_sizes).items())},
+    }
+
+
+def group_relationships(relationships: Iterable[Any],
+                        relationship_types: Optional[Iterable[str]] = None,
+                        min_confidence: Optional[float] = None,
+                        nodes: Optional[Sequence[Hashable]] = None,
+                        min_group_size: int = 2,
+                        id_prefix: str = 'GRP',
+                        id_width: int = 4) -> GroupingResult:
+    """
+    Group skills connected by relationships of the given types.
+
+    Accepts relationship records (dicts with skill_a_id, skill_b_id,
+    relationship_type and confidence, as written by the redundancy
+    analyzer) or SkillRelationship objects.
+
+    Args:
+        relationships: Relationship records or objects
+        relationship_types: Keep only these types (default: all)
+        min_confidence: Keep only edges with at least this confidence
+        nodes: Node order, see group_edges()
+        min_group_size: Smallest group to keep
+        id_prefix: Group ID prefix
+        id_width: Zero-padding of the group number
+
+    Returns:
+        GroupingResult; statistics also count the edges filtered out
+    """
+    wanted = {str(t) for t in relationship_types} if relationship_types is not None else None
+
+    left, right, confidence, edge_types = [], [], [], []
+    total = 0
+    for rel in relationships:
+        total += 1
+        if isinstance(rel, dict):
+            skill_a, skill_b = rel.get('skill_a_id'), rel.get('skill_b_id')
+            rel_type, conf = rel.get('relationship_type'), rel.get('confidence')
+        else:
+            skill_a, skill_b = rel.skill_a_id, rel.skill_b_id
+            rel_type, conf = rel.relationship_type, rel.confidence
+        rel_type = getattr(rel_type, 'value', rel_type)
+
+        if not skill_a or not skill_b:
+            continue
+        if wanted is not None and rel_type not in wanted:
+            continue
+        if not isinstance(conf, (int, float)):
+            conf = np.nan
+        if min_confidence is not None and not conf >= min_confidence:
+            continue
+
+        left.append(skill_a)
+        right.append(skill_b)
+        confidence.append(conf)
+        edge_types.append(rel_type)
+
+    result = group_edges(left, right, confidence=confidence, edge_types=edge_types,
+                         nodes=nodes, min_group_size=min_group_size,
+                         id_prefix=id_prefix, id_width=id_width)
+    result.statistics['relationships'] = total
+    result.statistics['relationships_filtered'] = total - len(left)
+    return result
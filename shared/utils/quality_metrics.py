@@ -15,18 +15,22 @@ Usage:
     quality = calculator.calculate_base_skill_quality(base_skill, metadata_df, sor_taxonomy)
 """
 
+import sys
 import pandas as pd
 import numpy as np
 from typing import List, Dict, Optional
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
 try:
-    from sentence_transformers import SentenceTransformer
     from sklearn.metrics.pairwise import cosine_similarity
     from sklearn.metrics import silhouette_score
-    EMBEDDINGS_AVAILABLE = True
+    from shared.embeddings import EmbeddingStore, embedding_backend_available, load_embedding_backend
+    EMBEDDINGS_AVAILABLE = embedding_backend_available()
 except ImportError:
     EMBEDDINGS_AVAILABLE = False
+if not EMBEDDINGS_AVAILABLE:
     print("Warning: sentence-transformers not available. Some quality metrics will be limited.")
 
 
@@ -36,7 +40,8 @@ class QualityMetricsCalculator:
     def __init__(self):
         """Initialize the quality metrics calculator."""
         if EMBEDDINGS_AVAILABLE:
-            self.embedder = SentenceTransformer('all-MiniLM-L6-v2')
+            self.embedder = load_embedding_backend('all-MiniLM-L6-v2')
+            self.embedding_store = EmbeddingStore('all-MiniLM-L6-v2', model=self.embedder)
         else:
             self.embedder = None
     
@@ -116,7 +121,7 @@ class QualityMetricsCalculator:
         
         # Calculate embeddings
         skill_names = member_skills['SKILL_NAME'].tolist()
-        embeddings = self.embedder.encode(skill_names)
+        embeddings = self.embedding_store.encode(skill_names)
         
         # Calculate pairwise cosine similarities
         similarities = cosine_similarity(embeddings)
@@ -20,6 +20,7 @@ Usage:
 """
 
 import pandas as pd
+import numpy as np
 import sys
 import json
 import argparse
@@ -30,6 +31,11 @@ import time
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / '02-skill-redundancy-relationships' / 'src' / 'detectors'))
+
+from candidate_generator import TermSetIndex
+from shared.utils.grouping import group_edges
 
 try:
     from spacy_processor import SkillProcessor
@@ -218,8 +224,12 @@ class IntegratedSkillPipeline:
         
         print(f"\n🔍 Analyzing {len(self.enriched_df)} skills for redundancies...")
         
-        redundancy_groups = []
-        processed_skills = set()
+        # Similar pairs from every section; groups are their connected
+        # components, so chains of similar skills end up in one group
+        # whatever order the pairs are found in
+        left, right = [], []
+        section_of = {}
+        node_order = []
         
         # Group by content area and skill area for efficiency
         grouping_cols = []
@@ -241,29 +251,25 @@ class IntegratedSkillPipeline:
             print(f"\n   Analyzing: {group_name} ({len(group)} skills)")
             
             # Simple similarity detection
-            for idx1, skill1 in group.iterrows():
-                if idx1 in processed_skills:
-                    continue
-                
-                similar_skills = [skill1.to_dict()]
-                
-                for idx2, skill2 in group.iterrows():
-                    if idx2 <= idx1 or idx2 in processed_skills:
-                        continue
-                    
-                    if self._check_similarity(skill1, skill2):
-                        similar_skills.append(skill2.to_dict())
-                        processed_skills.add(idx2)
-                
-                if len(similar_skills) > 1:
-                    redundancy_groups.append({
-                        "group_id": f"RED-{len(redundancy_groups)+1:03d}",
-                        "group_key": group_name,
-                        "skill_count": len(similar_skills),
-                        "skill_ids": [s['SKILL_ID'] for s in similar_skills],
-                        "skill_names": [s['SKILL_NAME'] for s in similar_skills]
-                    })
-                    processed_skills.add(idx1)
+            similar_pairs = self._find_similar_pairs(group)
+            for idx1, partners in similar_pairs.items():
+                left.extend([idx1] * len(partners))
+                right.extend(partners)
+            section_of.update(dict.fromkeys(group.index, group_name))
+            node_order.extend(group.index)
+        
+        grouping = group_edges(left, right, nodes=node_order, id_prefix='RED', id_width=3)
+        
+        redundancy_groups = []
+        for skill_group in grouping.groups:
+            members = self.enriched_df.loc[skill_group.skill_ids]
+            redundancy_groups.append({
+                "group_id": skill_group.group_id,
+                "group_key": section_of[skill_group.skill_ids[0]],
+                "skill_count": skill_group.size,
+                "skill_ids": members['SKILL_ID'].tolist(),
+                "skill_names": members['SKILL_NAME'].tolist()
+            })
         
         self.redundancy_groups = redundancy_groups
         
@@ -275,7 +281,8 @@ class IntegratedSkillPipeline:
                 "redundancy_groups": redundancy_groups,
                 "total_groups": len(redundancy_groups),
                 "skills_in_groups": sum(g['skill_count'] for g in redundancy_groups),
-                "unique_concepts_estimated": len(self.enriched_df) - sum(g['skill_count'] - 1 for g in redundancy_groups)
+                "unique_concepts_estimated": len(self.enriched_df) - sum(g['skill_count'] - 1 for g in redundancy_groups),
+                "group_statistics": grouping.statistics
             }, f, indent=2)
         
         elapsed = time.time() - start_time
@@ -303,36 +310,53 @@ class IntegratedSkillPipeline:
         
         return redundancy_groups
     
-    def _check_similarity(self, skill1: pd.Series, skill2: pd.Series) -> bool:
-        """Check if two skills are similar enough to be grouped."""
-        # Same grade level check
-        if 'GRADE_LEVEL_SHORT_NAME' in skill1.index:
-            if skill1['GRADE_LEVEL_SHORT_NAME'] != skill2['GRADE_LEVEL_SHORT_NAME']:
-                return False
+    STOPWORDS = {'a', 'an', 'the', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'and', 'or', 'from', 'using'}
+    
+    def _find_similar_pairs(self, group: pd.DataFrame) -> Dict:
+        """
+        Find skill pairs in a group that are similar enough to be grouped.
         
-        # Text-based similarity (simple word overlap)
-        words1 = set(str(skill1['SKILL_NAME']).lower().split())
-        words2 = set(str(skill2['SKILL_NAME']).lower().split())
+        A pair needs the same grade level and a name word overlap (Jaccard,
+        stopwords removed) above 0.5, blended 70/30 with concept action
+        overlap when the earlier skill has actions. Word and action sets are
+        sparse skill x term matrices, so intersections for the whole group
+        come from one sparse product instead of per-pair set operations.
         
-        stopwords = {'a', 'an', 'the', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'and', 'or', 'from', 'using'}
-        words1 = words1 - stopwords
-        words2 = words2 - stopwords
+        Returns:
+            Dict mapping each index label to the later labels (group order)
+            it is similar to
+        """
+        labels = group.index.to_numpy()
+        words = TermSetIndex(group['SKILL_NAME'],
+                             tokenizer=lambda name: set(str(name).lower().split()) - self.STOPWORDS)
         
-        if not words1 or not words2:
-            return False
+        # Only pairs sharing a name word can pass: 0.7 * overlap + 0.3 <= 0.5 otherwise
+        word_overlap = words.jaccard_block(0, len(group)).tocoo()
+        pos1, pos2, overlap = word_overlap.row, word_overlap.col, word_overlap.data
+        keep = labels[pos1] < labels[pos2]
+        pos1, pos2, overlap = pos1[keep], pos2[keep], overlap[keep]
         
-        overlap = len(words1 & words2) / len(words1 | words2)
+        # Same grade level check
+        if 'GRADE_LEVEL_SHORT_NAME' in group.columns:
+            grade_codes, _ = pd.factorize(group['GRADE_LEVEL_SHORT_NAME'], use_na_sentinel=True)
+            keep = (grade_codes[pos1] == grade_codes[pos2]) & (grade_codes[pos1] >= 0)
+            pos1, pos2, overlap = pos1[keep], pos2[keep], overlap[keep]
         
         # Concept-based enhancement (if concepts available)
-        if 'concepts_actions' in skill1.index and skill1['concepts_actions']:
-            actions1 = set(str(skill1['concepts_actions']).split('|'))
-            actions2 = set(str(skill2['concepts_actions']).split('|'))
-            
-            if actions1 and actions2:
-                action_overlap = len(actions1 & actions2) / len(actions1 | actions2)
-                overlap = 0.7 * overlap + 0.3 * action_overlap
-        
-        return overlap > 0.5
+        if 'concepts_actions' in group.columns:
+            actions = TermSetIndex(group['concepts_actions'],
+                                   tokenizer=lambda value: set(str(value).split('|')))
+            has_actions = np.array([bool(value) for value in group['concepts_actions']])
+            action_overlap = actions.jaccard(pos1, pos2)
+            overlap = np.where(has_actions[pos1], 0.7 * overlap + 0.3 * action_overlap, overlap)
+        
+        keep = overlap > 0.5
+        pos1, pos2 = pos1[keep], pos2[keep]
+        
+        similar_pairs = {}
+        for k in np.lexsort((pos2, pos1)):
+            similar_pairs.setdefault(labels[pos1[k]], []).append(labels[pos2[k]])
+        return similar_pairs
     
     def run_macro_level(self) -> List[Dict]:
         """